@@ -9,7 +9,7 @@ import os
 from typing import Dict, List, Optional
 from datetime import datetime
 import pytz
-import requests
+from http_session import get_session
 import time
 
 
@@ -181,7 +181,7 @@ class AINewsScriptGenerator:
             "max_tokens": self.max_tokens
         }
         
-        response = requests.post(api_url, headers=headers, json=data, timeout=30)
+        response = get_session().post(api_url, headers=headers, json=data, timeout=30)
         response.raise_for_status()
         
         result = response.json()
@@ -205,7 +205,7 @@ class AINewsScriptGenerator:
             ]
         }
         
-        response = requests.post(api_url, headers=headers, json=data, timeout=30)
+        response = get_session().post(api_url, headers=headers, json=data, timeout=30)
         response.raise_for_status()
         
         result = response.json()
@@ -228,7 +228,7 @@ class AINewsScriptGenerator:
             "temperature": self.temperature
         }
         
-        response = requests.post(api_url, headers=headers, json=data, timeout=30)
+        response = get_session().post(api_url, headers=headers, json=data, timeout=30)
         response.raise_for_status()
         
         result = response.json()
@@ -0,0 +1,137 @@
+# coding=utf-8
+"""
+离线抓取基准：用录制数据启动本地回放服务（可配置延迟与故障注入），
+多轮执行 crawl_websites 并统计耗时；加 --pipeline 时以回放模式完整执行 NewsAnalyzer.run
+
+未指定 --recordings 时，自动把 output/ 下最新的 txt 快照导入为临时录制数据。
+故障按 (种子, 平台, 请求序号) 注入，同一参数下每次运行的抓取结果一致（结果摘要相同）。
+
+用法（在项目根目录执行）:
+  python benchmarks/bench_crawl.py [--latency 80] [--jitter 40] [--failure-rate 0.1] [--rounds 3]
+  python benchmarks/bench_crawl.py --batch-size 20
+  python benchmarks/bench_crawl.py --pipeline
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("CONFIG_PATH", str(ROOT / "config" / "config.yaml"))
+os.environ.setdefault("FREQUENCY_WORDS_PATH", str(ROOT / "config" / "frequency_words.txt"))
+
+from newsnow_replay import RecordingStore, import_snapshots, start_replay_server
+
+
+def prepare_recordings(recordings_dir: str, work_dir: Path) -> RecordingStore:
+    """使用指定录制目录，或从最新 txt 快照生成录制数据"""
+    if recordings_dir:
+        return RecordingStore(Path(recordings_dir))
+
+    snapshots = sorted((ROOT / "output").glob("*/txt/*.txt"))
+    if not snapshots:
+        raise SystemExit("output/ 下没有 txt 快照，请用 --recordings 指定录制目录")
+    store = RecordingStore(work_dir / "recordings")
+    import_snapshots(store, [snapshots[-1]])
+    print(f"已从快照导入录制数据: {snapshots[-1].relative_to(ROOT)}")
+    return store
+
+
+def digest(results: dict) -> str:
+    """抓取结果摘要，用于确认多次运行结果一致"""
+    encoded = json.dumps(results, ensure_ascii=False, sort_keys=True).encode("utf-8")
+    return hashlib.sha1(encoded).hexdigest()[:12]
+
+
+def bench_crawl(store: RecordingStore, rounds: int, batch_size: int = 0, **server_options):
+    """每轮启动新的回放服务，使各轮注入的故障序列相同"""
+    from main import DataFetcher, MirrorSelector
+
+    ids = store.sources()
+    print(f"\n抓取基准: {len(ids)} 个平台，{rounds} 轮")
+    for round_index in range(1, rounds + 1):
+        server = start_replay_server(store, **server_options)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        fetcher = DataFetcher(
+            mirror_selector=MirrorSelector([base_url]),
+            host_rate_limit=0,
+            retry_budget=len(ids) * 3,
+            batch_size=batch_size,
+        )
+        start = time.perf_counter()
+        try:
+            results, _, failed_ids = fetcher.crawl_websites(
+                ids, request_interval=1, max_retries=3, min_retry_wait=0.05, max_retry_wait=0.1
+            )
+        finally:
+            server.shutdown()
+        elapsed = time.perf_counter() - start
+        print(
+            f"第{round_index}轮: {elapsed:.2f} 秒，成功 {len(results)}，失败 {len(failed_ids)}，"
+            f"结果摘要 {digest(results)}"
+        )
+
+
+def bench_pipeline(store: RecordingStore, work_dir: Path):
+    import main
+
+    main.CONFIG["FETCH_MODE"] = "replay"
+    main.CONFIG["RECORDINGS_DIR"] = str(store.root.resolve())
+    main.CONFIG["ENABLE_NOTIFICATION"] = False
+    main.CONFIG["PLATFORMS"] = [
+        platform for platform in main.CONFIG["PLATFORMS"] if platform["id"] in store.sources()
+    ]
+    os.environ["DOCKER_CONTAINER"] = "true"
+
+    pipeline_dir = work_dir / "pipeline"
+    pipeline_dir.mkdir()
+    os.chdir(pipeline_dir)
+    print(f"\n完整流程基准（回放模式，工作目录 {pipeline_dir}）")
+    start = time.perf_counter()
+    main.NewsAnalyzer().run()
+    print(f"完整流程耗时: {time.perf_counter() - start:.2f} 秒")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="离线抓取基准")
+    parser.add_argument("--recordings", default="", help="录制目录，默认从最新快照导入")
+    parser.add_argument("--latency", type=float, default=80, help="回放服务响应延迟（毫秒）")
+    parser.add_argument("--jitter", type=float, default=40, help="延迟抖动（毫秒）")
+    parser.add_argument("--failure-rate", type=float, default=0.1, help="故障注入比例")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--batch-size", type=int, default=0, help="批量获取的分块大小，0 为逐个请求")
+    parser.add_argument("--pipeline", action="store_true", help="额外执行一次完整分析流程")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        work_dir = Path(tmp)
+        store = prepare_recordings(args.recordings, work_dir)
+        print(
+            f"回放服务延迟 {args.latency}±{args.jitter} ms，"
+            f"故障比例 {args.failure_rate}，种子 {args.seed}"
+        )
+        try:
+            bench_crawl(
+                store,
+                args.rounds,
+                batch_size=args.batch_size,
+                latency_ms=args.latency,
+                jitter_ms=args.jitter,
+                failure_rate=args.failure_rate,
+                seed=args.seed,
+            )
+            if args.pipeline:
+                bench_pipeline(store, work_dir)
+        finally:
+            os.chdir(ROOT)
+
+
+if __name__ == "__main__":
+    main()
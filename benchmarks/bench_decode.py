@@ -0,0 +1,117 @@
+# coding=utf-8
+"""
+响应解码微基准：对比旧流程（response.text → 两次 json.loads → 构建字典）
+与单次解码流程（字节直接解码 → TitleRecord → 构建字典）的耗时和内存分配
+
+用法（在项目根目录执行）:
+  python benchmarks/bench_decode.py [条目数] [轮数]
+"""
+
+import json
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import requests
+
+from main import build_title_data, parse_heat, parse_newsnow_payload
+
+
+def make_payload(item_count: int) -> bytes:
+    """构造接近 newsnow 格式的大体量响应"""
+    items = []
+    for i in range(item_count):
+        items.append(
+            {
+                "id": f"item-{i}",
+                "title": f"第{i}条热点新闻标题：某地发布重要通知，涉及多项民生政策调整",
+                "url": f"https://example.com/news/{i}",
+                "mobileUrl": f"https://m.example.com/news/{i}",
+                "extra": {"info": f"{i * 37 % 9999}万热度", "hover": "摘要" * 20},
+            }
+        )
+    data = {"status": "success", "id": "bench", "updatedTime": 0, "items": items}
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+def make_response(payload: bytes) -> requests.Response:
+    """构造未声明字符集的响应对象，与真实上游一致"""
+    response = requests.Response()
+    response.status_code = 200
+    response._content = payload
+    response.headers["Content-Type"] = "application/json"
+    return response
+
+
+def legacy_decode(payload: bytes) -> dict:
+    """旧流程：fetch_data 解码一次校验状态，crawl_websites 再解码一次构建结果"""
+    response = make_response(payload)
+    data_text = response.text
+    data_json = json.loads(data_text)
+    if data_json.get("status", "未知") not in ["success", "cache"]:
+        raise ValueError("响应状态异常")
+
+    results = {}
+    data = json.loads(data_text)
+    for index, item in enumerate(data.get("items", []), 1):
+        title = item["title"]
+        if title in results:
+            results[title]["ranks"].append(index)
+        else:
+            results[title] = {
+                "ranks": [index],
+                "url": item.get("url", ""),
+                "mobileUrl": item.get("mobileUrl", ""),
+            }
+            # 与单次解码流程一样提取热度，两种流程的结果可直接比较
+            heat = parse_heat(item.get("extra"))
+            if heat is not None:
+                results[title]["heat"] = heat
+    return results
+
+
+def single_decode(payload: bytes) -> dict:
+    """单次解码流程"""
+    response = make_response(payload)
+    _, records = parse_newsnow_payload(response.content)
+    return build_title_data(records)
+
+
+def measure(func, payload: bytes, rounds: int):
+    """返回(平均耗时毫秒, 峰值分配KB)"""
+    func(payload)
+    start = time.perf_counter()
+    for _ in range(rounds):
+        func(payload)
+    elapsed = (time.perf_counter() - start) / rounds * 1000
+
+    tracemalloc.start()
+    func(payload)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak / 1024
+
+
+def main():
+    item_count = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+    rounds = int(sys.argv[2]) if len(sys.argv) > 2 else 5
+    payload = make_payload(item_count)
+
+    assert legacy_decode(payload) == single_decode(payload)
+
+    print(f"响应大小: {len(payload) / 1024 / 1024:.2f} MB，条目数: {item_count}，轮数: {rounds}")
+    legacy_time, legacy_peak = measure(legacy_decode, payload, rounds)
+    single_time, single_peak = measure(single_decode, payload, rounds)
+    print(f"旧流程  : {legacy_time:8.1f} ms/次，峰值分配 {legacy_peak:10.0f} KB")
+    print(f"单次解码: {single_time:8.1f} ms/次，峰值分配 {single_peak:10.0f} KB")
+    print(
+        f"耗时降低 {(1 - single_time / legacy_time) * 100:.1f}%，"
+        f"峰值分配降低 {(1 - single_peak / legacy_peak) * 100:.1f}%"
+    )
+
+
+if __name__ == "__main__":
+    main()
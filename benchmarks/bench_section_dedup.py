@@ -0,0 +1,102 @@
+# coding=utf-8
+"""
+快照去重统计：把 output/ 下已有的 txt 快照按时间顺序在临时目录中重新写入（开启 storage.dedup_sections），
+校验读回结果与原快照一致，并统计去重前后的磁盘占用
+
+用法（在项目根目录执行）:
+  python benchmarks/bench_section_dedup.py [--output output]
+"""
+
+import argparse
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+os.environ.setdefault("CONFIG_PATH", str(ROOT / "config" / "config.yaml"))
+
+import main
+from main import MANIFEST_FILE, OUTPUT_INDEX_FILE, SECTION_DIR, parse_snapshot_file, save_titles_to_file
+from snapshot_codec import read_failed_ids
+
+
+def file_sizes(paths) -> int:
+    return sum(path.stat().st_size for path in paths)
+
+
+def block_usage(paths) -> int:
+    """按文件系统块计算的实际占用（小文件至少占一个块）"""
+    return sum(path.stat().st_blocks * 512 for path in paths)
+
+
+def main_report():
+    parser = argparse.ArgumentParser(description="快照去重统计")
+    parser.add_argument("--output", default=str(ROOT / "output"), help="输出目录")
+    args = parser.parse_args()
+
+    source_dir = Path(args.output).resolve()
+    date_dirs = sorted(d for d in source_dir.iterdir() if d.is_dir() and (d / "txt").is_dir())
+    if not date_dirs:
+        raise SystemExit(f"{source_dir} 下没有 txt 快照")
+
+    main.CONFIG["STORAGE"].update(BACKEND="txt", DEDUP_SECTIONS=True)
+    original_cwd = os.getcwd()
+    totals = {
+        "before": 0, "snapshots": 0, "sections": 0, "manifests": 0, "refs": 0, "files": 0,
+        "blocks_before": 0, "blocks_after": 0, "section_files": 0,
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            for date_dir in date_dirs:
+                txt_files = sorted((date_dir / "txt").glob("*.txt"))
+                for txt_file in txt_files:
+                    titles_by_id, id_to_name, unchanged_ids = parse_snapshot_file(txt_file)
+                    target = Path("output") / date_dir.name / "txt" / txt_file.name
+                    save_titles_to_file(
+                        titles_by_id, id_to_name, read_failed_ids(txt_file), unchanged_ids,
+                        file_path=str(target),
+                    )
+                    assert parse_snapshot_file(target) == (titles_by_id, id_to_name, unchanged_ids), target
+                    totals["refs"] += target.read_text(encoding="utf-8").count(main.SECTION_REF_PREFIX)
+
+                day_dir = Path("output") / date_dir.name
+                before = file_sizes(txt_files)
+                snapshots = file_sizes((day_dir / "txt").glob("*.txt"))
+                sections = file_sizes((day_dir / SECTION_DIR).glob("*.txt"))
+                totals["before"] += before
+                totals["snapshots"] += snapshots
+                totals["sections"] += sections
+                totals["manifests"] += (day_dir / MANIFEST_FILE).stat().st_size
+                totals["files"] += len(txt_files)
+                totals["blocks_before"] += block_usage(txt_files)
+                section_files = list((day_dir / SECTION_DIR).glob("*.txt"))
+                totals["section_files"] += len(section_files)
+                totals["blocks_after"] += block_usage(
+                    list((day_dir / "txt").glob("*.txt")) + section_files
+                )
+                print(
+                    f"{date_dir.name}: {len(txt_files)} 个快照，"
+                    f"{before / 1024:.1f} KB → {(snapshots + sections) / 1024:.1f} KB"
+                )
+            totals["manifests"] += (Path("output") / OUTPUT_INDEX_FILE).stat().st_size
+        finally:
+            os.chdir(original_cwd)
+
+    after = totals["snapshots"] + totals["sections"]
+    print(
+        f"\n合计 {len(date_dirs)} 天 {totals['files']} 个快照，{totals['refs']} 个来源改为引用：\n"
+        f"  去重前 txt {totals['before'] / 1024:.1f} KB\n"
+        f"  去重后 txt {totals['snapshots'] / 1024:.1f} KB + sections {totals['sections'] / 1024:.1f} KB"
+        f" = {after / 1024:.1f} KB（节省 {1 - after / totals['before']:.1%}）\n"
+        f"  按块计算 {totals['blocks_before'] / 1024:.0f} KB → {totals['blocks_after'] / 1024:.0f} KB"
+        f"（节省 {1 - totals['blocks_after'] / totals['blocks_before']:.1%}，"
+        f"sections 共 {totals['section_files']} 个文件）\n"
+        f"  清单与索引另占 {totals['manifests'] / 1024:.1f} KB"
+    )
+
+
+if __name__ == "__main__":
+    main_report()
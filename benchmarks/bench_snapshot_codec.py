@@ -0,0 +1,119 @@
+# coding=utf-8
+"""
+二进制快照基准：把 output/ 下的 txt 快照转换为二进制格式（写入临时目录），
+对比磁盘占用，以及 parse_file_titles 与二进制读取器（全量解码 / 只读取单个来源）的耗时；
+指定 --base-interval 时按增量快照写入，全量解码改为依次重建各时刻，不测单来源读取
+
+用法（在项目根目录执行）:
+  python benchmarks/bench_snapshot_codec.py [--output output] [--days 3] [--rounds 3] [--base-interval 12]
+"""
+
+import argparse
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+
+from main import parse_file_titles
+from snapshot_codec import (
+    DICTIONARY_FILE,
+    SnapshotReader,
+    convert_txt_day,
+    iter_day,
+    open_dictionary,
+    snapshot_dir,
+)
+
+
+def dir_size(files) -> int:
+    return sum(f.stat().st_size for f in files)
+
+
+def best_of(rounds: int, func) -> float:
+    timings = []
+    for _ in range(rounds):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def bench_day(date_dir: Path, work_dir: Path, rounds: int, base_interval: int = 0):
+    txt_files = sorted((date_dir / "txt").glob("*.txt"))
+    day_dir = work_dir / date_dir.name
+    shutil.copytree(date_dir / "txt", day_dir / "txt")
+    snap_files = convert_txt_day(day_dir, base_interval)
+
+    # 校验转换结果
+    for txt_file, (_, decoded, decoded_names, _) in zip(txt_files, iter_day(day_dir)):
+        assert (decoded, decoded_names) == parse_file_titles(txt_file), txt_file
+
+    def parse_txt():
+        for txt_file in txt_files:
+            parse_file_titles(txt_file)
+
+    def read_snap():
+        if base_interval:
+            for _ in iter_day(day_dir):
+                pass
+            return
+        dictionary = open_dictionary(day_dir)
+        for snap_file in snap_files:
+            SnapshotReader(snap_file, dictionary).read()
+
+    def read_one_source():
+        dictionary = open_dictionary(day_dir)
+        for snap_file in snap_files:
+            reader = SnapshotReader(snap_file, dictionary)
+            if reader.source_ids:
+                reader.titles(reader.source_ids[0])
+
+    txt_size = dir_size(txt_files)
+    snap_size = dir_size(snap_files) + (snapshot_dir(day_dir) / DICTIONARY_FILE).stat().st_size
+    txt_time = best_of(rounds, parse_txt)
+    snap_time = best_of(rounds, read_snap)
+    one_source = ""
+    if not base_interval:
+        one_source = f"，二进制单来源 {best_of(rounds, read_one_source) * 1000:.1f} ms"
+    print(
+        f"{date_dir.name}: {len(txt_files)} 个快照，"
+        f"txt {txt_size / 1024:.1f} KB → 二进制 {snap_size / 1024:.1f} KB "
+        f"({snap_size / txt_size:.1%})；"
+        f"解析 txt {txt_time * 1000:.1f} ms，二进制全量 {snap_time * 1000:.1f} ms{one_source}"
+    )
+    return txt_size, snap_size, txt_time, snap_time
+
+
+def main():
+    parser = argparse.ArgumentParser(description="二进制快照基准")
+    parser.add_argument("--output", default=str(ROOT / "output"), help="输出目录")
+    parser.add_argument("--days", type=int, default=3, help="测试最近几天的快照")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--base-interval", type=int, default=0, help="增量快照的基准间隔，0 为全部保存完整快照")
+    args = parser.parse_args()
+
+    date_dirs = sorted(
+        d for d in Path(args.output).iterdir() if d.is_dir() and any((d / "txt").glob("*.txt"))
+    )[-args.days:]
+    if not date_dirs:
+        raise SystemExit(f"{args.output} 下没有 txt 快照")
+
+    totals = [0, 0, 0.0, 0.0]
+    with tempfile.TemporaryDirectory() as tmp:
+        for date_dir in date_dirs:
+            for i, value in enumerate(bench_day(date_dir, Path(tmp), args.rounds, args.base_interval)):
+                totals[i] += value
+
+    txt_size, snap_size, txt_time, snap_time = totals
+    print(
+        f"\n合计: 体积 {snap_size / txt_size:.1%}，"
+        f"全量解析耗时 {snap_time / txt_time:.1%}（相对 parse_file_titles）"
+    )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,237 @@
+# coding=utf-8
+"""
+分片抓取协调存储（SQLite）
+多个 worker 进程（可在不同节点上，共享同一数据库文件）按租约认领同一轮抓取的平台，
+各自把抓取结果写回存储，协调进程等待并合并为一份快照交给分析阶段。
+
+表结构：
+  runs     (run_id, created_at)                         一轮抓取
+  sources  (run_id, source_id, name, position)          本轮需要抓取的平台，position 为配置顺序
+  leases   (run_id, source_id, worker_id, expires_at)   认领租约，过期后可被其他 worker 重新认领
+  results  (run_id, source_id, worker_id, status, title_data, finished_at)
+           status: success / cache / unchanged / failed / timed_out，title_data 为 JSON，失败时为 NULL
+"""
+
+import json
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS runs (
+    run_id TEXT PRIMARY KEY,
+    created_at REAL NOT NULL
+);
+CREATE TABLE IF NOT EXISTS sources (
+    run_id TEXT NOT NULL,
+    source_id TEXT NOT NULL,
+    name TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (run_id, source_id)
+);
+CREATE TABLE IF NOT EXISTS leases (
+    run_id TEXT NOT NULL,
+    source_id TEXT NOT NULL,
+    worker_id TEXT NOT NULL,
+    expires_at REAL NOT NULL,
+    PRIMARY KEY (run_id, source_id)
+);
+CREATE TABLE IF NOT EXISTS results (
+    run_id TEXT NOT NULL,
+    source_id TEXT NOT NULL,
+    worker_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    title_data TEXT,
+    finished_at REAL NOT NULL,
+    PRIMARY KEY (run_id, source_id)
+);
+"""
+
+
+class CrawlCoordinator:
+    """基于 SQLite 的租约表与结果表，所有写操作在 IMMEDIATE 事务中完成，可供多进程并发使用"""
+
+    def __init__(self, db_path: Union[str, Path], lease_ttl: float = 120):
+        self.db_path = Path(db_path)
+        self.lease_ttl = lease_ttl
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _transaction(self) -> Iterator[sqlite3.Connection]:
+        """打开连接并开启写事务；每次操作单独连接，跨线程、跨进程均可安全使用"""
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        try:
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                yield conn
+            except Exception:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+        finally:
+            conn.close()
+
+    def start_run(self, run_id: str, platforms: List[Tuple[str, str]]) -> None:
+        """登记一轮抓取及其平台列表；各 worker 与协调进程都可调用，重复登记不会覆盖已有数据"""
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO runs (run_id, created_at) VALUES (?, ?)",
+                (run_id, time.time()),
+            )
+            conn.executemany(
+                "INSERT OR IGNORE INTO sources (run_id, source_id, name, position) "
+                "VALUES (?, ?, ?, ?)",
+                [
+                    (run_id, source_id, name, position)
+                    for position, (source_id, name) in enumerate(platforms)
+                ],
+            )
+
+    def claim(
+            self, run_id: str, worker_id: str, limit: int, now: Optional[float] = None
+    ) -> List[Tuple[str, str]]:
+        """
+        认领最多 limit 个尚无结果、且未被认领或租约已过期的平台，返回 [(id, name)]
+
+        没有可认领的平台时返回空列表（其余平台均已完成或正被其他 worker 抓取）
+        """
+        now = time.time() if now is None else now
+        with self._transaction() as conn:
+            rows = conn.execute(
+                """
+                SELECT s.source_id, s.name FROM sources s
+                LEFT JOIN results r ON r.run_id = s.run_id AND r.source_id = s.source_id
+                LEFT JOIN leases l ON l.run_id = s.run_id AND l.source_id = s.source_id
+                WHERE s.run_id = ? AND r.source_id IS NULL
+                  AND (l.source_id IS NULL OR l.expires_at <= ?)
+                ORDER BY s.position
+                LIMIT ?
+                """,
+                (run_id, now, limit),
+            ).fetchall()
+            conn.executemany(
+                "INSERT OR REPLACE INTO leases (run_id, source_id, worker_id, expires_at) "
+                "VALUES (?, ?, ?, ?)",
+                [(run_id, source_id, worker_id, now + self.lease_ttl) for source_id, _ in rows],
+            )
+        return [(source_id, name) for source_id, name in rows]
+
+    def complete(
+            self,
+            run_id: str,
+            worker_id: str,
+            source_id: str,
+            status: str,
+            title_data: Optional[Dict] = None,
+    ) -> None:
+        """写入平台的抓取结果并释放租约；租约过期后被重复抓取时保留先写入的结果"""
+        with self._transaction() as conn:
+            conn.execute(
+                "INSERT OR IGNORE INTO results "
+                "(run_id, source_id, worker_id, status, title_data, finished_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    run_id,
+                    source_id,
+                    worker_id,
+                    status,
+                    None if title_data is None else json.dumps(title_data, ensure_ascii=False),
+                    time.time(),
+                ),
+            )
+            conn.execute(
+                "DELETE FROM leases WHERE run_id = ? AND source_id = ?", (run_id, source_id)
+            )
+
+    def release(self, run_id: str, worker_id: str, source_ids: List[str]) -> None:
+        """放弃本 worker 持有的租约（如 worker 退出前），平台可立即被其他 worker 认领"""
+        with self._transaction() as conn:
+            conn.executemany(
+                "DELETE FROM leases WHERE run_id = ? AND source_id = ? AND worker_id = ?",
+                [(run_id, source_id, worker_id) for source_id in source_ids],
+            )
+
+    def results(self, run_id: str) -> Dict[str, Tuple[str, Optional[Dict]]]:
+        """返回已完成平台的结果 {id: (status, title_data)}，按配置顺序"""
+        with self._transaction() as conn:
+            rows = conn.execute(
+                """
+                SELECT r.source_id, r.status, r.title_data FROM results r
+                JOIN sources s ON s.run_id = r.run_id AND s.source_id = r.source_id
+                WHERE r.run_id = ? ORDER BY s.position
+                """,
+                (run_id,),
+            ).fetchall()
+        return {
+            source_id: (status, None if title_data is None else json.loads(title_data))
+            for source_id, status, title_data in rows
+        }
+
+    def progress(self, run_id: str) -> Tuple[int, int, int]:
+        """返回 (已完成, 正被认领, 平台总数)"""
+        now = time.time()
+        with self._transaction() as conn:
+            total = conn.execute(
+                "SELECT COUNT(*) FROM sources WHERE run_id = ?", (run_id,)
+            ).fetchone()[0]
+            done = conn.execute(
+                "SELECT COUNT(*) FROM results WHERE run_id = ?", (run_id,)
+            ).fetchone()[0]
+            leased = conn.execute(
+                "SELECT COUNT(*) FROM leases WHERE run_id = ? AND expires_at > ?",
+                (run_id, now),
+            ).fetchone()[0]
+        return done, leased, total
+
+    def merge(self, run_id: str) -> Tuple[Dict, Dict, List, List, List]:
+        """
+        按配置顺序合并本轮结果，返回 (results, id_to_name, failed_ids, unchanged_ids, missing_ids)
+
+        前四项与 save_titles_to_file 的参数一致；missing_ids 为超时或尚无结果的平台
+        """
+        with self._transaction() as conn:
+            names = conn.execute(
+                "SELECT source_id, name FROM sources WHERE run_id = ? ORDER BY position",
+                (run_id,),
+            ).fetchall()
+        finished = self.results(run_id)
+
+        results = {}
+        id_to_name = {}
+        failed_ids = []
+        unchanged_ids = []
+        missing_ids = []
+        for source_id, name in names:
+            id_to_name[source_id] = name
+            status, title_data = finished.get(source_id, ("timed_out", None))
+            if status == "timed_out":
+                missing_ids.append(source_id)
+            elif title_data is None:
+                failed_ids.append(source_id)
+            else:
+                results[source_id] = title_data
+                if status == "unchanged":
+                    unchanged_ids.append(source_id)
+        return results, id_to_name, failed_ids, unchanged_ids, missing_ids
+
+    def purge(self, older_than: float) -> int:
+        """删除创建时间早于 older_than（时间戳）的轮次，返回删除的轮次数"""
+        with self._transaction() as conn:
+            run_ids = [
+                row[0]
+                for row in conn.execute(
+                    "SELECT run_id FROM runs WHERE created_at < ?", (older_than,)
+                ).fetchall()
+            ]
+            for table in ("results", "leases", "sources", "runs"):
+                conn.executemany(
+                    f"DELETE FROM {table} WHERE run_id = ?", [(run_id,) for run_id in run_ids]
+                )
+        return len(run_ids)
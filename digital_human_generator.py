@@ -9,7 +9,7 @@ import json
 import time
 from pathlib import Path
 from typing import Optional, Dict
-import requests
+from http_session import get_session
 
 
 class DigitalHumanGenerator:
@@ -95,7 +95,7 @@ class DigitalHumanGenerator:
                 files = {"file": (Path(audio_file).name, f, "audio/mpeg")}
                 data = {"type": "audio"}
                 
-                upload_response = requests.post(
+                upload_response = get_session().post(
                     upload_url,
                     headers=headers,
                     files=files,
@@ -124,7 +124,7 @@ class DigitalHumanGenerator:
                     files = {"file": (Path(self.avatar_image).name, f, "image/jpeg")}
                     data = {"type": "image"}
                     
-                    avatar_upload_response = requests.post(
+                    avatar_upload_response = get_session().post(
                         upload_url,
                         headers=headers,
                         files=files,
@@ -146,7 +146,7 @@ class DigitalHumanGenerator:
                 "format": self.output_format
             }
             
-            create_response = requests.post(
+            create_response = get_session().post(
                 create_url,
                 headers=headers,
                 json=create_payload,
@@ -171,7 +171,7 @@ class DigitalHumanGenerator:
             start_time = time.time()
             
             while time.time() - start_time < max_wait_time:
-                status_response = requests.get(
+                status_response = get_session().get(
                     status_url,
                     headers=headers,
                     timeout=30
@@ -187,7 +187,7 @@ class DigitalHumanGenerator:
                             print(f"✅ 视频生成完成: {video_url}")
                             
                             # 5. 下载视频
-                            video_response = requests.get(video_url, timeout=120)
+                            video_response = get_session().get(video_url, timeout=120)
                             if video_response.status_code == 200:
                                 with open(output_path, "wb") as f:
                                     f.write(video_response.content)
@@ -265,7 +265,7 @@ class DigitalHumanGenerator:
                         "resolution": self.video_resolution
                     }
                     
-                    response = requests.post(
+                    response = get_session().post(
                         api_url,
                         headers=headers,
                         files=files,
@@ -279,7 +279,7 @@ class DigitalHumanGenerator:
                             video_url = result["data"]["video_url"]
                             
                             # 下载视频
-                            video_response = requests.get(video_url, timeout=120)
+                            video_response = get_session().get(video_url, timeout=120)
                             if video_response.status_code == 200:
                                 with open(output_path, "wb") as f:
                                     f.write(video_response.content)
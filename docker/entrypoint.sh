@@ -15,9 +15,17 @@ case "${RUN_MODE:-cron}" in
     echo "🔄 单次执行"
     exec /usr/local/bin/python main.py
     ;;
+"daemon")
+    echo "♻️ 常驻模式（自适应轮询）"
+    exec /usr/local/bin/python main.py --daemon
+    ;;
+"consume")
+    echo "📥 分析进程（消费 --crawl-only 发布的快照）"
+    exec /usr/local/bin/python main.py --consume
+    ;;
 "cron")
-    # 生成 crontab
-    echo "${CRON_SCHEDULE:-*/30 * * * *} cd /app && /usr/local/bin/python main.py" > /tmp/crontab
+    # 生成 crontab（CRON_ARGS 为附加参数，如 --crawl-only）
+    echo "${CRON_SCHEDULE:-*/30 * * * *} cd /app && /usr/local/bin/python main.py ${CRON_ARGS}" > /tmp/crontab
     
     echo "📅 生成的crontab内容:"
     cat /tmp/crontab
@@ -9,7 +9,7 @@ import os
 from pathlib import Path
 from typing import Optional, Dict
 from urllib.parse import quote
-import requests
+from http_session import get_session
 
 
 def send_script_to_feishu_webhook(
@@ -60,7 +60,7 @@ def send_script_to_feishu_webhook(
         if proxy_url:
             proxies = {"http": proxy_url, "https": proxy_url}
         
-        response = requests.post(
+        response = get_session().post(
             webhook_url,
             headers=headers,
             json=payload,
@@ -118,7 +118,7 @@ def send_script_to_feishu_api(
         if proxy_url:
             proxies = {"http": proxy_url, "https": proxy_url}
         
-        token_response = requests.post(
+        token_response = get_session().post(
             token_url,
             json=token_payload,
             proxies=proxies,
@@ -148,7 +148,7 @@ def send_script_to_feishu_api(
             "content": json.dumps({"text": f"📢 **AI财经热点新闻汇总播报**\n\n{script_text}"})
         }
         
-        text_response = requests.post(
+        text_response = get_session().post(
             send_text_url,
             headers=text_headers,
             json=text_payload,
@@ -173,7 +173,7 @@ def send_script_to_feishu_api(
                 files = {"file": (Path(audio_file_path).name, f, "audio/mpeg")}
                 data = {"file_type": "stream"}  # 音频文件类型
                 
-                upload_response = requests.post(
+                upload_response = get_session().post(
                     upload_url,
                     headers=upload_headers,
                     files=files,
@@ -199,7 +199,7 @@ def send_script_to_feishu_api(
                         "content": json.dumps({"file_key": file_token})
                     }
                     
-                    file_response = requests.post(
+                    file_response = get_session().post(
                         send_file_url,
                         headers=file_headers,
                         json=file_payload,
@@ -0,0 +1,146 @@
+# coding=utf-8
+"""
+共享HTTP会话
+全项目复用同一个连接池会话（keep-alive、gzip/br 压缩协商、按主机划分连接池、统一代理），
+并统计连接复用情况
+"""
+
+import threading
+from typing import Dict, Optional
+from urllib.parse import urlparse
+
+import requests
+from requests.adapters import HTTPAdapter
+from requests.utils import DEFAULT_ACCEPT_ENCODING
+from urllib3.connectionpool import HTTPConnectionPool, HTTPSConnectionPool
+
+
+DEFAULT_POOL_MAXSIZE = 10
+
+_lock = threading.Lock()
+_create_lock = threading.Lock()
+_session: Optional[requests.Session] = None
+_stats: Dict[str, Dict[str, int]] = {}
+
+
+def _record(host: str, key: str) -> None:
+    """累加指定主机的计数"""
+    with _lock:
+        host_stats = _stats.setdefault(host, {"requests": 0, "new_connections": 0})
+        host_stats[key] += 1
+
+
+class _CountingHTTPConnectionPool(HTTPConnectionPool):
+    def _new_conn(self):
+        _record(self.host, "new_connections")
+        return super()._new_conn()
+
+
+class _CountingHTTPSConnectionPool(HTTPSConnectionPool):
+    def _new_conn(self):
+        _record(self.host, "new_connections")
+        return super()._new_conn()
+
+
+_COUNTING_POOL_CLASSES = {
+    "http": _CountingHTTPConnectionPool,
+    "https": _CountingHTTPSConnectionPool,
+}
+
+
+class PooledHTTPAdapter(HTTPAdapter):
+    """记录请求数与新建连接数的连接池适配器"""
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = _COUNTING_POOL_CLASSES
+
+    def proxy_manager_for(self, proxy, **proxy_kwargs):
+        manager = super().proxy_manager_for(proxy, **proxy_kwargs)
+        manager.pool_classes_by_scheme = _COUNTING_POOL_CLASSES
+        return manager
+
+    def send(self, request, *args, **kwargs):
+        host = urlparse(request.url).hostname or ""
+        _record(host, "requests")
+        return super().send(request, *args, **kwargs)
+
+
+def configure_session(
+    proxy_url: Optional[str] = None,
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+    host_pool_sizes: Optional[Dict[str, int]] = None,
+) -> requests.Session:
+    """
+    创建（或重建）共享会话
+
+    Args:
+        proxy_url: 代理URL（可选），对会话内所有请求生效
+        pool_maxsize: 每个主机默认保留的连接数
+        host_pool_sizes: 按主机单独指定连接数，如 {"newsnow.busiyi.world": 8}
+
+    Returns:
+        共享的 requests.Session
+    """
+    global _session
+
+    session = requests.Session()
+    session.headers.update(
+        {"Accept-Encoding": DEFAULT_ACCEPT_ENCODING, "Connection": "keep-alive"}
+    )
+
+    default_adapter = PooledHTTPAdapter(
+        pool_connections=DEFAULT_POOL_MAXSIZE, pool_maxsize=pool_maxsize
+    )
+    session.mount("http://", default_adapter)
+    session.mount("https://", default_adapter)
+
+    for host, size in (host_pool_sizes or {}).items():
+        host_adapter = PooledHTTPAdapter(pool_connections=1, pool_maxsize=size)
+        session.mount(f"http://{host}", host_adapter)
+        session.mount(f"https://{host}", host_adapter)
+
+    if proxy_url:
+        session.proxies.update({"http": proxy_url, "https": proxy_url})
+
+    with _lock:
+        old_session = _session
+        _session = session
+    if old_session is not None:
+        old_session.close()
+    return session
+
+
+def get_session() -> requests.Session:
+    """获取共享会话，未配置时按默认参数创建"""
+    if _session is None:
+        with _create_lock:
+            if _session is None:
+                configure_session()
+    return _session
+
+
+def get_connection_stats() -> Dict[str, Dict[str, int]]:
+    """返回各主机的请求数、新建连接数和复用次数"""
+    with _lock:
+        snapshot = {host: dict(values) for host, values in _stats.items()}
+    for values in snapshot.values():
+        values["reused"] = max(0, values["requests"] - values["new_connections"])
+    return snapshot
+
+
+def format_connection_stats() -> str:
+    """格式化连接复用统计，用于运行总结输出"""
+    stats = get_connection_stats()
+    if not stats:
+        return "   • 连接复用: 无网络请求"
+
+    total_requests = sum(values["requests"] for values in stats.values())
+    total_reused = sum(values["reused"] for values in stats.values())
+    lines = [f"   • 连接复用: {total_reused}/{total_requests} 次请求复用了已有连接"]
+    for host, values in sorted(stats.items(), key=lambda x: -x[1]["requests"]):
+        lines.append(
+            f"     - {host}: 请求 {values['requests']}，"
+            f"新建连接 {values['new_connections']}，复用 {values['reused']}"
+        )
+    return "\n".join(lines)
@@ -1,20 +1,47 @@
 # coding=utf-8
 
+import copy
+import functools
+import hashlib
+import heapq
+import io
 import json
+import math
 import os
 import random
 import re
+import socket
+import threading
 import time
 import webbrowser
 import argparse
+import atexit
+import contextlib
+import shutil
+import tempfile
+import zipfile
+from abc import ABC, abstractmethod
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Tuple, Optional, Union
+from typing import Callable, Dict, Iterator, List, NamedTuple, Set, Tuple, Optional, Union
+from urllib.parse import urlparse
 
 import pytz
 import requests
 import yaml
 
+from crawl_coordinator import CrawlCoordinator
+from http_session import configure_session, format_connection_stats, get_session
+from newsnow_replay import RecordingStore
+from rss_feed import iter_feed_entries
+import output_archive
+from output_io import atomic_write_json, atomic_write_text, file_lock
+import snapshot_codec
+from snapshot_queue import SnapshotQueue
+from title_store import TitleStore
+
 # 自动加载 .env 文件（本地开发用，GitHub Actions 通过 Secrets 注入）
 try:
     from dotenv import load_dotenv
@@ -81,7 +108,49 @@ def load_config():
         "RANK_THRESHOLD": config_data["report"]["rank_threshold"],
         "USE_PROXY": config_data["crawler"]["use_proxy"],
         "DEFAULT_PROXY": config_data["crawler"]["default_proxy"],
+        "PROXY_POOL": {
+            "PROXIES": config_data["crawler"].get("proxy_pool", {}).get("proxies") or [],
+            "EJECT_AFTER": config_data["crawler"]
+            .get("proxy_pool", {})
+            .get("eject_after", 3),
+            "READMIT_AFTER": config_data["crawler"]
+            .get("proxy_pool", {})
+            .get("readmit_after", 300),
+        },
         "ENABLE_CRAWLER": config_data["crawler"]["enable_crawler"],
+        "MAX_CONCURRENCY": config_data["crawler"].get("max_concurrency", 1),
+        "HOST_RATE_LIMIT": config_data["crawler"].get("host_rate_limit", 0),
+        "HOST_RATE_BURST": config_data["crawler"].get("host_rate_burst", 1),
+        "SKIP_UNCHANGED": config_data["crawler"].get("skip_unchanged", True),
+        "RETRY_BUDGET": config_data["crawler"].get("retry_budget", 6),
+        "UPSTREAMS": config_data["crawler"].get(
+            "upstreams", ["https://newsnow.busiyi.world"]
+        ),
+        "HEDGE_DELAY": config_data["crawler"].get("hedge_delay_ms", 1500),
+        "BATCH_SIZE": config_data["crawler"].get("batch_size", 0),
+        "CRAWL_DEADLINE": config_data["crawler"].get("crawl_deadline", 0),
+        "FETCH_MODE": config_data["crawler"].get("fetch_mode", "live"),
+        "RECORDINGS_DIR": config_data["crawler"].get(
+            "recordings_dir", "output/.recordings"
+        ),
+        "REPLAY_AT": config_data["crawler"].get("replay_at", ""),
+        "CIRCUIT_BREAKER": {
+            "FAILURE_THRESHOLD": config_data["crawler"]
+            .get("circuit_breaker", {})
+            .get("failure_threshold", 3),
+            "COOLDOWN": config_data["crawler"]
+            .get("circuit_breaker", {})
+            .get("cooldown", 1800),
+        },
+        "HTTP_POOL": {
+            "POOL_MAXSIZE": config_data["crawler"]
+            .get("http_pool", {})
+            .get("pool_maxsize", 10),
+            "HOST_POOL_SIZES": config_data["crawler"]
+            .get("http_pool", {})
+            .get("host_pool_sizes", {})
+            or {},
+        },
         "ENABLE_NOTIFICATION": config_data["notification"]["enable_notification"],
         "MESSAGE_BATCH_SIZE": config_data["notification"]["message_batch_size"],
         "BATCH_SEND_INTERVAL": config_data["notification"]["batch_send_interval"],
@@ -113,10 +182,58 @@ def load_config():
             "RANK_WEIGHT": config_data["weight"]["rank_weight"],
             "FREQUENCY_WEIGHT": config_data["weight"]["frequency_weight"],
             "HOTNESS_WEIGHT": config_data["weight"]["hotness_weight"],
+            "HEAT_WEIGHT": config_data["weight"].get("heat_weight", 0),
         },
         "PLATFORMS": config_data["platforms"],
     }
 
+    # 标题存储配置
+    storage_config = config_data.get("storage", {})
+    config["STORAGE"] = {
+        "BACKEND": storage_config.get("backend", "txt"),
+        "SQLITE_PATH": storage_config.get("sqlite_path", "output/titles.db"),
+        "WRITE_TXT": storage_config.get("write_txt", True),
+        "BASE_INTERVAL": storage_config.get("base_interval", 12),
+        "DEDUP_SECTIONS": storage_config.get("dedup_sections", False),
+    }
+
+    # 旧日期目录归档配置
+    archive_config = config_data.get("archive", {})
+    config["ARCHIVE"] = {
+        "ENABLED": archive_config.get("enabled", False),
+        "KEEP_DAYS": archive_config.get("keep_days", 7),
+        "MAX_SIZE_MB": archive_config.get("max_size_mb", 0),
+        "ARCHIVE_RETENTION_DAYS": archive_config.get("archive_retention_days", 0),
+    }
+
+    # 分片抓取（--worker / --coordinate）配置
+    sharding_config = config_data.get("sharding", {})
+    config["SHARDING"] = {
+        "STORE": sharding_config.get("store", "output/.crawl_state/coordination.db"),
+        "LEASE_TTL": sharding_config.get("lease_ttl", 120),
+        "CLAIM_SIZE": sharding_config.get("claim_size", 10),
+        "RUN_WINDOW": sharding_config.get("run_window", 300),
+        "MERGE_TIMEOUT": sharding_config.get("merge_timeout", 600),
+    }
+
+    # 抓取与分析分离（--crawl-only / --consume）的快照队列配置
+    queue_config = config_data.get("snapshot_queue", {})
+    config["SNAPSHOT_QUEUE"] = {
+        "SPOOL_DIR": queue_config.get("spool_dir", "output/.snapshot_queue"),
+        "MAX_PENDING": queue_config.get("max_pending", 10),
+        "POLL_INTERVAL": queue_config.get("poll_interval", 5),
+        "MAX_ATTEMPTS": queue_config.get("max_attempts", 3),
+    }
+
+    # 常驻抓取（daemon）模式配置
+    daemon_config = config_data.get("daemon", {})
+    config["DAEMON"] = {
+        "MIN_INTERVAL": daemon_config.get("min_interval", 120),
+        "MAX_INTERVAL": daemon_config.get("max_interval", 1800),
+        "REPORT_INTERVAL": daemon_config.get("report_interval", 1800),
+        "CACHE_BACKOFF": daemon_config.get("cache_backoff", 1.5),
+    }
+
     # TTS语音合成配置
     tts_config = config_data.get("tts", {})
     config["TTS"] = {
@@ -277,7 +394,7 @@ def check_version_update(
             "Cache-Control": "no-cache",
         }
 
-        response = requests.get(
+        response = get_session().get(
             version_url, proxies=proxies, headers=headers, timeout=10
         )
         response.raise_for_status()
@@ -308,14 +425,7 @@ def check_version_update(
 
 def is_first_crawl_today() -> bool:
     """检测是否是当天第一次爬取"""
-    date_folder = format_date_folder()
-    txt_dir = Path("output") / date_folder / "txt"
-
-    if not txt_dir.exists():
-        return True
-
-    files = sorted([f for f in txt_dir.iterdir() if f.suffix == ".txt"])
-    return len(files) <= 1
+    return len(list_snapshot_times()) <= 1
 
 
 def html_escape(text: str) -> str:
@@ -394,8 +504,7 @@ class PushRecordManager:
         }
 
         try:
-            with open(record_file, "w", encoding="utf-8") as f:
-                json.dump(record, f, ensure_ascii=False, indent=2)
+            atomic_write_json(record_file, record, indent=2)
             print(f"推送记录已保存: {report_type} at {now.strftime('%H:%M:%S')}")
         except Exception as e:
             print(f"保存推送记录失败: {e}")
@@ -407,365 +516,2387 @@ class PushRecordManager:
         return start_time <= current_time <= end_time
 
 
-# === 数据获取 ===
-class DataFetcher:
-    """数据获取器"""
-
-    def __init__(self, proxy_url: Optional[str] = None):
-        self.proxy_url = proxy_url
+# === 限速 ===
+class TokenBucket:
+    """令牌桶限速器（线程安全）；clock/sleep 可替换为模拟时钟，便于测试"""
 
-    def fetch_data(
+    def __init__(
             self,
-            id_info: Union[str, Tuple[str, str]],
-            max_retries: int = 2,
-            min_retry_wait: int = 3,
-            max_retry_wait: int = 5,
-    ) -> Tuple[Optional[str], str, str]:
-        """获取指定ID数据，支持重试"""
-        if isinstance(id_info, tuple):
-            id_value, alias = id_info
-        else:
-            id_value = id_info
-            alias = id_value
+            rate: float,
+            capacity: float = 1,
+            clock: Callable[[], float] = time.monotonic,
+            sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = rate
+        self.capacity = max(1.0, float(capacity))
+        self.clock = clock
+        self.sleep = sleep
+        self.tokens = self.capacity
+        self.updated_at = clock()
+        self.lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """取出一个令牌，令牌不足时阻塞等待，返回等待的秒数"""
+        waited = 0.0
+        while True:
+            with self.lock:
+                now = self.clock()
+                self.tokens = min(
+                    self.capacity, self.tokens + (now - self.updated_at) * self.rate
+                )
+                self.updated_at = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return waited
+                wait_time = (1 - self.tokens) / self.rate
+            self.sleep(wait_time)
+            waited += wait_time
 
-        url = f"https://newsnow.busiyi.world/api/s?id={id_value}&latest"
 
-        proxies = None
-        if self.proxy_url:
-            proxies = {"http": self.proxy_url, "https": self.proxy_url}
+class HostRateLimiter:
+    """按主机划分的令牌桶限速器，同一主机共享一个令牌桶"""
 
-        headers = {
-            "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
-            "Accept": "application/json, text/plain, */*",
-            "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
-            "Connection": "keep-alive",
-            "Cache-Control": "no-cache",
-        }
+    def __init__(
+            self,
+            rate: float,
+            burst: float = 1,
+            clock: Callable[[], float] = time.monotonic,
+            sleep: Callable[[float], None] = time.sleep,
+    ):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self.buckets: Dict[str, TokenBucket] = {}
+        self.lock = threading.Lock()
+
+    def acquire(self, url: str) -> float:
+        """为目标URL所在主机取出一个令牌"""
+        host = urlparse(url).netloc
+        with self.lock:
+            bucket = self.buckets.get(host)
+            if bucket is None:
+                bucket = TokenBucket(self.rate, self.burst, self.clock, self.sleep)
+                self.buckets[host] = bucket
+        return bucket.acquire()
+
+
+# === 抓取状态 ===
+class PayloadHashStore:
+    """记录各来源上次响应的内容哈希及解析结果，跨运行持久化"""
+
+    def __init__(self, state_file: Optional[Path] = None):
+        self.state_file = state_file or Path("output") / ".crawl_state" / "payload_hashes.json"
+        self.lock = threading.Lock()
+        self.dirty = False
+        self.records: Dict[str, Dict] = {}
+        self.load()
+
+    def load(self):
+        """读取持久化的哈希记录"""
+        if not self.state_file.exists():
+            return
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                self.records = json.load(f)
+        except Exception as e:
+            print(f"读取响应哈希记录失败: {e}")
+            self.records = {}
+
+    def matches(self, source_id: str, payload_hash: str) -> bool:
+        """判断响应内容是否与上次记录一致"""
+        with self.lock:
+            record = self.records.get(source_id)
+        return bool(record) and record.get("hash") == payload_hash
+
+    def get_titles(self, source_id: str) -> Dict:
+        """返回上次记录的标题数据副本"""
+        with self.lock:
+            titles = self.records.get(source_id, {}).get("titles", {})
+        copies = {}
+        for title, info in titles.items():
+            copies[title] = {
+                "ranks": list(info.get("ranks", [])),
+                "url": info.get("url", ""),
+                "mobileUrl": info.get("mobileUrl", ""),
+            }
+            if "heat" in info:
+                copies[title]["heat"] = info["heat"]
+        return copies
 
-        retries = 0
-        while retries <= max_retries:
-            try:
-                response = requests.get(
-                    url, proxies=proxies, headers=headers, timeout=10
-                )
-                response.raise_for_status()
+    def get_validators(self, source_id: str) -> Dict[str, str]:
+        """返回上次响应的缓存校验头 {etag, last_modified}，没有记录时为空"""
+        with self.lock:
+            return dict(self.records.get(source_id, {}).get("validators", {}))
 
-                data_text = response.text
-                data_json = json.loads(data_text)
+    def update(
+            self,
+            source_id: str,
+            payload_hash: str,
+            titles: Dict,
+            validators: Optional[Dict[str, str]] = None,
+    ):
+        """记录新的响应哈希及解析结果；validators 与标题数据一起保存，保证 304 时复用的数据与之对应"""
+        with self.lock:
+            self.records[source_id] = {
+                "hash": payload_hash,
+                "titles": titles,
+                "updated_at": get_beijing_time().strftime("%Y-%m-%d %H:%M:%S"),
+            }
+            if validators:
+                self.records[source_id]["validators"] = validators
+            self.dirty = True
+
+    def update_validators(self, source_id: str, validators: Dict[str, str]):
+        """内容未变化但校验头已更新时，只替换已有记录的校验头"""
+        with self.lock:
+            record = self.records.get(source_id)
+            if record is None or record.get("validators") == validators:
+                return
+            if validators:
+                record["validators"] = validators
+            else:
+                record.pop("validators", None)
+            self.dirty = True
 
-                status = data_json.get("status", "未知")
-                if status not in ["success", "cache"]:
-                    raise ValueError(f"响应状态异常: {status}")
+    def save(self):
+        """有变更时写回记录文件"""
+        with self.lock:
+            if not self.dirty:
+                return
+            records = dict(self.records)
+            self.dirty = False
+        try:
+            atomic_write_json(self.state_file, records)
+        except Exception as e:
+            print(f"保存响应哈希记录失败: {e}")
 
-                status_info = "最新数据" if status == "success" else "缓存数据"
-                print(f"获取 {id_value} 成功（{status_info}）")
-                return data_text, id_value, alias
 
-            except Exception as e:
-                retries += 1
-                if retries <= max_retries:
-                    base_wait = random.uniform(min_retry_wait, max_retry_wait)
-                    additional_wait = (retries - 1) * random.uniform(1, 2)
-                    wait_time = base_wait + additional_wait
-                    print(f"请求 {id_value} 失败: {e}. {wait_time:.2f}秒后重试...")
-                    time.sleep(wait_time)
-                else:
-                    print(f"请求 {id_value} 失败: {e}")
-                    return None, id_value, alias
-        return None, id_value, alias
+class SourceHealthTracker:
+    """
+    来源健康记录与熔断器，按运行统计连续失败次数，跨运行持久化
 
-    def crawl_websites(
+    同一次运行内（start_run 之间）同一来源最多计一次失败，
+    生成 API 数据等再次调用抓取时不会重复累计
+    """
+
+    def __init__(
             self,
-            ids_list: List[Union[str, Tuple[str, str]]],
-            request_interval: int = CONFIG["REQUEST_INTERVAL"],
-    ) -> Tuple[Dict, Dict, List]:
-        """爬取多个网站数据"""
-        results = {}
-        id_to_name = {}
-        failed_ids = []
+            failure_threshold: int = CONFIG["CIRCUIT_BREAKER"]["FAILURE_THRESHOLD"],
+            cooldown: float = CONFIG["CIRCUIT_BREAKER"]["COOLDOWN"],
+            state_file: Optional[Path] = None,
+    ):
+        self.failure_threshold = max(1, failure_threshold)
+        self.cooldown = cooldown
+        self.state_file = state_file or Path("output") / ".crawl_state" / "source_health.json"
+        self.records: Dict[str, Dict] = {}
+        # 本次运行内已计入失败的来源
+        self.run_failures: Set[str] = set()
+        self.load()
+
+    def load(self):
+        """读取持久化的健康记录"""
+        if not self.state_file.exists():
+            return
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                self.records = json.load(f)
+        except Exception as e:
+            print(f"读取来源健康记录失败: {e}")
+            self.records = {}
 
-        for i, id_info in enumerate(ids_list):
-            if isinstance(id_info, tuple):
-                id_value, name = id_info
-            else:
-                id_value = id_info
-                name = id_value
+    def save(self):
+        """保存健康记录"""
+        try:
+            atomic_write_json(self.state_file, self.records, indent=2)
+        except Exception as e:
+            print(f"保存来源健康记录失败: {e}")
+
+    def start_run(self):
+        """开始新的一次运行（常驻模式每轮轮询），此后的失败重新计数"""
+        self.run_failures = set()
+
+    def get_state(self, source_id: str, now: float) -> str:
+        """返回熔断状态：closed 正常 / open 熔断中 / half_open 冷却结束待探测"""
+        record = self.records.get(source_id)
+        if not record or record.get("consecutive_failures", 0) < self.failure_threshold:
+            return "closed"
+        if now < record.get("open_until", 0):
+            return "open"
+        return "half_open"
+
+    def record_success(self, source_id: str, now: float):
+        """记录成功，关闭熔断"""
+        self.run_failures.discard(source_id)
+        self.records[source_id] = {
+            "consecutive_failures": 0,
+            "last_success": now,
+            "open_until": 0,
+        }
 
-            id_to_name[id_value] = name
-            response, _, _ = self.fetch_data(id_info)
+    def record_failure(self, source_id: str, now: float):
+        """记录一次运行内的失败，达到阈值后熔断；本次运行已计入过的来源只更新失败时间"""
+        record = self.records.setdefault(source_id, {"consecutive_failures": 0})
+        record["last_failure"] = now
+        if source_id in self.run_failures:
+            return
+        self.run_failures.add(source_id)
+        record["consecutive_failures"] = record.get("consecutive_failures", 0) + 1
+        if record["consecutive_failures"] >= self.failure_threshold:
+            record["open_until"] = now + self.cooldown
+            print(
+                f"{source_id} 已连续失败 {record['consecutive_failures']} 次，"
+                f"熔断 {self.cooldown:.0f} 秒"
+            )
 
-            if response:
-                try:
-                    data = json.loads(response)
-                    results[id_value] = {}
-                    for index, item in enumerate(data.get("items", []), 1):
-                        title = item["title"]
-                        url = item.get("url", "")
-                        mobile_url = item.get("mobileUrl", "")
-
-                        if title in results[id_value]:
-                            results[id_value][title]["ranks"].append(index)
-                        else:
-                            results[id_value][title] = {
-                                "ranks": [index],
-                                "url": url,
-                                "mobileUrl": mobile_url,
-                            }
-                except json.JSONDecodeError:
-                    print(f"解析 {id_value} 响应失败")
-                    failed_ids.append(id_value)
-                except Exception as e:
-                    print(f"处理 {id_value} 数据出错: {e}")
-                    failed_ids.append(id_value)
-            else:
-                failed_ids.append(id_value)
 
-            if i < len(ids_list) - 1:
-                actual_interval = request_interval + random.randint(-10, 20)
-                actual_interval = max(50, actual_interval)
-                time.sleep(actual_interval / 1000)
+class AdaptivePollScheduler:
+    """按来源标题变化率自适应调度轮询间隔，跨运行持久化统计"""
 
-        print(f"成功: {list(results.keys())}, 失败: {failed_ids}")
-        return results, id_to_name, failed_ids
+    CHURN_SMOOTHING = 0.5
 
+    def __init__(
+            self,
+            source_ids: List[str],
+            min_interval: float = CONFIG["DAEMON"]["MIN_INTERVAL"],
+            max_interval: float = CONFIG["DAEMON"]["MAX_INTERVAL"],
+            cache_backoff: float = CONFIG["DAEMON"]["CACHE_BACKOFF"],
+            state_file: Optional[Path] = None,
+    ):
+        self.min_interval = min_interval
+        self.max_interval = max(min_interval, max_interval)
+        self.cache_backoff = cache_backoff
+        self.state_file = state_file or Path("output") / ".crawl_state" / "poll_schedule.json"
+        self.stats: Dict[str, Dict] = {}
+        self.load()
+
+        for source_id in source_ids:
+            self.stats.setdefault(
+                source_id,
+                {
+                    "churn": None,
+                    "interval": (self.min_interval + self.max_interval) / 2,
+                    "next_poll": 0.0,
+                    "titles": [],
+                },
+            )
+        # 只保留当前配置中的来源
+        self.stats = {source_id: self.stats[source_id] for source_id in source_ids}
 
-# === 数据处理 ===
-def save_titles_to_file(results: Dict, id_to_name: Dict, failed_ids: List) -> str:
-    """保存标题到文件"""
-    file_path = get_output_path("txt", f"{format_time_filename()}.txt")
+    def load(self):
+        """读取持久化的调度统计"""
+        if not self.state_file.exists():
+            return
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                self.stats = json.load(f)
+        except Exception as e:
+            print(f"读取轮询调度记录失败: {e}")
+            self.stats = {}
 
-    with open(file_path, "w", encoding="utf-8") as f:
-        for id_value, title_data in results.items():
-            # id | name 或 id
-            name = id_to_name.get(id_value)
-            if name and name != id_value:
-                f.write(f"{id_value} | {name}\n")
-            else:
-                f.write(f"{id_value}\n")
-
-            # 按排名排序标题
-            sorted_titles = []
-            for title, info in title_data.items():
-                cleaned_title = clean_title(title)
-                if isinstance(info, dict):
-                    ranks = info.get("ranks", [])
-                    url = info.get("url", "")
-                    mobile_url = info.get("mobileUrl", "")
+    def save(self):
+        """保存调度统计"""
+        try:
+            atomic_write_json(self.state_file, self.stats)
+        except Exception as e:
+            print(f"保存轮询调度记录失败: {e}")
+
+    def due_sources(self, now: float) -> List[str]:
+        """返回已到轮询时间的来源"""
+        return [
+            source_id
+            for source_id, stat in self.stats.items()
+            if stat["next_poll"] <= now
+        ]
+
+    def next_wakeup(self) -> float:
+        """返回最近一次轮询的时间点"""
+        if not self.stats:
+            return time.time() + self.max_interval
+        return min(stat["next_poll"] for stat in self.stats.values())
+
+    def record(
+            self,
+            source_id: str,
+            titles: Optional[Dict],
+            status: Optional[str],
+            now: float,
+    ):
+        """根据本次抓取结果更新变化率并安排下次轮询"""
+        stat = self.stats.get(source_id)
+        if stat is None:
+            return
+
+        if titles is not None and status != "unchanged":
+            current_titles = set(titles.keys())
+            previous_titles = set(stat["titles"])
+            if previous_titles:
+                churn = len(current_titles - previous_titles) / max(len(current_titles), 1)
+                if stat["churn"] is None:
+                    stat["churn"] = churn
                 else:
-                    ranks = info if isinstance(info, list) else []
-                    url = ""
-                    mobile_url = ""
+                    stat["churn"] = (
+                            self.CHURN_SMOOTHING * churn
+                            + (1 - self.CHURN_SMOOTHING) * stat["churn"]
+                    )
+            stat["titles"] = list(current_titles)
+        elif status == "unchanged" and stat["churn"] is not None:
+            stat["churn"] = (1 - self.CHURN_SMOOTHING) * stat["churn"]
 
-                rank = ranks[0] if ranks else 1
-                sorted_titles.append((rank, cleaned_title, url, mobile_url))
+        if stat["churn"] is not None:
+            interval = self.max_interval - stat["churn"] * (
+                    self.max_interval - self.min_interval
+            )
+        else:
+            interval = stat["interval"]
 
-            sorted_titles.sort(key=lambda x: x[0])
+        # 上游返回缓存数据或内容未变化时，说明轮询过快，退避
+        if status in ("cache", "unchanged"):
+            interval = max(interval, stat["interval"] * self.cache_backoff)
 
-            for rank, cleaned_title, url, mobile_url in sorted_titles:
-                line = f"{rank}. {cleaned_title}"
+        stat["interval"] = min(self.max_interval, max(self.min_interval, interval))
+        stat["next_poll"] = now + stat["interval"]
 
-                if url:
-                    line += f" [URL:{url}]"
-                if mobile_url:
-                    line += f" [MOBILE:{mobile_url}]"
-                f.write(line + "\n")
+    def summary(self) -> str:
+        """格式化各来源的变化率与轮询间隔"""
+        parts = []
+        for source_id, stat in sorted(
+                self.stats.items(), key=lambda x: x[1]["interval"]
+        ):
+            churn = "-" if stat["churn"] is None else f"{stat['churn'] * 100:.0f}%"
+            parts.append(f"{source_id}(变化率 {churn}, 间隔 {stat['interval']:.0f}s)")
+        return ", ".join(parts)
 
-            f.write("\n")
 
-        if failed_ids:
-            f.write("==== 以下ID请求失败 ====\n")
-            for id_value in failed_ids:
-                f.write(f"{id_value}\n")
+class MirrorSelector:
+    """上游镜像选择器：记录各镜像延迟（指数滑动平均），最快的镜像作为主镜像"""
 
-    return file_path
+    SMOOTHING = 0.3
+    FAILURE_PENALTY = 10.0
 
+    def __init__(self, mirrors: List[str], state_file: Optional[Path] = None):
+        self.mirrors = [mirror.rstrip("/") for mirror in mirrors]
+        self.state_file = state_file
+        self.latencies: Dict[str, float] = {}
+        self.lock = threading.Lock()
+        self.load()
 
-def load_frequency_words(
-        frequency_file: Optional[str] = None,
-) -> Tuple[List[Dict], List[str]]:
-    """加载频率词配置"""
-    if frequency_file is None:
-        frequency_file = os.environ.get(
-            "FREQUENCY_WORDS_PATH", "config/frequency_words.txt"
+    def load(self):
+        """读取持久化的镜像延迟"""
+        if not self.state_file or not self.state_file.exists():
+            return
+        try:
+            with open(self.state_file, "r", encoding="utf-8") as f:
+                saved = json.load(f)
+            self.latencies = {
+                mirror: latency for mirror, latency in saved.items() if mirror in self.mirrors
+            }
+        except Exception as e:
+            print(f"读取镜像延迟记录失败: {e}")
+
+    def save(self):
+        """保存镜像延迟"""
+        if not self.state_file:
+            return
+        try:
+            with self.lock:
+                latencies = dict(self.latencies)
+            atomic_write_json(self.state_file, latencies, indent=2)
+        except Exception as e:
+            print(f"保存镜像延迟记录失败: {e}")
+
+    def ordered(self) -> List[str]:
+        """按平均延迟从低到高排列镜像，未测量的镜像按配置顺序排在后面"""
+        with self.lock:
+            latencies = dict(self.latencies)
+        return sorted(
+            self.mirrors,
+            key=lambda mirror: (
+                latencies.get(mirror, float("inf")),
+                self.mirrors.index(mirror),
+            ),
         )
 
-    frequency_path = Path(frequency_file)
-    if not frequency_path.exists():
-        raise FileNotFoundError(f"频率词文件 {frequency_file} 不存在")
+    def record(self, mirror: str, latency: Optional[float]):
+        """记录一次请求耗时，失败时记为惩罚延迟"""
+        sample = self.FAILURE_PENALTY if latency is None else latency
+        with self.lock:
+            previous = self.latencies.get(mirror)
+            if previous is None:
+                self.latencies[mirror] = sample
+            else:
+                self.latencies[mirror] = (
+                        self.SMOOTHING * sample + (1 - self.SMOOTHING) * previous
+                )
 
-    with open(frequency_path, "r", encoding="utf-8") as f:
-        content = f.read()
+    def summary(self) -> str:
+        """格式化各镜像平均延迟"""
+        with self.lock:
+            latencies = dict(self.latencies)
+        return ", ".join(
+            f"{mirror}({latencies[mirror] * 1000:.0f}ms)"
+            if mirror in latencies
+            else f"{mirror}(未测量)"
+            for mirror in self.ordered()
+        )
 
-    word_groups = [group.strip() for group in content.split("\n\n") if group.strip()]
 
-    processed_groups = []
-    filter_words = []
+class ProxyPool:
+    """
+    代理池：每个代理维护延迟和错误率的滑动平均，请求分配给评分最低（最快、最稳定）的代理；
+    连续失败的代理被暂时剔除，冷却后重新接纳试用
+    """
 
-    for group in word_groups:
-        words = [word.strip() for word in group.split("\n") if word.strip()]
+    SMOOTHING = 0.3
+    FAILURE_PENALTY = 10.0
+
+    def __init__(self, proxies: List[str], eject_after: int = 3, readmit_after: float = 300):
+        self.proxies = list(proxies)
+        self.eject_after = max(1, int(eject_after))
+        self.readmit_after = readmit_after
+        self.latencies: Dict[str, float] = {}
+        self.error_rates: Dict[str, float] = {proxy: 0.0 for proxy in self.proxies}
+        self.consecutive_failures: Dict[str, int] = {proxy: 0 for proxy in self.proxies}
+        self.ejected_until: Dict[str, float] = {}
+        self.in_flight: Dict[str, int] = {proxy: 0 for proxy in self.proxies}
+        self.stats: Dict[str, Dict] = {
+            proxy: {"requests": 0, "failures": 0, "total_time": 0.0, "ejections": 0}
+            for proxy in self.proxies
+        }
+        self.lock = threading.Lock()
+
+    def _score(self, proxy: str) -> float:
+        """评分越低越优先：预计排队延迟加错误率惩罚，未测量的代理优先试用"""
+        latency = self.latencies.get(proxy, 0.0)
+        return latency * (1 + self.in_flight[proxy]) + self.error_rates[proxy] * self.FAILURE_PENALTY
+
+    def acquire(self, now: Optional[float] = None) -> str:
+        """选择一个代理并计入进行中的请求；全部被剔除时选择最早结束冷却的代理"""
+        now = time.time() if now is None else now
+        with self.lock:
+            for proxy, until in list(self.ejected_until.items()):
+                if until <= now:
+                    # 冷却结束重新接纳，再失败一次即重新剔除
+                    del self.ejected_until[proxy]
+                    self.consecutive_failures[proxy] = self.eject_after - 1
+                    print(f"代理 {proxy} 冷却结束，重新接纳")
+
+            candidates = [proxy for proxy in self.proxies if proxy not in self.ejected_until]
+            if candidates:
+                proxy = min(candidates, key=lambda p: (self._score(p), self.proxies.index(p)))
+            else:
+                proxy = min(self.proxies, key=lambda p: self.ejected_until[p])
+            self.in_flight[proxy] += 1
+            return proxy
+
+    def release(self, proxy: str, latency: Optional[float], now: Optional[float] = None):
+        """记录一次请求结果，latency 为 None 表示代理连接失败"""
+        now = time.time() if now is None else now
+        failed = latency is None
+        sample = self.FAILURE_PENALTY if failed else latency
+        with self.lock:
+            self.in_flight[proxy] -= 1
+            stats = self.stats[proxy]
+            stats["requests"] += 1
+            stats["total_time"] += sample
+
+            previous = self.latencies.get(proxy)
+            self.latencies[proxy] = (
+                sample if previous is None
+                else self.SMOOTHING * sample + (1 - self.SMOOTHING) * previous
+            )
+            self.error_rates[proxy] = (
+                    self.SMOOTHING * (1.0 if failed else 0.0)
+                    + (1 - self.SMOOTHING) * self.error_rates[proxy]
+            )
 
-        group_required_words = []
-        group_normal_words = []
-        group_filter_words = []
+            if not failed:
+                self.consecutive_failures[proxy] = 0
+                return
+            stats["failures"] += 1
+            self.consecutive_failures[proxy] += 1
+            if (
+                    self.consecutive_failures[proxy] >= self.eject_after
+                    and proxy not in self.ejected_until
+            ):
+                self.ejected_until[proxy] = now + self.readmit_after
+                stats["ejections"] += 1
+                print(f"代理 {proxy} 连续失败 {self.consecutive_failures[proxy]} 次，剔除 {self.readmit_after} 秒")
+
+    def summary(self) -> str:
+        """格式化各代理的请求数、失败数、平均耗时和状态，用于运行总结输出"""
+        with self.lock:
+            lines = [f"   • 代理池: {len(self.proxies)} 个代理，剔除中 {len(self.ejected_until)} 个"]
+            for proxy in self.proxies:
+                stats = self.stats[proxy]
+                average = stats["total_time"] / stats["requests"] * 1000 if stats["requests"] else 0
+                status = "剔除中" if proxy in self.ejected_until else "正常"
+                lines.append(
+                    f"     - {proxy}: 请求 {stats['requests']}，失败 {stats['failures']}，"
+                    f"平均耗时 {average:.0f}ms，错误率 {self.error_rates[proxy]:.0%}，"
+                    f"剔除 {stats['ejections']} 次，{status}"
+                )
+        return "\n".join(lines)
 
-        for word in words:
-            if word.startswith("!"):
-                filter_words.append(word[1:])
-                group_filter_words.append(word[1:])
-            elif word.startswith("+"):
-                group_required_words.append(word[1:])
-            else:
-                group_normal_words.append(word)
 
-        if group_required_words or group_normal_words:
-            if group_normal_words:
-                group_key = " ".join(group_normal_words)
-            else:
-                group_key = " ".join(group_required_words)
+# === 上游数据解析 ===
+class TitleRecord(NamedTuple):
+    """上游单条标题记录"""
 
-            processed_groups.append(
-                {
-                    "required": group_required_words,
-                    "normal": group_normal_words,
-                    "group_key": group_key,
-                }
-            )
+    title: str
+    rank: int
+    url: str = ""
+    mobile_url: str = ""
+    extra: Optional[Dict] = None
 
-    return processed_groups, filter_words
 
+def parse_newsnow_payload(payload: Union[bytes, str]) -> Tuple[str, List[TitleRecord]]:
+    """一次解码 newsnow 响应字节，校验状态并生成标题记录，返回(status, records)"""
+    return parse_newsnow_data(json.loads(payload))
 
-def parse_file_titles(file_path: Path) -> Tuple[Dict, Dict]:
-    """解析单个txt文件的标题数据，返回(titles_by_id, id_to_name)"""
-    titles_by_id = {}
-    id_to_name = {}
 
-    with open(file_path, "r", encoding="utf-8") as f:
-        content = f.read()
-        sections = content.split("\n\n")
+def parse_newsnow_data(data: Dict) -> Tuple[str, List[TitleRecord]]:
+    """校验已解码的单个来源响应并生成标题记录，返回(status, records)"""
+    status = data.get("status", "未知")
+    if status not in ["success", "cache"]:
+        raise ValueError(f"响应状态异常: {status}")
 
-        for section in sections:
-            if not section.strip() or "==== 以下ID请求失败 ====" in section:
-                continue
+    records = [
+        TitleRecord(
+            item["title"],
+            index,
+            item.get("url", ""),
+            item.get("mobileUrl", ""),
+            item.get("extra") or None,
+        )
+        for index, item in enumerate(data.get("items", []), 1)
+    ]
+    return status, records
 
-            lines = section.strip().split("\n")
-            if len(lines) < 2:
-                continue
 
-            # id | name 或 id
-            header_line = lines[0].strip()
-            if " | " in header_line:
-                parts = header_line.split(" | ", 1)
-                source_id = parts[0].strip()
-                name = parts[1].strip()
-                id_to_name[source_id] = name
-            else:
-                source_id = header_line
-                id_to_name[source_id] = source_id
+# extra 中直接给出热度数值的字段，按优先级查找
+HEAT_FIELDS = ["heat", "hot", "hotValue", "views", "viewCount", "comments", "commentCount"]
+HEAT_UNITS = {"亿": 100000000, "万": 10000, "w": 10000, "k": 1000}
+HEAT_TEXT_PATTERN = re.compile(
+    r"(\d+(?:\.\d+)?)\s*(亿|万|w|k)?\s*(热度|热|播放|浏览|阅读|评论|讨论|点赞|回答|关注|views?|comments?|likes?|hot)?",
+    re.IGNORECASE,
+)
 
-            titles_by_id[source_id] = {}
 
-            for line in lines[1:]:
-                if line.strip():
-                    try:
-                        title_part = line.strip()
-                        rank = None
-
-                        # 提取排名
-                        if ". " in title_part and title_part.split(". ")[0].isdigit():
-                            rank_str, title_part = title_part.split(". ", 1)
-                            rank = int(rank_str)
-
-                        # 提取 MOBILE URL
-                        mobile_url = ""
-                        if " [MOBILE:" in title_part:
-                            title_part, mobile_part = title_part.rsplit(" [MOBILE:", 1)
-                            if mobile_part.endswith("]"):
-                                mobile_url = mobile_part[:-1]
-
-                        # 提取 URL
-                        url = ""
-                        if " [URL:" in title_part:
-                            title_part, url_part = title_part.rsplit(" [URL:", 1)
-                            if url_part.endswith("]"):
-                                url = url_part[:-1]
-
-                        title = clean_title(title_part.strip())
-                        ranks = [rank] if rank is not None else [1]
-
-                        titles_by_id[source_id][title] = {
-                            "ranks": ranks,
-                            "url": url,
-                            "mobileUrl": mobile_url,
-                        }
+def parse_heat(extra: Optional[Dict]) -> Optional[int]:
+    """
+    从 newsnow 条目的 extra 中提取热度（浏览、评论等互动数），无法识别时返回 None
 
-                    except Exception as e:
-                        print(f"解析标题行出错: {line}, 错误: {e}")
+    优先使用数值字段；否则解析 info 文本，如 "1234万热度"、"3.2万 评论"，
+    文本中的数字必须带单位或互动关键词，避免把 "2小时前" 之类误判为热度
+    """
+    if not extra:
+        return None
+
+    for field in HEAT_FIELDS:
+        value = extra.get(field)
+        if isinstance(value, (int, float)) and not isinstance(value, bool):
+            return int(value)
+
+    info = extra.get("info")
+    if not isinstance(info, str):
+        return None
+    for number, unit, keyword in HEAT_TEXT_PATTERN.findall(info.replace(",", "")):
+        if unit or keyword:
+            return int(float(number) * HEAT_UNITS.get(unit.lower(), 1))
+    return None
+
+
+def build_title_data(records: List[TitleRecord]) -> Dict:
+    """将标题记录转换为 {title: {ranks, url, mobileUrl[, heat]}}，重复标题合并排名"""
+    title_data = {}
+    for record in records:
+        existing = title_data.get(record.title)
+        if existing is not None:
+            existing["ranks"].append(record.rank)
+        else:
+            title_data[record.title] = {
+                "ranks": [record.rank],
+                "url": record.url,
+                "mobileUrl": record.mobile_url,
+            }
+            heat = parse_heat(record.extra)
+            if heat is not None:
+                title_data[record.title]["heat"] = heat
+    return title_data
 
-    return titles_by_id, id_to_name
 
+# 响应内容与上次一致时 fetch_data 返回的占位值
+UNCHANGED_PAYLOAD = "__unchanged__"
 
-def read_all_today_titles(
-        current_platform_ids: Optional[List[str]] = None,
-) -> Tuple[Dict, Dict, Dict]:
-    """读取当天所有标题文件，支持按当前监控平台过滤"""
-    date_folder = format_date_folder()
-    txt_dir = Path("output") / date_folder / "txt"
 
-    if not txt_dir.exists():
-        return {}, {}, {}
+# === 数据源适配器 ===
+class SourceAdapter(ABC):
+    """数据源适配器：为 DataFetcher 请求一次来源数据，返回(status, payload_hash, records)，失败时抛出异常"""
 
-    all_results = {}
-    final_id_to_name = {}
-    title_info = {}
+    @abstractmethod
+    def fetch(
+            self, fetcher: "DataFetcher", id_value: str
+    ) -> Tuple[str, str, Optional[List[TitleRecord]]]:
+        ...
 
-    files = sorted([f for f in txt_dir.iterdir() if f.suffix == ".txt"])
 
-    for file_path in files:
-        time_info = file_path.stem
+class NewsnowAdapter(SourceAdapter):
+    """newsnow 来源（默认）：经镜像对冲请求，回放模式下读取录制数据"""
 
-        titles_by_id, file_id_to_name = parse_file_titles(file_path)
+    def fetch(
+            self, fetcher: "DataFetcher", id_value: str
+    ) -> Tuple[str, str, Optional[List[TitleRecord]]]:
+        if fetcher.replay_store:
+            return fetcher._request_replay(id_value)
+        return fetcher._request_hedged(id_value)
 
-        if current_platform_ids is not None:
-            filtered_titles_by_id = {}
-            filtered_id_to_name = {}
 
-            for source_id, title_data in titles_by_id.items():
-                if source_id in current_platform_ids:
-                    filtered_titles_by_id[source_id] = title_data
-                    if source_id in file_id_to_name:
-                        filtered_id_to_name[source_id] = file_id_to_name[source_id]
+class RSSAdapter(SourceAdapter):
+    """
+    RSS/Atom 订阅来源
 
-            titles_by_id = filtered_titles_by_id
-            file_id_to_name = filtered_id_to_name
+    携带上次响应的 ETag / Last-Modified 发送条件请求，订阅未更新时服务端返回 304，
+    不下载也不解析内容，直接复用上次的标题数据（需启用 skip_unchanged 保存响应哈希）。
+    200 响应边下载边解析，取到 max_items 条后停止读取
+    """
 
-        final_id_to_name.update(file_id_to_name)
+    MAX_ITEMS = 50
+    ACCEPT = "application/rss+xml, application/atom+xml, application/xml;q=0.9, text/xml;q=0.8, */*;q=0.5"
+
+    def __init__(self, url: str, max_items: int = MAX_ITEMS):
+        self.url = url
+        self.max_items = max(1, int(max_items))
+
+    def _parse(self, stream) -> List[TitleRecord]:
+        entries = islice(iter_feed_entries(stream), self.max_items)
+        return [
+            TitleRecord(title, index, link)
+            for index, (title, link) in enumerate(entries, 1)
+        ]
+
+    def _result(
+            self, fetcher: "DataFetcher", id_value: str, records: List[TitleRecord]
+    ) -> Tuple[str, str, Optional[List[TitleRecord]]]:
+        # 按保留的条目计算哈希：只有保留的标题或链接变化时才视为内容变化
+        encoded = json.dumps(
+            [[record.title, record.url] for record in records], ensure_ascii=False
+        ).encode("utf-8")
+        payload_hash = hashlib.sha1(encoded).hexdigest()
+        if fetcher.payload_store and fetcher.payload_store.matches(id_value, payload_hash):
+            return "unchanged", payload_hash, None
+        return "success", payload_hash, records
+
+    def fetch(
+            self, fetcher: "DataFetcher", id_value: str
+    ) -> Tuple[str, str, Optional[List[TitleRecord]]]:
+        if fetcher.replay_store:
+            payload = fetcher.replay_store.load(id_value, fetcher.replay_at or None)
+            if payload is None:
+                raise ValueError(f"没有 {id_value} 的录制数据")
+            return self._result(fetcher, id_value, self._parse(io.BytesIO(payload)))
+
+        headers = dict(fetcher.REQUEST_HEADERS, Accept=self.ACCEPT)
+        validators = (
+            fetcher.payload_store.get_validators(id_value) if fetcher.payload_store else {}
+        )
+        if validators.get("etag"):
+            headers["If-None-Match"] = validators["etag"]
+        if validators.get("last_modified"):
+            headers["If-Modified-Since"] = validators["last_modified"]
+
+        if fetcher.rate_limiter:
+            fetcher.rate_limiter.acquire(self.url)
+        proxy = fetcher.proxy_pool.acquire() if fetcher.proxy_pool else fetcher.proxy_url
+        response = fetcher._send(
+            proxy,
+            "GET",
+            self.url,
+            headers=headers,
+            timeout=fetcher.REQUEST_TIMEOUT,
+            stream=True,
+        )
+        with response:
+            if response.status_code == 304:
+                if not validators:
+                    raise ValueError("未发送条件请求却返回 304")
+                return "unchanged", "", None
+            response.raise_for_status()
+
+            if fetcher.recorder:
+                fetcher.recorder.save(id_value, response.content)
+                records = self._parse(io.BytesIO(response.content))
+            else:
+                response.raw.decode_content = True
+                records = self._parse(response.raw)
 
-        for source_id, title_data in titles_by_id.items():
-            process_source_data(
-                source_id, title_data, time_info, all_results, title_info
+        new_validators = {
+            key: response.headers[header]
+            for key, header in (("etag", "ETag"), ("last_modified", "Last-Modified"))
+            if response.headers.get(header)
+        }
+        status, payload_hash, records = self._result(fetcher, id_value, records)
+        if status == "unchanged":
+            fetcher.payload_store.update_validators(id_value, new_validators)
+        else:
+            # 新内容的校验头在标题数据写入时一并保存，避免只更新校验头后复用旧数据
+            fetcher.feed_validators[id_value] = new_validators
+        return status, payload_hash, records
+
+
+def build_source_adapters(platforms: List[Dict]) -> Dict[str, SourceAdapter]:
+    """按平台配置的 type 创建非 newsnow 来源的适配器，未配置 type 的平台使用 newsnow"""
+    adapters = {}
+    for platform in platforms:
+        source_type = platform.get("type", "newsnow")
+        if source_type == "rss":
+            adapters[platform["id"]] = RSSAdapter(
+                platform["url"], platform.get("max_items", RSSAdapter.MAX_ITEMS)
             )
+        elif source_type != "newsnow":
+            print(f"未知的来源类型 {source_type}（{platform['id']}），按 newsnow 处理")
+    return adapters
 
-    return all_results, final_id_to_name, title_info
 
+# === 数据获取 ===
+class DataFetcher:
+    """数据获取器"""
 
-def process_source_data(
-        source_id: str,
-        title_data: Dict,
-        time_info: str,
-        all_results: Dict,
-        title_info: Dict,
-) -> None:
-    """处理来源数据，合并重复标题"""
-    if source_id not in all_results:
-        all_results[source_id] = title_data
+    REQUEST_HEADERS = {
+        "User-Agent": "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36",
+        "Accept": "application/json, text/plain, */*",
+        "Accept-Language": "zh-CN,zh;q=0.9,en;q=0.8",
+        "Connection": "keep-alive",
+        "Cache-Control": "no-cache",
+    }
+    # 单次请求超时（秒），也是截止后等待迟到来源的最长时间
+    REQUEST_TIMEOUT = 10
 
-        if source_id not in title_info:
-            title_info[source_id] = {}
+    def __init__(
+            self,
+            proxy_url: Optional[str] = None,
+            max_concurrency: int = CONFIG["MAX_CONCURRENCY"],
+            host_rate_limit: float = CONFIG["HOST_RATE_LIMIT"],
+            host_rate_burst: float = CONFIG["HOST_RATE_BURST"],
+            payload_store: Optional[PayloadHashStore] = None,
+            health_tracker: Optional[SourceHealthTracker] = None,
+            retry_budget: int = CONFIG["RETRY_BUDGET"],
+            mirror_selector: Optional[MirrorSelector] = None,
+            hedge_delay: float = CONFIG["HEDGE_DELAY"],
+            recorder: Optional[RecordingStore] = None,
+            replay_store: Optional[RecordingStore] = None,
+            replay_at: str = CONFIG["REPLAY_AT"],
+            batch_size: int = CONFIG["BATCH_SIZE"],
+            crawl_deadline: float = CONFIG["CRAWL_DEADLINE"],
+            proxy_pool: Optional[ProxyPool] = None,
+            adapters: Optional[Dict[str, SourceAdapter]] = None,
+    ):
+        self.proxy_url = proxy_url
+        self.proxy_pool = proxy_pool
+        # 非 newsnow 来源的适配器 {id: adapter}，其余来源使用 newsnow 适配器
+        self.adapters = adapters or {}
+        self.default_adapter = NewsnowAdapter()
+        self.batch_size = max(0, int(batch_size))
+        self.crawl_deadline = crawl_deadline
+        # 截止时间到达时尚未完成的来源，以及仍在进行的请求 {future: id}
+        self.timed_out_ids: List[str] = []
+        self.stragglers: Dict = {}
+        # 本次运行中因熔断而未请求的来源（不计入请求失败）
+        self.circuit_open_ids: List[str] = []
+        self.recorder = recorder
+        self.replay_store = replay_store
+        self.replay_at = replay_at
+        self.mirror_selector = mirror_selector or MirrorSelector(CONFIG["UPSTREAMS"])
+        self.hedge_delay = hedge_delay / 1000
+        self.hedge_executor: Optional[ThreadPoolExecutor] = None
+        self.payload_store = payload_store
+        self.health_tracker = health_tracker
+        self.retry_budget = retry_budget
+        self.payload_hashes: Dict[str, str] = {}
+        # 本次抓取中订阅响应的缓存校验头，随标题数据一起写入 payload_store
+        self.feed_validators: Dict[str, Dict[str, str]] = {}
+        self.unchanged_ids: List[str] = []
+        self.source_statuses: Dict[str, str] = {}
+        # 本次运行内已抓取的结果：{id: (标题数据或None, 名称)}，同一次运行再次请求时直接复用
+        self.run_cache: Dict[str, Tuple[Optional[Dict], str]] = {}
+        self.fetched_ids: List[str] = []
+        self.max_concurrency = max(1, int(max_concurrency))
+        self.host_rate_limit = host_rate_limit
+        self.host_rate_burst = host_rate_burst
+        self.rate_limiter: Optional[HostRateLimiter] = None
+
+    def close(self) -> None:
+        """关闭对冲请求线程池：取消排队中的请求，不等待仍在进行的请求"""
+        if self.hedge_executor is not None:
+            self.hedge_executor.shutdown(wait=False, cancel_futures=True)
+            self.hedge_executor = None
+
+    def reset_run_cache(self) -> None:
+        """清空本次运行的抓取结果缓存（常驻模式每轮轮询开始时调用），来源健康按新的一次运行计数"""
+        self.run_cache = {}
+        self.source_statuses = {}
+        self.timed_out_ids = []
+        self.circuit_open_ids = []
+        if self.health_tracker:
+            self.health_tracker.start_run()
+
+    def run_snapshot(self) -> Tuple[Dict, Dict, List, List]:
+        """返回本次运行已抓取的全部来源，格式与 save_titles_to_file 参数一致（熔断跳过的来源不在其中）"""
+        results = {}
+        id_to_name = {}
+        failed_ids = []
+        for id_value, (title_data, name) in self.run_cache.items():
+            if id_value in self.circuit_open_ids:
+                continue
+            id_to_name[id_value] = name
+            if title_data is None:
+                failed_ids.append(id_value)
+            else:
+                results[id_value] = title_data
+        unchanged_ids = [
+            id_value
+            for id_value in results
+            if self.source_statuses.get(id_value) == "unchanged"
+        ]
+        return results, id_to_name, failed_ids, unchanged_ids
+
+    def restore_run_snapshot(
+            self, results: Dict, id_to_name: Dict, failed_ids: List, unchanged_ids: List
+    ) -> None:
+        """用外部获取的结果（如分片 worker 合并的快照）填充本次运行缓存，后续抓取直接复用"""
+        for id_value in failed_ids:
+            self.run_cache[id_value] = (None, id_to_name.get(id_value, id_value))
+        for id_value, title_data in results.items():
+            self.run_cache[id_value] = (title_data, id_to_name.get(id_value, id_value))
+            self.source_statuses[id_value] = (
+                "unchanged" if id_value in unchanged_ids else "success"
+            )
 
-        for title, data in title_data.items():
-            ranks = data.get("ranks", [])
-            url = data.get("url", "")
-            mobile_url = data.get("mobileUrl", "")
+    def _get_rate_limiter(self, request_interval: int) -> HostRateLimiter:
+        """获取单主机限速器，未配置速率时按请求间隔换算"""
+        rate = self.host_rate_limit or 1000 / max(request_interval, 1)
+        if self.rate_limiter is None or self.rate_limiter.rate != rate:
+            self.rate_limiter = HostRateLimiter(rate, self.host_rate_burst)
+        return self.rate_limiter
+
+    @staticmethod
+    def _retry_wait(retries: int, min_retry_wait: float, max_retry_wait: float) -> float:
+        """计算第 retries 次重试前的等待时间"""
+        base_wait = random.uniform(min_retry_wait, max_retry_wait)
+        additional_wait = (retries - 1) * random.uniform(1, 2)
+        return base_wait + additional_wait
+
+    def _request_mirror(
+            self, mirror: str, id_value: str, cancelled: Optional[threading.Event] = None
+    ) -> Tuple[str, str, Optional[List[TitleRecord]]]:
+        """向单个镜像请求一次数据，返回(status, payload_hash, records)，失败时抛出异常；cancelled 已设置时不再发出请求"""
+        url = f"{mirror}/api/s?id={id_value}&latest"
+
+        if self.rate_limiter:
+            self.rate_limiter.acquire(url)
+        if cancelled is not None and cancelled.is_set():
+            raise RuntimeError(f"{id_value} 已由其他镜像返回，取消请求 {mirror}")
+        proxy = self.proxy_pool.acquire() if self.proxy_pool else self.proxy_url
+        start_time = time.monotonic()
+        try:
+            response = self._send(
+                proxy,
+                "GET",
+                url,
+                headers=self.REQUEST_HEADERS,
+                timeout=self.REQUEST_TIMEOUT,
+            )
+            response.raise_for_status()
+            result = self._decode_payload(id_value, response.content)
+        except Exception:
+            self.mirror_selector.record(mirror, None)
+            raise
+
+        self.mirror_selector.record(mirror, time.monotonic() - start_time)
+        if self.recorder:
+            self.recorder.save(id_value, response.content)
+        return result
+
+    def _send(self, proxy: Optional[str], method: str, url: str, **kwargs) -> requests.Response:
+        """经指定代理发送请求；使用代理池时记录该代理的耗时，连接失败计入代理错误"""
+        proxies = {"http": proxy, "https": proxy} if proxy else None
+        if not self.proxy_pool:
+            return get_session().request(method, url, proxies=proxies, **kwargs)
+
+        start_time = time.monotonic()
+        try:
+            response = get_session().request(method, url, proxies=proxies, **kwargs)
+        except (requests.exceptions.ConnectionError, requests.exceptions.Timeout):
+            self.proxy_pool.release(proxy, None)
+            raise
+        except Exception:
+            self.proxy_pool.release(proxy, time.monotonic() - start_time)
+            raise
+        self.proxy_pool.release(proxy, time.monotonic() - start_time)
+        return response
+
+    def _decode_payload(
+            self, id_value: str, payload: bytes, data: Optional[Dict] = None
+    ) -> Tuple[str, str, Optional[List[TitleRecord]]]:
+        """校验并解析原始响应，内容与上次一致时跳过解析；data 为已解码的响应（批量请求）"""
+        payload_hash = hashlib.sha1(payload).hexdigest()
+        if self.payload_store and self.payload_store.matches(id_value, payload_hash):
+            return "unchanged", payload_hash, None
+        if data is not None:
+            status, records = parse_newsnow_data(data)
+        else:
+            status, records = parse_newsnow_payload(payload)
+        return status, payload_hash, records
+
+    def _request_batch(
+            self, mirror: str, id_values: List[str]
+    ) -> Dict[str, Tuple[str, str, Optional[List[TitleRecord]]]]:
+        """
+        通过 newsnow 多来源接口一次请求多个ID
+
+        Returns:
+            {id: (status, payload_hash, records)}，缺失或状态异常的来源不在结果中；
+            整个请求失败时抛出异常
+        """
+        url = f"{mirror}/api/s/entire"
+
+        if self.rate_limiter:
+            self.rate_limiter.acquire(url)
+        proxy = self.proxy_pool.acquire() if self.proxy_pool else self.proxy_url
+        start_time = time.monotonic()
+        try:
+            response = self._send(
+                proxy,
+                "POST",
+                url,
+                json={"sources": id_values},
+                headers=self.REQUEST_HEADERS,
+                timeout=self.REQUEST_TIMEOUT + len(id_values),
+            )
+            response.raise_for_status()
+            entries = json.loads(response.content)
+            if not isinstance(entries, list):
+                raise ValueError("批量响应格式异常")
+        except Exception:
+            self.mirror_selector.record(mirror, None)
+            raise
+
+        self.mirror_selector.record(mirror, time.monotonic() - start_time)
+
+        wanted = set(id_values)
+        decoded = {}
+        for entry in entries:
+            id_value = entry.get("id") if isinstance(entry, dict) else None
+            if id_value not in wanted or id_value in decoded:
+                continue
+            # 按来源单独序列化，哈希与录制数据都以单个来源为单位
+            payload = json.dumps(entry, ensure_ascii=False, sort_keys=True).encode("utf-8")
+            try:
+                decoded[id_value] = self._decode_payload(id_value, payload, entry)
+            except ValueError as e:
+                print(f"批量获取 {id_value} 失败: {e}")
+                continue
+            if self.recorder:
+                self.recorder.save(id_value, payload)
+        return decoded
+
+    def _fetch_batches(
+            self,
+            id_values: List[str],
+            on_response: Optional[Callable[[str, Union[List[TitleRecord], str]], None]] = None,
+            deadline: Optional[float] = None,
+    ) -> Dict[str, Union[List[TitleRecord], str]]:
+        """按 batch_size 分块批量请求，各块并发执行；每块依次尝试各镜像，截止时间后未返回的块视为缺失"""
+        chunks = [
+            id_values[i:i + self.batch_size]
+            for i in range(0, len(id_values), self.batch_size)
+        ]
+
+        def fetch_chunk(chunk: List[str]) -> Dict:
+            for mirror in self.mirror_selector.ordered():
+                try:
+                    return self._request_batch(mirror, chunk)
+                except Exception as e:
+                    print(f"批量请求 {mirror} 失败: {e}")
+            return {}
+
+        responses = {}
+        executor = ThreadPoolExecutor(max_workers=min(self.max_concurrency, len(chunks)))
+        pending = {executor.submit(fetch_chunk, chunk) for chunk in chunks}
+        try:
+            while pending:
+                timeout = None if deadline is None else max(0.0, deadline - time.monotonic())
+                done, pending = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                if not done:
+                    break
+                for future in done:
+                    for id_value, (status, payload_hash, records) in future.result().items():
+                        responses[id_value] = self._accept_response(
+                            id_value, status, payload_hash, records
+                        )
+                        if on_response:
+                            on_response(id_value, responses[id_value])
+        finally:
+            executor.shutdown(wait=False)
+        return responses
+
+    def _request_replay(
+            self, id_value: str
+    ) -> Tuple[str, str, Optional[List[TitleRecord]]]:
+        """从录制数据中读取响应，没有录制时抛出异常"""
+        payload = self.replay_store.load(id_value, self.replay_at or None)
+        if payload is None:
+            raise ValueError(f"没有 {id_value} 的录制数据")
+        return self._decode_payload(id_value, payload)
+
+    def _request_hedged(
+            self, id_value: str
+    ) -> Tuple[str, str, Optional[List[TitleRecord]]]:
+        """对冲请求：主镜像超过延迟阈值未返回时向下一个镜像补发，取最先返回的有效响应"""
+        mirrors = self.mirror_selector.ordered()
+        if len(mirrors) == 1:
+            return self._request_mirror(mirrors[0], id_value)
+
+        if self.hedge_executor is None:
+            self.hedge_executor = ThreadPoolExecutor(
+                max_workers=self.max_concurrency * len(mirrors)
+            )
+
+        pending = {}
+        remaining = list(mirrors)
+        last_error: Optional[Exception] = None
+        # 已有镜像返回后，取消尚未开始的请求，仍在排队或限速等待的请求不再发出
+        cancelled = threading.Event()
+        try:
+            while remaining or pending:
+                if remaining:
+                    mirror = remaining.pop(0)
+                    future = self.hedge_executor.submit(
+                        self._request_mirror, mirror, id_value, cancelled
+                    )
+                    pending[future] = mirror
+
+                timeout = self.hedge_delay if remaining else None
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    mirror = pending.pop(future)
+                    if future.cancelled():
+                        continue
+                    try:
+                        result = future.result()
+                    except Exception as e:
+                        last_error = e
+                        continue
+                    if mirror != mirrors[0]:
+                        print(f"{id_value} 由镜像 {mirror} 返回")
+                    return result
+        finally:
+            cancelled.set()
+            for future in pending:
+                future.cancel()
+
+        raise last_error or ValueError("没有可用的上游镜像")
+
+    def _fetch_once(self, id_value: str) -> Union[List[TitleRecord], str]:
+        """经来源适配器请求一次指定ID数据并解析为标题记录，失败时抛出异常"""
+        adapter = self.adapters.get(id_value, self.default_adapter)
+        status, payload_hash, records = adapter.fetch(self, id_value)
+        return self._accept_response(id_value, status, payload_hash, records)
+
+    def _accept_response(
+            self,
+            id_value: str,
+            status: str,
+            payload_hash: str,
+            records: Optional[List[TitleRecord]],
+    ) -> Union[List[TitleRecord], str]:
+        """记录来源状态和响应哈希，返回标题记录或 UNCHANGED_PAYLOAD"""
+        if status == "unchanged":
+            print(f"获取 {id_value} 成功（数据未变化）")
+            self.source_statuses[id_value] = "unchanged"
+            return UNCHANGED_PAYLOAD
+
+        status_info = "最新数据" if status == "success" else "缓存数据"
+        print(f"获取 {id_value} 成功（{status_info}）")
+        self.source_statuses[id_value] = status
+        self.payload_hashes[id_value] = payload_hash
+        return records
+
+    def fetch_data(
+            self,
+            id_info: Union[str, Tuple[str, str]],
+            max_retries: int = 2,
+            min_retry_wait: int = 3,
+            max_retry_wait: int = 5,
+    ) -> Tuple[Optional[Union[List[TitleRecord], str]], str, str]:
+        """获取指定ID数据并解析为标题记录，支持重试"""
+        if isinstance(id_info, tuple):
+            id_value, alias = id_info
+        else:
+            id_value = id_info
+            alias = id_value
+
+        retries = 0
+        while retries <= max_retries:
+            try:
+                return self._fetch_once(id_value), id_value, alias
+            except Exception as e:
+                retries += 1
+                if retries <= max_retries:
+                    wait_time = self._retry_wait(retries, min_retry_wait, max_retry_wait)
+                    print(f"请求 {id_value} 失败: {e}. {wait_time:.2f}秒后重试...")
+                    time.sleep(wait_time)
+                else:
+                    print(f"请求 {id_value} 失败: {e}")
+                    return None, id_value, alias
+        return None, id_value, alias
+
+    def _fetch_all(
+            self,
+            id_values: List[str],
+            probe_ids: set,
+            max_retries: int,
+            min_retry_wait: float,
+            max_retry_wait: float,
+            on_response: Optional[Callable[[str, Union[List[TitleRecord], str]], None]] = None,
+            deadline: Optional[float] = None,
+    ) -> Dict[str, Optional[Union[List[TitleRecord], str]]]:
+        """
+        并发请求多个ID；失败的请求进入重试队列，等待期间不占用工作线程
+        每个ID请求成功时立即以 on_response(id, response) 通知调用方（在调用线程中执行）。
+        到达截止时间（time.monotonic()）时立即返回：未完成的ID不在结果中，
+        仍在进行的请求记入 stragglers，稍后可由 collect_stragglers 收集
+        """
+        responses = {}
+        attempts = {id_value: 0 for id_value in id_values}
+        retry_queue = []
+        retries_left = self.retry_budget
+
+        workers = min(self.max_concurrency, max(1, len(id_values)))
+        executor = ThreadPoolExecutor(max_workers=workers)
+        try:
+            pending = {
+                executor.submit(self._fetch_once, id_value): id_value
+                for id_value in id_values
+            }
+
+            while pending or retry_queue:
+                now = time.monotonic()
+                if deadline is not None and now >= deadline:
+                    break
+                while retry_queue and retry_queue[0][0] <= now:
+                    _, id_value = heapq.heappop(retry_queue)
+                    pending[executor.submit(self._fetch_once, id_value)] = id_value
+
+                timeout = retry_queue[0][0] - now if retry_queue else None
+                if deadline is not None:
+                    timeout = deadline - now if timeout is None else min(timeout, deadline - now)
+                if not pending:
+                    time.sleep(max(0.0, timeout))
+                    continue
+
+                done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+                for future in done:
+                    id_value = pending.pop(future)
+                    try:
+                        responses[id_value] = future.result()
+                    except Exception as e:
+                        error = e
+                    else:
+                        if on_response:
+                            on_response(id_value, responses[id_value])
+                        continue
+
+                    attempts[id_value] += 1
+                    can_retry = (
+                            attempts[id_value] <= max_retries
+                            and id_value not in probe_ids
+                            and retries_left > 0
+                    )
+                    if can_retry:
+                        retries_left -= 1
+                        wait_time = self._retry_wait(
+                            attempts[id_value], min_retry_wait, max_retry_wait
+                        )
+                        print(f"请求 {id_value} 失败: {error}. {wait_time:.2f}秒后重试...")
+                        heapq.heappush(retry_queue, (time.monotonic() + wait_time, id_value))
+                    else:
+                        if attempts[id_value] <= max_retries and retries_left <= 0:
+                            print(f"请求 {id_value} 失败: {error}（本次爬取重试预算已用完）")
+                        else:
+                            print(f"请求 {id_value} 失败: {error}")
+                        responses[id_value] = None
+        finally:
+            # 截止时间到达时不等待仍在进行的请求
+            executor.shutdown(wait=False)
+
+        for future, id_value in pending.items():
+            self.stragglers[future] = id_value
+        return responses
+
+    def crawl_websites(
+            self,
+            ids_list: List[Union[str, Tuple[str, str]]],
+            request_interval: int = CONFIG["REQUEST_INTERVAL"],
+            max_retries: int = 2,
+            min_retry_wait: float = 3,
+            max_retry_wait: float = 5,
+            on_source: Optional[Callable[[str, Dict], None]] = None,
+    ) -> Tuple[Dict, Dict, List]:
+        """
+        爬取多个网站数据，按并发数并行请求，同一主机由令牌桶限速
+
+        本次运行内已抓取过的来源直接复用结果，只请求缺失的来源；
+        实际发出请求的来源记录在 fetched_ids 中。
+        on_source(id, title_data) 在每个来源的数据到达时立即调用，便于边抓取边分析。
+        配置了 crawl_deadline 时，到期仍未完成的来源记入 timed_out_ids（不计入失败，
+        本次运行内再次请求时同样不计入），其中仍在进行的请求可在稍后通过 collect_stragglers 收集；
+        熔断中未请求的来源记入 circuit_open_ids（同样不计入失败）
+        """
+        results = {}
+        id_to_name = {}
+        failed_ids = []
+        self.unchanged_ids = []
+        self.payload_hashes = {}
+        self.feed_validators = {}
+        deadline = time.monotonic() + self.crawl_deadline if self.crawl_deadline else None
+
+        now = time.time()
+        fetch_ids = []
+        probe_ids = set()
+        skipped_ids = set()
+        cached_ids = []
+        for id_info in ids_list:
+            id_value = id_info[0] if isinstance(id_info, tuple) else id_info
+            if id_value in self.run_cache:
+                cached_ids.append(id_value)
+                continue
+            state = (
+                self.health_tracker.get_state(id_value, now)
+                if self.health_tracker
+                else "closed"
+            )
+            if state == "open":
+                skipped_ids.add(id_value)
+                if id_value not in self.circuit_open_ids:
+                    self.circuit_open_ids.append(id_value)
+                continue
+            if state == "half_open":
+                probe_ids.add(id_value)
+            fetch_ids.append(id_value)
+
+        if skipped_ids:
+            print(f"熔断中，跳过: {sorted(skipped_ids)}")
+        if probe_ids:
+            print(f"熔断冷却结束，探测: {sorted(probe_ids)}")
+        if cached_ids:
+            print(f"复用本次运行已获取的数据: {cached_ids}")
+
+        if on_source:
+            for id_value in cached_ids:
+                if self.run_cache[id_value][0] is not None:
+                    on_source(id_value, self.run_cache[id_value][0])
+
+        title_data_by_id = {}
+
+        def source_arrived(id_value: str, response: Union[List[TitleRecord], str]) -> None:
+            title_data = self._resolve_response(id_value, response)
+            title_data_by_id[id_value] = title_data
+            if on_source:
+                on_source(id_value, title_data)
+
+        self.fetched_ids = fetch_ids
+        responses = {}
+        if fetch_ids:
+            self._get_rate_limiter(request_interval)
+            print(
+                f"开始抓取 {len(fetch_ids)} 个平台，"
+                f"并发数 {min(self.max_concurrency, len(fetch_ids))}，"
+                f"单主机限速 {self.rate_limiter.rate:.1f} 次/秒，重试预算 {self.retry_budget} 次"
+            )
+            remaining_ids = fetch_ids
+            # 批量接口只适用于 newsnow 来源
+            batch_ids = [i for i in fetch_ids if i not in self.adapters]
+            if self.batch_size and not self.replay_store and batch_ids:
+                responses = self._fetch_batches(batch_ids, source_arrived, deadline)
+                remaining_ids = [i for i in fetch_ids if i not in responses]
+                print(f"批量获取 {len(responses)}/{len(batch_ids)} 个平台")
+                if remaining_ids:
+                    print(f"批量缺失或失败，逐个请求: {remaining_ids}")
+            if remaining_ids:
+                responses.update(
+                    self._fetch_all(
+                        remaining_ids,
+                        probe_ids,
+                        max_retries,
+                        min_retry_wait,
+                        max_retry_wait,
+                        source_arrived,
+                        deadline,
+                    )
+                )
+
+        # 按配置顺序组装结果，保持输出顺序稳定
+        for id_info in ids_list:
+            if isinstance(id_info, tuple):
+                id_value, name = id_info
+            else:
+                id_value = id_info
+                name = id_value
+
+            id_to_name[id_value] = name
+            if id_value in self.run_cache:
+                title_data = self.run_cache[id_value][0]
+                if id_value in self.circuit_open_ids or id_value in self.timed_out_ids:
+                    continue
+                if title_data is None:
+                    failed_ids.append(id_value)
+                else:
+                    results[id_value] = title_data
+                    if self.source_statuses.get(id_value) == "unchanged":
+                        self.unchanged_ids.append(id_value)
+                continue
+
+            response = responses.get(id_value)
+            if response is not None:
+                results[id_value] = title_data_by_id[id_value]
+                if response == UNCHANGED_PAYLOAD:
+                    self.unchanged_ids.append(id_value)
+            elif id_value in fetch_ids and id_value not in responses:
+                self.timed_out_ids.append(id_value)
+            elif id_value not in skipped_ids:
+                failed_ids.append(id_value)
+            self.run_cache[id_value] = (results.get(id_value), name)
+
+        if not fetch_ids:
+            print(f"成功: {list(results.keys())}, 失败: {failed_ids}")
+            return results, id_to_name, failed_ids
+
+        if self.payload_store:
+            self.payload_store.save()
+
+        if len(self.mirror_selector.mirrors) > 1:
+            self.mirror_selector.save()
+            print(f"镜像延迟: {self.mirror_selector.summary()}")
+
+        if self.health_tracker:
+            for id_value in fetch_ids:
+                if id_value in results:
+                    self.health_tracker.record_success(id_value, now)
+                else:
+                    self.health_tracker.record_failure(id_value, now)
+            self.health_tracker.save()
+
+        if self.unchanged_ids:
+            print(f"数据未变化: {self.unchanged_ids}")
+        if self.timed_out_ids:
+            print(f"超过抓取截止时间 {self.crawl_deadline} 秒，未返回: {self.timed_out_ids}")
+        print(f"成功: {list(results.keys())}, 失败: {failed_ids}")
+        return results, id_to_name, failed_ids
+
+    def collect_stragglers(self, timeout: float = REQUEST_TIMEOUT) -> Dict[str, Dict]:
+        """
+        等待截止时间后仍在进行的请求，返回其中成功到达的来源 {id: title_data}
+
+        到达的来源从 timed_out_ids 移除并写入本次运行缓存；超时仍未完成的请求被放弃
+        """
+        if not self.stragglers:
+            return {}
+
+        done, _ = wait(self.stragglers, timeout=timeout)
+        arrived = {}
+        now = time.time()
+        for future in done:
+            id_value = self.stragglers.pop(future)
+            try:
+                response = future.result()
+            except Exception as e:
+                print(f"迟到的 {id_value} 请求失败: {e}")
+                continue
+            arrived[id_value] = self._resolve_response(id_value, response)
+            name = self.run_cache.get(id_value, (None, id_value))[1]
+            self.run_cache[id_value] = (arrived[id_value], name)
+            if id_value in self.timed_out_ids:
+                self.timed_out_ids.remove(id_value)
+            if self.health_tracker:
+                self.health_tracker.record_success(id_value, now)
+        self.stragglers = {}
+
+        if arrived:
+            if self.payload_store:
+                self.payload_store.save()
+            if self.health_tracker:
+                self.health_tracker.save()
+            print(f"迟到的来源已到达: {list(arrived.keys())}")
+        return arrived
+
+    def _resolve_response(
+            self, id_value: str, response: Union[List[TitleRecord], str]
+    ) -> Dict:
+        """将抓取响应转换为标题数据，并更新响应哈希缓存"""
+        if response == UNCHANGED_PAYLOAD:
+            # 内容未变化：跳过解析，直接复用上次的标题数据
+            return self.payload_store.get_titles(id_value)
+
+        title_data = build_title_data(response)
+        if self.payload_store and id_value in self.payload_hashes:
+            self.payload_store.update(
+                id_value,
+                self.payload_hashes[id_value],
+                title_data,
+                self.feed_validators.get(id_value),
+            )
+        return title_data
+
+
+# === 标题存储 ===
+_title_store: Optional[TitleStore] = None
+_title_store_lock = threading.Lock()
+
+
+def get_title_store() -> Optional[TitleStore]:
+    """storage.backend 为 sqlite 时返回标题存储（首次调用时创建），否则返回 None 使用 txt 快照"""
+    global _title_store
+    if CONFIG["STORAGE"]["BACKEND"] != "sqlite":
+        return None
+    with _title_store_lock:
+        if _title_store is None:
+            _title_store = TitleStore(CONFIG["STORAGE"]["SQLITE_PATH"])
+        return _title_store
+
+
+def list_snapshot_times(date_folder: Optional[str] = None) -> List[str]:
+    """返回指定日期（默认当天）的快照时间（HH时MM分），按时间排序"""
+    date_folder = date_folder or format_date_folder()
+    store = get_title_store()
+    if store:
+        return store.snapshot_times(date_folder)
+    return sorted(load_manifest(date_folder)["snapshots"])
+
+
+def list_snapshot_versions(date_folder: Optional[str] = None) -> List[List[str]]:
+    """
+    返回指定日期（默认当天）的 [快照时间, 版本]，按时间排序；
+    快照被重写后版本随之变化（快照文件为清单中的内容哈希，SQLite 为写入时间）
+    """
+    date_folder = date_folder or format_date_folder()
+    store = get_title_store()
+    if store:
+        return [[time_name, version] for time_name, version in store.snapshot_versions(date_folder)]
+    snapshots = load_manifest(date_folder)["snapshots"]
+    return [[time_name, snapshots[time_name]["hash"]] for time_name in sorted(snapshots)]
+
+
+# === 输出锁 ===
+# 建议锁文件目录：cron 重叠运行、抓取与分析进程并行时，同一份数据的读取-修改-写入在进程间串行
+LOCK_DIR = Path("output") / ".locks"
+
+
+def output_lock(name: str, shared: bool = False):
+    """output/.locks/<name>.lock 上的建议锁（默认排他，同一线程可重入）"""
+    return file_lock(LOCK_DIR / f"{name}.lock", shared)
+
+
+def day_lock(date_folder: str, shared: bool = False):
+    """
+    当日快照锁：写入快照和归档日期目录时排他，读取快照时共享，
+    归档不会在读取或写入期间删除日期目录
+    """
+    return output_lock(f"snapshots-{date_folder}", shared)
+
+
+# === 快照清单 ===
+MANIFEST_FILE = "manifest.json"
+OUTPUT_INDEX_FILE = "index.json"
+MANIFEST_FORMAT = 1
+
+# 清单路径 -> (文件修改时间, 清单)
+_manifest_cache: Dict[str, Tuple[int, Dict]] = {}
+_manifest_lock = threading.RLock()
+
+
+def snapshot_manifest_entry(titles_by_id: Dict, id_to_name: Dict, unchanged_ids: List) -> Dict:
+    """
+    计算快照的清单条目：来源、各来源标题数和内容哈希；
+    哈希与快照格式无关，写入时与读回后计算的结果一致（没有标题的来源不计入）
+    """
+    sources = []
+    for source_id, title_data in titles_by_id.items():
+        if not title_data:
+            continue
+        entries = [
+            [
+                title,
+                (info.get("ranks") or [1])[0],
+                info.get("url", ""),
+                info.get("mobileUrl", ""),
+                info.get("heat"),
+            ]
+            for title, info in title_data.items()
+        ]
+        sources.append([source_id, id_to_name.get(source_id) or source_id, entries])
+
+    encoded = json.dumps([sources, list(unchanged_ids or [])], ensure_ascii=False)
+    return {
+        "sources": [source[0] for source in sources],
+        "titles": {source[0]: len(source[2]) for source in sources},
+        "hash": hashlib.sha1(encoded.encode("utf-8")).hexdigest(),
+    }
+
+
+def rebuild_manifest(date_folder: str) -> Dict:
+    """扫描并解析当日快照目录，重新生成清单（清单缺失、损坏或存储格式变化时）"""
+    backend = CONFIG["STORAGE"]["BACKEND"]
+    manifest = {"format": MANIFEST_FORMAT, "backend": backend, "snapshots": {}}
+    with open_day_dir(date_folder) as date_dir:
+        if backend == "binary":
+            snapshots = snapshot_codec.iter_day(date_dir)
+        else:
+            txt_dir = date_dir / "txt"
+            time_names = (
+                sorted(f.name[:-4] for f in txt_dir.iterdir() if f.name.endswith(".txt"))
+                if txt_dir.exists()
+                else []
+            )
+            snapshots = (
+                (time_name,)
+                + parse_snapshot_file(Path("output") / date_folder / "txt" / f"{time_name}.txt")
+                for time_name in time_names
+            )
+
+        for time_name, titles_by_id, id_to_name, unchanged_ids in snapshots:
+            manifest["snapshots"][time_name] = snapshot_manifest_entry(
+                titles_by_id, id_to_name, unchanged_ids
+            )
+    # 已归档的日期只在内存中重建，不重新创建日期目录
+    if manifest["snapshots"] and not is_day_archived(date_folder):
+        _write_manifest(date_folder, manifest)
+    return manifest
+
+
+def _write_manifest(date_folder: str, manifest: Dict) -> None:
+    manifest_path = Path("output") / date_folder / MANIFEST_FILE
+    atomic_write_json(manifest_path, manifest)
+    _manifest_cache[str(manifest_path.resolve())] = (manifest_path.stat().st_mtime_ns, manifest)
+    update_output_index(date_folder, manifest)
+
+
+def load_manifest(date_folder: str) -> Dict:
+    """
+    读取当日快照清单 {"format", "backend", "snapshots": {时间: 条目}}；清单文件未变化时复用进程内缓存，
+    只检查清单文件本身，不列出快照目录。返回的清单不应被修改
+    """
+    manifest_path = Path("output") / date_folder / MANIFEST_FILE
+    cache_key = str(manifest_path.resolve())
+    backend = CONFIG["STORAGE"]["BACKEND"]
+    # 先取当日共享锁再取进程内锁，与写入快照（当日排他锁 -> 进程内锁）的加锁顺序一致
+    with day_lock(date_folder, shared=True), _manifest_lock:
+        try:
+            mtime = manifest_path.stat().st_mtime_ns
+        except FileNotFoundError:
+            mtime = None
+        if mtime is None and is_day_archived(date_folder):
+            return load_archived_manifest(date_folder)
+        cached = _manifest_cache.get(cache_key)
+        if cached and cached[0] == mtime and cached[1]["backend"] == backend:
+            return cached[1]
+
+        manifest = None
+        if mtime is not None:
+            try:
+                with open(manifest_path, "r", encoding="utf-8") as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"读取快照清单失败，重新生成: {e}")
+        if (
+                not manifest
+                or manifest.get("format") != MANIFEST_FORMAT
+                or manifest.get("backend") != backend
+        ):
+            manifest = rebuild_manifest(date_folder)
+        elif mtime is not None:
+            _manifest_cache[cache_key] = (mtime, manifest)
+        return manifest
+
+
+def load_archived_manifest(date_folder: str) -> Dict:
+    """读取已归档日期的清单（只解压清单文件）；归档中没有清单时从归档内的快照重建"""
+    archive_file = output_archive.archive_path(Path("output"), date_folder)
+    cache_key = str(archive_file.resolve())
+    mtime = archive_file.stat().st_mtime_ns
+    cached = _manifest_cache.get(cache_key)
+    if cached and cached[0] == mtime:
+        return cached[1]
+
+    try:
+        manifest = json.loads(
+            output_archive.read_member(Path("output"), date_folder, MANIFEST_FILE)
+        )
+    except FileNotFoundError:
+        manifest = rebuild_manifest(date_folder)
+    except ValueError as e:
+        print(f"读取归档清单失败，重新生成: {e}")
+        manifest = rebuild_manifest(date_folder)
+    _manifest_cache[cache_key] = (mtime, manifest)
+    return manifest
+
+
+def record_snapshot(
+        date_folder: str,
+        time_name: str,
+        titles_by_id: Dict,
+        id_to_name: Dict,
+        unchanged_ids: List,
+) -> None:
+    """写入快照后更新当日清单和全局索引"""
+    with _manifest_lock, output_lock("index"):
+        manifest = load_manifest(date_folder)
+        manifest = dict(manifest, snapshots=dict(manifest["snapshots"]))
+        manifest["snapshots"][time_name] = snapshot_manifest_entry(
+            titles_by_id, id_to_name, unchanged_ids
+        )
+        _write_manifest(date_folder, manifest)
+
+
+def update_output_index(date_folder: str, manifest: Dict) -> None:
+    """
+    更新 output/index.json：按日期记录各快照的时间、标题总数和内容哈希，
+    多日查询直接读取索引，无需列出 output/ 或解析中文日期目录名
+    """
+    try:
+        date = datetime.strptime(date_folder, "%Y年%m月%d日").strftime("%Y-%m-%d")
+    except ValueError:
+        date = date_folder
+    with output_lock("index"):
+        index = load_output_index()
+        index["days"][date_folder] = {
+            "date": date,
+            "snapshots": {
+                time_name: {"titles": sum(entry["titles"].values()), "hash": entry["hash"]}
+                for time_name, entry in sorted(manifest["snapshots"].items())
+            },
+        }
+        atomic_write_json(Path("output") / OUTPUT_INDEX_FILE, index)
+
+
+def load_output_index() -> Dict:
+    """读取全局索引 {"format", "days": {日期目录: {"date", "snapshots"}}}，不存在时返回空索引"""
+    index_path = Path("output") / OUTPUT_INDEX_FILE
+    try:
+        with open(index_path, "r", encoding="utf-8") as f:
+            index = json.load(f)
+        if index.get("format") == MANIFEST_FORMAT:
+            return index
+    except FileNotFoundError:
+        pass
+    except (OSError, ValueError) as e:
+        print(f"读取全局索引失败，重新生成: {e}")
+    return {"format": MANIFEST_FORMAT, "days": {}}
+
+
+def list_output_days() -> List[Tuple[str, str]]:
+    """返回已记录的 (YYYY-MM-DD, 日期目录)，按日期排序"""
+    days = load_output_index()["days"]
+    return sorted((info["date"], date_folder) for date_folder, info in days.items())
+
+
+def iter_snapshots(
+        date_folder: Optional[str] = None,
+        current_platform_ids: Optional[List[str]] = None,
+        after: Optional[str] = None,
+        until: Optional[str] = None,
+) -> Iterator[Tuple[str, Dict, Dict, List]]:
+    """
+    按时间顺序返回指定日期（默认当天）各快照 (time_info, titles_by_id, id_to_name, unchanged_ids)，
+    after / until 限定快照时间范围（不含 after，含 until）
+    """
+    date_folder = date_folder or format_date_folder()
+    store = get_title_store()
+    if store:
+        yield from store.iter_day(date_folder, current_platform_ids, after, until)
+        return
+
+    with open_day_dir(date_folder) as date_dir:
+        if CONFIG["STORAGE"]["BACKEND"] == "binary":
+            snapshots = snapshot_codec.iter_day(
+                date_dir, after, until, names=list_snapshot_times(date_folder)
+            )
+        else:
+            txt_dir = Path("output") / date_folder / "txt"
+            snapshots = (
+                (time_info,) + parse_snapshot_file(txt_dir / f"{time_info}.txt")
+                for time_info in list_snapshot_times(date_folder)
+                if not (after and time_info <= after) and not (until and time_info > until)
+            )
+
+        for time_info, titles_by_id, id_to_name, unchanged_ids in snapshots:
+            if current_platform_ids is not None:
+                titles_by_id = {
+                    source_id: title_data
+                    for source_id, title_data in titles_by_id.items()
+                    if source_id in current_platform_ids
+                }
+                id_to_name = {
+                    source_id: name
+                    for source_id, name in id_to_name.items()
+                    if source_id in titles_by_id
+                }
+            yield time_info, titles_by_id, id_to_name, unchanged_ids
+
+
+# === 旧日期归档 ===
+def is_day_archived(date_folder: str) -> bool:
+    """日期目录已打包为 output/archive/<日期>.zip（原目录不存在）"""
+    return (
+        not (Path("output") / date_folder).exists()
+        and output_archive.is_archived(Path("output"), date_folder)
+    )
+
+
+@contextlib.contextmanager
+def open_day_dir(date_folder: str):
+    """日期目录（持有当日共享锁）；已归档时为归档内的 zipfile.Path，只读取用到的文件"""
+    with day_lock(date_folder, shared=True):
+        if not is_day_archived(date_folder):
+            yield Path("output") / date_folder
+            return
+        with zipfile.ZipFile(output_archive.archive_path(Path("output"), date_folder)) as archive:
+            yield zipfile.Path(archive)
+
+
+def read_output_text(file_path: Path) -> str:
+    """读取 output/<日期>/ 下的文本文件（快照、报告等）；日期目录已归档时只从归档中解压该文件"""
+    try:
+        parts = Path(os.path.abspath(file_path)).relative_to(Path("output").resolve()).parts
+    except ValueError:
+        parts = ()
+    if len(parts) < 2:
+        with open(file_path, "r", encoding="utf-8") as f:
+            return f.read()
+
+    with day_lock(parts[0], shared=True):
+        try:
+            with open(file_path, "r", encoding="utf-8") as f:
+                return f.read()
+        except FileNotFoundError:
+            if not is_day_archived(parts[0]):
+                raise
+        return output_archive.read_member(
+            Path("output"), parts[0], "/".join(parts[1:])
+        ).decode("utf-8")
+
+
+def compact_output(
+        keep_days: Optional[int] = None,
+        max_size_mb: Optional[float] = None,
+        archive_retention_days: Optional[int] = None,
+        force: bool = False,
+) -> Dict[str, List[str]]:
+    """
+    按 archive 配置归档旧日期目录，删除过期归档并从全局索引中移除（每次运行结束后调用）；
+    参数为 None 时使用配置值，force 为真时忽略 enabled（output_archive.py compact 手动归档）。
+    返回 {"archived": [...], "deleted": [...]}
+    """
+    archive_config = CONFIG["ARCHIVE"]
+    result = {"archived": [], "deleted": []}
+    if not archive_config["ENABLED"] and not force:
+        return result
+    try:
+        with output_lock("archive"):
+            result = output_archive.compact_output(
+                Path("output"),
+                get_beijing_time().date(),
+                keep_days=archive_config["KEEP_DAYS"] if keep_days is None else keep_days,
+                max_size_mb=archive_config["MAX_SIZE_MB"] if max_size_mb is None else max_size_mb,
+                archive_retention_days=(
+                    archive_config["ARCHIVE_RETENTION_DAYS"]
+                    if archive_retention_days is None
+                    else archive_retention_days
+                ),
+                # 归档前确保清单和全局索引已记录该日期，归档后无需扫描即可列出快照
+                prepare=load_manifest,
+                day_lock=day_lock,
+            )
+    except (OSError, zipfile.BadZipFile) as e:
+        print(f"归档旧日期目录失败: {e}")
+        return result
+
+    if result["deleted"]:
+        with _manifest_lock, output_lock("index"):
+            index = load_output_index()
+            for date_folder in result["deleted"]:
+                index["days"].pop(date_folder, None)
+            atomic_write_json(Path("output") / OUTPUT_INDEX_FILE, index)
+    if result["archived"] or result["deleted"]:
+        print(f"已归档 {len(result['archived'])} 个日期目录，删除 {len(result['deleted'])} 个过期归档")
+    return result
+
+
+# === 数据处理 ===
+UNCHANGED_IDS_HEADER = "==== 以下ID数据未变化 ===="
+FAILED_IDS_HEADER = "==== 以下ID请求失败 ===="
+SECTION_REF_PREFIX = "@SECTION:"
+SECTION_DIR = "sections"
+
+
+def format_source_section(title_data: Dict) -> str:
+    """按 txt 快照格式输出单个来源的标题行（按排名排序）"""
+    sorted_titles = []
+    for title, info in title_data.items():
+        cleaned_title = clean_title(title)
+        if isinstance(info, dict):
+            ranks = info.get("ranks", [])
+            url = info.get("url", "")
+            mobile_url = info.get("mobileUrl", "")
+            heat = info.get("heat")
+        else:
+            ranks = info if isinstance(info, list) else []
+            url = ""
+            mobile_url = ""
+            heat = None
+
+        rank = ranks[0] if ranks else 1
+        sorted_titles.append((rank, cleaned_title, url, mobile_url, heat))
+
+    sorted_titles.sort(key=lambda x: x[0])
+
+    lines = []
+    for rank, cleaned_title, url, mobile_url, heat in sorted_titles:
+        line = f"{rank}. {cleaned_title}"
+
+        if url:
+            line += f" [URL:{url}]"
+        if mobile_url:
+            line += f" [MOBILE:{mobile_url}]"
+        if heat is not None:
+            line += f" [HEAT:{heat}]"
+        lines.append(line + "\n")
+    return "".join(lines)
+
+
+def format_snapshot_text(
+        results: Dict,
+        id_to_name: Dict,
+        failed_ids: List,
+        unchanged_ids: Optional[List] = None,
+        section_refs: Optional[Dict[str, str]] = None,
+) -> str:
+    """
+    按 txt 快照格式输出标题，与 parse_snapshot_file 互逆；
+    section_refs 中的来源只写一行内容哈希引用，标题行存放在 sections/ 下
+    """
+    section_refs = section_refs or {}
+    lines = []
+    for id_value, title_data in results.items():
+        # id | name 或 id
+        name = id_to_name.get(id_value)
+        if name and name != id_value:
+            lines.append(f"{id_value} | {name}\n")
+        else:
+            lines.append(f"{id_value}\n")
+
+        if id_value in section_refs:
+            lines.append(f"{SECTION_REF_PREFIX}{section_refs[id_value]}\n")
+        else:
+            lines.append(format_source_section(title_data))
+        lines.append("\n")
+
+    if unchanged_ids:
+        lines.append(f"{UNCHANGED_IDS_HEADER}\n")
+        for id_value in unchanged_ids:
+            lines.append(f"{id_value}\n")
+        lines.append("\n")
+
+    if failed_ids:
+        lines.append(f"{FAILED_IDS_HEADER}\n")
+        for id_value in failed_ids:
+            lines.append(f"{id_value}\n")
+    return "".join(lines)
+
+
+def section_hash(section_text: str) -> str:
+    return hashlib.sha1(section_text.encode("utf-8")).hexdigest()
+
+
+def store_sections(date_folder: str, results: Dict) -> Dict[str, str]:
+    """
+    内容寻址去重：各来源的标题行按内容哈希存入 output/<日期>/sections/<哈希>.txt，
+    相同内容只存一份（上游返回缓存数据时各次快照的来源内容完全相同），返回 {来源ID: 哈希} 供快照引用
+    """
+    section_dir = Path("output") / date_folder / SECTION_DIR
+    refs = {}
+    for source_id, title_data in results.items():
+        section_text = format_source_section(title_data)
+        if not section_text:
+            continue
+        digest = section_hash(section_text)
+        section_path = section_dir / f"{digest}.txt"
+        if not section_path.exists():
+            atomic_write_text(section_path, section_text)
+        refs[source_id] = digest
+    return refs
+
+
+def snapshot_section_refs(snapshot_text: str) -> Set[str]:
+    """txt 快照中引用的去重内容哈希"""
+    return {
+        line[len(SECTION_REF_PREFIX):].strip()
+        for line in snapshot_text.split("\n")
+        if line.startswith(SECTION_REF_PREFIX)
+    }
+
+
+def remove_orphan_sections(date_folder: str, candidates: Set[str]) -> List[str]:
+    """
+    快照被改写后，删除 candidates 中不再被当日任何 txt 快照引用的去重内容，返回删除的哈希；
+    调用方需持有当日快照锁，避免与并发写入的快照竞争
+    """
+    day_dir = Path("output") / date_folder
+    txt_dir = day_dir / "txt"
+    referenced = set()
+    if txt_dir.exists():
+        for txt_file in txt_dir.glob("*.txt"):
+            with open(txt_file, "r", encoding="utf-8") as f:
+                referenced |= snapshot_section_refs(f.read())
+
+    removed = []
+    for digest in sorted(candidates - referenced):
+        try:
+            (day_dir / SECTION_DIR / f"{digest}.txt").unlink()
+            removed.append(digest)
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def save_titles_to_file(
+        results: Dict,
+        id_to_name: Dict,
+        failed_ids: List,
+        unchanged_ids: Optional[List] = None,
+        file_path: Optional[str] = None,
+) -> str:
+    """
+    保存标题到文件，未变化的来源额外记录在文件末尾；file_path 用于重写已有快照
+
+    使用 SQLite 标题存储或二进制快照时，快照按 file_path 对应的日期和时间写入，
+    storage.write_txt 关闭时不再写 txt 文件（仍返回 file_path 作为快照标识）
+    """
+    if file_path is None:
+        file_path = str(
+            Path("output") / format_date_folder() / "txt" / f"{format_time_filename()}.txt"
+        )
+
+    backend = CONFIG["STORAGE"]["BACKEND"]
+    snapshot_path = Path(file_path)
+    date_folder = snapshot_path.parent.parent.name
+    # 只有 output/<日期>/ 下的快照记入清单（测试或工具可能写到其他位置）
+    in_output = snapshot_path.parent.parent.parent.resolve() == Path("output").resolve()
+    normalized_results = {
+        id_value: normalize_snapshot_titles(title_data)
+        for id_value, title_data in results.items()
+    }
+    # 同一日期的快照写入在多个进程间串行（二进制快照的字符串字典为追加写入）
+    with day_lock(date_folder):
+        # 向已归档的日期写入（如跨天补录迟到来源）时先解压回日期目录，下次归档时重新打包
+        if in_output and output_archive.is_archived(Path("output"), date_folder):
+            output_archive.restore_day(Path("output"), date_folder)
+            _manifest_cache.clear()
+        if backend != "txt":
+            store = get_title_store()
+            if store:
+                store.save_snapshot(
+                    date_folder,
+                    snapshot_path.stem,
+                    normalized_results,
+                    id_to_name,
+                    failed_ids,
+                    unchanged_ids,
+                )
+            elif backend == "binary":
+                snapshot_codec.write_snapshot(
+                    snapshot_path.parent.parent,
+                    snapshot_path.stem,
+                    normalized_results,
+                    id_to_name,
+                    unchanged_ids or [],
+                    failed_ids,
+                    base_interval=CONFIG["STORAGE"]["BASE_INTERVAL"],
+                    names=list_snapshot_times(date_folder),
+                )
+                if in_output:
+                    record_snapshot(
+                        date_folder, snapshot_path.stem, normalized_results, id_to_name, unchanged_ids
+                    )
+            if not CONFIG["STORAGE"]["WRITE_TXT"]:
+                return file_path
+
+        # 改写已有快照时记录其原有引用，写入后清理不再被引用的去重内容
+        previous_refs = set()
+        if in_output and snapshot_path.exists():
+            with open(snapshot_path, "r", encoding="utf-8") as f:
+                previous_refs = snapshot_section_refs(f.read())
+
+        section_refs = None
+        if CONFIG["STORAGE"]["DEDUP_SECTIONS"] and in_output:
+            section_refs = store_sections(date_folder, results)
+
+        atomic_write_text(
+            file_path,
+            format_snapshot_text(results, id_to_name, failed_ids, unchanged_ids, section_refs),
+        )
+        orphaned = previous_refs - set((section_refs or {}).values())
+        if orphaned:
+            remove_orphan_sections(date_folder, orphaned)
+        if backend == "txt" and in_output:
+            record_snapshot(
+                date_folder, snapshot_path.stem, normalized_results, id_to_name, unchanged_ids
+            )
+
+    return file_path
+
+
+def load_frequency_words(
+        frequency_file: Optional[str] = None,
+) -> Tuple[List[Dict], List[str]]:
+    """加载频率词配置"""
+    if frequency_file is None:
+        frequency_file = os.environ.get(
+            "FREQUENCY_WORDS_PATH", "config/frequency_words.txt"
+        )
+
+    frequency_path = Path(frequency_file)
+    if not frequency_path.exists():
+        raise FileNotFoundError(f"频率词文件 {frequency_file} 不存在")
+
+    with open(frequency_path, "r", encoding="utf-8") as f:
+        content = f.read()
+
+    word_groups = [group.strip() for group in content.split("\n\n") if group.strip()]
+
+    processed_groups = []
+    filter_words = []
+
+    for group in word_groups:
+        words = [word.strip() for word in group.split("\n") if word.strip()]
+
+        group_required_words = []
+        group_normal_words = []
+        group_filter_words = []
+
+        for word in words:
+            if word.startswith("!"):
+                filter_words.append(word[1:])
+                group_filter_words.append(word[1:])
+            elif word.startswith("+"):
+                group_required_words.append(word[1:])
+            else:
+                group_normal_words.append(word)
+
+        if group_required_words or group_normal_words:
+            if group_normal_words:
+                group_key = " ".join(group_normal_words)
+            else:
+                group_key = " ".join(group_required_words)
+
+            processed_groups.append(
+                {
+                    "required": group_required_words,
+                    "normal": group_normal_words,
+                    "group_key": group_key,
+                }
+            )
+
+    return processed_groups, filter_words
+
+
+def parse_file_titles(file_path: Path) -> Tuple[Dict, Dict]:
+    """解析单个txt文件的标题数据，返回(titles_by_id, id_to_name)"""
+    titles_by_id, id_to_name, _ = parse_snapshot_file(file_path)
+    return titles_by_id, id_to_name
+
+
+@functools.lru_cache(maxsize=1024)
+def read_stored_section(section_path: str) -> List[str]:
+    """读取去重存放的标题行（内容寻址，文件内容不会变化，可以缓存）"""
+    return read_output_text(Path(section_path)).strip().split("\n")
+
+
+def parse_snapshot_file(file_path: Path) -> Tuple[Dict, Dict, List]:
+    """解析单个txt文件，返回(titles_by_id, id_to_name, unchanged_ids)"""
+    titles_by_id = {}
+    id_to_name = {}
+    unchanged_ids = []
+
+    content = read_output_text(file_path)
+    sections = content.split("\n\n")
+
+    for section in sections:
+        if not section.strip() or FAILED_IDS_HEADER in section:
+            continue
+
+        if section.strip().startswith(UNCHANGED_IDS_HEADER):
+            unchanged_ids.extend(
+                line.strip()
+                for line in section.strip().split("\n")[1:]
+                if line.strip()
+            )
+            continue
+
+        lines = section.strip().split("\n")
+        if len(lines) < 2:
+            continue
+
+        # 内容哈希引用：从 sections/ 读回标题行
+        if lines[1].startswith(SECTION_REF_PREFIX):
+            section_path = (
+                Path(file_path).parent.parent
+                / SECTION_DIR
+                / f"{lines[1][len(SECTION_REF_PREFIX):].strip()}.txt"
+            )
+            try:
+                lines = lines[:1] + read_stored_section(str(section_path))
+            except OSError as e:
+                print(f"读取去重内容失败: {section_path}, 错误: {e}")
+                continue
+
+        # id | name 或 id
+        header_line = lines[0].strip()
+        if " | " in header_line:
+            parts = header_line.split(" | ", 1)
+            source_id = parts[0].strip()
+            name = parts[1].strip()
+            id_to_name[source_id] = name
+        else:
+            source_id = header_line
+            id_to_name[source_id] = source_id
+
+        titles_by_id[source_id] = {}
+
+        for line in lines[1:]:
+            if line.strip():
+                try:
+                    title_part = line.strip()
+                    rank = None
+
+                    # 提取排名
+                    if ". " in title_part and title_part.split(". ")[0].isdigit():
+                        rank_str, title_part = title_part.split(". ", 1)
+                        rank = int(rank_str)
+
+                    # 提取热度
+                    heat = None
+                    if title_part.endswith("]") and " [HEAT:" in title_part:
+                        head, heat_part = title_part.rsplit(" [HEAT:", 1)
+                        if heat_part[:-1].isdigit():
+                            title_part = head
+                            heat = int(heat_part[:-1])
+
+                    # 提取 MOBILE URL
+                    mobile_url = ""
+                    if " [MOBILE:" in title_part:
+                        title_part, mobile_part = title_part.rsplit(" [MOBILE:", 1)
+                        if mobile_part.endswith("]"):
+                            mobile_url = mobile_part[:-1]
+
+                    # 提取 URL
+                    url = ""
+                    if " [URL:" in title_part:
+                        title_part, url_part = title_part.rsplit(" [URL:", 1)
+                        if url_part.endswith("]"):
+                            url = url_part[:-1]
+
+                    title = clean_title(title_part.strip())
+                    ranks = [rank] if rank is not None else [1]
+
+                    titles_by_id[source_id][title] = {
+                        "ranks": ranks,
+                        "url": url,
+                        "mobileUrl": mobile_url,
+                    }
+                    if heat is not None:
+                        titles_by_id[source_id][title]["heat"] = heat
+
+                except Exception as e:
+                    print(f"解析标题行出错: {line}, 错误: {e}")
+
+    return titles_by_id, id_to_name, unchanged_ids
+
+
+def read_all_today_titles(
+        current_platform_ids: Optional[List[str]] = None,
+) -> Tuple[Dict, Dict, Dict]:
+    """读取当天所有快照的汇总结果，支持按当前监控平台过滤"""
+    aggregate = read_daily_aggregate()["full"]
+    all_results = aggregate["all_results"]
+    title_info = aggregate["title_info"]
+    id_to_name = aggregate["id_to_name"]
+    if current_platform_ids is not None:
+        all_results = {
+            source_id: title_data
+            for source_id, title_data in all_results.items()
+            if source_id in current_platform_ids
+        }
+        title_info = {
+            source_id: info for source_id, info in title_info.items() if source_id in all_results
+        }
+        id_to_name = {
+            source_id: name for source_id, name in id_to_name.items() if source_id in all_results
+        }
+
+    # 调用方可能修改结果，返回副本以免影响缓存
+    return copy.deepcopy((all_results, id_to_name, title_info))
+
+
+# === 当日聚合 ===
+DAILY_AGGREGATE_FILE = "daily_aggregate.json"
+DAILY_AGGREGATE_FORMAT = 1
+
+_daily_aggregate_cache: Dict = {}
+_daily_aggregate_lock = threading.Lock()
+
+
+def _empty_daily_aggregate() -> Dict:
+    return {
+        "format": DAILY_AGGREGATE_FORMAT,
+        "snapshots": [],
+        "all_results": {},
+        "id_to_name": {},
+        "title_info": {},
+    }
+
+
+def merge_snapshots_into_aggregate(
+        aggregate: Dict,
+        date_folder: str,
+        after: Optional[str] = None,
+        until: Optional[str] = None,
+) -> None:
+    """把 (after, until] 范围内的快照依次合并进聚合结果"""
+    for time_info, titles_by_id, file_id_to_name, unchanged_ids in iter_snapshots(
+            date_folder, after=after, until=until
+    ):
+        aggregate["id_to_name"].update(file_id_to_name)
+        for source_id, title_data in titles_by_id.items():
+            process_source_data(
+                source_id,
+                title_data,
+                time_info,
+                aggregate["all_results"],
+                aggregate["title_info"],
+                unchanged=source_id in unchanged_ids,
+            )
+
+
+def load_base_aggregate(date_folder: str, versions: List[List[str]]) -> Dict:
+    """
+    读取并更新持久化的当日基础聚合（覆盖除最新快照以外的全部快照）
+
+    最新快照可能在本次运行中被重写（同一分钟覆盖、迟到来源合并），不计入持久化结果；
+    已记录的快照与当前快照一致时只合并新增的快照，文件缺失、损坏或快照有变化时全量重建
+    """
+    base_versions = versions[:-1]
+    aggregate_path = Path("output") / date_folder / DAILY_AGGREGATE_FILE
+    archived = is_day_archived(date_folder)
+    # 多个进程（如抓取与分析进程）同时更新时串行，后者直接复用前者合并的结果
+    with output_lock(f"aggregate-{date_folder}"):
+        aggregate = None
+        if aggregate_path.exists() or archived:
+            try:
+                aggregate = json.loads(read_output_text(aggregate_path))
+            except FileNotFoundError:
+                pass
+            except (OSError, ValueError) as e:
+                print(f"读取当日聚合失败，重新构建: {e}")
+
+        if aggregate is not None:
+            recorded = aggregate.get("snapshots", [])
+            if (
+                    aggregate.get("format") != DAILY_AGGREGATE_FORMAT
+                    or recorded != base_versions[: len(recorded)]
+            ):
+                print("当日快照已变化，重新构建当日聚合")
+                aggregate = None
+        if aggregate is None:
+            aggregate = _empty_daily_aggregate()
+
+        recorded = aggregate["snapshots"]
+        if len(recorded) < len(base_versions):
+            merge_snapshots_into_aggregate(
+                aggregate,
+                date_folder,
+                after=recorded[-1][0] if recorded else None,
+                until=base_versions[-1][0],
+            )
+            aggregate["snapshots"] = base_versions
+            # 已归档的日期只在内存中重建，不重新创建日期目录
+            if not archived:
+                atomic_write_json(aggregate_path, aggregate)
+        return aggregate
+
+
+def read_daily_aggregate(date_folder: Optional[str] = None) -> Dict:
+    """
+    返回当日聚合 {"snapshots", "base", "full"}：base 为持久化的基础聚合，full 在其基础上
+    合并最新快照；快照未变化时直接复用进程内缓存，同一次运行的多次读取只计算一次
+    """
+    date_folder = date_folder or format_date_folder()
+    versions = list_snapshot_versions(date_folder)
+    key = (
+        os.getcwd(),
+        CONFIG["STORAGE"]["BACKEND"],
+        CONFIG["STORAGE"]["SQLITE_PATH"],
+        date_folder,
+        json.dumps(versions),
+    )
+    with _daily_aggregate_lock:
+        if _daily_aggregate_cache.get("key") != key:
+            if versions:
+                base = load_base_aggregate(date_folder, versions)
+                full = copy.deepcopy(base)
+                merge_snapshots_into_aggregate(
+                    full,
+                    date_folder,
+                    after=versions[-2][0] if len(versions) > 1 else None,
+                    until=versions[-1][0],
+                )
+                full["snapshots"] = versions
+            else:
+                base = full = _empty_daily_aggregate()
+            _daily_aggregate_cache.clear()
+            _daily_aggregate_cache.update(key=key, snapshots=versions, base=base, full=full)
+        return dict(_daily_aggregate_cache)
+
+
+def process_source_data(
+        source_id: str,
+        title_data: Dict,
+        time_info: str,
+        all_results: Dict,
+        title_info: Dict,
+        unchanged: bool = False,
+) -> None:
+    """处理来源数据，合并重复标题；来源数据未变化时只更新出现时间和次数"""
+    if (
+            unchanged
+            and source_id in all_results
+            and all(title in title_info[source_id] for title in title_data)
+    ):
+        for title in title_data:
+            title_info[source_id][title]["last_time"] = time_info
+            title_info[source_id][title]["count"] += 1
+        return
+
+    if source_id not in all_results:
+        all_results[source_id] = title_data
+
+        if source_id not in title_info:
+            title_info[source_id] = {}
+
+        for title, data in title_data.items():
+            ranks = data.get("ranks", [])
+            url = data.get("url", "")
+            mobile_url = data.get("mobileUrl", "")
 
             title_info[source_id][title] = {
                 "first_time": time_info,
@@ -775,11 +2906,14 @@ def process_source_data(
                 "url": url,
                 "mobileUrl": mobile_url,
             }
+            if "heat" in data:
+                title_info[source_id][title]["heat"] = data["heat"]
     else:
         for title, data in title_data.items():
             ranks = data.get("ranks", [])
             url = data.get("url", "")
             mobile_url = data.get("mobileUrl", "")
+            heat = data.get("heat")
 
             if title not in all_results[source_id]:
                 all_results[source_id][title] = {
@@ -795,6 +2929,9 @@ def process_source_data(
                     "url": url,
                     "mobileUrl": mobile_url,
                 }
+                if heat is not None:
+                    all_results[source_id][title]["heat"] = heat
+                    title_info[source_id][title]["heat"] = heat
             else:
                 existing_data = all_results[source_id][title]
                 existing_ranks = existing_data.get("ranks", [])
@@ -820,21 +2957,34 @@ def process_source_data(
                 if not title_info[source_id][title].get("mobileUrl"):
                     title_info[source_id][title]["mobileUrl"] = mobile_url
 
+                # 热度取当日峰值
+                peak_heat = max(
+                    (h for h in (existing_data.get("heat"), heat) if h is not None),
+                    default=None,
+                )
+                if peak_heat is not None:
+                    all_results[source_id][title]["heat"] = peak_heat
+                    title_info[source_id][title]["heat"] = peak_heat
+
 
 def detect_latest_new_titles(current_platform_ids: Optional[List[str]] = None) -> Dict:
     """检测当日最新批次的新增标题，支持按当前监控平台过滤"""
     date_folder = format_date_folder()
-    txt_dir = Path("output") / date_folder / "txt"
-
-    if not txt_dir.exists():
-        return {}
+    store = get_title_store()
+    if store:
+        return store.latest_new_titles(date_folder, current_platform_ids)
+    if CONFIG["STORAGE"]["BACKEND"] == "binary":
+        return snapshot_codec.latest_new_titles(
+            Path("output") / date_folder, current_platform_ids, list_snapshot_times(date_folder)
+        )
 
-    files = sorted([f for f in txt_dir.iterdir() if f.suffix == ".txt"])
-    if len(files) < 2:
+    aggregate = read_daily_aggregate(date_folder)
+    snapshot_times = [time_name for time_name, _ in aggregate["snapshots"]]
+    if len(snapshot_times) < 2:
         return {}
 
     # 解析最新文件
-    latest_file = files[-1]
+    latest_file = Path("output") / date_folder / "txt" / f"{snapshot_times[-1]}.txt"
     latest_titles, _ = parse_file_titles(latest_file)
 
     # 如果指定了当前平台列表，过滤最新文件数据
@@ -845,29 +2995,13 @@ def detect_latest_new_titles(current_platform_ids: Optional[List[str]] = None) -
                 filtered_latest_titles[source_id] = title_data
         latest_titles = filtered_latest_titles
 
-    # 汇总历史标题（按平台过滤）
-    historical_titles = {}
-    for file_path in files[:-1]:
-        historical_data, _ = parse_file_titles(file_path)
-
-        # 过滤历史数据
-        if current_platform_ids is not None:
-            filtered_historical_data = {}
-            for source_id, title_data in historical_data.items():
-                if source_id in current_platform_ids:
-                    filtered_historical_data[source_id] = title_data
-            historical_data = filtered_historical_data
-
-        for source_id, titles_data in historical_data.items():
-            if source_id not in historical_titles:
-                historical_titles[source_id] = set()
-            for title in titles_data.keys():
-                historical_titles[source_id].add(title)
+    # 历史标题即基础聚合中出现过的标题
+    historical_titles = aggregate["base"]["title_info"]
 
     # 找出新增标题
     new_titles = {}
     for source_id, latest_source_titles in latest_titles.items():
-        historical_set = historical_titles.get(source_id, set())
+        historical_set = historical_titles.get(source_id, {})
         source_new_titles = {}
 
         for title, title_data in latest_source_titles.items():
@@ -875,12 +3009,169 @@ def detect_latest_new_titles(current_platform_ids: Optional[List[str]] = None) -
                 source_new_titles[title] = title_data
 
         if source_new_titles:
-            new_titles[source_id] = source_new_titles
+            new_titles[source_id] = source_new_titles
+
+    return new_titles
+
+
+def detect_new_titles_since(
+        first_time: str,
+        until: str,
+        current_platform_ids: Optional[List[str]] = None,
+        date_folder: Optional[str] = None,
+) -> Dict:
+    """
+    检测 first_time 至 until（均含）之间各快照中新增的标题，即此前快照中未出现过的标题；
+    分析进程跳过积压快照时使用，标题数据取最后一次出现时的数据
+    """
+    historical_titles = {}
+    new_titles = {}
+    for time_info, titles_by_id, _, _ in iter_snapshots(
+            date_folder, current_platform_ids, until=until
+    ):
+        for source_id, source_titles in titles_by_id.items():
+            if time_info < first_time:
+                historical_titles.setdefault(source_id, set()).update(source_titles)
+                continue
+            historical_set = historical_titles.get(source_id, set())
+            for title, title_data in source_titles.items():
+                if title not in historical_set:
+                    new_titles.setdefault(source_id, {})[title] = title_data
+    return new_titles
+
+
+# === 流式分析 ===
+def normalize_snapshot_titles(title_data: Dict) -> Dict:
+    """按快照的写入规则规范化标题数据（清理标题、只保留首个排名），与写入后再读回的结果一致"""
+    entries = []
+    for title, info in title_data.items():
+        ranks = info.get("ranks", [])
+        entries.append(
+            (
+                ranks[0] if ranks else 1,
+                clean_title(title),
+                info.get("url", ""),
+                info.get("mobileUrl", ""),
+                info.get("heat"),
+            )
+        )
+    entries.sort(key=lambda x: x[0])
+
+    normalized = {}
+    for rank, title, url, mobile_url, heat in entries:
+        normalized[title] = {"ranks": [rank], "url": url, "mobileUrl": mobile_url}
+        if heat is not None:
+            normalized[title]["heat"] = heat
+    return normalized
+
+
+class StreamingAnalysisStage:
+    """
+    边抓取边分析：当日历史快照在后台预先解析，每个来源的数据到达时立即
+    规范化、计算新增标题并完成词组匹配，抓取结束后报告阶段只需处理剩余工作
+    """
+
+    def __init__(
+            self,
+            platform_ids: List[str],
+            word_groups: Optional[List[Dict]] = None,
+            filter_words: Optional[List[str]] = None,
+    ):
+        if word_groups is None:
+            word_groups, filter_words = load_frequency_words()
+        self.platform_ids = list(platform_ids)
+        self.word_groups = word_groups
+        self.filter_words = filter_words or []
+        # 未配置词组时 count_word_frequency 会改用"全部新闻"虚拟词组，不使用缓存
+        self.match_cache: Optional[Dict[str, Optional[int]]] = {} if word_groups else None
+        self.source_new_titles: Dict[str, Dict] = {}
+        self.date_folder = format_date_folder()
+        self.history_files: List[str] = []
+        self.historical_titles: Dict[str, set] = {}
+        self.loader = threading.Thread(target=self._load_history, daemon=True)
+        self.loader.start()
+
+    def _list_snapshots(self) -> List[str]:
+        return list_snapshot_times(self.date_folder)
+
+    def _load_history(self) -> None:
+        """读取当日已有快照，收集各平台出现过的标题（与网络请求并行执行）"""
+        store = get_title_store()
+        if store:
+            snapshot_times = self._list_snapshots()
+            self.historical_titles = store.seen_titles(self.date_folder, self.platform_ids)
+        else:
+            aggregate = read_daily_aggregate(self.date_folder)
+            snapshot_times = [time_name for time_name, _ in aggregate["snapshots"]]
+            self.historical_titles = {
+                source_id: set(info)
+                for source_id, info in aggregate["full"]["title_info"].items()
+                if source_id in self.platform_ids
+            }
+        self.history_files = snapshot_times
+
+    def add_source(self, source_id: str, title_data: Dict) -> None:
+        """处理一个刚到达的来源，作为 crawl_websites 的 on_source 回调"""
+        self.loader.join()
+        normalized = normalize_snapshot_titles(title_data)
+
+        if self.match_cache is not None:
+            for title in list(title_data) + list(normalized):
+                if title not in self.match_cache:
+                    self.match_cache[title] = match_word_group(
+                        title, self.word_groups, self.filter_words
+                    )
+
+        if source_id not in self.platform_ids:
+            return
+        historical_set = self.historical_titles.get(source_id, set())
+        source_new_titles = {
+            title: info for title, info in normalized.items() if title not in historical_set
+        }
+        if source_new_titles:
+            self.source_new_titles[source_id] = source_new_titles
+        else:
+            self.source_new_titles.pop(source_id, None)
 
-    return new_titles
+    def new_titles(self) -> Dict:
+        """
+        返回本次运行的新增标题，结果与 detect_latest_new_titles 一致；
+        预加载之后快照目录出现了本次快照以外的变化（如同一分钟覆盖）时，退回重新解析
+        """
+        self.loader.join()
+        file_names = self._list_snapshots()
+        if file_names[:-1] != self.history_files or file_names[-1:] == self.history_files[-1:]:
+            print("快照目录已变化，重新检测新增标题")
+            return detect_latest_new_titles(self.platform_ids)
+        if len(file_names) < 2:
+            return {}
+        return dict(self.source_new_titles)
 
 
 # === 统计和分析 ===
+def calculate_source_peak_heats(results: Dict, title_info: Optional[Dict] = None) -> Dict[str, int]:
+    """统计各来源标题的最高热度，用于来源内归一化（不同平台的热度量级差异很大）"""
+    peak_heats = {}
+    for source_id, titles_data in results.items():
+        heats = [data["heat"] for data in titles_data.values() if data.get("heat") is not None]
+        if title_info and source_id in title_info:
+            heats.extend(
+                info["heat"]
+                for info in title_info[source_id].values()
+                if info.get("heat") is not None
+            )
+        if heats:
+            peak_heats[source_id] = max(heats)
+    return peak_heats
+
+
+def normalize_heat(heat: int, peak_heat: int) -> float:
+    """按对数刻度把热度换算为 0-100 的得分，来源内最高热度为 100"""
+    if peak_heat <= 0:
+        return 0.0
+    return math.log1p(max(heat, 0)) / math.log1p(peak_heat) * 100
+
+
 def calculate_news_weight(
         title_data: Dict, rank_threshold: int = CONFIG["RANK_THRESHOLD"]
 ) -> float:
@@ -908,10 +3199,16 @@ def calculate_news_weight(
     hotness_ratio = high_rank_count / len(ranks) if ranks else 0
     hotness_weight = hotness_ratio * 100
 
+    # 互动热度：来源内归一化的热度得分（0-100），来源不提供热度时按排名权重折算
+    heat_score = title_data.get("heat_score")
+    if heat_score is None:
+        heat_score = rank_weight * 10
+
     total_weight = (
             rank_weight * weight_config["RANK_WEIGHT"]
             + frequency_weight * weight_config["FREQUENCY_WEIGHT"]
             + hotness_weight * weight_config["HOTNESS_WEIGHT"]
+            + heat_score * weight_config["HEAT_WEIGHT"]
     )
 
     return total_weight
@@ -925,14 +3222,21 @@ def matches_word_groups(
     if not word_groups:
         return True
 
+    return match_word_group(title, word_groups, filter_words) is not None
+
+
+def match_word_group(
+        title: str, word_groups: List[Dict], filter_words: List[str]
+) -> Optional[int]:
+    """返回标题匹配的第一个词组下标，被过滤或未匹配时返回None"""
     title_lower = title.lower()
 
     # 过滤词检查
     if any(filter_word.lower() in title_lower for filter_word in filter_words):
-        return False
+        return None
 
     # 词组匹配检查
-    for group in word_groups:
+    for index, group in enumerate(word_groups):
         required_words = group["required"]
         normal_words = group["normal"]
 
@@ -952,9 +3256,9 @@ def matches_word_groups(
             if not any_normal_present:
                 continue
 
-        return True
+        return index
 
-    return False
+    return None
 
 
 def format_time_display(first_time: str, last_time: str) -> str:
@@ -1016,8 +3320,13 @@ def count_word_frequency(
         rank_threshold: int = CONFIG["RANK_THRESHOLD"],
         new_titles: Optional[Dict] = None,
         mode: str = "daily",
+        match_cache: Optional[Dict[str, Optional[int]]] = None,
 ) -> Tuple[List[Dict], int]:
-    """统计词频，支持必须词、频率词、过滤词，并标记新增标题"""
+    """
+    统计词频，支持必须词、频率词、过滤词，并标记新增标题
+
+    match_cache 为 {标题: 匹配的词组下标或None}，由流式分析阶段在抓取时预先计算
+    """
 
     # 如果没有配置词组，创建一个包含所有新闻的虚拟词组
     if not word_groups:
@@ -1096,6 +3405,8 @@ def count_word_frequency(
         group_key = group["group_key"]
         word_stats[group_key] = {"count": 0, "titles": {}}
 
+    peak_heats = calculate_source_peak_heats(results, title_info)
+
     for source_id, titles_data in results_to_process.items():
         total_titles += len(titles_data)
 
@@ -1106,12 +3417,13 @@ def count_word_frequency(
             if title in processed_titles.get(source_id, {}):
                 continue
 
-            # 使用统一的匹配逻辑
-            matches_frequency_words = matches_word_groups(
-                title, word_groups, filter_words
-            )
+            # 使用统一的匹配逻辑（流式阶段已匹配过的标题直接取缓存结果）
+            if match_cache is not None and title in match_cache:
+                group_index = match_cache[title]
+            else:
+                group_index = match_word_group(title, word_groups, filter_words)
 
-            if not matches_frequency_words:
+            if group_index is None:
                 continue
 
             # 如果是增量模式或 current 模式第一次，统计匹配的新增新闻数量
@@ -1123,116 +3435,90 @@ def count_word_frequency(
             source_ranks = title_data.get("ranks", [])
             source_url = title_data.get("url", "")
             source_mobile_url = title_data.get("mobileUrl", "")
+            heat = title_data.get("heat")
+
+            # 记入匹配的词组
+            group_key = word_groups[group_index]["group_key"]
+            word_stats[group_key]["count"] += 1
+            if source_id not in word_stats[group_key]["titles"]:
+                word_stats[group_key]["titles"][source_id] = []
+
+            first_time = ""
+            last_time = ""
+            count_info = 1
+            ranks = source_ranks if source_ranks else []
+            url = source_url
+            mobile_url = source_mobile_url
+
+            # 对于 current 模式，从历史统计信息中获取完整数据
+            if (
+                    mode == "current"
+                    and title_info
+                    and source_id in title_info
+                    and title in title_info[source_id]
+            ):
+                info = title_info[source_id][title]
+                first_time = info.get("first_time", "")
+                last_time = info.get("last_time", "")
+                count_info = info.get("count", 1)
+                if "ranks" in info and info["ranks"]:
+                    ranks = info["ranks"]
+                url = info.get("url", source_url)
+                mobile_url = info.get("mobileUrl", source_mobile_url)
+                heat = info.get("heat", heat)
+            elif (
+                    title_info
+                    and source_id in title_info
+                    and title in title_info[source_id]
+            ):
+                info = title_info[source_id][title]
+                first_time = info.get("first_time", "")
+                last_time = info.get("last_time", "")
+                count_info = info.get("count", 1)
+                if "ranks" in info and info["ranks"]:
+                    ranks = info["ranks"]
+                url = info.get("url", source_url)
+                mobile_url = info.get("mobileUrl", source_mobile_url)
+                heat = info.get("heat", heat)
+
+            if not ranks:
+                ranks = [99]
+
+            time_display = format_time_display(first_time, last_time)
+
+            source_name = id_to_name.get(source_id, source_id)
+
+            # 判断是否为新增
+            is_new = False
+            if all_news_are_new:
+                # 增量模式下所有处理的新闻都是新增，或者当天第一次的所有新闻都是新增
+                is_new = True
+            elif new_titles and source_id in new_titles:
+                # 检查是否在新增列表中
+                new_titles_for_source = new_titles[source_id]
+                is_new = title in new_titles_for_source
+
+            title_entry = {
+                "title": title,
+                "source_name": source_name,
+                "first_time": first_time,
+                "last_time": last_time,
+                "time_display": time_display,
+                "count": count_info,
+                "ranks": ranks,
+                "rank_threshold": rank_threshold,
+                "url": url,
+                "mobileUrl": mobile_url,
+                "is_new": is_new,
+            }
+            if heat is not None and source_id in peak_heats:
+                title_entry["heat"] = heat
+                title_entry["heat_score"] = normalize_heat(heat, peak_heats[source_id])
+            word_stats[group_key]["titles"][source_id].append(title_entry)
 
-            # 找到匹配的词组
-            title_lower = title.lower()
-            for group in word_groups:
-                required_words = group["required"]
-                normal_words = group["normal"]
-
-                # 如果是"全部新闻"模式，所有标题都匹配第一个（唯一的）词组
-                if len(word_groups) == 1 and word_groups[0]["group_key"] == "全部新闻":
-                    group_key = group["group_key"]
-                    word_stats[group_key]["count"] += 1
-                    if source_id not in word_stats[group_key]["titles"]:
-                        word_stats[group_key]["titles"][source_id] = []
-                else:
-                    # 原有的匹配逻辑
-                    if required_words:
-                        all_required_present = all(
-                            req_word.lower() in title_lower
-                            for req_word in required_words
-                        )
-                        if not all_required_present:
-                            continue
-
-                    if normal_words:
-                        any_normal_present = any(
-                            normal_word.lower() in title_lower
-                            for normal_word in normal_words
-                        )
-                        if not any_normal_present:
-                            continue
-
-                    group_key = group["group_key"]
-                    word_stats[group_key]["count"] += 1
-                    if source_id not in word_stats[group_key]["titles"]:
-                        word_stats[group_key]["titles"][source_id] = []
-
-                first_time = ""
-                last_time = ""
-                count_info = 1
-                ranks = source_ranks if source_ranks else []
-                url = source_url
-                mobile_url = source_mobile_url
-
-                # 对于 current 模式，从历史统计信息中获取完整数据
-                if (
-                        mode == "current"
-                        and title_info
-                        and source_id in title_info
-                        and title in title_info[source_id]
-                ):
-                    info = title_info[source_id][title]
-                    first_time = info.get("first_time", "")
-                    last_time = info.get("last_time", "")
-                    count_info = info.get("count", 1)
-                    if "ranks" in info and info["ranks"]:
-                        ranks = info["ranks"]
-                    url = info.get("url", source_url)
-                    mobile_url = info.get("mobileUrl", source_mobile_url)
-                elif (
-                        title_info
-                        and source_id in title_info
-                        and title in title_info[source_id]
-                ):
-                    info = title_info[source_id][title]
-                    first_time = info.get("first_time", "")
-                    last_time = info.get("last_time", "")
-                    count_info = info.get("count", 1)
-                    if "ranks" in info and info["ranks"]:
-                        ranks = info["ranks"]
-                    url = info.get("url", source_url)
-                    mobile_url = info.get("mobileUrl", source_mobile_url)
-
-                if not ranks:
-                    ranks = [99]
-
-                time_display = format_time_display(first_time, last_time)
-
-                source_name = id_to_name.get(source_id, source_id)
-
-                # 判断是否为新增
-                is_new = False
-                if all_news_are_new:
-                    # 增量模式下所有处理的新闻都是新增，或者当天第一次的所有新闻都是新增
-                    is_new = True
-                elif new_titles and source_id in new_titles:
-                    # 检查是否在新增列表中
-                    new_titles_for_source = new_titles[source_id]
-                    is_new = title in new_titles_for_source
-
-                word_stats[group_key]["titles"][source_id].append(
-                    {
-                        "title": title,
-                        "source_name": source_name,
-                        "first_time": first_time,
-                        "last_time": last_time,
-                        "time_display": time_display,
-                        "count": count_info,
-                        "ranks": ranks,
-                        "rank_threshold": rank_threshold,
-                        "url": url,
-                        "mobileUrl": mobile_url,
-                        "is_new": is_new,
-                    }
-                )
-
-                if source_id not in processed_titles:
-                    processed_titles[source_id] = {}
-                processed_titles[source_id][title] = True
-
-                break
+            if source_id not in processed_titles:
+                processed_titles[source_id] = {}
+            processed_titles[source_id][title] = True
 
     # 最后统一打印汇总信息
     if mode == "incremental":
@@ -1324,6 +3610,8 @@ def prepare_report_data(
         new_titles: Optional[Dict] = None,
         id_to_name: Optional[Dict] = None,
         mode: str = "daily",
+        timed_out_ids: Optional[List] = None,
+        circuit_open_ids: Optional[List] = None,
 ) -> Dict:
     """准备报告数据"""
     processed_new_titles = []
@@ -1409,6 +3697,8 @@ def prepare_report_data(
         "stats": processed_stats,
         "new_titles": processed_new_titles,
         "failed_ids": failed_ids or [],
+        "timed_out_ids": timed_out_ids or [],
+        "circuit_open_ids": circuit_open_ids or [],
         "total_new_count": sum(
             len(source["titles"]) for source in processed_new_titles
         ),
@@ -1558,6 +3848,8 @@ def generate_html_report(
         id_to_name: Optional[Dict] = None,
         mode: str = "daily",
         is_daily_summary: bool = False,
+        timed_out_ids: Optional[List] = None,
+        circuit_open_ids: Optional[List] = None,
 ) -> str:
     """生成HTML报告"""
     if is_daily_summary:
@@ -1572,7 +3864,9 @@ def generate_html_report(
 
     file_path = get_output_path("html", filename)
 
-    report_data = prepare_report_data(stats, failed_ids, new_titles, id_to_name, mode)
+    report_data = prepare_report_data(
+        stats, failed_ids, new_titles, id_to_name, mode, timed_out_ids, circuit_open_ids
+    )
 
     # 生成AI口播稿（如果启用）
     ai_script = None
@@ -1647,10 +3941,8 @@ def generate_html_report(
             
             if ai_script:
                 # 保存口播稿到文件
-                script_dir = Path(file_path).parent / "script"
-                script_dir.mkdir(parents=True, exist_ok=True)
-                script_file = script_dir / "口播稿.txt"
-                script_file.write_text(ai_script, encoding="utf-8")
+                script_file = Path(file_path).parent / "script" / "口播稿.txt"
+                atomic_write_text(script_file, ai_script)
                 print(f"✅ AI口播稿已生成: {script_file}")
                 
                 # 生成TTS音频（如果启用）
@@ -1676,13 +3968,10 @@ def generate_html_report(
         report_data, total_titles, is_daily_summary, mode, ai_script
     )
 
-    with open(file_path, "w", encoding="utf-8") as f:
-        f.write(html_content)
+    atomic_write_text(file_path, html_content)
 
     if is_daily_summary:
-        root_file_path = Path("index.html")
-        with open(root_file_path, "w", encoding="utf-8") as f:
-            f.write(html_content)
+        atomic_write_text(Path("index.html"), html_content)
 
     return file_path
 
@@ -2030,6 +4319,19 @@ def render_html_content(
                 font-family: 'SF Mono', Consolas, monospace;
             }
 
+            .timeout-section {
+                background: #fffbeb;
+                border-color: #fde68a;
+            }
+
+            .timeout-section .error-title {
+                color: #d97706;
+            }
+
+            .timeout-section .error-item {
+                color: #92400e;
+            }
+
             @media (max-width: 480px) {
                 body { padding: 12px; }
                 .header { padding: 24px 20px; }
@@ -2229,6 +4531,30 @@ def render_html_content(
                     </ul>
                 </div>"""
 
+    # 超过抓取截止时间的平台（与请求失败分开显示）
+    if report_data["timed_out_ids"]:
+        html += """
+                <div class="error-section timeout-section">
+                    <div class="error-title">⏱️ 超时未返回的平台（数据将稍后补录）</div>
+                    <ul class="error-list">"""
+        for id_value in report_data["timed_out_ids"]:
+            html += f'<li class="error-item">{html_escape(id_value)}</li>'
+        html += """
+                    </ul>
+                </div>"""
+
+    # 连续失败后熔断、本次未请求的平台
+    if report_data["circuit_open_ids"]:
+        html += """
+                <div class="error-section timeout-section">
+                    <div class="error-title">⛔ 熔断中暂停请求的平台（冷却结束后自动恢复）</div>
+                    <ul class="error-list">"""
+        for id_value in report_data["circuit_open_ids"]:
+            html += f'<li class="error-item">{html_escape(id_value)}</li>'
+        html += """
+                    </ul>
+                </div>"""
+
     # 处理主要统计数据
     if report_data["stats"]:
         total_count = len(report_data["stats"])
@@ -2509,6 +4835,26 @@ def render_feishu_content(
         for i, id_value in enumerate(report_data["failed_ids"], 1):
             stats_content += f"  • {id_value}\n"
 
+    if report_data["timed_out_ids"]:
+        if stats_content and ("暂无匹配" not in stats_content or report_data["failed_ids"]):
+            stats_content += f"\n{CONFIG['FEISHU_MESSAGE_SEPARATOR']}\n\n"
+
+        stats_content += "⏱️ **超时未返回的平台：**\n\n"
+        for id_value in report_data["timed_out_ids"]:
+            stats_content += f"  • {id_value}\n"
+
+    if report_data["circuit_open_ids"]:
+        if stats_content and (
+                "暂无匹配" not in stats_content
+                or report_data["failed_ids"]
+                or report_data["timed_out_ids"]
+        ):
+            stats_content += f"\n{CONFIG['FEISHU_MESSAGE_SEPARATOR']}\n\n"
+
+        stats_content += "⛔ **熔断中暂停请求的平台：**\n\n"
+        for id_value in report_data["circuit_open_ids"]:
+            stats_content += f"  • {id_value}\n"
+
     # 拼接：播报在前，统计在后
     if text_content and stats_content:
         text_content += f"\n\n{CONFIG['FEISHU_MESSAGE_SEPARATOR']}\n\n"
@@ -2605,6 +4951,26 @@ def render_dingtalk_content(
         for i, id_value in enumerate(report_data["failed_ids"], 1):
             text_content += f"  • **{id_value}**\n"
 
+    if report_data["timed_out_ids"]:
+        if text_content and ("暂无匹配" not in text_content or report_data["failed_ids"]):
+            text_content += f"\n---\n\n"
+
+        text_content += "⏱️ **超时未返回的平台：**\n\n"
+        for id_value in report_data["timed_out_ids"]:
+            text_content += f"  • **{id_value}**\n"
+
+    if report_data["circuit_open_ids"]:
+        if text_content and (
+                "暂无匹配" not in text_content
+                or report_data["failed_ids"]
+                or report_data["timed_out_ids"]
+        ):
+            text_content += f"\n---\n\n"
+
+        text_content += "⛔ **熔断中暂停请求的平台：**\n\n"
+        for id_value in report_data["circuit_open_ids"]:
+            text_content += f"  • **{id_value}**\n"
+
     text_content += f"\n\n> 更新时间：{now.strftime('%Y-%m-%d %H:%M:%S')}"
 
     if update_info:
@@ -2658,6 +5024,8 @@ def split_content_into_batches(
             not report_data["stats"]
             and not report_data["new_titles"]
             and not report_data["failed_ids"]
+            and not report_data["timed_out_ids"]
+            and not report_data["circuit_open_ids"]
     ):
         if mode == "incremental":
             mode_text = "增量模式下暂无新增匹配的热点词汇"
@@ -2902,12 +5270,29 @@ def split_content_into_batches(
 
             current_batch += "\n"
 
-    if report_data["failed_ids"]:
-        failed_header = ""
-        if format_type == "wework":
-            failed_header = f"\n\n\n\n⚠️ **数据获取失败的平台：**\n\n"
-        elif format_type == "telegram":
-            failed_header = f"\n\n⚠️ 数据获取失败的平台：\n\n"
+    # 请求失败、超时未返回与熔断中的平台分别列出
+    if format_type == "wework":
+        platform_sections = [
+            (report_data["failed_ids"], f"\n\n\n\n⚠️ **数据获取失败的平台：**\n\n"),
+            (report_data["timed_out_ids"], f"\n\n\n\n⏱️ **超时未返回的平台：**\n\n"),
+            (report_data["circuit_open_ids"], f"\n\n\n\n⛔ **熔断中暂停请求的平台：**\n\n"),
+        ]
+    elif format_type == "telegram":
+        platform_sections = [
+            (report_data["failed_ids"], f"\n\n⚠️ 数据获取失败的平台：\n\n"),
+            (report_data["timed_out_ids"], f"\n\n⏱️ 超时未返回的平台：\n\n"),
+            (report_data["circuit_open_ids"], f"\n\n⛔ 熔断中暂停请求的平台：\n\n"),
+        ]
+    else:
+        platform_sections = [
+            (report_data["failed_ids"], ""),
+            (report_data["timed_out_ids"], ""),
+            (report_data["circuit_open_ids"], ""),
+        ]
+
+    for section_ids, failed_header in platform_sections:
+        if not section_ids:
+            continue
 
         test_content = current_batch + failed_header
         if (
@@ -2922,7 +5307,7 @@ def split_content_into_batches(
             current_batch = test_content
             current_batch_has_content = True
 
-        for i, id_value in enumerate(report_data["failed_ids"], 1):
+        for i, id_value in enumerate(section_ids, 1):
             failed_line = f"  • {id_value}\n"
             test_content = current_batch + failed_line
             if (
@@ -2953,6 +5338,8 @@ def send_to_webhooks(
         update_info: Optional[Dict] = None,
         proxy_url: Optional[str] = None,
         mode: str = "daily",
+        timed_out_ids: Optional[List] = None,
+        circuit_open_ids: Optional[List] = None,
 ) -> Dict[str, bool]:
     """发送数据到多个webhook平台"""
     results = {}
@@ -2975,7 +5362,9 @@ def send_to_webhooks(
             else:
                 print(f"静默模式：今天首次推送")
 
-    report_data = prepare_report_data(stats, failed_ids, new_titles, id_to_name, mode)
+    report_data = prepare_report_data(
+        stats, failed_ids, new_titles, id_to_name, mode, timed_out_ids, circuit_open_ids
+    )
 
     feishu_url = CONFIG["FEISHU_WEBHOOK_URL"]
     dingtalk_url = CONFIG["DINGTALK_WEBHOOK_URL"]
@@ -3080,7 +5469,7 @@ def send_to_feishu(
         proxies = {"http": proxy_url, "https": proxy_url}
 
     try:
-        response = requests.post(
+        response = get_session().post(
             webhook_url, headers=headers, json=payload, proxies=proxies, timeout=30
         )
         if response.status_code == 200:
@@ -3120,7 +5509,7 @@ def send_to_dingtalk(
         proxies = {"http": proxy_url, "https": proxy_url}
 
     try:
-        response = requests.post(
+        response = get_session().post(
             webhook_url, headers=headers, json=payload, proxies=proxies, timeout=30
         )
         if response.status_code == 200:
@@ -3173,7 +5562,7 @@ def send_to_wework(
         payload = {"msgtype": "markdown", "markdown": {"content": batch_content}}
 
         try:
-            response = requests.post(
+            response = get_session().post(
                 webhook_url, headers=headers, json=payload, proxies=proxies, timeout=30
             )
             if response.status_code == 200:
@@ -3245,7 +5634,7 @@ def send_to_telegram(
         }
 
         try:
-            response = requests.post(
+            response = get_session().post(
                 url, headers=headers, json=payload, proxies=proxies, timeout=30
             )
             if response.status_code == 200:
@@ -3273,10 +5662,25 @@ def send_to_telegram(
     return True
 
 
+# === 分片抓取 ===
+def shard_run_id(window: float = CONFIG["SHARDING"]["RUN_WINDOW"]) -> str:
+    """按时间窗口生成轮次ID，同一 cron 周期内启动的 worker 与协调进程得到相同的ID"""
+    start = int(time.time() // window * window)
+    return datetime.fromtimestamp(start, pytz.timezone("Asia/Shanghai")).strftime("%Y%m%d-%H%M%S")
+
+
+def shard_worker_id() -> str:
+    """worker 标识：主机名-进程号"""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
 # === 主分析器 ===
 class NewsAnalyzer:
     """新闻分析器"""
 
+    # 分片模式下协调进程轮询 worker 结果的间隔（秒）
+    SHARD_POLL_INTERVAL = 2
+
     # 模式策略定义
     MODE_STRATEGIES = {
         "incremental": {
@@ -3316,8 +5720,45 @@ class NewsAnalyzer:
         self.is_docker_container = self._detect_docker_environment()
         self.update_info = None
         self.proxy_url = None
+        self.snapshot_file: Optional[str] = None
+        self.proxy_pool: Optional[ProxyPool] = None
+        # 分片模式：设置后 _crawl_data 不直接抓取，而是合并各 worker 写回的结果
+        self.coordinator: Optional[CrawlCoordinator] = None
+        self.run_id: Optional[str] = None
         self._setup_proxy()
-        self.data_fetcher = DataFetcher(self.proxy_url)
+        configure_session(
+            self.proxy_url,
+            CONFIG["HTTP_POOL"]["POOL_MAXSIZE"],
+            CONFIG["HTTP_POOL"]["HOST_POOL_SIZES"],
+        )
+        fetch_mode = CONFIG["FETCH_MODE"]
+        recording_store = RecordingStore(Path(CONFIG["RECORDINGS_DIR"]))
+        if fetch_mode in ("record", "replay"):
+            print(f"抓取模式: {fetch_mode}（录制目录: {recording_store.root}）")
+        # 抓取状态（响应哈希、熔断记录、镜像延迟、轮询调度）的目录；回放模式使用本次运行独立的
+        # 临时目录，既不受线上运行留下的状态影响，也不改写它，回放结果只取决于录制数据
+        if fetch_mode == "replay":
+            self.crawl_state_dir = Path(tempfile.mkdtemp(prefix="crawl_state_replay_"))
+            atexit.register(shutil.rmtree, self.crawl_state_dir, True)
+        else:
+            self.crawl_state_dir = Path("output") / ".crawl_state"
+        self.data_fetcher = DataFetcher(
+            self.proxy_url,
+            payload_store=(
+                PayloadHashStore(self.crawl_state_dir / "payload_hashes.json")
+                if CONFIG["SKIP_UNCHANGED"]
+                else None
+            ),
+            health_tracker=SourceHealthTracker(state_file=self.crawl_state_dir / "source_health.json"),
+            mirror_selector=MirrorSelector(
+                CONFIG["UPSTREAMS"],
+                self.crawl_state_dir / "mirror_latency.json",
+            ),
+            recorder=recording_store if fetch_mode == "record" else None,
+            replay_store=recording_store if fetch_mode == "replay" else None,
+            proxy_pool=self.proxy_pool,
+            adapters=build_source_adapters(CONFIG["PLATFORMS"]),
+        )
 
         if self.is_github_actions:
             self._check_version_update()
@@ -3343,7 +5784,16 @@ class NewsAnalyzer:
         """设置代理配置"""
         if not self.is_github_actions and CONFIG["USE_PROXY"]:
             self.proxy_url = CONFIG["DEFAULT_PROXY"]
-            print("本地环境，使用代理")
+            pool_config = CONFIG["PROXY_POOL"]
+            if pool_config["PROXIES"]:
+                self.proxy_pool = ProxyPool(
+                    pool_config["PROXIES"],
+                    pool_config["EJECT_AFTER"],
+                    pool_config["READMIT_AFTER"],
+                )
+                print(f"本地环境，抓取使用代理池（{len(pool_config['PROXIES'])} 个代理）")
+            else:
+                print("本地环境，使用代理")
         elif not self.is_github_actions and not CONFIG["USE_PROXY"]:
             print("本地环境，未启用代理")
         else:
@@ -3453,6 +5903,8 @@ class NewsAnalyzer:
                     "url": url,
                     "mobileUrl": mobile_url,
                 }
+                if "heat" in title_data:
+                    title_info[source_id][title]["heat"] = title_data["heat"]
         return title_info
 
     def _run_analysis_pipeline(
@@ -3466,6 +5918,9 @@ class NewsAnalyzer:
             id_to_name: Dict,
             failed_ids: Optional[List] = None,
             is_daily_summary: bool = False,
+            match_cache: Optional[Dict[str, Optional[int]]] = None,
+            timed_out_ids: Optional[List] = None,
+            circuit_open_ids: Optional[List] = None,
     ) -> Tuple[List[Dict], str]:
         """统一的分析流水线：数据处理 → 统计计算 → HTML生成"""
 
@@ -3479,6 +5934,7 @@ class NewsAnalyzer:
             self.rank_threshold,
             new_titles,
             mode=mode,
+            match_cache=match_cache,
         )
 
         # HTML生成
@@ -3490,6 +5946,8 @@ class NewsAnalyzer:
             id_to_name=id_to_name,
             mode=mode,
             is_daily_summary=is_daily_summary,
+            timed_out_ids=timed_out_ids,
+            circuit_open_ids=circuit_open_ids,
         )
 
         return stats, html_file
@@ -3502,6 +5960,8 @@ class NewsAnalyzer:
             failed_ids: Optional[List] = None,
             new_titles: Optional[Dict] = None,
             id_to_name: Optional[Dict] = None,
+            timed_out_ids: Optional[List] = None,
+            circuit_open_ids: Optional[List] = None,
     ) -> bool:
         """统一的通知发送逻辑，包含所有判断条件"""
         has_webhook = self._has_webhook_configured()
@@ -3520,6 +5980,8 @@ class NewsAnalyzer:
                 self.update_info,
                 self.proxy_url,
                 mode=mode,
+                timed_out_ids=timed_out_ids,
+                circuit_open_ids=circuit_open_ids,
             )
             return True
         elif CONFIG["ENABLE_NOTIFICATION"] and not has_webhook:
@@ -3634,40 +6096,164 @@ class NewsAnalyzer:
         print(f"报告模式: {self.report_mode}")
         print(f"运行模式: {mode_strategy['description']}")
 
-    def _crawl_data(self) -> Tuple[Dict, Dict, List]:
-        """执行数据爬取"""
+    def _crawl_data(
+            self,
+            platforms: Optional[List[Dict]] = None,
+            on_source: Optional[Callable[[str, Dict], None]] = None,
+            save_snapshot: bool = True,
+    ) -> Tuple[Dict, Dict, List]:
+        """
+        执行数据爬取，默认爬取全部配置的平台；on_source 在每个来源到达时调用，
+        save_snapshot 为假时不保存快照（由调用方合并后保存）
+        """
+        if platforms is None:
+            platforms = CONFIG["PLATFORMS"]
+
         ids = []
-        for platform in CONFIG["PLATFORMS"]:
+        for platform in platforms:
             if "name" in platform:
                 ids.append((platform["id"], platform["name"]))
             else:
                 ids.append(platform["id"])
 
-        print(
-            f"配置的监控平台: {[p.get('name', p['id']) for p in CONFIG['PLATFORMS']]}"
-        )
-        print(f"开始爬取数据，请求间隔 {self.request_interval} 毫秒")
+        print(f"配置的监控平台: {[p.get('name', p['id']) for p in platforms]}")
         ensure_directory_exists("output")
+        if self.coordinator:
+            return self._collect_shard_results(ids, on_source)
+
+        print(f"开始爬取数据，最大并发数 {self.data_fetcher.max_concurrency}")
 
         results, id_to_name, failed_ids = self.data_fetcher.crawl_websites(
-            ids, self.request_interval
+            ids, self.request_interval, on_source=on_source
+        )
+        if not save_snapshot:
+            return results, id_to_name, failed_ids
+
+        self.snapshot_file = save_titles_to_file(
+            results,
+            id_to_name,
+            failed_ids + self.data_fetcher.timed_out_ids,
+            self.data_fetcher.unchanged_ids,
         )
+        print(f"标题已保存到: {self.snapshot_file}")
+
+        return results, id_to_name, failed_ids
 
-        title_file = save_titles_to_file(results, id_to_name, failed_ids)
-        print(f"标题已保存到: {title_file}")
+    def _collect_shard_results(
+            self,
+            ids: List[Union[str, Tuple[str, str]]],
+            on_source: Optional[Callable[[str, Dict], None]] = None,
+    ) -> Tuple[Dict, Dict, List]:
+        """分片模式：等待各 worker 写回本轮结果（最长 merge_timeout 秒），合并后保存快照"""
+        platforms = [id_info if isinstance(id_info, tuple) else (id_info, id_info) for id_info in ids]
+        self.coordinator.start_run(self.run_id, platforms)
+        print(f"分片抓取轮次 {self.run_id}：等待 worker 写回 {len(platforms)} 个平台的结果")
+
+        deadline = time.monotonic() + CONFIG["SHARDING"]["MERGE_TIMEOUT"]
+        notified = set()
+        while True:
+            if on_source:
+                for source_id, (_, title_data) in self.coordinator.results(self.run_id).items():
+                    if source_id not in notified and title_data is not None:
+                        notified.add(source_id)
+                        on_source(source_id, title_data)
+            done, leased, total = self.coordinator.progress(self.run_id)
+            if done >= total:
+                break
+            if time.monotonic() >= deadline:
+                print(f"等待 worker 超时：已完成 {done}/{total}")
+                break
+            print(f"已完成 {done}/{total}，抓取中 {leased}")
+            time.sleep(self.SHARD_POLL_INTERVAL)
 
+        results, id_to_name, failed_ids, unchanged_ids, missing_ids = self.coordinator.merge(
+            self.run_id
+        )
+        self.data_fetcher.timed_out_ids = missing_ids
+        # 之后生成 API 数据时直接复用合并结果，不再重复抓取
+        self.data_fetcher.restore_run_snapshot(results, id_to_name, failed_ids, unchanged_ids)
+        self.snapshot_file = save_titles_to_file(
+            results, id_to_name, failed_ids + missing_ids, unchanged_ids
+        )
+        print(f"合并结果已保存到: {self.snapshot_file}")
+        print(f"成功: {list(results.keys())}, 失败: {failed_ids}, 未返回: {missing_ids}")
+        self.coordinator.purge(time.time() - 86400)
         return results, id_to_name, failed_ids
 
+    def _collect_late_shards(self) -> Dict[str, Dict]:
+        """分片模式：读取报告生成期间才写回的超时平台结果"""
+        finished = self.coordinator.results(self.run_id)
+        arrived = {}
+        for source_id in list(self.data_fetcher.timed_out_ids):
+            title_data = finished.get(source_id, (None, None))[1]
+            if title_data is not None:
+                arrived[source_id] = title_data
+                self.data_fetcher.timed_out_ids.remove(source_id)
+        return arrived
+
+    def _merge_stragglers(self, results: Dict, id_to_name: Dict, failed_ids: List) -> Dict:
+        """等待超时平台的迟到响应，到达后重写本次快照，返回补录的来源 {id: title_data}"""
+        if self.coordinator:
+            arrived = self._collect_late_shards()
+        else:
+            arrived = self.data_fetcher.collect_stragglers()
+        if not arrived:
+            print(f"超时平台未能补录: {self.data_fetcher.timed_out_ids}")
+            return arrived
+
+        merged_results = {**results, **arrived}
+        save_titles_to_file(
+            merged_results,
+            id_to_name,
+            failed_ids + self.data_fetcher.timed_out_ids,
+            self.data_fetcher.unchanged_ids,
+            file_path=self.snapshot_file,
+        )
+        print(f"迟到的来源已补录到快照: {self.snapshot_file}")
+        return arrived
+
     def _execute_mode_strategy(
-            self, mode_strategy: Dict, results: Dict, id_to_name: Dict, failed_ids: List
+            self,
+            mode_strategy: Dict,
+            results: Dict,
+            id_to_name: Dict,
+            failed_ids: List,
+            save_snapshot: bool = True,
+            stage: Optional[StreamingAnalysisStage] = None,
+            timed_out_ids: Optional[List] = None,
+            snapshot_time: Optional[str] = None,
+            new_titles: Optional[Dict] = None,
+            circuit_open_ids: Optional[List] = None,
     ) -> Optional[str]:
-        """执行模式特定逻辑"""
+        """
+        执行模式特定逻辑；传入 stage 时直接使用抓取期间已完成的新增检测和词组匹配，
+        timed_out_ids 为超过抓取截止时间的平台、circuit_open_ids 为熔断中未请求的平台，
+        在报告中与失败平台分开显示；
+        snapshot_time 为不保存快照时标题的出现时间（默认当前时间）；
+        new_titles 为调用方已检测的新增标题（默认检测最新快照的新增）
+        """
         # 获取当前监控平台ID列表
         current_platform_ids = [platform["id"] for platform in CONFIG["PLATFORMS"]]
 
-        new_titles = detect_latest_new_titles(current_platform_ids)
-        time_info = Path(save_titles_to_file(results, id_to_name, failed_ids)).stem
-        word_groups, filter_words = load_frequency_words()
+        if stage:
+            new_titles = stage.new_titles()
+            word_groups, filter_words = stage.word_groups, stage.filter_words
+            match_cache = stage.match_cache
+        else:
+            if new_titles is None:
+                new_titles = detect_latest_new_titles(current_platform_ids)
+            word_groups, filter_words = load_frequency_words()
+            match_cache = None
+        if save_snapshot:
+            self.snapshot_file = save_titles_to_file(
+                results,
+                id_to_name,
+                failed_ids + (timed_out_ids or []),
+                self.data_fetcher.unchanged_ids,
+            )
+            time_info = Path(self.snapshot_file).stem
+        else:
+            time_info = snapshot_time or format_time_filename()
 
         # current模式下，实时推送需要使用完整的历史数据来保证统计信息的完整性
         if self.report_mode == "current":
@@ -3696,6 +6282,9 @@ class NewsAnalyzer:
                     filter_words,
                     historical_id_to_name,
                     failed_ids=failed_ids,
+                    match_cache=match_cache,
+                    timed_out_ids=timed_out_ids,
+                    circuit_open_ids=circuit_open_ids,
                 )
 
                 combined_id_to_name = {**historical_id_to_name, **id_to_name}
@@ -3712,6 +6301,8 @@ class NewsAnalyzer:
                         failed_ids=failed_ids,
                         new_titles=historical_new_titles,
                         id_to_name=combined_id_to_name,
+                        timed_out_ids=timed_out_ids,
+                        circuit_open_ids=circuit_open_ids,
                     )
             else:
                 print("❌ 严重错误：无法读取刚保存的数据文件")
@@ -3727,6 +6318,9 @@ class NewsAnalyzer:
                 filter_words,
                 id_to_name,
                 failed_ids=failed_ids,
+                match_cache=match_cache,
+                timed_out_ids=timed_out_ids,
+                circuit_open_ids=circuit_open_ids,
             )
             print(f"HTML报告已生成: {html_file}")
 
@@ -3740,6 +6334,8 @@ class NewsAnalyzer:
                     failed_ids=failed_ids,
                     new_titles=new_titles,
                     id_to_name=id_to_name,
+                    timed_out_ids=timed_out_ids,
+                    circuit_open_ids=circuit_open_ids,
                 )
 
         # 生成汇总报告（如果需要）
@@ -3780,16 +6376,32 @@ class NewsAnalyzer:
 
             mode_strategy = self._get_mode_strategy()
 
+            # 抓取期间每个来源到达即完成新增检测和词组匹配
+            stage = StreamingAnalysisStage(
+                [platform["id"] for platform in CONFIG["PLATFORMS"]]
+            )
             crawl_start = time.time()
-            results, id_to_name, failed_ids = self._crawl_data()
+            results, id_to_name, failed_ids = self._crawl_data(on_source=stage.add_source)
             crawl_time = time.time() - crawl_start
+            timed_out_ids = list(self.data_fetcher.timed_out_ids)
 
             summary_html_path = self._execute_mode_strategy(
-                mode_strategy, results, id_to_name, failed_ids
+                mode_strategy,
+                results,
+                id_to_name,
+                failed_ids,
+                stage=stage,
+                timed_out_ids=timed_out_ids,
+                circuit_open_ids=list(self.data_fetcher.circuit_open_ids),
             )
 
+            # 报告发出后再补录截止时间后才到达的来源
+            if timed_out_ids:
+                self._merge_stragglers(results, id_to_name, failed_ids)
+
             # 运行结束后，生成静态API文件和关联的图片
             generate_static_api_files(self)
+            compact_output()
 
             # 输出性能统计
             total_time = time.time() - start_time
@@ -3798,12 +6410,328 @@ class NewsAnalyzer:
             print(f"   • 总耗时: {total_time:.2f} 秒")
             print(f"   • 爬取耗时: {crawl_time:.2f} 秒 ({crawl_time/total_time*100:.1f}%)")
             print(f"   • 处理耗时: {total_time - crawl_time:.2f} 秒 ({(total_time - crawl_time)/total_time*100:.1f}%)")
+            print(format_connection_stats())
+            if self.proxy_pool:
+                print(self.proxy_pool.summary())
             print(f"{'='*50}\n")
 
         except Exception as e:
             print(f"分析流程执行出错: {e}")
             raise
 
+    def run_crawl_only(self, queue: SnapshotQueue) -> None:
+        """只抓取并保存快照，然后向快照队列发布消息，分析、渲染和推送由 --consume 进程完成"""
+        self._initialize_and_check_config()
+        if not CONFIG["ENABLE_CRAWLER"]:
+            return
+
+        crawl_start = time.time()
+        results, id_to_name, failed_ids = self._crawl_data()
+        if self.data_fetcher.timed_out_ids:
+            results = {**results, **self._merge_stragglers(results, id_to_name, failed_ids)}
+
+        queue.publish(
+            {
+                "snapshot_file": self.snapshot_file,
+                "results": results,
+                "id_to_name": id_to_name,
+                "failed_ids": failed_ids,
+                "timed_out_ids": list(self.data_fetcher.timed_out_ids),
+                "circuit_open_ids": list(self.data_fetcher.circuit_open_ids),
+                "unchanged_ids": list(self.data_fetcher.unchanged_ids),
+                "crawl_time": round(time.time() - crawl_start, 3),
+            }
+        )
+        print(f"快照已发布: {self.snapshot_file}")
+        print(queue.format_metrics())
+
+    def _analyze_snapshot_message(self, mode_strategy: Dict, message: Dict) -> None:
+        """分析一条快照消息：与单进程模式相同的报告、推送和静态API文件生成，不再发起抓取"""
+        results = message["results"]
+        id_to_name = message["id_to_name"]
+        failed_ids = message["failed_ids"]
+        timed_out_ids = message["timed_out_ids"]
+        circuit_open_ids = message.get("circuit_open_ids", [])
+
+        self.snapshot_file = message["snapshot_file"]
+        self.data_fetcher.reset_run_cache()
+        self.data_fetcher.unchanged_ids = message["unchanged_ids"]
+        # 生成 API 数据时复用消息中的结果，超时和熔断中的来源同样不再请求，也不计入失败
+        self.data_fetcher.restore_run_snapshot(
+            results, id_to_name, failed_ids + timed_out_ids + circuit_open_ids, message["unchanged_ids"]
+        )
+        self.data_fetcher.timed_out_ids = list(timed_out_ids)
+        self.data_fetcher.circuit_open_ids = list(circuit_open_ids)
+        print(f"分析快照: {self.snapshot_file}（抓取耗时 {message.get('crawl_time', 0)} 秒）")
+
+        # 跳过了积压的快照时，新增标题按跳过的第一份快照以来的全部快照计算，避免漏推
+        snapshot_path = Path(self.snapshot_file)
+        date_folder = snapshot_path.parent.parent.name
+        superseded_times = [
+            Path(path).stem
+            for path in message.get("superseded_snapshots", [])
+            if Path(path).parent.parent.name == date_folder
+        ]
+        new_titles = None
+        if superseded_times:
+            print(f"补齐跳过的 {len(superseded_times)} 份快照中的新增标题")
+            new_titles = detect_new_titles_since(
+                min(superseded_times),
+                snapshot_path.stem,
+                [platform["id"] for platform in CONFIG["PLATFORMS"]],
+                date_folder,
+            )
+
+        self._execute_mode_strategy(
+            mode_strategy,
+            results,
+            id_to_name,
+            failed_ids,
+            save_snapshot=False,
+            timed_out_ids=timed_out_ids,
+            snapshot_time=snapshot_path.stem,
+            new_titles=new_titles,
+            circuit_open_ids=circuit_open_ids,
+        )
+        generate_static_api_files(self)
+        compact_output()
+
+    def run_consumer(self, queue: SnapshotQueue, once: bool = False) -> None:
+        """
+        分析进程：持续消费快照队列，每次处理最新的快照；分析期间积压的旧快照被跳过，
+        其中的新增标题并入最新快照一起推送；分析失败的消息放回队列重试
+
+        once 为真时处理完当前积压后退出
+        """
+        self._initialize_and_check_config()
+        mode_strategy = self._get_mode_strategy()
+        recovered = queue.recover()
+        if recovered:
+            print(f"恢复 {recovered} 条未确认的快照消息")
+        poll_interval = CONFIG["SNAPSHOT_QUEUE"]["POLL_INTERVAL"]
+
+        while True:
+            claimed = queue.claim_latest()
+            if claimed is None:
+                if once:
+                    return
+                time.sleep(poll_interval)
+                continue
+
+            claimed_path, message = claimed
+            start_time = time.time()
+            try:
+                self._analyze_snapshot_message(mode_strategy, message)
+            except Exception as e:
+                # 放回队列重试：有更新的快照时由其取代，跳过期间的新增标题随之补齐
+                print(f"分析快照失败: {e}")
+                queue.fail(claimed_path, message, str(e))
+            else:
+                queue.ack(claimed_path, message, time.time() - start_time)
+            print(queue.format_metrics())
+
+    def run_worker(self, coordinator: CrawlCoordinator, run_id: str) -> None:
+        """分片抓取 worker：反复认领平台并抓取，结果写回协调存储，直到本轮没有可认领的平台"""
+        if not CONFIG["ENABLE_CRAWLER"]:
+            print("爬虫功能已禁用（ENABLE_CRAWLER=False），程序退出")
+            return
+
+        worker_id = shard_worker_id()
+        coordinator.start_run(
+            run_id,
+            [(platform["id"], platform.get("name", platform["id"])) for platform in CONFIG["PLATFORMS"]],
+        )
+        claim_size = CONFIG["SHARDING"]["CLAIM_SIZE"]
+        completed = 0
+        while True:
+            claimed = coordinator.claim(run_id, worker_id, claim_size)
+            if not claimed:
+                break
+            claimed_ids = [source_id for source_id, _ in claimed]
+            print(f"worker {worker_id} 认领: {claimed_ids}")
+            try:
+                results, _, _ = self.data_fetcher.crawl_websites(claimed, self.request_interval)
+                if self.data_fetcher.timed_out_ids:
+                    results.update(self.data_fetcher.collect_stragglers())
+            except Exception:
+                coordinator.release(run_id, worker_id, claimed_ids)
+                raise
+
+            for source_id in claimed_ids:
+                if source_id in results:
+                    status = self.data_fetcher.source_statuses.get(source_id, "success")
+                    coordinator.complete(run_id, worker_id, source_id, status, results[source_id])
+                elif source_id in self.data_fetcher.timed_out_ids:
+                    coordinator.complete(run_id, worker_id, source_id, "timed_out")
+                else:
+                    coordinator.complete(run_id, worker_id, source_id, "failed")
+            completed += len(claimed_ids)
+
+        print(f"worker {worker_id} 在轮次 {run_id} 中完成 {completed} 个平台")
+
+    def _save_minute_snapshot(
+            self, minute_snapshot: Dict, results: Dict, id_to_name: Dict, failed_ids: List
+    ) -> None:
+        """常驻模式：把本次轮询结果并入当前分钟的快照后保存，进入新的一分钟时开始新快照"""
+        file_path = str(
+            Path("output") / format_date_folder() / "txt" / f"{format_time_filename()}.txt"
+        )
+        if minute_snapshot["path"] != file_path:
+            minute_snapshot.update(
+                path=file_path, results={}, id_to_name={}, failed_ids=set(), unchanged_ids=set()
+            )
+        polled_ids = set(results) | set(failed_ids) | set(self.data_fetcher.timed_out_ids)
+        minute_snapshot["results"].update(results)
+        minute_snapshot["id_to_name"].update(id_to_name)
+        minute_snapshot["failed_ids"] -= polled_ids
+        minute_snapshot["failed_ids"].update(failed_ids, self.data_fetcher.timed_out_ids)
+        minute_snapshot["unchanged_ids"] -= polled_ids
+        minute_snapshot["unchanged_ids"].update(self.data_fetcher.unchanged_ids)
+        for id_value in minute_snapshot["failed_ids"]:
+            minute_snapshot["results"].pop(id_value, None)
+
+        self.snapshot_file = save_titles_to_file(
+            minute_snapshot["results"],
+            minute_snapshot["id_to_name"],
+            sorted(minute_snapshot["failed_ids"]),
+            sorted(minute_snapshot["unchanged_ids"]),
+            file_path=file_path,
+        )
+        print(f"标题已保存到: {self.snapshot_file}")
+
+    def _unreported_new_titles(
+            self, snapshot_paths: List[str]
+    ) -> Tuple[Optional[str], Optional[Dict]]:
+        """
+        常驻模式：返回(最新快照时间, 上次报告以来各快照中的新增标题)；
+        只有一份快照时新增标题为 None，按最新快照检测
+        """
+        if not snapshot_paths:
+            return None, None
+        latest_path = Path(snapshot_paths[-1])
+        date_folder = latest_path.parent.parent.name
+        snapshot_times = [
+            Path(path).stem
+            for path in snapshot_paths
+            if Path(path).parent.parent.name == date_folder
+        ]
+        if len(snapshot_times) < 2:
+            return latest_path.stem, None
+        print(f"合并上次报告以来 {len(snapshot_times)} 份快照中的新增标题")
+        new_titles = detect_new_titles_since(
+            min(snapshot_times),
+            latest_path.stem,
+            [platform["id"] for platform in CONFIG["PLATFORMS"]],
+            date_folder,
+        )
+        return latest_path.stem, new_titles
+
+    def run_daemon(self) -> None:
+        """常驻运行：按各来源变化率自适应轮询，定时生成报告和推送"""
+        self._initialize_and_check_config()
+        if not CONFIG["ENABLE_CRAWLER"]:
+            return
+
+        mode_strategy = self._get_mode_strategy()
+        platforms_by_id = {platform["id"]: platform for platform in CONFIG["PLATFORMS"]}
+        scheduler = AdaptivePollScheduler(
+            list(platforms_by_id.keys()), state_file=self.crawl_state_dir / "poll_schedule.json"
+        )
+        report_interval = CONFIG["DAEMON"]["REPORT_INTERVAL"]
+
+        latest_results = {}
+        latest_id_to_name = {}
+        latest_failed_ids = set()
+        # 超过抓取截止时间的来源单独记录，报告中与失败来源分开显示
+        latest_timed_out_ids = set()
+        latest_circuit_open_ids = set()
+        last_report_time = 0.0
+        # 快照按分钟命名：同一分钟内的多次轮询合并写入同一快照，避免后一次覆盖前一次
+        minute_snapshot = {"path": None}
+        # 上次报告以来保存的快照，报告时按其中最早的一份计算新增标题，避免两次报告之间的新增被漏推
+        unreported_snapshots: List[str] = []
+
+        print(
+            f"常驻模式启动：轮询间隔 {scheduler.min_interval}~{scheduler.max_interval} 秒，"
+            f"报告间隔 {report_interval} 秒"
+        )
+
+        while True:
+            try:
+                now = time.time()
+                due_ids = scheduler.due_sources(now)
+                # 上一轮超过截止时间的来源若已返回，直接并入最新结果
+                arrived = self.data_fetcher.collect_stragglers(timeout=0)
+                latest_results.update(arrived)
+                latest_failed_ids.difference_update(arrived.keys())
+                latest_timed_out_ids.difference_update(arrived.keys())
+                latest_circuit_open_ids.difference_update(arrived.keys())
+                self.data_fetcher.reset_run_cache()
+                if due_ids:
+                    results, id_to_name, failed_ids = self._crawl_data(
+                        [platforms_by_id[source_id] for source_id in due_ids],
+                        save_snapshot=False,
+                    )
+                    self._save_minute_snapshot(minute_snapshot, results, id_to_name, failed_ids)
+                    if minute_snapshot["path"] not in unreported_snapshots:
+                        unreported_snapshots.append(minute_snapshot["path"])
+                    for source_id in due_ids:
+                        scheduler.record(
+                            source_id,
+                            results.get(source_id),
+                            self.data_fetcher.source_statuses.get(source_id),
+                            now,
+                        )
+                    latest_results.update(results)
+                    latest_id_to_name.update(id_to_name)
+                    timed_out_ids = self.data_fetcher.timed_out_ids
+                    circuit_open_ids = self.data_fetcher.circuit_open_ids
+                    latest_failed_ids.difference_update(results.keys(), timed_out_ids, circuit_open_ids)
+                    latest_failed_ids.update(failed_ids)
+                    latest_timed_out_ids.difference_update(results.keys(), failed_ids, circuit_open_ids)
+                    latest_timed_out_ids.update(timed_out_ids)
+                    latest_circuit_open_ids.difference_update(results.keys(), failed_ids, timed_out_ids)
+                    latest_circuit_open_ids.update(circuit_open_ids)
+                    scheduler.save()
+                    print(f"轮询调度: {scheduler.summary()}")
+
+                if latest_results and now - last_report_time >= report_interval:
+                    last_report_time = now
+                    snapshot_time, new_titles = self._unreported_new_titles(unreported_snapshots)
+                    unreported_snapshots.clear()
+                    self._execute_mode_strategy(
+                        mode_strategy,
+                        latest_results,
+                        latest_id_to_name,
+                        sorted(latest_failed_ids),
+                        save_snapshot=False,
+                        timed_out_ids=sorted(latest_timed_out_ids),
+                        snapshot_time=snapshot_time,
+                        new_titles=new_titles,
+                        circuit_open_ids=sorted(latest_circuit_open_ids),
+                    )
+                    # 用各来源的最新结果填充运行缓存，生成 API 文件时不再绕过调度器重新抓取
+                    self.data_fetcher.reset_run_cache()
+                    self.data_fetcher.restore_run_snapshot(
+                        latest_results,
+                        latest_id_to_name,
+                        sorted(latest_failed_ids | latest_timed_out_ids | latest_circuit_open_ids),
+                        [],
+                    )
+                    self.data_fetcher.timed_out_ids = sorted(latest_timed_out_ids)
+                    self.data_fetcher.circuit_open_ids = sorted(latest_circuit_open_ids)
+                    generate_static_api_files(self, crawl=False)
+                    compact_output()
+                    print(format_connection_stats())
+                    if self.proxy_pool:
+                        print(self.proxy_pool.summary())
+            except Exception as e:
+                print(f"常驻模式本轮执行出错: {e}")
+
+            next_report_time = last_report_time + report_interval
+            wait_time = min(scheduler.next_wakeup(), next_report_time) - time.time()
+            time.sleep(max(1.0, wait_time))
+
 
 # === API 功能部分 ===
 
@@ -3818,24 +6746,36 @@ API_IDS = [
 
 def generate_api_data(
     analyzer: "NewsAnalyzer",
+    crawl: bool = True,
 ) -> Tuple[Dict, List, int, List, Dict]:
     """
     获取并分析来自固定源的趋势数据，返回API所需的所有数据。
+    crawl 为假时不发起抓取（常驻模式由轮询调度器抓取），失败来源取自本次运行缓存。
+    超过抓取截止时间的来源不计入 failed_sources，单独记入 timed_out_sources。
     """
     print("为API生成数据：开始获取和分析...")
+    api_id_list = [
+        item[0] if isinstance(item, tuple) else item for item in API_IDS
+    ]
 
-    # 1. 爬取数据
-    results, id_to_name, failed_ids = analyzer.data_fetcher.crawl_websites(
-        API_IDS, analyzer.request_interval
-    )
+    # 1. 爬取数据（主流程已获取的来源直接复用，只抓取缺失的来源）
+    data_fetcher = analyzer.data_fetcher
+    if crawl:
+        results, id_to_name, failed_ids = data_fetcher.crawl_websites(
+            API_IDS, analyzer.request_interval
+        )
 
-    # 2. 保存原始数据（可选，但保持与主流程一致）
-    save_titles_to_file(results, id_to_name, failed_ids)
+        # 2. 有新抓取的来源时，保存本次运行全部来源的快照（与主流程同一分钟时覆盖为并集）
+        if data_fetcher.fetched_ids:
+            save_titles_to_file(*data_fetcher.run_snapshot())
+    else:
+        cached_failed_ids = set(data_fetcher.run_snapshot()[2]) - set(data_fetcher.timed_out_ids)
+        failed_ids = [id_value for id_value in api_id_list if id_value in cached_failed_ids]
+    timed_out_ids = [
+        id_value for id_value in api_id_list if id_value in data_fetcher.timed_out_ids
+    ]
 
     # 3. 分析数据
-    api_id_list = [
-        item[0] if isinstance(item, tuple) else item for item in API_IDS
-    ]
     all_results, final_id_to_name, title_info = read_all_today_titles(api_id_list)
 
     if not all_results:
@@ -3843,6 +6783,7 @@ def generate_api_data(
             "generated_at": get_beijing_time().isoformat(),
             "total_titles_processed": 0,
             "failed_sources": failed_ids,
+            "timed_out_sources": timed_out_ids,
             "trends": [],
         }
         return empty_response, [], 0, failed_ids, {}
@@ -3866,6 +6807,7 @@ def generate_api_data(
         "generated_at": get_beijing_time().isoformat(),
         "total_titles_processed": total_titles,
         "failed_sources": failed_ids,
+        "timed_out_sources": timed_out_ids,
         "trends": [],
     }
 
@@ -3893,9 +6835,10 @@ def generate_api_data(
     return api_response, stats, total_titles, failed_ids, final_id_to_name
 
 
-def generate_static_api_files(analyzer: "NewsAnalyzer"):
+def generate_static_api_files(analyzer: "NewsAnalyzer", crawl: bool = True):
     """
     获取趋势数据，生成HTML报告和图片，并将其保存为静态的 JSON 文件。
+    crawl 为假时只使用已保存的快照，不发起抓取。
     """
     (
         api_data,
@@ -3903,7 +6846,7 @@ def generate_static_api_files(analyzer: "NewsAnalyzer"):
         total_titles,
         failed_ids,
         id_to_name,
-    ) = generate_api_data(analyzer)
+    ) = generate_api_data(analyzer, crawl)
 
     # 生成与API数据关联的HTML报告
     api_html_report_path = generate_html_report(
@@ -3913,6 +6856,7 @@ def generate_static_api_files(analyzer: "NewsAnalyzer"):
         id_to_name=id_to_name,
         mode="daily",
         is_daily_summary=True,
+        timed_out_ids=api_data["timed_out_sources"],
     )
     print(f"为API数据生成了HTML报告: {api_html_report_path}")
 
@@ -3930,11 +6874,7 @@ def generate_static_api_files(analyzer: "NewsAnalyzer"):
 
     # 确保API目录存在并将JSON文件保存到新路径
     output_path = "api/trends.json"
-    output_dir = Path(output_path).parent
-    output_dir.mkdir(parents=True, exist_ok=True)
-
-    with open(output_path, "w", encoding="utf-8") as f:
-        json.dump(api_data, f, ensure_ascii=False, indent=2)
+    atomic_write_json(output_path, api_data, indent=2)
 
     print(f"静态API文件已成功生成: {output_path}")
 
@@ -3950,6 +6890,7 @@ if FLASK_AVAILABLE:
         API端点，实时生成并返回趋势数据。
         注意：这是一个耗时操作，每次请求都会重新爬取、分析和渲染图片。
         """
+        analyzer = None
         try:
             analyzer = NewsAnalyzer()
             # 运行完整的静态文件生成流程
@@ -3964,6 +6905,9 @@ if FLASK_AVAILABLE:
         except Exception as e:
             print(f"API请求处理失败: {e}")
             return jsonify({"error": "内部服务器错误", "message": str(e)}), 500
+        finally:
+            if analyzer is not None:
+                analyzer.data_fetcher.close()
 
     @app.route('/img/<path:filename>')
     def serve_image(filename):
@@ -3983,8 +6927,39 @@ def main():
         action='store_true',
         help='仅生成静态的 trends.json, news.jpg 和相关HTML文件并退出'
     )
+    parser.add_argument(
+        '--daemon',
+        action='store_true',
+        help='以常驻模式运行，按各平台变化率自适应调整轮询间隔'
+    )
+    parser.add_argument(
+        '--worker',
+        action='store_true',
+        help='分片抓取 worker：从协调存储认领平台并写回抓取结果'
+    )
+    parser.add_argument(
+        '--coordinate',
+        action='store_true',
+        help='分片抓取协调进程：合并各 worker 的结果后执行分析和推送'
+    )
+    parser.add_argument(
+        '--crawl-only',
+        action='store_true',
+        help='只抓取并把快照发布到快照队列（可与 --coordinate 同用），由 --consume 进程分析'
+    )
+    parser.add_argument(
+        '--consume',
+        action='store_true',
+        help='分析进程：持续消费快照队列，执行分析、报告生成和推送'
+    )
+    parser.add_argument(
+        '--run-id',
+        default='',
+        help='分片抓取轮次ID，默认按 sharding.run_window 时间窗口生成'
+    )
     args = parser.parse_args()
 
+    analyzer = None
     try:
         if args.serve_api:
             if not FLASK_AVAILABLE:
@@ -4000,6 +6975,51 @@ def main():
             generate_static_api_files(analyzer)
             print("文件生成完毕。")
 
+        elif args.daemon:
+            print("以常驻模式运行...")
+            analyzer = NewsAnalyzer()
+            analyzer.run_daemon()
+
+        elif args.consume:
+            print("以分析进程模式运行，消费快照队列...")
+            queue_config = CONFIG["SNAPSHOT_QUEUE"]
+            analyzer = NewsAnalyzer()
+            analyzer.run_consumer(
+                SnapshotQueue(
+                    queue_config["SPOOL_DIR"],
+                    queue_config["MAX_PENDING"],
+                    queue_config["MAX_ATTEMPTS"],
+                )
+            )
+
+        elif args.worker:
+            sharding = CONFIG["SHARDING"]
+            coordinator = CrawlCoordinator(sharding["STORE"], sharding["LEASE_TTL"])
+            run_id = args.run_id or shard_run_id()
+            print(f"以分片抓取 worker 模式运行（轮次 {run_id}）...")
+            analyzer = NewsAnalyzer()
+            analyzer.run_worker(coordinator, run_id)
+
+        elif args.coordinate or args.crawl_only:
+            analyzer = NewsAnalyzer()
+            if args.coordinate:
+                sharding = CONFIG["SHARDING"]
+                analyzer.coordinator = CrawlCoordinator(sharding["STORE"], sharding["LEASE_TTL"])
+                analyzer.run_id = args.run_id or shard_run_id()
+                print(f"以分片抓取协调模式运行（轮次 {analyzer.run_id}）...")
+            if args.crawl_only:
+                print("仅抓取并发布快照...")
+                queue_config = CONFIG["SNAPSHOT_QUEUE"]
+                analyzer.run_crawl_only(
+                    SnapshotQueue(
+                    queue_config["SPOOL_DIR"],
+                    queue_config["MAX_PENDING"],
+                    queue_config["MAX_ATTEMPTS"],
+                )
+                )
+            else:
+                analyzer.run()
+
         else:
             print("以单次脚本模式运行...")
             analyzer = NewsAnalyzer()
@@ -4014,6 +7034,9 @@ def main():
     except Exception as e:
         print(f"❌ 程序运行错误: {e}")
         raise
+    finally:
+        if analyzer is not None:
+            analyzer.data_fetcher.close()
 
 
 if __name__ == "__main__":
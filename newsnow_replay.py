@@ -0,0 +1,282 @@
+# coding=utf-8
+"""
+newsnow 响应录制与回放
+录制模式按来源和时间保存上游原始响应；回放模式既可作为 DataFetcher 的数据来源，
+也可作为模拟 /api/s?id= 与 /api/s/entire 的本地 HTTP 服务（支持延迟和故障注入），用于离线、可重复的性能测试
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Dict, List, Optional
+from urllib.parse import parse_qs, urlparse
+
+import pytz
+
+from output_io import atomic_write_bytes
+
+
+DEFAULT_RECORDINGS_DIR = Path("output") / ".recordings"
+TIMESTAMP_FORMAT = "%Y%m%d-%H%M%S"
+
+
+class RecordingStore:
+    """按 <来源>/<时间>.json 组织的响应录制目录"""
+
+    def __init__(self, root: Optional[Path] = None):
+        self.root = Path(root) if root else DEFAULT_RECORDINGS_DIR
+        self.lock = threading.Lock()
+        self.cursors: Dict[str, int] = {}
+
+    def save(self, source_id: str, payload: bytes, timestamp: Optional[datetime] = None) -> Path:
+        """保存一次原始响应"""
+        if timestamp is None:
+            timestamp = datetime.now(pytz.timezone("Asia/Shanghai"))
+        file_path = self.root / source_id / f"{timestamp.strftime(TIMESTAMP_FORMAT)}.json"
+        atomic_write_bytes(file_path, payload)
+        return file_path
+
+    def sources(self) -> List[str]:
+        """返回有录制数据的来源"""
+        if not self.root.exists():
+            return []
+        return sorted(path.name for path in self.root.iterdir() if path.is_dir())
+
+    def recordings(self, source_id: str) -> List[Path]:
+        """按时间顺序返回某来源的全部录制文件"""
+        source_dir = self.root / source_id
+        if not source_dir.exists():
+            return []
+        return sorted(source_dir.glob("*.json"))
+
+    def load(self, source_id: str, at: Optional[str] = None) -> Optional[bytes]:
+        """
+        读取某来源的录制响应
+
+        Args:
+            source_id: 来源ID
+            at: 回放时间点（格式 YYYYmmdd-HHMMSS），取不晚于该时间的最后一条；为空时取最新一条
+
+        Returns:
+            原始响应字节，没有录制时返回None
+        """
+        files = self.recordings(source_id)
+        if at:
+            files = [path for path in files if path.stem <= at]
+        if not files:
+            return None
+        return files[-1].read_bytes()
+
+    def load_next(self, source_id: str) -> Optional[bytes]:
+        """按时间顺序依次回放某来源的录制响应，播完后从头循环"""
+        files = self.recordings(source_id)
+        if not files:
+            return None
+        with self.lock:
+            index = self.cursors.get(source_id, 0)
+            self.cursors[source_id] = (index + 1) % len(files)
+        return files[index].read_bytes()
+
+
+def make_handler(
+    store: RecordingStore,
+    latency_ms: float = 0,
+    jitter_ms: float = 0,
+    failure_rate: float = 0,
+    sequence: bool = False,
+    at: Optional[str] = None,
+    seed: int = 0,
+):
+    """
+    构造模拟 newsnow /api/s 接口的请求处理类
+
+    延迟和故障按 (种子, 来源ID, 该来源第几次请求) 确定，与并发请求的到达顺序无关，
+    同一组参数每次运行注入的故障完全一致
+    """
+    request_counts: Dict[str, int] = {}
+    count_lock = threading.Lock()
+
+    class ReplayHandler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def _send(self, code: int, body: bytes):
+            self.send_response(code)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def _inject(self, key: str) -> bool:
+            """按请求键模拟延迟，返回本次请求是否注入故障"""
+            with count_lock:
+                attempt = request_counts.get(key, 0)
+                request_counts[key] = attempt + 1
+            rng = random.Random(f"{seed}:{key}:{attempt}")
+            time.sleep(max(0.0, latency_ms + rng.uniform(-jitter_ms, jitter_ms)) / 1000)
+            return rng.random() < failure_rate
+
+        def _load(self, source_id: str) -> Optional[bytes]:
+            return store.load_next(source_id) if sequence else store.load(source_id, at)
+
+        def do_GET(self):
+            parsed = urlparse(self.path)
+            if parsed.path.rstrip("/") != "/api/s":
+                self._send(404, b'{"status":"error","message":"not found"}')
+                return
+
+            source_id = parse_qs(parsed.query).get("id", [""])[0]
+            if self._inject(source_id):
+                self._send(500, b'{"status":"error","message":"injected failure"}')
+                return
+
+            payload = self._load(source_id)
+            if payload is None:
+                self._send(404, b'{"status":"error","message":"no recording"}')
+                return
+            self._send(200, payload)
+
+        def do_POST(self):
+            """多来源接口 /api/s/entire，请求体为 {"sources": [...]}，无录制数据的来源不返回"""
+            if urlparse(self.path).path.rstrip("/") != "/api/s/entire":
+                self._send(404, b'{"status":"error","message":"not found"}')
+                return
+
+            length = int(self.headers.get("Content-Length") or 0)
+            try:
+                source_ids = json.loads(self.rfile.read(length) or b"{}").get("sources", [])
+            except ValueError:
+                self._send(400, b'{"status":"error","message":"bad request"}')
+                return
+
+            if self._inject("entire:" + ",".join(source_ids)):
+                self._send(500, b'{"status":"error","message":"injected failure"}')
+                return
+
+            entries = []
+            for source_id in source_ids:
+                payload = self._load(source_id)
+                if payload is not None:
+                    entries.append(json.loads(payload))
+            self._send(200, json.dumps(entries, ensure_ascii=False).encode("utf-8"))
+
+        def log_message(self, *args):
+            pass
+
+    return ReplayHandler
+
+
+def start_replay_server(
+    store: RecordingStore,
+    host: str = "127.0.0.1",
+    port: int = 0,
+    **handler_options,
+) -> ThreadingHTTPServer:
+    """在后台线程启动回放服务，port 为 0 时自动分配端口"""
+    server = ThreadingHTTPServer((host, port), make_handler(store, **handler_options))
+    server.daemon_threads = True
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+def import_snapshots(store: RecordingStore, snapshot_files: List[Path]) -> int:
+    """将已有的 txt 快照转换为录制响应，便于用历史数据离线回放"""
+    from main import parse_file_titles
+
+    count = 0
+    for file_path in snapshot_files:
+        # output/<日期>/txt/<时间>.txt
+        timestamp = datetime.strptime(
+            f"{file_path.parent.parent.name} {file_path.stem}", "%Y年%m月%d日 %H时%M分"
+        )
+        titles_by_id, _ = parse_file_titles(file_path)
+        for source_id, title_data in titles_by_id.items():
+            items = sorted(
+                (
+                    (min(info["ranks"]) if info["ranks"] else 99, title, info)
+                    for title, info in title_data.items()
+                ),
+                key=lambda x: x[0],
+            )
+            payload = {
+                "status": "success",
+                "id": source_id,
+                "updatedTime": int(timestamp.timestamp() * 1000),
+                "items": [
+                    {
+                        "id": title,
+                        "title": title,
+                        "url": info.get("url", ""),
+                        "mobileUrl": info.get("mobileUrl", ""),
+                    }
+                    for _, title, info in items
+                ],
+            }
+            store.save(
+                source_id,
+                json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+                timestamp,
+            )
+            count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="newsnow 响应录制回放工具")
+    parser.add_argument("--dir", default=str(DEFAULT_RECORDINGS_DIR), help="录制目录")
+    subparsers = parser.add_subparsers(dest="command")
+
+    serve_parser = subparsers.add_parser("serve", help="启动模拟 /api/s?id= 的本地回放服务")
+    serve_parser.add_argument("--host", default="127.0.0.1")
+    serve_parser.add_argument("--port", type=int, default=8765)
+    serve_parser.add_argument("--latency", type=float, default=0, help="响应延迟（毫秒）")
+    serve_parser.add_argument("--jitter", type=float, default=0, help="延迟抖动（毫秒）")
+    serve_parser.add_argument("--failure-rate", type=float, default=0, help="故障注入比例 0-1")
+    serve_parser.add_argument("--sequence", action="store_true", help="按时间顺序循环回放")
+    serve_parser.add_argument("--at", default=None, help="回放时间点 YYYYmmdd-HHMMSS")
+    serve_parser.add_argument("--seed", type=int, default=0, help="延迟与故障注入的随机种子")
+
+    subparsers.add_parser("list", help="列出录制数据")
+
+    import_parser = subparsers.add_parser("import", help="把 txt 快照导入为录制数据")
+    import_parser.add_argument("snapshots", nargs="+", help="txt 快照文件")
+
+    args = parser.parse_args()
+    store = RecordingStore(Path(args.dir))
+
+    if args.command == "serve":
+        server = start_replay_server(
+            store,
+            args.host,
+            args.port,
+            latency_ms=args.latency,
+            jitter_ms=args.jitter,
+            failure_rate=args.failure_rate,
+            sequence=args.sequence,
+            at=args.at,
+            seed=args.seed,
+        )
+        print(f"回放服务已启动: http://{args.host}:{server.server_address[1]}/api/s?id=<来源ID>")
+        print("将 config.yaml 中 crawler.upstreams 指向该地址即可离线运行")
+        try:
+            while True:
+                time.sleep(3600)
+        except KeyboardInterrupt:
+            server.shutdown()
+    elif args.command == "list":
+        for source_id in store.sources():
+            files = store.recordings(source_id)
+            print(f"{source_id}: {len(files)} 条（{files[0].stem} ~ {files[-1].stem}）")
+    elif args.command == "import":
+        count = import_snapshots(store, [Path(path) for path in args.snapshots])
+        print(f"已导入 {count} 条录制数据到 {store.root}")
+    else:
+        parser.print_help()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,256 @@
+# coding=utf-8
+"""
+旧日期目录归档
+
+把 output/<日期>/ 整个目录（txt 快照、sections、html 报告、清单等）打包为
+output/archive/<日期>.zip（deflate 压缩）。zip 末尾的中央目录即为内部索引：
+读取单个快照或报告时只读取索引和对应成员，无需解压整个归档。
+
+归档时机：
+  - 早于保留天数（keep_days）的日期目录
+  - 输出目录总大小超过预算（max_size_mb）时，继续从最早的日期开始归档（当天除外）
+  - archive_retention_days > 0 时，删除更早的归档
+
+用法（在项目根目录执行）:
+  python output_archive.py compact [--keep-days 7] [--max-size-mb 200] [--archive-retention-days 0]
+  （compact 经 main.compact_output 执行：与抓取、分析进程共用日期锁和清单刷新，按北京时间判断日期，
+   未指定的参数取 config.yaml 中的 archive 配置）
+  python output_archive.py list
+  python output_archive.py cat 2026年02月20日 txt/09时14分.txt
+"""
+
+import argparse
+import contextlib
+import os
+import shutil
+import sys
+import zipfile
+from datetime import date, datetime, timedelta
+from pathlib import Path
+from typing import Callable, ContextManager, Dict, List, Optional, Tuple
+
+ARCHIVE_DIR = "archive"
+ARCHIVE_SUFFIX = ".zip"
+DATE_FOLDER_FORMAT = "%Y年%m月%d日"
+
+
+def archive_path(output_dir: Path, date_folder: str) -> Path:
+    return Path(output_dir) / ARCHIVE_DIR / f"{date_folder}{ARCHIVE_SUFFIX}"
+
+
+def is_archived(output_dir: Path, date_folder: str) -> bool:
+    return archive_path(output_dir, date_folder).exists()
+
+
+def read_member(output_dir: Path, date_folder: str, member: str) -> bytes:
+    """
+    读取某天的单个文件（如 txt/09时14分.txt、html/当日汇总.html），
+    未归档时读取日期目录中的文件，已归档时只从归档中解压该成员
+    """
+    loose_path = Path(output_dir) / date_folder / member
+    if loose_path.exists():
+        return loose_path.read_bytes()
+    path = archive_path(output_dir, date_folder)
+    if not path.exists():
+        raise FileNotFoundError(str(loose_path))
+    with zipfile.ZipFile(path) as archive:
+        try:
+            return archive.read(member)
+        except KeyError:
+            raise FileNotFoundError(f"{path}:{member}") from None
+
+
+def list_members(output_dir: Path, date_folder: str) -> List[str]:
+    """列出归档中的文件（只读取中央目录）"""
+    with zipfile.ZipFile(archive_path(output_dir, date_folder)) as archive:
+        return [info.filename for info in archive.infolist() if not info.is_dir()]
+
+
+def archive_day(output_dir: Path, date_folder: str) -> Path:
+    """
+    把 output/<日期>/ 打包为归档并删除原目录；已有归档时合并（目录中的文件覆盖归档中的同名成员）。
+    先写临时文件、校验后再替换，中途失败不会丢失数据
+    """
+    output_dir = Path(output_dir)
+    day_dir = output_dir / date_folder
+    path = archive_path(output_dir, date_folder)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(path.name + ".tmp")
+
+    loose_files = sorted(f for f in day_dir.rglob("*") if f.is_file())
+    loose_names = {f.relative_to(day_dir).as_posix() for f in loose_files}
+    with zipfile.ZipFile(tmp_path, "w", zipfile.ZIP_DEFLATED, compresslevel=9) as archive:
+        if path.exists():
+            with zipfile.ZipFile(path) as existing:
+                for info in existing.infolist():
+                    if info.filename not in loose_names:
+                        archive.writestr(info, existing.read(info))
+        for file_path in loose_files:
+            archive.write(file_path, file_path.relative_to(day_dir).as_posix())
+
+    with zipfile.ZipFile(tmp_path) as archive:
+        broken = archive.testzip()
+        if broken is not None:
+            tmp_path.unlink()
+            raise zipfile.BadZipFile(f"归档校验失败: {broken}")
+    os.replace(tmp_path, path)
+    shutil.rmtree(day_dir)
+    return path
+
+
+def restore_day(output_dir: Path, date_folder: str) -> Path:
+    """把归档解压回 output/<日期>/ 并删除归档（需要向已归档的日期写入时），返回日期目录"""
+    output_dir = Path(output_dir)
+    day_dir = output_dir / date_folder
+    path = archive_path(output_dir, date_folder)
+    with zipfile.ZipFile(path) as archive:
+        for info in archive.infolist():
+            # 已存在的文件比归档中的新
+            if not info.is_dir() and not (day_dir / info.filename).exists():
+                archive.extract(info, day_dir)
+    path.unlink()
+    return day_dir
+
+
+def parse_date_folder(name: str) -> Optional[date]:
+    try:
+        return datetime.strptime(name, DATE_FOLDER_FORMAT).date()
+    except ValueError:
+        return None
+
+
+def tree_size(path: Path) -> int:
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                total += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return total
+
+
+def scan_output(output_dir: Path) -> Tuple[Dict[str, date], Dict[str, date]]:
+    """返回 ({未归档的日期目录: 日期}, {已归档的日期目录: 日期})"""
+    output_dir = Path(output_dir)
+    loose = {}
+    if output_dir.exists():
+        for entry in output_dir.iterdir():
+            day = parse_date_folder(entry.name) if entry.is_dir() else None
+            if day:
+                loose[entry.name] = day
+    archived = {}
+    archive_dir = output_dir / ARCHIVE_DIR
+    if archive_dir.exists():
+        for entry in archive_dir.iterdir():
+            day = parse_date_folder(entry.stem) if entry.suffix == ARCHIVE_SUFFIX else None
+            if day:
+                archived[entry.stem] = day
+    return loose, archived
+
+
+def compact_output(
+        output_dir: Path,
+        today: date,
+        keep_days: int = 7,
+        max_size_mb: float = 0,
+        archive_retention_days: int = 0,
+        prepare: Optional[Callable[[str], object]] = None,
+        day_lock: Optional[Callable[[str], ContextManager]] = None,
+) -> Dict[str, List[str]]:
+    """
+    归档早于 keep_days 天的日期目录；输出目录超过 max_size_mb（0 表示不限制）时
+    继续从最早的日期开始归档，当天目录始终保留；archive_retention_days > 0 时删除更早的归档。
+    prepare(日期目录) 在打包前调用（如补齐快照清单）；day_lock(日期目录) 返回该日期的排他锁，
+    打包、删除目录和删除归档期间持有，与读写该日期的进程互斥。返回 {"archived": [...], "deleted": [...]}
+    """
+    output_dir = Path(output_dir)
+    loose, archived = scan_output(output_dir)
+    result = {"archived": [], "deleted": []}
+
+    def locked(date_folder: str) -> ContextManager:
+        return day_lock(date_folder) if day_lock else contextlib.nullcontext()
+
+    def archive(date_folder: str) -> Optional[Path]:
+        with locked(date_folder):
+            # 等待锁期间可能已被其他进程归档
+            if not (output_dir / date_folder).exists():
+                return None
+            if prepare:
+                prepare(date_folder)
+            return archive_day(output_dir, date_folder)
+
+    cutoff = today - timedelta(days=keep_days)
+    for date_folder, day in sorted(loose.items(), key=lambda item: item[1]):
+        if day < cutoff:
+            archive(date_folder)
+            result["archived"].append(date_folder)
+            archived[date_folder] = loose.pop(date_folder)
+
+    if max_size_mb > 0:
+        budget = max_size_mb * 1024 * 1024
+        size = tree_size(output_dir)
+        for date_folder, day in sorted(loose.items(), key=lambda item: item[1]):
+            if size <= budget or day >= today:
+                break
+            before = tree_size(output_dir / date_folder)
+            path = archive(date_folder)
+            size -= before - (path.stat().st_size if path else 0)
+            result["archived"].append(date_folder)
+            archived[date_folder] = day
+        if size > budget:
+            print(f"输出目录仍超过预算: {size / 1024 / 1024:.1f} MB > {max_size_mb} MB")
+
+    if archive_retention_days > 0:
+        expire = today - timedelta(days=archive_retention_days)
+        for date_folder, day in sorted(archived.items(), key=lambda item: item[1]):
+            if day < expire:
+                with locked(date_folder):
+                    with contextlib.suppress(FileNotFoundError):
+                        archive_path(output_dir, date_folder).unlink()
+                result["deleted"].append(date_folder)
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description="旧日期目录归档")
+    parser.add_argument("--output", default="output", help="输出目录")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    compact_parser = subparsers.add_parser("compact", help="归档旧日期目录")
+    compact_parser.add_argument("--keep-days", type=int)
+    compact_parser.add_argument("--max-size-mb", type=float)
+    compact_parser.add_argument("--archive-retention-days", type=int)
+    subparsers.add_parser("list", help="列出归档")
+    cat_parser = subparsers.add_parser("cat", help="输出某天的单个文件")
+    cat_parser.add_argument("date_folder")
+    cat_parser.add_argument("member")
+    args = parser.parse_args()
+
+    output_dir = Path(args.output)
+    if args.command == "compact":
+        if output_dir.name != "output":
+            parser.error("compact 只支持名为 output 的输出目录（与抓取、分析进程共用锁和清单）")
+        # 延迟导入：main 导入时加载 config/config.yaml
+        import main as trendradar
+
+        os.chdir(output_dir.resolve().parent)
+        result = trendradar.compact_output(
+            args.keep_days,
+            args.max_size_mb,
+            args.archive_retention_days,
+            force=True,
+        )
+        if not result["archived"] and not result["deleted"]:
+            print("没有需要归档或删除的日期目录")
+    elif args.command == "list":
+        _, archived = scan_output(output_dir)
+        for date_folder in sorted(archived, key=archived.get):
+            path = archive_path(output_dir, date_folder)
+            print(f"{date_folder}: {len(list_members(output_dir, date_folder))} 个文件，"
+                  f"{path.stat().st_size / 1024:.1f} KB")
+    else:
+        sys.stdout.buffer.write(read_member(output_dir, args.date_folder, args.member))
+
+
+if __name__ == "__main__":
+    main()
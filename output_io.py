@@ -0,0 +1,100 @@
+# coding=utf-8
+"""
+多进程安全的输出写入
+
+- 原子写入：先写同目录下的临时文件再 os.replace，读取方只会看到旧文件或完整的新文件
+- 文件锁：fcntl.flock 建议锁，串行化同一份数据的"读取-修改-写入"（清单、索引、聚合、队列指标等），
+  读取方可持有共享锁（如读取快照期间阻止归档删除日期目录）；同一线程可重入；
+  没有 fcntl 的平台（Windows）退化为进程内的线程锁
+"""
+
+import contextlib
+import json
+import os
+import threading
+from pathlib import Path
+from typing import Dict, Iterator, Union
+
+try:
+    import fcntl
+except ImportError:
+    fcntl = None
+
+
+def atomic_write_bytes(path: Union[str, Path], data: bytes) -> None:
+    """原子写入二进制文件（自动创建目录）"""
+    path = Path(path)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp_path = path.with_name(f".{path.name}.{os.getpid()}.{threading.get_ident()}.tmp")
+    try:
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path)
+    except BaseException:
+        with contextlib.suppress(OSError):
+            tmp_path.unlink()
+        raise
+
+
+def atomic_write_text(path: Union[str, Path], text: str, encoding: str = "utf-8") -> None:
+    """原子写入文本文件（自动创建目录）"""
+    atomic_write_bytes(path, text.encode(encoding))
+
+
+def atomic_write_json(path: Union[str, Path], data, **dump_kwargs) -> None:
+    """原子写入 JSON 文件，dump_kwargs 传给 json.dumps（默认 ensure_ascii=False）"""
+    dump_kwargs.setdefault("ensure_ascii", False)
+    atomic_write_text(path, json.dumps(data, **dump_kwargs))
+
+
+# 没有 fcntl 时使用的进程内锁：锁文件路径 -> 线程锁
+_thread_locks: Dict[str, threading.RLock] = {}
+_thread_locks_guard = threading.Lock()
+# 当前线程持有的文件锁：锁文件路径 -> {"file", "shared", "depth"}
+_held = threading.local()
+
+
+@contextlib.contextmanager
+def file_lock(lock_path: Union[str, Path], shared: bool = False) -> Iterator[None]:
+    """
+    持有 lock_path 上的建议锁（阻塞等待）：默认排他，shared 为真时为共享锁（多个读取方可同时持有）。
+    同一线程可重入；已持有共享锁时再请求排他锁会升级，退出内层后恢复为共享锁
+    """
+    key = os.path.abspath(lock_path)
+    if fcntl is None:
+        # 只能保证进程内互斥，共享锁同样按排他处理
+        with _thread_locks_guard:
+            thread_lock = _thread_locks.setdefault(key, threading.RLock())
+        with thread_lock:
+            yield
+        return
+
+    held = getattr(_held, "locks", None)
+    if held is None:
+        held = _held.locks = {}
+    entry = held.get(key)
+    if entry:
+        upgrade = entry["shared"] and not shared
+        if upgrade:
+            fcntl.flock(entry["file"].fileno(), fcntl.LOCK_EX)
+            entry["shared"] = False
+        entry["depth"] += 1
+        try:
+            yield
+        finally:
+            entry["depth"] -= 1
+            if upgrade:
+                fcntl.flock(entry["file"].fileno(), fcntl.LOCK_SH)
+                entry["shared"] = True
+        return
+
+    # 每次获取都打开新的文件描述，flock 在同一进程的不同线程之间同样互斥
+    Path(key).parent.mkdir(parents=True, exist_ok=True)
+    with open(key, "a") as f:
+        fcntl.flock(f.fileno(), fcntl.LOCK_SH if shared else fcntl.LOCK_EX)
+        held[key] = {"file": f, "shared": shared, "depth": 1}
+        try:
+            yield
+        finally:
+            held.pop(key, None)
+            fcntl.flock(f.fileno(), fcntl.LOCK_UN)
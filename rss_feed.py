@@ -0,0 +1,45 @@
+# coding=utf-8
+"""
+RSS/Atom 流式解析
+边读取边解析（iterparse），逐条产出标题和链接，已处理的条目立即释放；
+调用方停止迭代后不再继续读取剩余内容
+"""
+
+import xml.etree.ElementTree as ET
+from typing import BinaryIO, Iterator, Tuple
+
+
+def _local_name(tag: str) -> str:
+    """去掉命名空间前缀，如 {http://www.w3.org/2005/Atom}entry -> entry"""
+    return tag.rsplit("}", 1)[-1]
+
+
+def iter_feed_entries(stream: BinaryIO) -> Iterator[Tuple[str, str]]:
+    """
+    流式解析 RSS 2.0、RSS 1.0 (RDF) 和 Atom，按文档顺序产出 (title, link)
+
+    Args:
+        stream: 已解压的字节流（如 response.raw，需开启 decode_content）
+    """
+    for _, elem in ET.iterparse(stream, events=("end",)):
+        if _local_name(elem.tag) not in ("item", "entry"):
+            continue
+
+        title = ""
+        link = ""
+        for child in elem:
+            child_tag = _local_name(child.tag)
+            if child_tag == "title":
+                title = " ".join("".join(child.itertext()).split())
+            elif child_tag == "link":
+                href = child.get("href")
+                if href is None:
+                    # RSS: <link>url</link>
+                    link = link or (child.text or "").strip()
+                elif child.get("rel", "alternate") == "alternate" and not link:
+                    # Atom: <link rel="alternate" href="url"/>
+                    link = href.strip()
+        elem.clear()
+
+        if title:
+            yield title, link
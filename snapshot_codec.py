@@ -0,0 +1,829 @@
+# coding=utf-8
+"""
+紧凑二进制快照格式
+
+标题、链接、平台ID和名称按天存入字符串字典（output/<日期>/snap/strings.bin，只追加），
+每个快照（output/<日期>/snap/HH时MM分.snap）只记录各来源的 (字符串编号, 排名) 数组。
+同一天内绝大多数标题和链接在各次抓取间保持不变，因此每次快照只新增少量字符串。
+
+整数均为 LEB128 变长编码，字符串编号 0 表示空字符串。
+
+  strings.bin   魔数 + 连续的 [长度][UTF-8 字节]，第 n 条字符串编号为 n
+  *.snap        魔数
+                来源数，逐个来源: 平台ID编号、名称编号、条目数、正文偏移、正文长度
+                未变化来源数 + 平台ID编号，失败来源数 + 平台ID编号
+                正文: 逐条 标题编号、排名、链接编号、移动端链接编号、热度+1（0 表示无热度）
+
+读取时只解析来源表，来源正文和字典中的字符串在首次访问时才解码。
+
+写入时可以只定期保存完整快照（基准），其余快照保存为相对上一个快照的增量：
+
+  *.snap（增量） 增量魔数、上一个快照的时间编号
+                来源数，逐个来源: 平台ID编号、名称编号（即本次快照的来源及顺序）
+                有变化的来源数，逐个来源: 平台ID编号、
+                  新进入条目数 + 完整条目，退出条目数 + 标题编号，
+                  变化条目数 + 逐条 标题编号、新排名、排名变化（zigzag）、变化字段掩码、变化的字段
+                未变化来源数 + 平台ID编号，失败来源数 + 平台ID编号
+
+读取任意时刻的快照时从最近的基准开始依次应用增量；增量本身也可直接读取，
+新增标题检测和排名变化分析只需处理变化的条目。
+
+用法（在项目根目录执行）:
+  python snapshot_codec.py encode output/2026年02月20日 [--base-interval 12]
+  python snapshot_codec.py decode output/2026年02月20日 --target /tmp/txt
+"""
+
+import argparse
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Sequence, Set, Tuple
+
+from output_io import atomic_write_bytes, atomic_write_text
+
+DICTIONARY_MAGIC = b"TRSD1\n"
+SNAPSHOT_MAGIC = b"TRSS1\n"
+DELTA_MAGIC = b"TRSX1\n"
+SNAPSHOT_DIR = "snap"
+DICTIONARY_FILE = "strings.bin"
+SNAPSHOT_SUFFIX = ".snap"
+
+
+# 条目: (标题编号, 排名, 链接编号, 移动端链接编号, 热度)
+Entry = Tuple[int, int, int, int, Optional[int]]
+
+# 变化条目: (标题编号, 原排名, 新排名, 链接编号, 移动端链接编号, 热度)，未变化的字段为 KEEP
+RankChange = Tuple[int, int, int, int, int, Optional[int]]
+KEEP = -1
+
+
+class SnapshotFormatError(ValueError):
+    """文件不是有效的二进制快照或字典"""
+
+
+def as_path(path) -> Path:
+    """字符串转为 Path；zipfile.Path（已归档日期的归档内目录）原样使用，只读取需要的成员"""
+    return Path(path) if isinstance(path, str) else path
+
+
+def encode_varint(value: int, out: bytearray) -> None:
+    while value > 0x7F:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+
+def decode_varint(data: Sequence[int], pos: int) -> Tuple[int, int]:
+    """返回 (数值, 下一个位置)"""
+    result = 0
+    shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        result |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return result, pos
+        shift += 7
+
+
+class StringDictionary:
+    """
+    按天共享的字符串字典：编号只增不减，已写入的快照始终可以解码；
+    读取时只建立偏移表，字符串在首次查找时才解码
+    """
+
+    def __init__(self, path: Path):
+        self.path = as_path(path)
+        self.data = b""
+        self.spans: List[Tuple[int, int]] = []
+        self.cache: Dict[int, str] = {}
+        self.index: Optional[Dict[str, int]] = None
+        self.pending: List[str] = []
+        if self.path.exists():
+            self.data = self.path.read_bytes()
+            if not self.data.startswith(DICTIONARY_MAGIC):
+                raise SnapshotFormatError(f"不是字符串字典: {self.path}")
+            pos = len(DICTIONARY_MAGIC)
+            while pos < len(self.data):
+                try:
+                    length, start = decode_varint(self.data, pos)
+                except IndexError:
+                    break
+                if start + length > len(self.data):
+                    break
+                self.spans.append((start, length))
+                pos = start + length
+            # 另一个进程正在追加时末尾可能是不完整的字符串，忽略（快照只引用追加完成后的编号）
+            self.data = self.data[:pos]
+
+    def __len__(self) -> int:
+        return len(self.spans) + len(self.pending)
+
+    def lookup(self, string_id: int) -> str:
+        if string_id == 0:
+            return ""
+        text = self.cache.get(string_id)
+        if text is None:
+            if string_id > len(self.spans):
+                text = self.pending[string_id - len(self.spans) - 1]
+            else:
+                start, length = self.spans[string_id - 1]
+                text = self.data[start:start + length].decode("utf-8")
+            self.cache[string_id] = text
+        return text
+
+    def intern(self, text: str) -> int:
+        """返回字符串编号，新字符串暂存到 pending，flush 时写入文件"""
+        if not text:
+            return 0
+        if self.index is None:
+            self.index = {self.lookup(i): i for i in range(1, len(self) + 1)}
+        string_id = self.index.get(text)
+        if string_id is None:
+            self.pending.append(text)
+            string_id = len(self)
+            self.index[text] = string_id
+        return string_id
+
+    def flush(self) -> None:
+        """把新增字符串追加到字典文件"""
+        if not self.pending:
+            return
+        out = bytearray() if self.data else bytearray(DICTIONARY_MAGIC)
+        base = len(self.data)
+        spans = []
+        for text in self.pending:
+            encoded = text.encode("utf-8")
+            encode_varint(len(encoded), out)
+            spans.append((base + len(out), len(encoded)))
+            out += encoded
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        with open(self.path, "ab") as f:
+            f.write(out)
+        self.data += bytes(out)
+        self.spans.extend(spans)
+        self.pending = []
+
+
+class SnapshotState:
+    """
+    某一时刻的快照内容（均为字符串编号）：来源及名称（按快照顺序）、各来源的条目（按排名排序）、
+    未变化与失败的来源；没有标题的来源与 txt 快照一样不记录
+    """
+
+    def __init__(self):
+        self.sources: Dict[int, int] = {}
+        self.entries: Dict[int, Dict[int, Entry]] = {}
+        self.unchanged: List[int] = []
+        self.failed: List[int] = []
+
+    @classmethod
+    def from_titles(
+            cls,
+            dictionary: StringDictionary,
+            titles_by_id: Dict,
+            id_to_name: Dict,
+            unchanged_ids: Sequence[str] = (),
+            failed_ids: Sequence[str] = (),
+    ) -> "SnapshotState":
+        """titles_by_id 应为 txt 快照读回后的形式（标题已清理、每个标题一个排名）"""
+        state = cls()
+        for source_id, title_data in titles_by_id.items():
+            if not title_data:
+                continue
+            source_sid = dictionary.intern(source_id)
+            state.sources[source_sid] = dictionary.intern(id_to_name.get(source_id, source_id))
+            entries = {}
+            for title, info in title_data.items():
+                title_sid = dictionary.intern(title)
+                entries[title_sid] = (
+                    title_sid,
+                    (info.get("ranks") or [1])[0],
+                    dictionary.intern(info.get("url", "")),
+                    dictionary.intern(info.get("mobileUrl", "")),
+                    info.get("heat"),
+                )
+            state.entries[source_sid] = entries
+        state.unchanged = [dictionary.intern(source_id) for source_id in unchanged_ids]
+        state.failed = [dictionary.intern(source_id) for source_id in failed_ids]
+        return state
+
+    def decode(self, dictionary: StringDictionary) -> Tuple[Dict, Dict, List]:
+        """返回 (titles_by_id, id_to_name, unchanged_ids)，与 parse_snapshot_file 一致"""
+        lookup = dictionary.lookup
+        titles_by_id = {}
+        for source_sid in self.sources:
+            titles_by_id[lookup(source_sid)] = {
+                lookup(entry[0]): entry_info(dictionary, entry)
+                for entry in self.entries[source_sid].values()
+            }
+        id_to_name = {lookup(source_sid): lookup(name_sid) for source_sid, name_sid in self.sources.items()}
+        return titles_by_id, id_to_name, [lookup(source_sid) for source_sid in self.unchanged]
+
+
+def entry_info(dictionary: StringDictionary, entry: Entry) -> Dict:
+    """把条目解码为标题数据（ranks / url / mobileUrl / heat）"""
+    _, rank, url_sid, mobile_sid, heat = entry
+    info = {"ranks": [rank], "url": dictionary.lookup(url_sid), "mobileUrl": dictionary.lookup(mobile_sid)}
+    if heat is not None:
+        info["heat"] = heat
+    return info
+
+
+def _encode_entry(entry: Entry, out: bytearray) -> None:
+    title_sid, rank, url_sid, mobile_sid, heat = entry
+    encode_varint(title_sid, out)
+    encode_varint(rank, out)
+    encode_varint(url_sid, out)
+    encode_varint(mobile_sid, out)
+    encode_varint(0 if heat is None else heat + 1, out)
+
+
+def _decode_entry(data: bytes, pos: int) -> Tuple[Entry, int]:
+    values = []
+    for _ in range(5):
+        value, pos = decode_varint(data, pos)
+        values.append(value)
+    title_sid, rank, url_sid, mobile_sid, heat = values
+    return (title_sid, rank, url_sid, mobile_sid, heat - 1 if heat else None), pos
+
+
+def _encode_ids(ids: Sequence[int], out: bytearray) -> None:
+    encode_varint(len(ids), out)
+    for value in ids:
+        encode_varint(value, out)
+
+
+def _decode_ids(data: bytes, pos: int) -> Tuple[List[int], int]:
+    count, pos = decode_varint(data, pos)
+    ids = []
+    for _ in range(count):
+        value, pos = decode_varint(data, pos)
+        ids.append(value)
+    return ids, pos
+
+
+def encode_snapshot(dictionary: StringDictionary, state: SnapshotState) -> bytes:
+    """编码完整快照；新字符串留在 dictionary.pending 中，由调用方在写入快照前 flush"""
+    table = bytearray()
+    body = bytearray()
+    encode_varint(len(state.sources), table)
+    for source_sid, name_sid in state.sources.items():
+        section = bytearray()
+        for entry in state.entries[source_sid].values():
+            _encode_entry(entry, section)
+        encode_varint(source_sid, table)
+        encode_varint(name_sid, table)
+        encode_varint(len(state.entries[source_sid]), table)
+        encode_varint(len(body), table)
+        encode_varint(len(section), table)
+        body += section
+
+    _encode_ids(state.unchanged, table)
+    _encode_ids(state.failed, table)
+    return SNAPSHOT_MAGIC + bytes(table) + bytes(body)
+
+
+class SnapshotReader:
+    """
+    二进制快照的延迟解码读取器：打开时只解析来源表，
+    各来源的条目在首次访问时解码，字符串按需从字典查找
+    """
+
+    def __init__(self, path: Path, dictionary: StringDictionary):
+        self.path = as_path(path)
+        self.dictionary = dictionary
+        self.data = self.path.read_bytes()
+        if not self.data.startswith(SNAPSHOT_MAGIC):
+            raise SnapshotFormatError(f"不是二进制快照: {self.path}")
+
+        pos = len(SNAPSHOT_MAGIC)
+        source_count, pos = decode_varint(self.data, pos)
+        raw_sources = []
+        for _ in range(source_count):
+            fields = []
+            for _ in range(5):
+                value, pos = decode_varint(self.data, pos)
+                fields.append(value)
+            raw_sources.append(fields)
+        self.unchanged_sids, pos = _decode_ids(self.data, pos)
+        self.failed_sids, pos = _decode_ids(self.data, pos)
+        self.unchanged_ids = [dictionary.lookup(sid) for sid in self.unchanged_sids]
+        self.failed_ids = [dictionary.lookup(sid) for sid in self.failed_sids]
+
+        # 来源ID -> (平台ID编号, 名称编号, 条目数, 正文起点)
+        self.sections: Dict[str, Tuple[int, int, int, int]] = {}
+        for source_sid, name_sid, count, offset, _ in raw_sources:
+            self.sections[dictionary.lookup(source_sid)] = (source_sid, name_sid, count, pos + offset)
+        self._decoded: Dict[str, Dict] = {}
+
+    @property
+    def source_ids(self) -> List[str]:
+        return list(self.sections)
+
+    @property
+    def id_to_name(self) -> Dict[str, str]:
+        return {
+            source_id: self.dictionary.lookup(section[1])
+            for source_id, section in self.sections.items()
+        }
+
+    def iter_entries(self, source_id: str) -> Iterator[Entry]:
+        """逐条返回 (标题编号, 排名, 链接编号, 移动端链接编号, 热度)，不解码字符串"""
+        _, _, count, pos = self.sections[source_id]
+        for _ in range(count):
+            entry, pos = _decode_entry(self.data, pos)
+            yield entry
+
+    def titles(self, source_id: str) -> Dict:
+        """返回单个来源的标题数据，格式与 parse_snapshot_file 一致"""
+        if source_id not in self._decoded:
+            self._decoded[source_id] = {
+                self.dictionary.lookup(entry[0]): entry_info(self.dictionary, entry)
+                for entry in self.iter_entries(source_id)
+            }
+        return self._decoded[source_id]
+
+    def read(self) -> Tuple[Dict, Dict, List]:
+        """解码全部来源，返回 (titles_by_id, id_to_name, unchanged_ids)"""
+        titles_by_id = {source_id: self.titles(source_id) for source_id in self.sections}
+        return titles_by_id, self.id_to_name, list(self.unchanged_ids)
+
+    def state(self) -> SnapshotState:
+        state = SnapshotState()
+        for source_id, (source_sid, name_sid, _, _) in self.sections.items():
+            state.sources[source_sid] = name_sid
+            state.entries[source_sid] = {entry[0]: entry for entry in self.iter_entries(source_id)}
+        state.unchanged = list(self.unchanged_sids)
+        state.failed = list(self.failed_sids)
+        return state
+
+
+# === 增量快照 ===
+class SnapshotChanges:
+    """
+    相邻两个快照之间的变化（均为字符串编号）：base 为上一个快照的时间，sources 为本次快照的来源及名称；
+    entered / exited / changed 只包含有变化的来源，本次缺失的来源（如请求失败）不计入 exited
+    """
+
+    def __init__(self, base: Optional[str] = None):
+        self.base = base
+        self.sources: Dict[int, int] = {}
+        self.entered: Dict[int, List[Entry]] = {}
+        self.exited: Dict[int, List[int]] = {}
+        self.changed: Dict[int, List[RankChange]] = {}
+        self.unchanged: List[int] = []
+        self.failed: List[int] = []
+
+    def changed_sources(self) -> List[int]:
+        return [
+            source_sid
+            for source_sid in self.sources
+            if source_sid in self.entered or source_sid in self.exited or source_sid in self.changed
+        ]
+
+
+def diff_states(previous: SnapshotState, current: SnapshotState, base: Optional[str]) -> SnapshotChanges:
+    changes = SnapshotChanges(base)
+    changes.sources = dict(current.sources)
+    changes.unchanged = list(current.unchanged)
+    changes.failed = list(current.failed)
+    for source_sid in current.sources:
+        old_entries = previous.entries.get(source_sid, {})
+        new_entries = current.entries[source_sid]
+        if old_entries is new_entries:
+            continue
+        entered = []
+        changed = []
+        for title_sid, entry in new_entries.items():
+            old = old_entries.get(title_sid)
+            if old is None:
+                entered.append(entry)
+            elif old != entry:
+                changed.append(
+                    (
+                        title_sid,
+                        old[1],
+                        entry[1],
+                        KEEP if entry[2] == old[2] else entry[2],
+                        KEEP if entry[3] == old[3] else entry[3],
+                        KEEP if entry[4] == old[4] else entry[4],
+                    )
+                )
+        exited = [title_sid for title_sid in old_entries if title_sid not in new_entries]
+        if entered:
+            changes.entered[source_sid] = entered
+        if exited:
+            changes.exited[source_sid] = exited
+        if changed:
+            changes.changed[source_sid] = changed
+    return changes
+
+
+def apply_changes(previous: SnapshotState, changes: SnapshotChanges) -> SnapshotState:
+    """在上一个快照上应用增量；没有变化的来源与上一个快照共享条目（状态视为只读）"""
+    state = SnapshotState()
+    state.sources = dict(changes.sources)
+    state.unchanged = list(changes.unchanged)
+    state.failed = list(changes.failed)
+    changed_sources = set(changes.changed_sources())
+    for source_sid in changes.sources:
+        entries = previous.entries.get(source_sid, {})
+        if source_sid in changed_sources:
+            entries = dict(entries)
+            for title_sid in changes.exited.get(source_sid, []):
+                del entries[title_sid]
+            for title_sid, _, rank, url_sid, mobile_sid, heat in changes.changed.get(source_sid, []):
+                old = entries[title_sid]
+                entries[title_sid] = (
+                    title_sid,
+                    rank,
+                    old[2] if url_sid == KEEP else url_sid,
+                    old[3] if mobile_sid == KEEP else mobile_sid,
+                    old[4] if heat == KEEP else heat,
+                )
+            for entry in changes.entered.get(source_sid, []):
+                entries[entry[0]] = entry
+            entries = dict(sorted(entries.items(), key=lambda item: item[1][1]))
+        state.entries[source_sid] = entries
+    return state
+
+
+def encode_changes(dictionary: StringDictionary, changes: SnapshotChanges) -> bytes:
+    out = bytearray(DELTA_MAGIC)
+    encode_varint(dictionary.intern(changes.base or ""), out)
+    encode_varint(len(changes.sources), out)
+    for source_sid, name_sid in changes.sources.items():
+        encode_varint(source_sid, out)
+        encode_varint(name_sid, out)
+
+    changed_sources = changes.changed_sources()
+    encode_varint(len(changed_sources), out)
+    for source_sid in changed_sources:
+        encode_varint(source_sid, out)
+        entered = changes.entered.get(source_sid, [])
+        encode_varint(len(entered), out)
+        for entry in entered:
+            _encode_entry(entry, out)
+        _encode_ids(changes.exited.get(source_sid, []), out)
+        changed = changes.changed.get(source_sid, [])
+        encode_varint(len(changed), out)
+        for title_sid, old_rank, rank, url_sid, mobile_sid, heat in changed:
+            encode_varint(title_sid, out)
+            encode_varint(rank, out)
+            shift = old_rank - rank
+            encode_varint(shift * 2 if shift >= 0 else -shift * 2 - 1, out)
+            mask = (url_sid != KEEP) | (mobile_sid != KEEP) << 1 | (heat != KEEP) << 2
+            encode_varint(mask, out)
+            if url_sid != KEEP:
+                encode_varint(url_sid, out)
+            if mobile_sid != KEEP:
+                encode_varint(mobile_sid, out)
+            if heat != KEEP:
+                encode_varint(0 if heat is None else heat + 1, out)
+
+    _encode_ids(changes.unchanged, out)
+    _encode_ids(changes.failed, out)
+    return bytes(out)
+
+
+def read_changes(path: Path, dictionary: StringDictionary) -> SnapshotChanges:
+    """读取增量快照记录的变化"""
+    data = as_path(path).read_bytes()
+    if not data.startswith(DELTA_MAGIC):
+        raise SnapshotFormatError(f"不是增量快照: {path}")
+    pos = len(DELTA_MAGIC)
+    base_sid, pos = decode_varint(data, pos)
+    changes = SnapshotChanges(dictionary.lookup(base_sid) or None)
+
+    source_count, pos = decode_varint(data, pos)
+    for _ in range(source_count):
+        source_sid, pos = decode_varint(data, pos)
+        changes.sources[source_sid], pos = decode_varint(data, pos)
+
+    changed_count, pos = decode_varint(data, pos)
+    for _ in range(changed_count):
+        source_sid, pos = decode_varint(data, pos)
+        count, pos = decode_varint(data, pos)
+        entered = []
+        for _ in range(count):
+            entry, pos = _decode_entry(data, pos)
+            entered.append(entry)
+        exited, pos = _decode_ids(data, pos)
+        count, pos = decode_varint(data, pos)
+        changed = []
+        for _ in range(count):
+            title_sid, pos = decode_varint(data, pos)
+            rank, pos = decode_varint(data, pos)
+            shift, pos = decode_varint(data, pos)
+            old_rank = rank + (shift // 2 if shift % 2 == 0 else -(shift + 1) // 2)
+            mask, pos = decode_varint(data, pos)
+            fields = []
+            for bit in range(3):
+                value = KEEP
+                if mask & (1 << bit):
+                    value, pos = decode_varint(data, pos)
+                    if bit == 2:
+                        value = value - 1 if value else None
+                fields.append(value)
+            changed.append((title_sid, old_rank, rank, fields[0], fields[1], fields[2]))
+        if entered:
+            changes.entered[source_sid] = entered
+        if exited:
+            changes.exited[source_sid] = exited
+        if changed:
+            changes.changed[source_sid] = changed
+
+    changes.unchanged, pos = _decode_ids(data, pos)
+    changes.failed, pos = _decode_ids(data, pos)
+    return changes
+
+
+def is_delta(path: Path) -> bool:
+    with as_path(path).open("rb") as f:
+        return f.read(len(DELTA_MAGIC)) == DELTA_MAGIC
+
+
+def snapshot_dir(date_dir: Path) -> Path:
+    return as_path(date_dir) / SNAPSHOT_DIR
+
+
+def open_dictionary(date_dir: Path) -> StringDictionary:
+    return StringDictionary(snapshot_dir(date_dir) / DICTIONARY_FILE)
+
+
+def list_snapshots(date_dir: Path) -> List[str]:
+    """返回日期目录下的快照时间（HH时MM分），按时间排序"""
+    directory = snapshot_dir(date_dir)
+    if not directory.exists():
+        return []
+    return sorted(f.stem for f in directory.glob(f"*{SNAPSHOT_SUFFIX}"))
+
+
+def iter_day_states(
+        date_dir: Path,
+        after: Optional[str] = None,
+        until: Optional[str] = None,
+        dictionary: Optional[StringDictionary] = None,
+        names: Optional[List[str]] = None,
+) -> Iterator[Tuple[str, SnapshotState, SnapshotChanges]]:
+    """
+    按时间顺序返回 (after, until] 范围内各快照的 (时间, 内容, 相对上一个快照的变化)；
+    从范围前最近的基准开始依次应用增量，基准快照的变化与上一个快照比较得到。
+    names 为已知的快照列表（如来自快照清单），省略时列出目录
+    """
+    dictionary = dictionary or open_dictionary(date_dir)
+    names = list_snapshots(date_dir) if names is None else names
+    wanted = [
+        name for name in names
+        if (after is None or name > after) and (until is None or name <= until)
+    ]
+    if not wanted:
+        return
+
+    directory = snapshot_dir(date_dir)
+    start = max(names.index(wanted[0]) - 1, 0)
+    while start > 0 and is_delta(directory / f"{names[start]}{SNAPSHOT_SUFFIX}"):
+        start -= 1
+
+    state = SnapshotState()
+    previous_name = None
+    for name in names[start:names.index(wanted[-1]) + 1]:
+        path = directory / f"{name}{SNAPSHOT_SUFFIX}"
+        if is_delta(path):
+            changes = read_changes(path, dictionary)
+            if changes.base != previous_name:
+                raise SnapshotFormatError(f"增量快照的基准不连续: {path}")
+            state = apply_changes(state, changes)
+        else:
+            current = SnapshotReader(path, dictionary).state()
+            changes = diff_states(state, current, previous_name)
+            state = current
+        previous_name = name
+        if name >= wanted[0]:
+            yield name, state, changes
+
+
+def iter_day(
+        date_dir: Path,
+        after: Optional[str] = None,
+        until: Optional[str] = None,
+        names: Optional[List[str]] = None,
+) -> Iterator[Tuple[str, Dict, Dict, List]]:
+    """按时间顺序返回 (time_name, titles_by_id, id_to_name, unchanged_ids)，与解析对应 txt 快照一致"""
+    dictionary = open_dictionary(date_dir)
+    for name, state, _ in iter_day_states(date_dir, after, until, dictionary, names):
+        yield (name,) + state.decode(dictionary)
+
+
+def load_snapshot(date_dir: Path, time_name: str) -> Tuple[Dict, Dict, List]:
+    """重建任意时刻的快照，返回 (titles_by_id, id_to_name, unchanged_ids)"""
+    names = [name for name in list_snapshots(date_dir) if name < time_name]
+    for name, titles_by_id, id_to_name, unchanged_ids in iter_day(
+            date_dir, after=names[-1] if names else None, until=time_name
+    ):
+        if name == time_name:
+            return titles_by_id, id_to_name, unchanged_ids
+    raise FileNotFoundError(f"快照不存在: {date_dir} {time_name}")
+
+
+def write_snapshot(
+        date_dir: Path,
+        time_name: str,
+        titles_by_id: Dict,
+        id_to_name: Dict,
+        unchanged_ids: Sequence[str] = (),
+        failed_ids: Sequence[str] = (),
+        dictionary: Optional[StringDictionary] = None,
+        base_interval: int = 0,
+        names: Optional[List[str]] = None,
+) -> Path:
+    """
+    写入 output/<日期>/snap/<时间>.snap，先追加字典再写快照，保证快照引用的字符串都已落盘
+
+    base_interval > 0 时写为相对上一个快照的增量，每 base_interval 个快照保存一次完整基准；
+    之后已有快照时（插入或改写历史快照）写为完整快照，紧随其后的增量快照改写为完整快照，
+    保证每个增量的基准都是前一个快照。字典为追加写入，多个进程写同一日期时需由调用方加锁（main.save_titles_to_file）
+    """
+    dictionary = dictionary or open_dictionary(date_dir)
+    state = SnapshotState.from_titles(dictionary, titles_by_id, id_to_name, unchanged_ids, failed_ids)
+
+    directory = snapshot_dir(date_dir)
+    names = list_snapshots(date_dir) if names is None else names
+    earlier = [name for name in names if name < time_name]
+    chain = 0
+    for name in reversed(earlier):
+        chain += 1
+        if not is_delta(directory / f"{name}{SNAPSHOT_SUFFIX}"):
+            break
+
+    if base_interval > 0 and earlier and chain < base_interval and names[-1] <= time_name:
+        previous = None
+        for _, previous, _ in iter_day_states(
+                date_dir,
+                after=earlier[-2] if len(earlier) > 1 else None,
+                until=earlier[-1],
+                dictionary=dictionary,
+                names=names,
+        ):
+            pass
+        payload = encode_changes(dictionary, diff_states(previous, state, earlier[-1]))
+    else:
+        payload = encode_snapshot(dictionary, state)
+    dictionary.flush()
+
+    later = [name for name in names if name > time_name]
+    if later and is_delta(directory / f"{later[0]}{SNAPSHOT_SUFFIX}"):
+        following = None
+        for _, following, _ in iter_day_states(
+                date_dir,
+                after=names[names.index(later[0]) - 1],
+                until=later[0],
+                dictionary=dictionary,
+                names=names,
+        ):
+            pass
+        atomic_write_bytes(
+            directory / f"{later[0]}{SNAPSHOT_SUFFIX}", encode_snapshot(dictionary, following)
+        )
+
+    path = directory / f"{time_name}{SNAPSHOT_SUFFIX}"
+    atomic_write_bytes(path, payload)
+    return path
+
+
+def read_snapshot(path: Path, dictionary: Optional[StringDictionary] = None) -> SnapshotReader:
+    """读取完整快照（增量快照用 load_snapshot / read_changes）"""
+    path = Path(path)
+    return SnapshotReader(path, dictionary or StringDictionary(path.parent / DICTIONARY_FILE))
+
+
+def latest_new_titles(
+        date_dir: Path,
+        platform_ids: Optional[List[str]] = None,
+        names: Optional[List[str]] = None,
+) -> Dict:
+    """
+    最新快照中当天首次出现的标题，结果与 detect_latest_new_titles 一致：
+    累积各快照新进入的标题作为已出现集合，只需处理变化的条目
+    """
+    names = list_snapshots(date_dir) if names is None else names
+    if len(names) < 2:
+        return {}
+
+    dictionary = open_dictionary(date_dir)
+    seen: Dict[int, Set[int]] = {}
+    latest = None
+    for name, _, changes in iter_day_states(date_dir, dictionary=dictionary, names=names):
+        if name == names[-1]:
+            latest = changes
+            break
+        for source_sid, entries in changes.entered.items():
+            seen.setdefault(source_sid, set()).update(entry[0] for entry in entries)
+
+    new_titles = {}
+    for source_sid, entries in latest.entered.items():
+        source_id = dictionary.lookup(source_sid)
+        if platform_ids is not None and source_id not in platform_ids:
+            continue
+        seen_titles = seen.get(source_sid, set())
+        source_new_titles = {
+            dictionary.lookup(entry[0]): entry_info(dictionary, entry)
+            for entry in entries
+            if entry[0] not in seen_titles
+        }
+        if source_new_titles:
+            new_titles[source_id] = source_new_titles
+    return new_titles
+
+
+def rank_movements(date_dir: Path, time_name: str) -> Dict[str, Dict[str, Tuple[int, int]]]:
+    """指定快照相对上一个快照的排名变化 {平台ID: {标题: (原排名, 新排名)}}"""
+    dictionary = open_dictionary(date_dir)
+    names = [name for name in list_snapshots(date_dir) if name < time_name]
+    movements = {}
+    for name, _, changes in iter_day_states(
+            date_dir, after=names[-1] if names else None, until=time_name, dictionary=dictionary
+    ):
+        for source_sid, changed in changes.changed.items():
+            moved = {
+                dictionary.lookup(title_sid): (old_rank, rank)
+                for title_sid, old_rank, rank, _, _, _ in changed
+                if old_rank != rank
+            }
+            if moved:
+                movements[dictionary.lookup(source_sid)] = moved
+    return movements
+
+
+def read_failed_ids(txt_file: Path) -> List[str]:
+    """读取 txt 快照末尾记录的失败来源（parse_snapshot_file 不返回这一部分）"""
+    from main import FAILED_IDS_HEADER
+
+    content = Path(txt_file).read_text(encoding="utf-8")
+    for section in content.split("\n\n"):
+        lines = section.strip().split("\n")
+        if lines[0] == FAILED_IDS_HEADER:
+            return [line.strip() for line in lines[1:] if line.strip()]
+    return []
+
+
+def convert_txt_day(date_dir: Path, base_interval: int = 0) -> List[Path]:
+    """把 <日期>/txt/*.txt 按时间顺序转换为二进制快照，返回生成的文件"""
+    from main import parse_snapshot_file
+
+    dictionary = open_dictionary(date_dir)
+    written = []
+    for txt_file in sorted((Path(date_dir) / "txt").glob("*.txt")):
+        titles_by_id, id_to_name, unchanged_ids = parse_snapshot_file(txt_file)
+        written.append(
+            write_snapshot(
+                date_dir,
+                txt_file.stem,
+                titles_by_id,
+                id_to_name,
+                unchanged_ids,
+                read_failed_ids(txt_file),
+                dictionary=dictionary,
+                base_interval=base_interval,
+            )
+        )
+    return written
+
+
+def convert_snap_day(date_dir: Path, target_dir: Optional[Path] = None) -> List[Path]:
+    """把 <日期>/snap/*.snap 还原为 txt 快照（默认写回 <日期>/txt），返回生成的文件"""
+    from main import format_snapshot_text
+
+    target_dir = Path(target_dir) if target_dir else Path(date_dir) / "txt"
+    dictionary = open_dictionary(date_dir)
+    written = []
+    for name, state, _ in iter_day_states(date_dir, dictionary=dictionary):
+        titles_by_id, id_to_name, unchanged_ids = state.decode(dictionary)
+        failed_ids = [dictionary.lookup(source_sid) for source_sid in state.failed]
+        txt_file = target_dir / f"{name}.txt"
+        atomic_write_text(
+            txt_file, format_snapshot_text(titles_by_id, id_to_name, failed_ids, unchanged_ids)
+        )
+        written.append(txt_file)
+    return written
+
+
+def main():
+    parser = argparse.ArgumentParser(description="二进制快照格式转换")
+    parser.add_argument("command", choices=["encode", "decode"], help="encode: txt → snap，decode: snap → txt")
+    parser.add_argument("date_dirs", nargs="+", help="日期目录，如 output/2026年02月20日")
+    parser.add_argument("--target", default="", help="decode 时的 txt 输出目录，默认写回日期目录下的 txt/")
+    parser.add_argument(
+        "--base-interval", type=int, default=0, help="encode 时每隔几个快照保存完整基准，0 为全部保存完整快照"
+    )
+    args = parser.parse_args()
+
+    for date_dir in map(Path, args.date_dirs):
+        if args.command == "encode":
+            files = convert_txt_day(date_dir, args.base_interval)
+        else:
+            files = convert_snap_day(date_dir, Path(args.target) if args.target else None)
+        print(f"{date_dir}: 已转换 {len(files)} 个快照")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,228 @@
+# coding=utf-8
+"""
+快照队列（本地 spool 目录）
+抓取进程每保存一份快照就发布一条消息，分析进程独立消费，渲染、AI 口播稿、截图和推送
+再慢也不会推迟下一次抓取。
+
+目录结构：
+  pending/     待处理消息，文件名按发布时间排序
+  processing/  已被分析进程认领、尚未确认的消息（进程异常退出后由 recover 放回 pending）
+  failed/      分析重试 max_attempts 次仍失败的消息（保留错误信息，便于排查后手动放回 pending）
+  metrics.json 发布/消费计数与延迟指标
+
+消息写入临时文件后重命名，认领通过 rename 完成，多个进程并发发布或认领也不会读到半条消息；
+指标的读取-修改-写入由文件锁串行，并发更新不会丢失计数。
+"""
+
+import json
+import os
+import time
+from pathlib import Path
+from typing import Dict, List, Optional, Tuple, Union
+
+from output_io import atomic_write_json, file_lock
+
+
+class SnapshotQueue:
+    """
+    基于目录的持久化队列
+
+    背压：待处理消息超过 max_pending 时丢弃最旧的消息，其快照记入新消息的 superseded_snapshots
+    （快照本身已写入 output）；消费端每次只处理最新一条，其余积压消息一并确认为已跳过，
+    被跳过的快照同样记录在所认领消息的 superseded_snapshots 中，分析时据此补齐
+    丢弃和跳过期间的新增标题，中间消息不会丢失数据。
+    分析失败的消息放回 pending 重试，超过 max_attempts 次后移入 failed。
+    """
+
+    def __init__(self, spool_dir: Union[str, Path], max_pending: int = 10, max_attempts: int = 3):
+        self.root = Path(spool_dir)
+        self.pending_dir = self.root / "pending"
+        self.processing_dir = self.root / "processing"
+        self.failed_dir = self.root / "failed"
+        self.metrics_file = self.root / "metrics.json"
+        self.metrics_lock_file = self.root / ".metrics.lock"
+        self.max_pending = max(1, int(max_pending))
+        self.max_attempts = max(1, int(max_attempts))
+        self.pending_dir.mkdir(parents=True, exist_ok=True)
+        self.processing_dir.mkdir(parents=True, exist_ok=True)
+
+    def _pending_files(self) -> List[Path]:
+        return sorted(self.pending_dir.glob("*.json"))
+
+    def publish(self, message: Dict) -> Path:
+        """
+        写入一条消息并返回其路径；队列已满时先丢弃最旧的消息，
+        被丢弃消息的快照按发布顺序记入新消息的 superseded_snapshots
+        """
+        now = time.time()
+        message = dict(message, published_at=now)
+        pending = self._pending_files()
+        dropped = 0
+        superseded = []
+        for stale in pending[: max(0, len(pending) - self.max_pending + 1)]:
+            stale_message = self._read_message(stale)
+            try:
+                stale.unlink()
+                dropped += 1
+            except FileNotFoundError:
+                # 已被消费端认领
+                continue
+            superseded.extend(self._snapshot_chain(stale_message))
+        if superseded:
+            message["superseded_snapshots"] = superseded + message.get("superseded_snapshots", [])
+        if dropped:
+            print(f"快照队列已满（上限 {self.max_pending}），丢弃最旧的 {dropped} 条消息")
+
+        # 微秒时间戳保证按文件名排序即发布顺序
+        name = f"{int(now * 1e6)}-{os.getpid()}.json"
+        path = self.pending_dir / name
+        atomic_write_json(path, message)
+
+        self._update_metrics(published=1, dropped=dropped, last_published_at=now)
+        return path
+
+    def claim_latest(self) -> Optional[Tuple[Path, Dict]]:
+        """
+        认领最新的一条消息，更早的积压消息视为已被取代并删除；
+        被取代消息的快照（含其中已记录的被取代快照）按发布顺序记入 message["superseded_snapshots"]
+
+        Returns:
+            (processing 中的路径, 消息)，队列为空时返回 None
+        """
+        files = self._pending_files()
+        while files:
+            latest = files.pop()
+            claimed = self.processing_dir / latest.name
+            try:
+                os.rename(latest, claimed)
+            except FileNotFoundError:
+                # 被其他消费进程抢先认领
+                continue
+            try:
+                with open(claimed, "r", encoding="utf-8") as f:
+                    message = json.load(f)
+            except (OSError, ValueError) as e:
+                print(f"读取快照消息失败，已丢弃: {claimed.name}（{e}）")
+                claimed.unlink(missing_ok=True)
+                files = self._pending_files()
+                continue
+            skipped = 0
+            superseded = []
+            for stale in files:
+                stale_message = self._read_message(stale)
+                try:
+                    stale.unlink()
+                    skipped += 1
+                except FileNotFoundError:
+                    # 已被其他消费进程认领，由其负责分析
+                    continue
+                superseded.extend(self._snapshot_chain(stale_message))
+            if superseded:
+                message["superseded_snapshots"] = superseded + message.get("superseded_snapshots", [])
+            lag = time.time() - message.get("published_at", time.time())
+            self._update_metrics(skipped=skipped, claim_lag=lag)
+            if skipped:
+                print(f"分析积压，跳过 {skipped} 条被取代的快照消息")
+            return claimed, message
+        return None
+
+    def ack(self, claimed: Path, message: Dict, processing_time: float) -> None:
+        """确认消息处理完成并记录端到端延迟"""
+        claimed.unlink(missing_ok=True)
+        lag = time.time() - message.get("published_at", time.time())
+        self._update_metrics(consumed=1, end_to_end_lag=lag, processing_time=processing_time)
+
+    def fail(self, claimed: Path, message: Dict, error: str) -> bool:
+        """
+        记录一次分析失败：未达到 max_attempts 时以原文件名放回 pending 重试（若已有更新的消息，
+        重试的消息会被取代，其快照并入更新消息的 superseded_snapshots），否则移入 failed。
+        返回是否会重试
+        """
+        attempts = message.get("attempts", 0) + 1
+        message = dict(message, attempts=attempts, last_error=error)
+        retry = attempts < self.max_attempts
+        target_dir = self.pending_dir if retry else self.failed_dir
+        atomic_write_json(target_dir / claimed.name, message)
+        claimed.unlink(missing_ok=True)
+        if retry:
+            self._update_metrics(retried=1)
+        else:
+            self._update_metrics(failed=1)
+            print(f"快照消息已重试 {attempts} 次仍失败，移入 {target_dir}: {claimed.name}")
+        return retry
+
+    def recover(self) -> int:
+        """把未确认的消息放回 pending（消费进程启动时调用），返回恢复的条数"""
+        recovered = 0
+        for claimed in sorted(self.processing_dir.glob("*.json")):
+            try:
+                os.rename(claimed, self.pending_dir / claimed.name)
+                recovered += 1
+            except FileNotFoundError:
+                pass
+        return recovered
+
+    def metrics(self) -> Dict:
+        """返回累计指标，并附上当前积压条数与最旧消息的等待时间（秒）"""
+        metrics = self._load_metrics()
+        files = self._pending_files()
+        metrics["pending"] = len(files)
+        metrics["oldest_pending_age"] = 0.0
+        if files:
+            try:
+                metrics["oldest_pending_age"] = round(time.time() - files[0].stat().st_mtime, 1)
+            except FileNotFoundError:
+                pass
+        return metrics
+
+    def format_metrics(self) -> str:
+        """格式化队列指标，用于日志输出"""
+        m = self.metrics()
+        return (
+            f"快照队列: 积压 {m['pending']} 条（最旧等待 {m['oldest_pending_age']:.1f} 秒），"
+            f"已发布 {m.get('published', 0)}，已消费 {m.get('consumed', 0)}，"
+            f"丢弃 {m.get('dropped', 0)}，跳过 {m.get('skipped', 0)}，"
+            f"重试 {m.get('retried', 0)}，失败 {m.get('failed', 0)}，"
+            f"最近认领延迟 {m.get('claim_lag', 0):.1f} 秒，"
+            f"最近端到端延迟 {m.get('end_to_end_lag', 0):.1f} 秒，"
+            f"最近处理耗时 {m.get('processing_time', 0):.1f} 秒"
+        )
+
+    @staticmethod
+    def _snapshot_chain(message: Optional[Dict]) -> List[str]:
+        """消息已取代的快照加上其自身的快照，按发布顺序排列"""
+        if not message:
+            return []
+        chain = list(message.get("superseded_snapshots", []))
+        if message.get("snapshot_file"):
+            chain.append(message["snapshot_file"])
+        return chain
+
+    @staticmethod
+    def _read_message(path: Path) -> Optional[Dict]:
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def _load_metrics(self) -> Dict:
+        try:
+            with open(self.metrics_file, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _update_metrics(self, **values) -> None:
+        """累加计数类指标（published/consumed/dropped/skipped/retried/failed），其余指标记录最近一次的值"""
+        try:
+            with file_lock(self.metrics_lock_file):
+                metrics = self._load_metrics()
+                for key, value in values.items():
+                    if key in ("published", "consumed", "dropped", "skipped", "retried", "failed"):
+                        metrics[key] = metrics.get(key, 0) + value
+                    else:
+                        metrics[key] = round(value, 3)
+                atomic_write_json(self.metrics_file, metrics)
+        except OSError as e:
+            print(f"保存快照队列指标失败: {e}")
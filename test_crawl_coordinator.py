@@ -0,0 +1,104 @@
+# coding=utf-8
+"""
+测试分片抓取协调存储：租约认领、过期重新认领，以及多个 worker 合并结果与单进程抓取一致
+"""
+
+import json
+import os
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+import main
+from crawl_coordinator import CrawlCoordinator
+from main import DataFetcher, NewsAnalyzer
+from newsnow_replay import RecordingStore
+
+PLATFORMS = [(f"source{i}", f"平台{i}") for i in range(7)]
+
+
+def test_lease_claim_and_expiry():
+    print("=== 测试1: 租约认领与过期 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        coordinator = CrawlCoordinator(Path(tmp) / "coordination.db", lease_ttl=60)
+        coordinator.start_run("run1", PLATFORMS)
+
+        first = coordinator.claim("run1", "a", 3, now=0)
+        second = coordinator.claim("run1", "b", 10, now=0)
+        assert [i for i, _ in first] == ["source0", "source1", "source2"]
+        assert [i for i, _ in second] == [f"source{i}" for i in range(3, 7)]
+        assert coordinator.claim("run1", "c", 10, now=1) == []
+
+        coordinator.complete("run1", "a", "source0", "success", {"标题": {"ranks": [1], "url": "", "mobileUrl": ""}})
+        coordinator.complete("run1", "a", "source1", "failed")
+        # worker a 异常退出：source2 的租约过期后由 c 重新认领
+        assert coordinator.claim("run1", "c", 10, now=61) == [("source2", "平台2")] + second
+        assert coordinator.progress("run1")[0] == 2
+
+        results, id_to_name, failed_ids, unchanged_ids, missing_ids = coordinator.merge("run1")
+        assert list(results) == ["source0"]
+        assert failed_ids == ["source1"]
+        assert missing_ids == [f"source{i}" for i in range(2, 7)]
+        assert id_to_name["source3"] == "平台3"
+        print("✅ 未完成的平台在租约过期后可被重新认领")
+
+
+def test_workers_merge_into_one_snapshot():
+    print("\n=== 测试2: 多 worker 合并结果 ===")
+    original_cwd = os.getcwd()
+    original_platforms = main.CONFIG["PLATFORMS"]
+    original_claim_size = main.CONFIG["SHARDING"]["CLAIM_SIZE"]
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            store = RecordingStore(Path(tmp) / "recordings")
+            for source_id, _ in PLATFORMS[:-1]:
+                store.save(
+                    source_id,
+                    json.dumps(
+                        {"status": "success", "items": [{"title": f"{source_id} 标题{n}"} for n in range(3)]}
+                    ).encode("utf-8"),
+                )
+            expected, _, expected_failed = DataFetcher(
+                replay_store=store, retry_budget=0
+            ).crawl_websites(PLATFORMS, request_interval=1)
+
+            main.CONFIG["PLATFORMS"] = [{"id": i, "name": name} for i, name in PLATFORMS]
+            main.CONFIG["SHARDING"]["CLAIM_SIZE"] = 2
+            coordinator = CrawlCoordinator(Path(tmp) / "coordination.db")
+
+            def run_worker():
+                analyzer = NewsAnalyzer()
+                analyzer.data_fetcher = DataFetcher(replay_store=store, retry_budget=0)
+                analyzer.run_worker(coordinator, "run1")
+
+            threads = [threading.Thread(target=run_worker) for _ in range(3)]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+            analyzer = NewsAnalyzer()
+            analyzer.coordinator = coordinator
+            analyzer.run_id = "run1"
+            results, id_to_name, failed_ids = analyzer._crawl_data()
+        finally:
+            main.CONFIG["PLATFORMS"] = original_platforms
+            main.CONFIG["SHARDING"]["CLAIM_SIZE"] = original_claim_size
+            os.chdir(original_cwd)
+
+        assert results == expected
+        assert failed_ids == expected_failed == ["source6"]
+        assert analyzer.data_fetcher.timed_out_ids == []
+        assert analyzer.data_fetcher.run_cache["source6"] == (None, "平台6")
+        print("✅ 合并快照与单进程抓取结果一致")
+
+
+if __name__ == "__main__":
+    test_lease_claim_and_expiry()
+    test_workers_merge_into_one_snapshot()
+    print("\n✅ 所有测试通过！")
@@ -0,0 +1,292 @@
+# coding=utf-8
+"""
+测试常驻模式：按变化率自适应的轮询间隔、缓存退避与上下限，同一分钟内多次轮询合并写入同一快照，
+生成 API 数据时不绕过调度器重新抓取，两次报告之间各次轮询的新增标题都被推送
+"""
+
+import json
+import os
+import sys
+import tempfile
+import time
+import types
+from datetime import datetime, timedelta
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+import main
+from main import (
+    FAILED_IDS_HEADER,
+    AdaptivePollScheduler,
+    DataFetcher,
+    NewsAnalyzer,
+    parse_snapshot_file,
+)
+from newsnow_replay import RecordingStore
+
+PLATFORMS = {
+    "weibo": {"id": "weibo", "name": "微博"},
+    "zhihu": {"id": "zhihu", "name": "知乎"},
+    "toutiao": {"id": "toutiao", "name": "今日头条"},
+}
+
+
+def make_titles(*names):
+    return {name: {"ranks": [1], "url": "", "mobileUrl": ""} for name in names}
+
+
+def test_interval_follows_churn():
+    print("=== 测试1: 轮询间隔随变化率调整 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        scheduler = AdaptivePollScheduler(
+            ["weibo", "zhihu"], min_interval=100, max_interval=1000, cache_backoff=1.5,
+            state_file=Path(tmp) / "poll_schedule.json",
+        )
+        assert scheduler.due_sources(0) == ["weibo", "zhihu"]
+
+        # 首次抓取没有可比较的标题，保持初始间隔
+        scheduler.record("weibo", make_titles("a", "b", "c", "d"), "success", 1000)
+        assert scheduler.stats["weibo"]["churn"] is None
+        assert scheduler.stats["weibo"]["interval"] == 550
+        assert scheduler.stats["weibo"]["next_poll"] == 1550
+
+        # 标题全部更新：变化率 100%，间隔降到下限
+        scheduler.record("weibo", make_titles("e", "f", "g", "h"), "success", 1550)
+        assert scheduler.stats["weibo"]["churn"] == 1.0
+        assert scheduler.stats["weibo"]["interval"] == 100
+
+        # 标题不变：变化率按平滑系数衰减到 50%，间隔回到中值
+        scheduler.record("weibo", make_titles("e", "f", "g", "h"), "success", 1650)
+        assert scheduler.stats["weibo"]["churn"] == 0.5
+        assert scheduler.stats["weibo"]["interval"] == 550
+
+        # 更新一半标题：变化率 (0.5 + 0.5) / 2
+        scheduler.record("weibo", make_titles("e", "f", "x", "y"), "success", 2200)
+        assert scheduler.stats["weibo"]["churn"] == 0.5
+        assert scheduler.due_sources(2200) == ["zhihu"]
+        assert scheduler.next_wakeup() == 0.0
+    print("✅ 变化快的来源间隔缩短，变化慢时间隔回升")
+
+
+def test_cache_backoff_and_clamping():
+    print("\n=== 测试2: 缓存退避与间隔上下限 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        state_file = Path(tmp) / "poll_schedule.json"
+        scheduler = AdaptivePollScheduler(
+            ["weibo", "zhihu"], min_interval=100, max_interval=1000, cache_backoff=1.5,
+            state_file=state_file,
+        )
+        # 内容未变化：按 cache_backoff 放大间隔，直至上限
+        scheduler.record("weibo", make_titles("a"), "unchanged", 0)
+        assert scheduler.stats["weibo"]["interval"] == 825
+        scheduler.record("weibo", make_titles("a"), "unchanged", 825)
+        assert scheduler.stats["weibo"]["interval"] == 1000
+
+        # 上游返回缓存数据时即使变化率高也不缩短间隔
+        scheduler.record("zhihu", make_titles("a", "b"), "success", 0)
+        scheduler.record("zhihu", make_titles("c", "d"), "cache", 550)
+        assert scheduler.stats["zhihu"]["churn"] == 1.0
+        assert scheduler.stats["zhihu"]["interval"] == 825
+
+        # 失败的抓取不更新变化率，按已有变化率安排下次轮询
+        scheduler.record("zhihu", None, None, 1375)
+        assert scheduler.stats["zhihu"]["churn"] == 1.0
+        assert scheduler.stats["zhihu"]["next_poll"] == 1475
+
+        # 持久化后重新加载：只保留当前配置的来源，越界的间隔被限制在新的上下限内
+        scheduler.stats["zhihu"]["interval"] = 10
+        scheduler.stats["zhihu"]["churn"] = None
+        scheduler.save()
+        reloaded = AdaptivePollScheduler(
+            ["zhihu", "baidu"], min_interval=200, max_interval=150, state_file=state_file
+        )
+        assert list(reloaded.stats) == ["zhihu", "baidu"]
+        assert reloaded.max_interval == 200
+        reloaded.record("zhihu", None, None, 0)
+        assert reloaded.stats["zhihu"]["interval"] == 200
+        reloaded.record("baidu", make_titles("a"), "cache", 0)
+        assert reloaded.stats["baidu"]["interval"] == 200
+        assert "zhihu(变化率 -, 间隔 200s)" in reloaded.summary()
+    print("✅ 未变化或缓存响应时退避，间隔始终在上下限之间")
+
+
+def make_store(root: Path) -> RecordingStore:
+    store = RecordingStore(root)
+    for source_id in ["weibo", "zhihu"]:
+        store.save(
+            source_id,
+            json.dumps(
+                {"status": "success", "items": [{"title": f"{source_id} 标题{n}"} for n in range(3)]},
+                ensure_ascii=False,
+            ).encode("utf-8"),
+        )
+    return store
+
+
+def test_same_minute_polls_are_merged():
+    print("\n=== 测试3: 同一分钟内的轮询合并为一个快照 ===")
+    original_cwd = os.getcwd()
+    original_time_filename = main.format_time_filename
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            analyzer = NewsAnalyzer()
+            analyzer.data_fetcher = DataFetcher(replay_store=make_store(Path(tmp) / "rec"), retry_budget=0)
+            minute_snapshot = {"path": None}
+
+            def poll(source_ids):
+                analyzer.data_fetcher.reset_run_cache()
+                results, id_to_name, failed_ids = analyzer._crawl_data(
+                    [PLATFORMS[source_id] for source_id in source_ids], save_snapshot=False
+                )
+                analyzer._save_minute_snapshot(minute_snapshot, results, id_to_name, failed_ids)
+                return Path(analyzer.snapshot_file)
+
+            main.format_time_filename = lambda: "09时00分"
+            first = poll(["weibo", "toutiao"])
+            second = poll(["zhihu"])
+            assert first == second
+            titles_by_id, id_to_name, _ = parse_snapshot_file(second)
+            assert sorted(titles_by_id) == ["weibo", "zhihu"]
+            assert id_to_name["weibo"] == "微博"
+            assert second.read_text(encoding="utf-8").endswith(f"{FAILED_IDS_HEADER}\ntoutiao\n")
+
+            # 新的一分钟只包含本分钟轮询的来源
+            main.format_time_filename = lambda: "09时01分"
+            third = poll(["zhihu"])
+            assert third != second
+            titles_by_id, _, _ = parse_snapshot_file(third)
+            assert list(titles_by_id) == ["zhihu"]
+            assert FAILED_IDS_HEADER not in third.read_text(encoding="utf-8")
+        finally:
+            main.format_time_filename = original_time_filename
+            os.chdir(original_cwd)
+    print("✅ 后一次轮询不会覆盖同一分钟内先前轮询的来源")
+
+
+def test_api_data_without_crawl():
+    print("\n=== 测试4: 生成 API 数据时不重新抓取 ===")
+    original_cwd = os.getcwd()
+    frequency_file = str(Path(__file__).parent / "config" / "frequency_words.txt")
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        os.environ["FREQUENCY_WORDS_PATH"] = frequency_file
+        try:
+            analyzer = NewsAnalyzer()
+            analyzer.data_fetcher = DataFetcher(retry_budget=0)
+
+            def no_crawl(*args, **kwargs):
+                raise AssertionError("常驻模式生成 API 数据时不应发起抓取")
+
+            analyzer.data_fetcher.crawl_websites = no_crawl
+            results = {"baidu": {"百度标题": {"ranks": [1], "url": "", "mobileUrl": ""}}}
+            main.save_titles_to_file(results, {"baidu": "百度热搜"}, ["toutiao"])
+            analyzer.data_fetcher.restore_run_snapshot(
+                results,
+                {"baidu": "百度热搜", "toutiao": "今日头条", "weibo": "微博"},
+                ["toutiao", "weibo", "example-rss"],
+                [],
+            )
+            analyzer.data_fetcher.timed_out_ids = ["weibo"]
+            api_data, _, _, failed_ids, _ = main.generate_api_data(analyzer, crawl=False)
+        finally:
+            os.environ.pop("FREQUENCY_WORDS_PATH", None)
+            main._daily_aggregate_cache.clear()
+            os.chdir(original_cwd)
+    # 失败来源取自运行缓存并限定在 API 来源内，超时的来源单独列出
+    assert failed_ids == api_data["failed_sources"] == ["toutiao"]
+    assert api_data["timed_out_sources"] == ["weibo"]
+    print("✅ 只读取已保存的快照，失败来源来自运行缓存，超时来源不计入失败")
+
+
+class StopDaemon(Exception):
+    pass
+
+
+def test_new_titles_between_reports():
+    print("\n=== 测试5: 两次报告之间的新增标题 ===")
+    original_cwd = os.getcwd()
+    original_time = main.time
+    original_time_filename = main.format_time_filename
+    original_platforms = main.CONFIG["PLATFORMS"]
+    original_daemon = dict(main.CONFIG["DAEMON"])
+    original_api_files = main.generate_static_api_files
+    original_compact = main.compact_output
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            store = RecordingStore(Path(tmp) / "rec")
+            recorded_at = datetime(2026, 1, 1, 9, 0, 0)
+            polls = [
+                ("09时00分", ["已有标题"]),
+                ("09时01分", ["已有标题", "第一次轮询的新标题"]),
+                ("09时02分", ["已有标题", "第一次轮询的新标题", "第二次轮询的新标题"]),
+            ]
+
+            # 每次唤醒时所有来源都已到期；报告间隔为 1.5 次唤醒，首次轮询后报告一次，再轮询两次后报告
+            step = original_daemon["MAX_INTERVAL"] + 1
+            main.CONFIG["DAEMON"]["REPORT_INTERVAL"] = step * 1.5
+            main.CONFIG["PLATFORMS"] = [PLATFORMS["weibo"]]
+            clock = {"now": step * 100.0, "poll": 0}
+
+            def next_poll():
+                time_name, titles = polls[clock["poll"]]
+                main.format_time_filename = lambda: time_name
+                payload = {"status": "success", "items": [{"title": title} for title in titles]}
+                store.save(
+                    "weibo",
+                    json.dumps(payload, ensure_ascii=False).encode("utf-8"),
+                    recorded_at + timedelta(minutes=clock["poll"]),
+                )
+
+            def fake_sleep(seconds):
+                clock["poll"] += 1
+                if clock["poll"] == len(polls):
+                    raise StopDaemon()
+                clock["now"] += step
+                next_poll()
+
+            main.time = types.SimpleNamespace(
+                time=lambda: clock["now"], monotonic=time.monotonic, sleep=fake_sleep
+            )
+            main.generate_static_api_files = lambda *args, **kwargs: None
+            main.compact_output = lambda *args, **kwargs: None
+
+            analyzer = NewsAnalyzer()
+            analyzer.report_mode = "incremental"
+            analyzer.data_fetcher = DataFetcher(replay_store=store, retry_budget=0)
+            reports = []
+            analyzer._execute_mode_strategy = lambda *args, **kwargs: reports.append(kwargs)
+
+            next_poll()
+            try:
+                analyzer.run_daemon()
+            except StopDaemon:
+                pass
+        finally:
+            main.time = original_time
+            main.format_time_filename = original_time_filename
+            main.CONFIG["PLATFORMS"] = original_platforms
+            main.CONFIG["DAEMON"].update(original_daemon)
+            main.generate_static_api_files = original_api_files
+            main.compact_output = original_compact
+            main._daily_aggregate_cache.clear()
+            os.chdir(original_cwd)
+
+    assert len(reports) == 2
+    assert reports[0]["new_titles"] is None and reports[0]["snapshot_time"] == "09时00分"
+    # 第二次报告覆盖期间的两次轮询，第一次轮询的新增标题不被漏推
+    assert reports[1]["snapshot_time"] == "09时02分"
+    assert sorted(reports[1]["new_titles"]["weibo"]) == ["第一次轮询的新标题", "第二次轮询的新标题"]
+    print("✅ 报告包含上次报告以来每次轮询的新增标题")
+
+
+if __name__ == "__main__":
+    test_interval_follows_churn()
+    test_cache_backoff_and_clamping()
+    test_same_minute_polls_are_merged()
+    test_api_data_without_crawl()
+    test_new_titles_between_reports()
+    print("\n✅ 所有测试通过！")
@@ -0,0 +1,151 @@
+# coding=utf-8
+"""
+测试持久化的当日聚合：每次运行只合并新增快照，结果与全量重新解析一致；
+聚合文件缺失、损坏或历史快照被改写时全量重建
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+import main
+from main import (
+    DAILY_AGGREGATE_FILE,
+    detect_latest_new_titles,
+    format_date_folder,
+    iter_snapshots,
+    process_source_data,
+    read_all_today_titles,
+    save_titles_to_file,
+)
+
+ID_TO_NAME = {"weibo": "微博", "zhihu": "知乎"}
+
+
+def make_results(index):
+    return {
+        "weibo": {
+            "常驻标题": {"ranks": [1], "url": "", "mobileUrl": "", "heat": 100 * index},
+            f"第{index}轮标题": {"ranks": [index + 1], "url": f"https://w/{index}", "mobileUrl": ""},
+        },
+        "zhihu": {f"知乎 {index % 2}": {"ranks": [1], "url": "", "mobileUrl": ""}},
+    }
+
+
+def full_rebuild(platform_ids=None):
+    """不使用聚合，按时间顺序重新解析全部快照"""
+    all_results, id_to_name, title_info = {}, {}, {}
+    for time_info, titles_by_id, file_id_to_name, unchanged_ids in iter_snapshots(
+            current_platform_ids=platform_ids
+    ):
+        id_to_name.update(file_id_to_name)
+        for source_id, title_data in titles_by_id.items():
+            process_source_data(
+                source_id, title_data, time_info, all_results, title_info,
+                unchanged=source_id in unchanged_ids,
+            )
+    return all_results, id_to_name, title_info
+
+
+def write_snapshot(index, unchanged_ids=None, extra=None):
+    path = Path("output") / format_date_folder() / "txt" / f"{index:02d}时00分.txt"
+    results = dict(make_results(index), **(extra or {}))
+    save_titles_to_file(results, ID_TO_NAME, [], unchanged_ids, file_path=str(path))
+    return path
+
+
+def count_parses():
+    parsed = []
+    parse_snapshot_file = main.parse_snapshot_file
+
+    def counting_parse(file_path):
+        parsed.append(Path(file_path).stem)
+        return parse_snapshot_file(file_path)
+
+    main.parse_snapshot_file = counting_parse
+    return parsed, parse_snapshot_file
+
+
+def new_process():
+    """模拟新一次运行：清空进程内缓存"""
+    main._daily_aggregate_cache.clear()
+
+
+def test_incremental_merge_matches_full_rebuild():
+    print("=== 测试1: 增量合并与全量重建一致 ===")
+    original_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            aggregate_path = Path("output") / format_date_folder() / DAILY_AGGREGATE_FILE
+            for index in range(1, 6):
+                write_snapshot(index, unchanged_ids=["zhihu"] if index == 3 else None)
+                new_process()
+                parsed, original_parse = count_parses()
+                try:
+                    result = read_all_today_titles()
+                    # 同一次运行内再次读取直接复用缓存
+                    weibo_result = read_all_today_titles(["weibo"])
+                finally:
+                    main.parse_snapshot_file = original_parse
+
+                # 基础聚合已覆盖此前的快照，本次只解析上一轮新增的快照和最新快照
+                expected_parsed = [f"{i:02d}时00分" for i in range(max(1, index - 1), index + 1)]
+                assert parsed == expected_parsed, (index, parsed)
+                assert result == full_rebuild(), index
+                assert weibo_result == full_rebuild(["weibo"]), index
+
+            stored = json.loads(aggregate_path.read_text(encoding="utf-8"))
+            assert [name for name, _ in stored["snapshots"]] == [f"{i:02d}时00分" for i in range(1, 5)]
+            assert detect_latest_new_titles() == {
+                "weibo": {"第5轮标题": {"ranks": [6], "url": "https://w/5", "mobileUrl": ""}}
+            }
+            print("✅ 每次运行只合并新增快照，结果与全量重建一致")
+        finally:
+            os.chdir(original_cwd)
+
+
+def test_rebuild_when_stale_or_corrupt():
+    print("\n=== 测试2: 聚合过期或损坏时重建 ===")
+    original_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            aggregate_path = Path("output") / format_date_folder() / DAILY_AGGREGATE_FILE
+            for index in range(1, 4):
+                write_snapshot(index)
+            new_process()
+            read_all_today_titles()
+
+            # 改写历史快照：记录的版本不再匹配，全量重建
+            write_snapshot(1, extra={"baidu": {"补录标题": {"ranks": [1], "url": "", "mobileUrl": ""}}})
+            new_process()
+            result = read_all_today_titles()
+            assert "baidu" in result[0]
+            assert result == full_rebuild()
+
+            # 重写最新快照不影响持久化的基础聚合
+            stored_before = aggregate_path.read_text(encoding="utf-8")
+            write_snapshot(3, extra={"toutiao": {"迟到标题": {"ranks": [1], "url": "", "mobileUrl": ""}}})
+            assert read_all_today_titles() == full_rebuild()
+            assert aggregate_path.read_text(encoding="utf-8") == stored_before
+
+            # 聚合文件损坏
+            aggregate_path.write_text("{broken", encoding="utf-8")
+            new_process()
+            assert read_all_today_titles() == full_rebuild()
+            json.loads(aggregate_path.read_text(encoding="utf-8"))
+            print("✅ 过期或损坏的聚合已重建，重写最新快照不影响基础聚合")
+        finally:
+            os.chdir(original_cwd)
+
+
+if __name__ == "__main__":
+    test_incremental_merge_matches_full_rebuild()
+    test_rebuild_when_stale_or_corrupt()
+    print("\n✅ 所有测试通过！")
@@ -0,0 +1,93 @@
+# coding=utf-8
+"""
+测试上游热度：从 extra 提取热度、写入快照并读回，以及按来源归一化后参与权重排序
+"""
+
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+import main
+from main import (
+    build_title_data,
+    count_word_frequency,
+    parse_file_titles,
+    parse_heat,
+    parse_newsnow_data,
+    save_titles_to_file,
+)
+
+
+def test_parse_heat():
+    print("=== 测试1: 提取热度 ===")
+    assert parse_heat(None) is None
+    assert parse_heat({"info": "1234万热度"}) == 12340000
+    assert parse_heat({"info": "热度 3.5亿"}) == 350000000
+    assert parse_heat({"info": "1,024 评论"}) == 1024
+    assert parse_heat({"info": "2小时前"}) is None
+    assert parse_heat({"hover": "说明", "views": 880}) == 880
+    print("✅ 数值字段与 info 文本均可识别，非互动数字被忽略")
+
+
+def test_heat_survives_snapshot():
+    print("\n=== 测试2: 热度写入快照并读回 ===")
+    _, records = parse_newsnow_data(
+        {
+            "status": "success",
+            "items": [
+                {"title": "有热度", "url": "https://example.com/1", "extra": {"info": "12万热度"}},
+                {"title": "无热度", "extra": {"icon": "hot.png"}},
+            ],
+        }
+    )
+    title_data = build_title_data(records)
+    assert title_data["有热度"]["heat"] == 120000
+    assert "heat" not in title_data["无热度"]
+
+    with tempfile.TemporaryDirectory() as tmp:
+        file_path = save_titles_to_file(
+            {"zhihu": title_data}, {"zhihu": "知乎"}, [], file_path=str(Path(tmp) / "snapshot.txt")
+        )
+        assert "1. 有热度 [URL:https://example.com/1] [HEAT:120000]" in Path(file_path).read_text(
+            encoding="utf-8"
+        )
+        titles_by_id, _ = parse_file_titles(Path(file_path))
+    assert titles_by_id["zhihu"] == title_data
+    print("✅ 快照读回的数据与写入前一致")
+
+
+def test_heat_orders_titles_per_source():
+    print("\n=== 测试3: 热度参与排序 ===")
+    results = {
+        "zhihu": {
+            "AI 排名靠前": {"ranks": [1], "url": "", "mobileUrl": "", "heat": 1000},
+            "AI 热度最高": {"ranks": [2], "url": "", "mobileUrl": "", "heat": 5000000},
+        },
+        "bilibili": {
+            "AI 视频": {"ranks": [1], "url": "", "mobileUrl": "", "heat": 300},
+        },
+    }
+    word_groups = [{"required": [], "normal": ["AI"], "group_key": "AI"}]
+    # heat_weight 默认为 0（不参与排序），这里显式启用
+    original_weight = main.CONFIG["WEIGHT_CONFIG"]["HEAT_WEIGHT"]
+    main.CONFIG["WEIGHT_CONFIG"]["HEAT_WEIGHT"] = 0.2
+    try:
+        stats, _ = count_word_frequency(
+            results, word_groups, [], {"zhihu": "知乎", "bilibili": "B站"}
+        )
+    finally:
+        main.CONFIG["WEIGHT_CONFIG"]["HEAT_WEIGHT"] = original_weight
+    titles = [entry["title"] for entry in stats[0]["titles"]]
+    # 热度按来源归一化：B站唯一的标题即为该来源最高热度，不因绝对值较小而靠后
+    assert titles == ["AI 视频", "AI 热度最高", "AI 排名靠前"], titles
+    print(f"✅ 排序结果: {titles}")
+
+
+if __name__ == "__main__":
+    test_parse_heat()
+    test_heat_survives_snapshot()
+    test_heat_orders_titles_per_source()
+    print("\n✅ 所有测试通过！")
@@ -0,0 +1,96 @@
+# coding=utf-8
+"""
+测试共享HTTP会话：会话复用、按主机挂载的连接池，以及连接复用统计（本地HTTP服务，无需联网）
+"""
+
+import sys
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+import http_session
+from http_session import (
+    DEFAULT_POOL_MAXSIZE,
+    PooledHTTPAdapter,
+    configure_session,
+    format_connection_stats,
+    get_connection_stats,
+    get_session,
+)
+
+
+class KeepAliveHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        body = b'{"status": "success"}'
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass
+
+
+def test_session_reuse_and_host_pools():
+    print("=== 测试1: 会话复用与按主机连接池 ===")
+    try:
+        session = configure_session(pool_maxsize=4, host_pool_sizes={"newsnow.example.com": 8})
+        assert get_session() is session
+        assert get_session() is get_session()
+
+        host_adapter = session.get_adapter("https://newsnow.example.com/api/s?id=weibo")
+        default_adapter = session.get_adapter("https://other.example.com/feed")
+        assert isinstance(host_adapter, PooledHTTPAdapter)
+        assert host_adapter is not default_adapter
+        assert host_adapter._pool_maxsize == 8
+        assert default_adapter._pool_maxsize == 4
+        assert session.get_adapter("http://newsnow.example.com/") is host_adapter
+
+        # 重新配置时替换共享会话并关闭旧会话的连接池
+        closed = []
+        session.close = lambda: closed.append(True)
+        replaced = configure_session(proxy_url="http://127.0.0.1:7890")
+        assert get_session() is replaced and replaced is not session
+        assert closed == [True]
+        assert replaced.proxies["https"] == "http://127.0.0.1:7890"
+    finally:
+        configure_session()
+    print("✅ 全局只有一个会话，指定主机使用单独的连接池")
+
+
+def test_connection_stats():
+    print("\n=== 测试2: 连接复用统计 ===")
+    server = ThreadingHTTPServer(("127.0.0.1", 0), KeepAliveHandler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    url = f"http://127.0.0.1:{server.server_address[1]}/api/s?id=weibo"
+    try:
+        http_session._stats.clear()
+        assert format_connection_stats() == "   • 连接复用: 无网络请求"
+
+        session = configure_session(pool_maxsize=DEFAULT_POOL_MAXSIZE)
+        for _ in range(3):
+            response = session.get(url, timeout=5)
+            assert response.json() == {"status": "success"}
+
+        stats = get_connection_stats()
+        assert stats == {"127.0.0.1": {"requests": 3, "new_connections": 1, "reused": 2}}
+        text = format_connection_stats()
+        assert "2/3 次请求复用了已有连接" in text
+        assert "127.0.0.1: 请求 3，新建连接 1，复用 2" in text
+    finally:
+        server.shutdown()
+        configure_session()
+        http_session._stats.clear()
+    print("✅ keep-alive 连接被复用，统计与实际请求一致")
+
+
+if __name__ == "__main__":
+    test_session_reuse_and_host_pools()
+    test_connection_stats()
+    print("\n✅ 所有测试通过！")
@@ -0,0 +1,183 @@
+# coding=utf-8
+"""
+测试上游镜像对冲请求与延迟选择（使用本地模拟的 newsnow 服务，无需联网）
+"""
+
+import json
+import sys
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Optional
+from urllib.parse import parse_qs, urlparse
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from main import DataFetcher, MirrorSelector, prepare_report_data, render_feishu_content
+
+
+def start_stub_server(
+        delay: float = 0.0,
+        status: str = "success",
+        source_delays: Optional[dict] = None,
+        request_log: Optional[list] = None,
+):
+    """
+    启动一个模拟 /api/s?id= 的本地服务，返回(server, base_url)；source_delays 为按来源单独设置的延迟，
+    request_log 记录收到的请求路径
+    """
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            if request_log is not None:
+                request_log.append(self.path)
+            source_id = parse_qs(urlparse(self.path).query).get("id", [""])[0]
+            time.sleep((source_delays or {}).get(source_id, delay))
+            body = json.dumps(
+                {
+                    "status": status,
+                    "id": source_id,
+                    "items": [{"title": f"{source_id} 标题{i}"} for i in range(1, 4)],
+                }
+            ).encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}"
+
+
+def test_hedged_request_uses_faster_mirror():
+    """主镜像超过对冲阈值时，应由第二个镜像返回"""
+    print("=== 测试1: 对冲请求 ===")
+    slow_server, slow_url = start_stub_server(delay=1.0)
+    fast_server, fast_url = start_stub_server()
+    try:
+        fetcher = DataFetcher(
+            mirror_selector=MirrorSelector([slow_url, fast_url]),
+            hedge_delay=100,
+            retry_budget=0,
+        )
+        start = time.time()
+        results, _, failed_ids = fetcher.crawl_websites(["weibo"], request_interval=1)
+        elapsed = time.time() - start
+
+        assert not failed_ids
+        assert list(results["weibo"].keys())[0] == "weibo 标题1"
+        assert elapsed < 0.9, f"对冲请求未生效，耗时 {elapsed:.2f}s"
+        # 两个镜像测得延迟后，快镜像成为主镜像
+        time.sleep(1.0)
+        assert fetcher.mirror_selector.ordered()[0] == fast_url
+        print(f"✅ 对冲请求生效，耗时 {elapsed:.2f}s")
+    finally:
+        slow_server.shutdown()
+        fast_server.shutdown()
+
+
+def test_fallback_when_primary_invalid():
+    """主镜像返回异常状态时，应立即改用下一个镜像"""
+    print("\n=== 测试2: 镜像失败回退 ===")
+    bad_server, bad_url = start_stub_server(status="error")
+    good_server, good_url = start_stub_server()
+    try:
+        fetcher = DataFetcher(
+            mirror_selector=MirrorSelector([bad_url, good_url]),
+            hedge_delay=5000,
+            retry_budget=0,
+        )
+        results, _, failed_ids = fetcher.crawl_websites(["zhihu"], request_interval=1)
+
+        assert not failed_ids
+        assert len(results["zhihu"]) == 3
+        assert fetcher.mirror_selector.ordered()[0] == good_url
+        print("✅ 主镜像失败后由备用镜像返回")
+    finally:
+        bad_server.shutdown()
+        good_server.shutdown()
+
+
+def test_losing_hedge_requests_are_cancelled():
+    """已有镜像返回后，仍在限速等待的对冲请求不再发出，关闭后线程池不再接受请求"""
+    print("\n=== 测试3: 取消落后的对冲请求 ===")
+    request_log = []
+    server, base_url = start_stub_server(delay=0.15, request_log=request_log)
+    try:
+        # 两个镜像位于同一主机，共享令牌桶：补发的请求需等待约 0.2s 才能发出
+        fetcher = DataFetcher(
+            mirror_selector=MirrorSelector([f"{base_url}/primary", f"{base_url}/backup"]),
+            hedge_delay=50,
+            host_rate_limit=5,
+            host_rate_burst=1,
+            retry_budget=0,
+        )
+        results, _, failed_ids = fetcher.crawl_websites(["weibo"], request_interval=1)
+        assert not failed_ids and len(results["weibo"]) == 3
+
+        time.sleep(0.4)
+        assert [path.split("?")[0] for path in request_log] == ["/primary/api/s"]
+
+        executor = fetcher.hedge_executor
+        fetcher.close()
+        assert fetcher.hedge_executor is None
+        try:
+            executor.submit(time.sleep, 0)
+        except RuntimeError:
+            pass
+        else:
+            raise AssertionError("关闭后的对冲线程池仍接受请求")
+        print("✅ 主镜像返回后备用镜像未收到请求，线程池已关闭")
+    finally:
+        server.shutdown()
+
+
+def test_crawl_deadline_reports_partial_results():
+    """超过抓取截止时间的平台记为超时而非失败，迟到的响应可在稍后收集"""
+    print("\n=== 测试4: 抓取截止时间 ===")
+    server, base_url = start_stub_server(source_delays={"slow": 1.0})
+    try:
+        fetcher = DataFetcher(
+            mirror_selector=MirrorSelector([base_url]), crawl_deadline=0.3
+        )
+        start = time.time()
+        results, _, failed_ids = fetcher.crawl_websites(["fast", "slow"], request_interval=1)
+        elapsed = time.time() - start
+
+        assert list(results.keys()) == ["fast"]
+        assert failed_ids == []
+        assert fetcher.timed_out_ids == ["slow"]
+        assert elapsed < 0.8, f"截止时间未生效，耗时 {elapsed:.2f}s"
+
+        # 同一次运行再次请求（如生成 API 数据）时，超时的平台仍不计入失败
+        _, _, failed_ids = fetcher.crawl_websites(["fast", "slow"], request_interval=1)
+        assert failed_ids == [] and fetcher.timed_out_ids == ["slow"]
+
+        report_data = prepare_report_data([], ["broken"], timed_out_ids=fetcher.timed_out_ids)
+        content = render_feishu_content(report_data)
+        assert "数据获取失败的平台" in content and "超时未返回的平台" in content
+
+        arrived = fetcher.collect_stragglers(timeout=5)
+        assert list(arrived.keys()) == ["slow"]
+        assert fetcher.timed_out_ids == []
+        assert fetcher.run_snapshot()[0]["slow"] == arrived["slow"]
+        print(f"✅ {elapsed:.2f}s 内返回部分结果，迟到的平台已补收")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_hedged_request_uses_faster_mirror()
+    test_fallback_when_primary_invalid()
+    test_losing_hedge_requests_are_cancelled()
+    test_crawl_deadline_reports_partial_results()
+    print("\n✅ 所有测试通过！")
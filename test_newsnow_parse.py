@@ -0,0 +1,100 @@
+# coding=utf-8
+"""
+测试 newsnow 响应解析：状态校验、缺失字段的默认值、重复标题合并排名，以及热度提取
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from main import TitleRecord, build_title_data, parse_heat, parse_newsnow_payload
+
+
+def test_payload_status_and_missing_fields():
+    print("=== 测试1: 状态校验与缺失字段 ===")
+    payload = json.dumps(
+        {
+            "status": "cache",
+            "items": [
+                {"title": "完整条目", "url": "https://e/1", "mobileUrl": "https://m.e/1", "extra": {"info": "5万热度"}},
+                {"title": "只有标题"},
+                {"title": "空 extra", "url": "https://e/3", "extra": {}},
+            ],
+        },
+        ensure_ascii=False,
+    ).encode("utf-8")
+    status, records = parse_newsnow_payload(payload)
+    assert status == "cache"
+    assert records == [
+        TitleRecord("完整条目", 1, "https://e/1", "https://m.e/1", {"info": "5万热度"}),
+        TitleRecord("只有标题", 2, "", "", None),
+        TitleRecord("空 extra", 3, "https://e/3", "", None),
+    ]
+
+    # 字符串与字节均可解析；缺少 items 时没有记录
+    assert parse_newsnow_payload('{"status": "success"}') == ("success", [])
+
+    for bad_payload in ['{"status": "error", "items": []}', '{"items": []}']:
+        try:
+            parse_newsnow_payload(bad_payload)
+        except ValueError as e:
+            assert "响应状态异常" in str(e)
+        else:
+            raise AssertionError(f"状态异常的响应应被拒绝: {bad_payload}")
+    print("✅ 缺失的 url/mobileUrl/extra 使用默认值，异常状态被拒绝")
+
+
+def test_duplicate_titles_merge_ranks():
+    print("\n=== 测试2: 重复标题合并排名 ===")
+    records = [
+        TitleRecord("重复标题", 1, "https://e/first", "", {"views": 300}),
+        TitleRecord("其他标题", 2),
+        TitleRecord("重复标题", 3, "https://e/second", "https://m.e/second", {"views": 900}),
+        TitleRecord("重复标题", 5),
+    ]
+    title_data = build_title_data(records)
+    assert list(title_data) == ["重复标题", "其他标题"]
+    # 排名依次追加，链接与热度保留首次出现时的值
+    assert title_data["重复标题"] == {
+        "ranks": [1, 3, 5],
+        "url": "https://e/first",
+        "mobileUrl": "",
+        "heat": 300,
+    }
+    assert title_data["其他标题"] == {"ranks": [2], "url": "", "mobileUrl": ""}
+    assert build_title_data([]) == {}
+    print("✅ 重复标题只保留一条，排名合并")
+
+
+def test_heat_extraction():
+    print("\n=== 测试3: 热度提取 ===")
+    # 数值字段按 HEAT_FIELDS 顺序优先
+    assert parse_heat({"views": 10, "heat": 20}) == 20
+    assert parse_heat({"hotValue": 12.7}) == 12
+    assert parse_heat({"heat": True, "comments": 8}) == 8
+    assert parse_heat({"heat": "1万", "info": "3k 评论"}) == 3000
+    # info 文本：单位换算、千分位、关键词
+    assert parse_heat({"info": "2.5亿 播放"}) == 250000000
+    assert parse_heat({"info": "12w"}) == 120000
+    assert parse_heat({"info": "3,201 likes"}) == 3201
+    assert parse_heat({"info": "置顶 · 88 讨论"}) == 88
+    # 无单位也无关键词的数字不视为热度
+    assert parse_heat({"info": "2小时前"}) is None
+    assert parse_heat({"info": "第 3 名"}) is None
+    assert parse_heat({"icon": "hot.png"}) is None
+    assert parse_heat({}) is None
+
+    title_data = build_title_data([TitleRecord("有热度", 1, extra={"info": "7万热度"}), TitleRecord("无热度", 2)])
+    assert title_data["有热度"]["heat"] == 70000
+    assert "heat" not in title_data["无热度"]
+    print("✅ 数值字段与 info 文本均可识别，无法识别时不写入热度")
+
+
+if __name__ == "__main__":
+    test_payload_status_and_missing_fields()
+    test_duplicate_titles_merge_ranks()
+    test_heat_extraction()
+    print("\n✅ 所有测试通过！")
@@ -0,0 +1,199 @@
+# coding=utf-8
+"""
+测试响应录制与回放（录制 → 回放后端 / 本地回放服务，无需联网）
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+import main
+from main import DataFetcher, MirrorSelector, NewsAnalyzer
+from newsnow_replay import RecordingStore, start_replay_server
+
+
+def make_payload(source_id: str, count: int = 3) -> bytes:
+    data = {
+        "status": "success",
+        "id": source_id,
+        "items": [{"title": f"{source_id} 标题{i}"} for i in range(1, count + 1)],
+    }
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+def test_record_then_replay():
+    """录制模式保存的原始响应，回放模式应得到相同的抓取结果"""
+    print("=== 测试1: 录制后回放 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        origin_store = RecordingStore(Path(tmp) / "origin")
+        origin_store.save("weibo", make_payload("weibo"))
+        server = start_replay_server(origin_store)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+
+        recorded_store = RecordingStore(Path(tmp) / "recorded")
+        try:
+            recorder = DataFetcher(
+                mirror_selector=MirrorSelector([base_url]),
+                recorder=recorded_store,
+                retry_budget=0,
+            )
+            live_results, _, _ = recorder.crawl_websites(["weibo"], request_interval=1)
+        finally:
+            server.shutdown()
+
+        assert len(recorded_store.recordings("weibo")) == 1
+
+        replayer = DataFetcher(replay_store=recorded_store, retry_budget=0)
+        replay_results, _, failed_ids = replayer.crawl_websites(
+            ["weibo", "zhihu"], request_interval=1
+        )
+        assert replay_results == live_results
+        assert failed_ids == ["zhihu"]
+        print("✅ 回放结果与录制时一致，无录制数据的平台记为失败")
+
+
+def test_failure_injection_is_deterministic():
+    """相同种子下回放服务注入的故障应完全一致"""
+    print("\n=== 测试2: 确定性故障注入 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = RecordingStore(Path(tmp))
+        ids = [f"source{i}" for i in range(8)]
+        for source_id in ids:
+            store.save(source_id, make_payload(source_id))
+
+        outcomes = []
+        for _ in range(2):
+            server = start_replay_server(store, failure_rate=0.5, seed=7)
+            base_url = f"http://127.0.0.1:{server.server_address[1]}"
+            try:
+                fetcher = DataFetcher(
+                    mirror_selector=MirrorSelector([base_url]), retry_budget=0
+                )
+                _, _, failed_ids = fetcher.crawl_websites(ids, request_interval=1)
+            finally:
+                server.shutdown()
+            outcomes.append(sorted(failed_ids))
+
+        assert outcomes[0] == outcomes[1]
+        assert 0 < len(outcomes[0]) < len(ids)
+        print(f"✅ 两次运行失败的平台一致: {outcomes[0]}")
+
+
+def test_run_cache_fetches_only_missing_ids():
+    """同一次运行内再次抓取时，只请求尚未获取的来源，快照为所有来源的并集"""
+    print("\n=== 测试3: 运行内抓取缓存 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = RecordingStore(Path(tmp))
+        for source_id in ["weibo", "zhihu", "baidu"]:
+            store.save(source_id, make_payload(source_id))
+
+        fetcher = DataFetcher(replay_store=store, retry_budget=0)
+        fetcher.crawl_websites(["weibo", "zhihu", "toutiao"], request_interval=1)
+        assert fetcher.fetched_ids == ["weibo", "zhihu", "toutiao"]
+
+        results, _, failed_ids = fetcher.crawl_websites(
+            [("zhihu", "知乎"), "baidu", "toutiao"], request_interval=1
+        )
+        assert fetcher.fetched_ids == ["baidu"]
+        assert list(results.keys()) == ["zhihu", "baidu"]
+        assert failed_ids == ["toutiao"]
+
+        snapshot_results, _, snapshot_failed, _ = fetcher.run_snapshot()
+        assert sorted(snapshot_results) == ["baidu", "weibo", "zhihu"]
+        assert snapshot_failed == ["toutiao"]
+
+        fetcher.reset_run_cache()
+        fetcher.crawl_websites(["weibo"], request_interval=1)
+        assert fetcher.fetched_ids == ["weibo"]
+        print("✅ 已获取的来源被复用，只抓取缺失的来源")
+
+
+def test_batch_fetch_with_fallback():
+    """批量接口返回的来源不再逐个请求；批量缺失的来源改为逐个请求"""
+    print("\n=== 测试4: 批量获取与回退 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = RecordingStore(Path(tmp))
+        ids = ["weibo", "zhihu", "baidu"]
+        for source_id in ids:
+            store.save(source_id, make_payload(source_id))
+        server = start_replay_server(store)
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            per_source = DataFetcher(mirror_selector=MirrorSelector([base_url]), retry_budget=0)
+            expected, _, _ = per_source.crawl_websites(ids, request_interval=1)
+
+            fetcher = DataFetcher(
+                mirror_selector=MirrorSelector([base_url]), batch_size=2, retry_budget=0
+            )
+            fallback_calls = []
+            fetch_all = fetcher._fetch_all
+
+            def record_fallback(id_values, *args):
+                fallback_calls.append(list(id_values))
+                return fetch_all(id_values, *args)
+
+            fetcher._fetch_all = record_fallback
+            results, _, failed_ids = fetcher.crawl_websites(
+                ids + ["toutiao"], request_interval=1
+            )
+        finally:
+            server.shutdown()
+
+        assert results == expected
+        assert failed_ids == ["toutiao"]
+        assert fallback_calls == [["toutiao"]]
+        print("✅ 批量获取结果与逐个请求一致，缺失来源已回退")
+
+
+def test_replay_ignores_crawl_state():
+    """回放模式不读取也不改写 output/.crawl_state 中线上运行留下的抓取状态"""
+    print("\n=== 测试5: 回放与抓取状态隔离 ===")
+    original_cwd = os.getcwd()
+    original_config = {key: main.CONFIG[key] for key in ("FETCH_MODE", "RECORDINGS_DIR", "SKIP_UNCHANGED")}
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            store = RecordingStore(Path(tmp) / "recordings")
+            store.save("weibo", make_payload("weibo"))
+            # 线上运行留下的状态：weibo 处于熔断中，且记录了不同的响应哈希
+            state_dir = Path(tmp) / "output" / ".crawl_state"
+            state_dir.mkdir(parents=True)
+            live_state = {
+                "source_health.json": {"weibo": {"consecutive_failures": 9, "open_until": 4e9}},
+                "payload_hashes.json": {"weibo": {"hash": "live", "titles": {}}},
+            }
+            for name, data in live_state.items():
+                (state_dir / name).write_text(json.dumps(data), encoding="utf-8")
+
+            main.CONFIG.update(FETCH_MODE="replay", RECORDINGS_DIR=str(store.root), SKIP_UNCHANGED=True)
+            analyzer = NewsAnalyzer()
+            analyzer.data_fetcher.retry_budget = 0
+            results, _, failed_ids = analyzer.data_fetcher.crawl_websites(
+                ["weibo", "zhihu"], request_interval=1
+            )
+            replay_state_dir = analyzer.crawl_state_dir
+        finally:
+            main.CONFIG.update(original_config)
+            os.chdir(original_cwd)
+
+        assert list(results) == ["weibo"] and failed_ids == ["zhihu"]
+        assert replay_state_dir != state_dir
+        assert sorted(f.name for f in state_dir.iterdir()) == sorted(live_state)
+        for name, data in live_state.items():
+            assert json.loads((state_dir / name).read_text(encoding="utf-8")) == data
+        assert (replay_state_dir / "source_health.json").exists()
+        print("✅ 回放使用独立的抓取状态目录，线上状态不受影响")
+
+
+if __name__ == "__main__":
+    test_record_then_replay()
+    test_failure_injection_is_deterministic()
+    test_run_cache_fetches_only_missing_ids()
+    test_batch_fetch_with_fallback()
+    test_replay_ignores_crawl_state()
+    print("\n✅ 所有测试通过！")
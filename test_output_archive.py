@@ -0,0 +1,183 @@
+# coding=utf-8
+"""
+测试旧日期目录归档：归档后历史快照、清单、当日聚合和报告仍可读取且结果不变，
+读取单个文件时只解压该成员；超过大小预算时从最早的日期开始归档，当天目录保留
+"""
+
+import sys
+import zipfile
+from datetime import date
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+import main
+import output_archive
+from test_title_store import ID_TO_NAME, SNAPSHOTS, storage_tempdir
+
+OLD_DAY = "2026年01月01日"
+TODAY = date(2026, 1, 20)
+REPORT = "html/当日汇总.html"
+
+
+def write_day(date_folder: str):
+    txt_dir = Path("output") / date_folder / "txt"
+    for time_name, results, unchanged_ids, failed_ids in SNAPSHOTS:
+        main.save_titles_to_file(
+            results, ID_TO_NAME, failed_ids, unchanged_ids,
+            file_path=str(txt_dir / f"{time_name}.txt"),
+        )
+    report = Path("output") / date_folder / REPORT
+    report.parent.mkdir(parents=True, exist_ok=True)
+    report.write_text(f"<html>{date_folder} 汇总</html>", encoding="utf-8")
+
+
+def read_day(date_folder: str):
+    main._daily_aggregate_cache.clear()
+    main.read_stored_section.cache_clear()
+    return (
+        main.list_snapshot_versions(date_folder),
+        list(main.iter_snapshots(date_folder)),
+        list(main.iter_snapshots(date_folder, ["weibo"], after="08时00分", until="08时30分")),
+        main.read_daily_aggregate(date_folder)["full"],
+    )
+
+
+def check_archived_day_reads_back():
+    write_day(OLD_DAY)
+    expected = read_day(OLD_DAY)
+    assert len(expected[0]) == len(SNAPSHOTS)
+
+    result = output_archive.compact_output(
+        Path("output"), TODAY, keep_days=7, prepare=main.load_manifest
+    )
+    assert result == {"archived": [OLD_DAY], "deleted": []}
+    assert not (Path("output") / OLD_DAY).exists()
+    assert main.is_day_archived(OLD_DAY)
+
+    main._manifest_cache.clear()
+    assert read_day(OLD_DAY) == expected
+    # 读取历史数据不会重新创建日期目录
+    assert not (Path("output") / OLD_DAY).exists()
+    assert OLD_DAY in main.load_output_index()["days"]
+
+    # 单个报告只解压对应成员
+    opened = []
+    original_open = zipfile.ZipFile.open
+
+    def tracking_open(self, name, *args, **kwargs):
+        opened.append(name if isinstance(name, str) else name.filename)
+        return original_open(self, name, *args, **kwargs)
+
+    zipfile.ZipFile.open = tracking_open
+    try:
+        report = output_archive.read_member(Path("output"), OLD_DAY, REPORT)
+    finally:
+        zipfile.ZipFile.open = original_open
+    assert report.decode("utf-8") == f"<html>{OLD_DAY} 汇总</html>"
+    assert opened == [REPORT]
+
+
+def test_archived_txt_day():
+    print("=== 测试1: 归档后读取 txt 快照（去重存储） ===")
+    with storage_tempdir(BACKEND="txt", DEDUP_SECTIONS=True):
+        check_archived_day_reads_back()
+    print("✅ 快照、清单、聚合和报告与归档前一致，只解压需要的文件")
+
+
+def test_archived_binary_day():
+    print("\n=== 测试2: 归档后读取二进制快照 ===")
+    with storage_tempdir(BACKEND="binary", WRITE_TXT=False):
+        check_archived_day_reads_back()
+    print("✅ 二进制快照直接从归档中按需读取")
+
+
+def test_size_budget_and_retention():
+    print("\n=== 测试3: 大小预算与归档保留期 ===")
+
+    def check():
+        days = ["2026年01月17日", "2026年01月18日", "2026年01月19日", "2026年01月20日"]
+        for date_folder in days:
+            write_day(date_folder)
+            (Path("output") / date_folder / "padding.bin").write_bytes(b"0" * 300 * 1024)
+
+        # 都在保留天数内，但总大小约 1.2MB 超出 0.8MB 预算：从最早的日期开始归档
+        result = output_archive.compact_output(
+            Path("output"), TODAY, keep_days=7, max_size_mb=0.8, prepare=main.load_manifest
+        )
+        assert result["archived"] == days[:2]
+        assert output_archive.tree_size(Path("output")) <= 0.8 * 1024 * 1024
+        loose, archived = output_archive.scan_output(Path("output"))
+        assert sorted(loose) == days[2:] and sorted(archived) == days[:2]
+
+        # 预算无法满足时当天目录仍保留
+        result = output_archive.compact_output(Path("output"), TODAY, keep_days=7, max_size_mb=0.01)
+        assert result["archived"] == [days[2]]
+        assert (Path("output") / days[3]).exists()
+
+        # 已有归档时合并迟到写入的文件
+        late = Path("output") / days[0] / "txt" / "23时59分.txt"
+        late.parent.mkdir(parents=True)
+        late.write_text("weibo | 微博\n1. 迟到的标题\n\n", encoding="utf-8")
+        output_archive.archive_day(Path("output"), days[0])
+        members = output_archive.list_members(Path("output"), days[0])
+        assert "txt/23时59分.txt" in members and REPORT in members
+
+        result = output_archive.compact_output(
+            Path("output"), TODAY, keep_days=7, archive_retention_days=1
+        )
+        assert result["deleted"] == days[:2]
+        assert not output_archive.is_archived(Path("output"), days[0])
+
+        # 向已归档的日期写入快照时先解压回日期目录，原有快照不丢失
+        expected = read_day(days[2])
+        time_name, results, unchanged_ids, failed_ids = SNAPSHOTS[-1]
+        main.save_titles_to_file(
+            results, ID_TO_NAME, failed_ids, unchanged_ids,
+            file_path=str(Path("output") / days[2] / "txt" / f"{time_name}.txt"),
+        )
+        assert not output_archive.is_archived(Path("output"), days[2])
+        assert read_day(days[2]) == expected
+
+    with storage_tempdir(BACKEND="txt", DEDUP_SECTIONS=True):
+        check()
+    print("✅ 超出预算时按日期顺序归档，过期归档被删除")
+
+
+def test_cli_compact_uses_pipeline_hooks():
+    print("\n=== 测试4: 命令行归档与抓取进程共用日期锁 ===")
+    original_argv = sys.argv
+    original_day_lock = main.day_lock
+    locked = []
+
+    def recording_day_lock(date_folder, shared=False):
+        locked.append((date_folder, shared))
+        return original_day_lock(date_folder, shared)
+
+    with storage_tempdir(BACKEND="txt", DEDUP_SECTIONS=True):
+        try:
+            write_day(OLD_DAY)
+            expected = read_day(OLD_DAY)
+            main._manifest_cache.clear()
+            main.day_lock = recording_day_lock
+            sys.argv = ["output_archive.py", "compact", "--keep-days", "7"]
+            output_archive.main()
+        finally:
+            main.day_lock = original_day_lock
+            sys.argv = original_argv
+
+        assert (OLD_DAY, False) in locked
+        assert main.is_day_archived(OLD_DAY)
+        main._manifest_cache.clear()
+        assert read_day(OLD_DAY) == expected
+        assert OLD_DAY in main.load_output_index()["days"]
+    print("✅ 命令行归档经 main.compact_output 执行，持有日期锁并刷新清单")
+
+
+if __name__ == "__main__":
+    test_archived_txt_day()
+    test_archived_binary_day()
+    test_size_budget_and_retention()
+    test_cli_compact_uses_pipeline_hooks()
+    print("\n✅ 所有测试通过！")
@@ -0,0 +1,158 @@
+# coding=utf-8
+"""
+测试多进程安全的输出写入：文件锁串行化读取-修改-写入，原子写入不会被读到半个文件，
+多个进程同时写同一日期的快照后清单、全局索引和二进制字典保持完整
+"""
+
+import multiprocessing
+import os
+import sys
+import tempfile
+import time
+from datetime import date
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+import main
+import output_archive
+from output_io import atomic_write_text, file_lock
+from snapshot_queue import SnapshotQueue
+from test_title_store import clear_read_caches, storage_tempdir
+
+PROCESSES = 4
+ROUNDS = 50
+DAY = "2026年01月01日"
+
+
+def increment_counter(counter: str) -> None:
+    for _ in range(ROUNDS):
+        with file_lock(counter + ".lock"):
+            # 可重入：同一线程嵌套获取同一把锁不会死锁
+            with file_lock(counter + ".lock"):
+                value = int(Path(counter).read_text())
+            atomic_write_text(counter, str(value + 1))
+
+
+def rewrite_file(path: str) -> None:
+    for i in range(ROUNDS):
+        atomic_write_text(path, str(i % 10) * 200_000)
+
+
+def publish_messages(spool_dir: str) -> None:
+    queue = SnapshotQueue(spool_dir, max_pending=1000)
+    for i in range(ROUNDS // 5):
+        queue.publish({"index": i})
+
+
+def write_snapshots(worker: int) -> None:
+    for i in range(5):
+        time_name = f"{worker:02d}时{i:02d}分"
+        main.save_titles_to_file(
+            {f"source{worker}": {f"进程{worker} 标题{i} {j}": {"ranks": [j + 1]} for j in range(20)}},
+            {f"source{worker}": f"来源{worker}"},
+            [],
+            file_path=str(Path("output") / DAY / "txt" / f"{time_name}.txt"),
+        )
+
+
+def read_while_archiving(started, snapshots) -> None:
+    # 持有当日共享锁期间两次读取，中间归档进程应等待而不是删除日期目录
+    with main.day_lock(DAY, shared=True):
+        first = list(main.iter_snapshots(DAY))
+        started.set()
+        time.sleep(0.5)
+        second = list(main.iter_snapshots(DAY))
+    snapshots.put(len(first) == len(second) == PROCESSES * 5)
+
+
+def run_processes(target, args_list):
+    context = multiprocessing.get_context("fork")
+    processes = [context.Process(target=target, args=args) for args in args_list]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+        assert process.exitcode == 0
+
+
+def test_lock_and_atomic_write():
+    print("=== 测试1: 文件锁与原子写入 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        counter = os.path.join(tmp, "counter")
+        Path(counter).write_text("0")
+        run_processes(increment_counter, [(counter,)] * PROCESSES)
+        assert Path(counter).read_text() == str(PROCESSES * ROUNDS)
+
+        # 写入期间读取方只会看到完整的文件
+        path = os.path.join(tmp, "report.html")
+        atomic_write_text(path, "0" * 200_000)
+        context = multiprocessing.get_context("fork")
+        writer = context.Process(target=rewrite_file, args=(path,))
+        writer.start()
+        reads = 0
+        while writer.is_alive() or reads == 0:
+            content = Path(path).read_text()
+            assert len(content) == 200_000 and content == content[0] * 200_000
+            reads += 1
+        writer.join()
+        assert not [name for name in os.listdir(tmp) if name.endswith(".tmp")]
+        print(f"✅ 并发累加无丢失，{reads} 次读取均为完整文件")
+
+
+def test_queue_metrics_across_processes():
+    print("\n=== 测试2: 多进程发布快照队列 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        run_processes(publish_messages, [(tmp,)] * PROCESSES)
+        metrics = SnapshotQueue(tmp).metrics()
+        assert metrics["published"] == metrics["pending"] == PROCESSES * ROUNDS // 5
+        print("✅ 发布计数与积压消息数一致")
+
+
+def test_concurrent_snapshot_writers():
+    print("\n=== 测试3: 多进程写入同一日期的快照 ===")
+    for backend in ["txt", "binary"]:
+        with storage_tempdir(BACKEND=backend, WRITE_TXT=False, DEDUP_SECTIONS=True):
+            run_processes(write_snapshots, [(worker,) for worker in range(PROCESSES)])
+
+            clear_read_caches()
+            time_names = main.list_snapshot_times(DAY)
+            assert len(time_names) == PROCESSES * 5
+            assert len(main.load_output_index()["days"][DAY]["snapshots"]) == PROCESSES * 5
+            for time_name, titles_by_id, _, _ in main.iter_snapshots(DAY):
+                worker, i = int(time_name[:2]), int(time_name[3:5])
+                assert titles_by_id[f"source{worker}"][f"进程{worker} 标题{i} 0"]["ranks"] == [1]
+        print(f"✅ {backend}: {PROCESSES} 个进程的快照全部记入清单且可完整读取")
+
+
+def test_archive_waits_for_readers():
+    print("\n=== 测试4: 归档等待正在读取的进程 ===")
+    with storage_tempdir(BACKEND="txt", WRITE_TXT=True, DEDUP_SECTIONS=True):
+        for worker in range(PROCESSES):
+            write_snapshots(worker)
+
+        context = multiprocessing.get_context("fork")
+        started = context.Event()
+        snapshots = context.Queue()
+        reader = context.Process(target=read_while_archiving, args=(started, snapshots))
+        reader.start()
+        assert started.wait(10)
+        start = time.time()
+        result = output_archive.compact_output(
+            Path("output"), date(2026, 2, 1), keep_days=7,
+            prepare=main.load_manifest, day_lock=main.day_lock,
+        )
+        waited = time.time() - start
+        reader.join()
+        assert reader.exitcode == 0 and snapshots.get(timeout=1)
+        assert result["archived"] == [DAY] and waited >= 0.3
+        print(f"✅ 归档等待读取结束（{waited:.2f} 秒）后才删除日期目录")
+
+
+if __name__ == "__main__":
+    test_lock_and_atomic_write()
+    test_queue_metrics_across_processes()
+    test_concurrent_snapshot_writers()
+    test_archive_waits_for_readers()
+    print("\n✅ 所有测试通过！")
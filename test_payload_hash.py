@@ -0,0 +1,125 @@
+# coding=utf-8
+"""
+测试响应哈希跳过：内容未变化的来源不再解析而复用上次的标题数据，未变化标记写入快照并读回，
+汇总时未变化的来源只更新出现时间和次数
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from main import (
+    UNCHANGED_IDS_HEADER,
+    DataFetcher,
+    PayloadHashStore,
+    parse_snapshot_file,
+    process_source_data,
+    save_titles_to_file,
+)
+from newsnow_replay import RecordingStore
+
+
+def make_payload(titles) -> bytes:
+    data = {"status": "success", "items": [{"title": title, "url": f"https://w/{title}"} for title in titles]}
+    return json.dumps(data, ensure_ascii=False).encode("utf-8")
+
+
+def test_unchanged_payload_is_skipped():
+    print("=== 测试1: 响应内容未变化时跳过解析 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        state_file = Path(tmp) / "payload_hashes.json"
+        store = RecordingStore(Path(tmp) / "recordings")
+        store.save("weibo", make_payload(["标题一", "标题二"]))
+        store.save("zhihu", make_payload(["知乎标题"]))
+
+        def crawl():
+            fetcher = DataFetcher(
+                replay_store=store, payload_store=PayloadHashStore(state_file), retry_budget=0
+            )
+            results, _, _ = fetcher.crawl_websites(["weibo", "zhihu"], request_interval=1)
+            return fetcher, results
+
+        fetcher, first = crawl()
+        assert fetcher.unchanged_ids == []
+        assert json.loads(state_file.read_text(encoding="utf-8"))["weibo"]["titles"] == first["weibo"]
+
+        # 新的运行从持久化记录中判断内容未变化，直接复用上次的标题数据
+        fetcher, second = crawl()
+        assert second == first
+        assert fetcher.unchanged_ids == ["weibo", "zhihu"]
+        assert fetcher.source_statuses == {"weibo": "unchanged", "zhihu": "unchanged"}
+        assert fetcher.run_snapshot()[3] == ["weibo", "zhihu"]
+
+        # 复用的是副本，修改结果不影响记录
+        second["weibo"]["标题一"]["ranks"].append(9)
+        assert PayloadHashStore(state_file).get_titles("weibo")["标题一"]["ranks"] == [1]
+
+        store.save("weibo", make_payload(["标题二", "新标题"]))
+        fetcher, third = crawl()
+        assert fetcher.unchanged_ids == ["zhihu"]
+        assert list(third["weibo"]) == ["标题二", "新标题"]
+    print("✅ 哈希一致的来源标记为未变化，内容变化后重新解析")
+
+
+def test_unchanged_ids_round_trip():
+    print("\n=== 测试2: 未变化标记写入快照并读回 ===")
+    results = {
+        "weibo": {"标题一": {"ranks": [1], "url": "https://w/1", "mobileUrl": ""}},
+        "zhihu": {"知乎标题": {"ranks": [1], "url": "", "mobileUrl": ""}},
+    }
+    with tempfile.TemporaryDirectory() as tmp:
+        path = save_titles_to_file(
+            results, {"weibo": "微博", "zhihu": "知乎"}, ["baidu"], ["zhihu"],
+            file_path=str(Path(tmp) / "09时00分.txt"),
+        )
+        text = Path(path).read_text(encoding="utf-8")
+        assert f"{UNCHANGED_IDS_HEADER}\nzhihu\n" in text
+        titles_by_id, id_to_name, unchanged_ids = parse_snapshot_file(Path(path))
+    assert titles_by_id == results
+    assert id_to_name == {"weibo": "微博", "zhihu": "知乎"}
+    assert unchanged_ids == ["zhihu"]
+    print("✅ 标题数据与未变化的来源列表读回后一致")
+
+
+def test_unchanged_source_updates_counts_only():
+    print("\n=== 测试3: 汇总时未变化的来源 ===")
+    all_results, title_info = {}, {}
+    first = {"标题一": {"ranks": [1], "url": "https://w/1", "mobileUrl": ""}}
+    # 当天首次出现的来源即使标记为未变化也按正常数据处理
+    process_source_data("weibo", first, "08时00分", all_results, title_info, unchanged=True)
+    assert title_info["weibo"]["标题一"]["count"] == 1
+
+    process_source_data(
+        "weibo", {"标题一": {"ranks": [1], "url": "https://w/1", "mobileUrl": ""}},
+        "08时30分", all_results, title_info, unchanged=True,
+    )
+    info = title_info["weibo"]["标题一"]
+    assert (info["first_time"], info["last_time"], info["count"]) == ("08时00分", "08时30分", 2)
+    assert all_results["weibo"]["标题一"]["ranks"] == [1]
+
+    # 含有未记录过的标题时退回完整合并
+    process_source_data(
+        "weibo",
+        {
+            "标题一": {"ranks": [3], "url": "", "mobileUrl": ""},
+            "标题二": {"ranks": [2], "url": "", "mobileUrl": ""},
+        },
+        "09时00分", all_results, title_info, unchanged=True,
+    )
+    assert title_info["weibo"]["标题一"]["count"] == 3
+    assert title_info["weibo"]["标题一"]["last_time"] == "09时00分"
+    assert all_results["weibo"]["标题一"]["ranks"] == [1, 3]
+    assert title_info["weibo"]["标题二"]["first_time"] == "09时00分"
+    assert title_info["weibo"]["标题二"]["count"] == 1
+    print("✅ 未变化的来源只更新出现时间和次数，出现新标题时完整合并")
+
+
+if __name__ == "__main__":
+    test_unchanged_payload_is_skipped()
+    test_unchanged_ids_round_trip()
+    test_unchanged_source_updates_counts_only()
+    print("\n✅ 所有测试通过！")
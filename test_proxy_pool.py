@@ -0,0 +1,92 @@
+# coding=utf-8
+"""
+测试代理池的评分分配、剔除与重新接纳（本地模拟代理，无需联网）
+"""
+
+import json
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from main import DataFetcher, MirrorSelector, ProxyPool
+from newsnow_replay import RecordingStore, start_replay_server
+
+
+def test_score_ejection_and_readmission():
+    print("=== 测试1: 评分、剔除与重新接纳 ===")
+    pool = ProxyPool(["http://a", "http://b"], eject_after=2, readmit_after=60)
+
+    # 未测量的代理优先试用，之后按延迟选择
+    first = pool.acquire(now=0)
+    pool.release(first, 0.5, now=0)
+    second = pool.acquire(now=0)
+    assert second != first
+    pool.release(second, 0.1, now=0)
+    assert pool.acquire(now=0) == second
+    pool.release(second, 0.1, now=0)
+
+    # 失败后评分上升，请求转向另一个代理；连续失败达到阈值后剔除，冷却期内不再分配
+    pool.in_flight[second] += 1
+    pool.release(second, None, now=1)
+    assert pool.acquire(now=1) == first
+    pool.release(first, 0.5, now=1)
+    pool.in_flight[second] += 1
+    pool.release(second, None, now=1)
+    assert second in pool.ejected_until
+    assert pool.acquire(now=2) == first
+    pool.release(first, 0.5, now=2)
+
+    # 冷却结束后重新接纳，再失败一次立即重新剔除
+    pool.acquire(now=100)
+    pool.release(first, 0.5, now=100)
+    assert second not in pool.ejected_until
+    pool.in_flight[second] += 1
+    pool.release(second, None, now=100)
+    assert second in pool.ejected_until
+    assert pool.stats[second]["ejections"] == 2
+    print(pool.summary())
+    print("✅ 评分分配、剔除与重新接纳符合预期")
+
+
+def test_crawl_routes_around_dead_proxy():
+    print("\n=== 测试2: 抓取绕开不可用代理 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = RecordingStore(Path(tmp))
+        ids = [f"source{i}" for i in range(6)]
+        for source_id in ids:
+            store.save(
+                source_id,
+                json.dumps({"status": "success", "items": [{"title": source_id}]}).encode(),
+            )
+        # 回放服务同时充当 HTTP 代理（代理请求的路径为完整URL，同样可被解析）
+        server = start_replay_server(store)
+        live_proxy = f"http://127.0.0.1:{server.server_address[1]}"
+        dead_proxy = "http://127.0.0.1:9"
+        try:
+            pool = ProxyPool([dead_proxy, live_proxy], eject_after=1, readmit_after=60)
+            fetcher = DataFetcher(
+                mirror_selector=MirrorSelector(["http://newsnow.invalid"]),
+                proxy_pool=pool,
+                max_concurrency=1,
+            )
+            results, _, failed_ids = fetcher.crawl_websites(
+                ids, request_interval=1, min_retry_wait=0.01, max_retry_wait=0.02
+            )
+        finally:
+            server.shutdown()
+
+        assert not failed_ids and len(results) == len(ids)
+        assert dead_proxy in pool.ejected_until
+        assert pool.stats[dead_proxy]["requests"] == 1
+        assert pool.stats[live_proxy]["requests"] == len(ids)
+        print(pool.summary())
+        print("✅ 不可用代理被剔除，其余请求全部经可用代理完成")
+
+
+if __name__ == "__main__":
+    test_score_ejection_and_readmission()
+    test_crawl_routes_around_dead_proxy()
+    print("\n✅ 所有测试通过！")
@@ -0,0 +1,144 @@
+# coding=utf-8
+"""
+测试单主机限速与并发抓取：令牌桶的突发与补充、按主机隔离（模拟时钟，不依赖实际耗时），
+以及并发完成顺序不同时结果仍按配置顺序输出
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from main import DataFetcher, HostRateLimiter, SourceAdapter, TitleRecord, TokenBucket
+
+
+class FakeClock:
+    """模拟时钟：sleep 只推进时间，不真正等待"""
+
+    def __init__(self):
+        self.now = 0.0
+        self.sleeps = []
+
+    def __call__(self) -> float:
+        return self.now
+
+    def sleep(self, seconds: float) -> None:
+        self.sleeps.append(seconds)
+        self.now += seconds
+
+
+def test_token_bucket_burst_and_refill():
+    print("=== 测试1: 令牌桶突发与补充 ===")
+    # 速率取 2 的幂，模拟时钟上的浮点运算没有舍入误差
+    clock = FakeClock()
+    bucket = TokenBucket(rate=8, capacity=2, clock=clock, sleep=clock.sleep)
+    # 满桶时可连续取出 capacity 个令牌
+    assert bucket.acquire() == 0 and bucket.acquire() == 0
+    assert clock.sleeps == []
+
+    # 令牌用完后按速率等待一个令牌的补充时间
+    assert bucket.acquire() == 0.125
+    assert clock.now == 0.125
+
+    # 空闲期间补充的令牌不超过容量
+    clock.now += 5
+    assert bucket.acquire() == 0 and bucket.acquire() == 0
+    assert bucket.acquire() == 0.125
+
+    # 10 秒内按 8 次/秒的速率最多取出 capacity + 80 个令牌
+    clock.now += 5
+    start = clock.now
+    granted = 0
+    while True:
+        bucket.acquire()
+        if clock.now - start > 10:
+            break
+        granted += 1
+    assert granted == 2 + 80, granted
+    print("✅ 连续取出 capacity 个令牌后按速率等待，补充量以容量为上限")
+
+
+def test_host_rate_limiter_isolation():
+    print("\n=== 测试2: 按主机隔离 ===")
+    clock = FakeClock()
+    limiter = HostRateLimiter(rate=4, burst=1, clock=clock, sleep=clock.sleep)
+    assert limiter.acquire("https://a.example.com/api/s?id=weibo") == 0
+    # 另一主机有独立的令牌桶，不受 a 的限速影响
+    assert limiter.acquire("https://b.example.com/api/s?id=weibo") == 0
+    # 同一主机的不同路径共享令牌桶
+    assert limiter.acquire("https://a.example.com/api/s?id=zhihu") == 0.25
+    assert sorted(limiter.buckets) == ["a.example.com", "b.example.com"]
+    print("✅ 同一主机共享令牌，不同主机互不影响")
+
+
+class BlockingAdapter(SourceAdapter):
+    """
+    前 3 个请求在屏障处会合（并发数不足 3 时屏障超时失败）；first 来源等其余来源全部到达后才返回，
+    完成顺序与配置顺序不同。记录同时进行的请求数
+    """
+
+    def __init__(self, first: str, concurrency: int):
+        self.first = first
+        self.barrier = threading.Barrier(concurrency)
+        self.release = threading.Event()
+        self.calls = 0
+        self.active = 0
+        self.max_active = 0
+        self.lock = threading.Lock()
+
+    def fetch(self, fetcher, id_value):
+        with self.lock:
+            self.calls += 1
+            at_barrier = self.calls <= self.barrier.parties
+            self.active += 1
+            self.max_active = max(self.max_active, self.active)
+        try:
+            if at_barrier:
+                self.barrier.wait(timeout=5)
+            if id_value == self.first:
+                assert self.release.wait(timeout=5), "其余来源未全部到达"
+            if id_value == "broken":
+                raise ConnectionError("模拟请求失败")
+            return "success", id_value, [TitleRecord(f"{id_value} 标题", 1)]
+        finally:
+            with self.lock:
+                self.active -= 1
+
+
+def test_concurrent_results_keep_config_order():
+    print("\n=== 测试3: 并发抓取的结果顺序 ===")
+    ids = ["s0", "s1", "broken", "s3", "s4", "s5"]
+    adapter = BlockingAdapter("s0", concurrency=3)
+    fetcher = DataFetcher(
+        adapters={id_value: adapter for id_value in ids},
+        max_concurrency=3,
+        retry_budget=0,
+    )
+    arrived = []
+
+    def on_source(id_value, _):
+        arrived.append(id_value)
+        if set(arrived) == {"s1", "s3", "s4", "s5"}:
+            adapter.release.set()
+
+    results, id_to_name, failed_ids = fetcher.crawl_websites(
+        ids, request_interval=1, on_source=on_source
+    )
+
+    assert list(results) == ["s0", "s1", "s3", "s4", "s5"]
+    assert list(id_to_name) == ids
+    assert failed_ids == ["broken"]
+    assert results["s3"] == {"s3 标题": {"ranks": [1], "url": "", "mobileUrl": ""}}
+    # s0 最后到达，但输出仍按配置顺序；并发数达到且不超过 max_concurrency
+    assert arrived[-1] == "s0" and sorted(arrived) == sorted(results)
+    assert adapter.max_active == 3
+    print(f"✅ 到达顺序 {arrived}，输出顺序与配置一致")
+
+
+if __name__ == "__main__":
+    test_token_bucket_burst_and_refill()
+    test_host_rate_limiter_isolation()
+    test_concurrent_results_keep_config_order()
+    print("\n✅ 所有测试通过！")
@@ -0,0 +1,119 @@
+# coding=utf-8
+"""
+测试 RSS/Atom 来源适配器：流式解析、条件请求（304 时跳过下载与解析），本地模拟订阅服务
+"""
+
+import sys
+import tempfile
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from main import DataFetcher, PayloadHashStore, build_source_adapters
+
+RSS_FEED = """<?xml version="1.0" encoding="utf-8"?>
+<rss version="2.0"><channel><title>示例</title>
+<item><title>第一条 RSS 新闻</title><link>https://example.com/rss/1</link></item>
+<item><title><![CDATA[第二条  RSS
+ 新闻]]></title><link>https://example.com/rss/2</link></item>
+<item><title>第一条 RSS 新闻</title><link>https://example.com/rss/1</link></item>
+</channel></rss>"""
+
+ATOM_FEED = """<?xml version="1.0" encoding="utf-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom"><title>示例</title>
+<entry><title>Atom 新闻</title>
+<link rel="enclosure" href="https://example.com/a.mp3"/>
+<link href="https://example.com/atom/1"/></entry>
+</feed>"""
+
+
+def start_feed_server(feeds: dict):
+    """启动模拟订阅服务，按路径返回 feeds 中的内容；If-None-Match 与 ETag 一致时返回 304"""
+    stats = {"200": 0, "304": 0}
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def do_GET(self):
+            body = feeds[self.path].encode("utf-8")
+            etag = f'"{hash(body) & 0xFFFFFFFF:x}"'
+            if self.headers.get("If-None-Match") == etag:
+                stats["304"] += 1
+                self.send_response(304)
+                self.send_header("ETag", etag)
+                self.end_headers()
+                return
+            stats["200"] += 1
+            self.send_response(200)
+            self.send_header("Content-Type", "application/xml")
+            self.send_header("Content-Length", str(len(body)))
+            self.send_header("ETag", etag)
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, *args):
+            pass
+
+    server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://127.0.0.1:{server.server_address[1]}", stats
+
+
+def test_conditional_get():
+    print("=== 测试: RSS/Atom 条件请求 ===")
+    feeds = {"/rss": RSS_FEED, "/atom": ATOM_FEED}
+    server, base_url, stats = start_feed_server(feeds)
+    platforms = [
+        {"id": "rss-demo", "name": "RSS 示例", "type": "rss", "url": f"{base_url}/rss"},
+        {"id": "atom-demo", "name": "Atom 示例", "type": "rss", "url": f"{base_url}/atom"},
+    ]
+    ids = [(p["id"], p["name"]) for p in platforms]
+    try:
+        with tempfile.TemporaryDirectory() as tmp:
+            store = PayloadHashStore(Path(tmp) / "payload_hashes.json")
+            fetcher = DataFetcher(
+                payload_store=store,
+                adapters=build_source_adapters(platforms),
+                retry_budget=0,
+            )
+            results, _, failed_ids = fetcher.crawl_websites(ids, request_interval=1)
+            assert not failed_ids
+            assert results["rss-demo"] == {
+                "第一条 RSS 新闻": {"ranks": [1, 3], "url": "https://example.com/rss/1", "mobileUrl": ""},
+                "第二条 RSS 新闻": {"ranks": [2], "url": "https://example.com/rss/2", "mobileUrl": ""},
+            }
+            assert results["atom-demo"] == {
+                "Atom 新闻": {"ranks": [1], "url": "https://example.com/atom/1", "mobileUrl": ""},
+            }
+            assert stats == {"200": 2, "304": 0}
+            print("✅ 首次抓取解析为 {title: {ranks, url, mobileUrl}}")
+
+            # 新的运行从持久化记录中读取校验头，订阅未更新时服务端返回 304
+            fetcher = DataFetcher(
+                payload_store=PayloadHashStore(Path(tmp) / "payload_hashes.json"),
+                adapters=build_source_adapters(platforms),
+                retry_budget=0,
+            )
+            second, _, _ = fetcher.crawl_websites(ids, request_interval=1)
+            assert second == results
+            assert fetcher.unchanged_ids == ["rss-demo", "atom-demo"]
+            assert stats == {"200": 2, "304": 2}
+            print("✅ 订阅未更新时返回 304，复用上次的标题数据")
+
+            feeds["/atom"] = ATOM_FEED.replace("Atom 新闻", "Atom 更新")
+            fetcher.reset_run_cache()
+            third, _, _ = fetcher.crawl_websites(ids, request_interval=1)
+            assert list(third["atom-demo"]) == ["Atom 更新"]
+            assert fetcher.unchanged_ids == ["rss-demo"]
+            assert stats == {"200": 3, "304": 3}
+            print("✅ 订阅更新后重新下载并解析")
+    finally:
+        server.shutdown()
+
+
+if __name__ == "__main__":
+    test_conditional_get()
+    print("\n✅ 所有测试通过！")
@@ -0,0 +1,96 @@
+# coding=utf-8
+"""
+测试快照去重：来源标题行按内容哈希只存一份，快照只写引用，读取时透明还原，分析结果与不去重时一致
+"""
+
+import sys
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+import main
+from main import SECTION_DIR, SECTION_REF_PREFIX, format_date_folder, parse_snapshot_file
+from test_title_store import ID_TO_NAME, SNAPSHOTS, analyze, storage_tempdir, write_snapshots
+
+
+def run_with_dedup(enabled: bool):
+    with storage_tempdir(BACKEND="txt", DEDUP_SECTIONS=enabled):
+        write_snapshots()
+        day_dir = Path("output") / format_date_folder()
+        snapshots = {f.name: parse_snapshot_file(f) for f in sorted((day_dir / "txt").glob("*.txt"))}
+        texts = [f.read_text(encoding="utf-8") for f in sorted((day_dir / "txt").glob("*.txt"))]
+        section_files = sorted((day_dir / SECTION_DIR).glob("*.txt"))
+        return snapshots, analyze(), texts, section_files, day_dir
+
+
+def test_dedup_is_transparent():
+    print("=== 测试: 去重存储与读取 ===")
+    expected_snapshots, expected_analysis, _, no_sections, _ = run_with_dedup(False)
+    snapshots, analysis, texts, section_files, _ = run_with_dedup(True)
+    assert not no_sections
+
+    assert snapshots == expected_snapshots
+    assert analysis == expected_analysis
+
+    # 3 个快照共 7 个来源，知乎两次内容相同，只存 6 份
+    source_count = sum(len(results) for _, results, _, _ in SNAPSHOTS)
+    assert sum(text.count(SECTION_REF_PREFIX) for text in texts) == source_count == 7
+    assert len(section_files) == 6
+    print("✅ 相同内容只存一份，读取结果与不去重时一致")
+
+
+def test_missing_section_is_skipped():
+    print("\n=== 测试: 引用内容缺失 ===")
+    with storage_tempdir(BACKEND="txt", DEDUP_SECTIONS=True):
+        path = main.save_titles_to_file(
+            {
+                "weibo": {"标题一": {"ranks": [1], "url": "", "mobileUrl": ""}},
+                "zhihu": {"标题二": {"ranks": [1], "url": "", "mobileUrl": ""}},
+            },
+            {"weibo": "微博", "zhihu": "知乎"},
+            [],
+        )
+        text = Path(path).read_text(encoding="utf-8")
+        digest = text.split("zhihu | 知乎\n" + SECTION_REF_PREFIX, 1)[1].split("\n", 1)[0]
+        (Path(path).parent.parent / SECTION_DIR / f"{digest}.txt").unlink()
+        main.read_stored_section.cache_clear()
+
+        titles_by_id, id_to_name, _ = parse_snapshot_file(Path(path))
+        assert list(titles_by_id) == ["weibo"]
+        assert id_to_name == {"weibo": "微博"}
+    print("✅ 缺失的引用内容被跳过，其余来源正常读取")
+
+
+def test_rewrite_removes_orphan_sections():
+    print("\n=== 测试: 改写快照后清理不再引用的内容 ===")
+    with storage_tempdir(BACKEND="txt", DEDUP_SECTIONS=True):
+        write_snapshots()
+        day_dir = Path("output") / format_date_folder()
+        before = {f.stem for f in (day_dir / SECTION_DIR).glob("*.txt")}
+
+        # 改写最新快照：微博内容变化，百度内容不变；原微博内容仅被该快照引用
+        time_name, results, unchanged_ids, failed_ids = SNAPSHOTS[-1]
+        rewritten = dict(results, weibo={"改写后的标题": {"ranks": [1], "url": "", "mobileUrl": ""}})
+        main.save_titles_to_file(
+            rewritten, ID_TO_NAME, failed_ids, unchanged_ids,
+            file_path=str(day_dir / "txt" / f"{time_name}.txt"),
+        )
+        after = {f.stem for f in (day_dir / SECTION_DIR).glob("*.txt")}
+        old_weibo = main.section_hash(main.format_source_section(results["weibo"]))
+        new_weibo = main.section_hash(main.format_source_section(rewritten["weibo"]))
+        assert after == before - {old_weibo} | {new_weibo}
+
+        # 其余快照引用的内容仍可读取
+        main.read_stored_section.cache_clear()
+        for earlier_time, earlier_results, _, _ in SNAPSHOTS[:-1]:
+            titles_by_id, _, _ = parse_snapshot_file(day_dir / "txt" / f"{earlier_time}.txt")
+            assert list(titles_by_id) == list(earlier_results)
+    print("✅ 只删除不再被任何快照引用的内容")
+
+
+if __name__ == "__main__":
+    test_dedup_is_transparent()
+    test_missing_section_is_skipped()
+    test_rewrite_removes_orphan_sections()
+    print("\n✅ 所有测试通过！")
@@ -0,0 +1,167 @@
+# coding=utf-8
+"""
+测试二进制快照：与 txt 快照互相转换结果一致，字典按天共享且只追加新字符串，读取时按来源延迟解码；
+增量快照可重建任意时刻，binary 后端的分析结果与 txt 后端一致
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+import main
+from main import format_date_folder, parse_snapshot_file, save_titles_to_file
+from snapshot_codec import (
+    convert_snap_day,
+    convert_txt_day,
+    is_delta,
+    list_snapshots,
+    load_snapshot,
+    open_dictionary,
+    rank_movements,
+    read_snapshot,
+    snapshot_dir,
+    write_snapshot,
+)
+from test_title_store import analyze, use_backend, write_snapshots
+
+ID_TO_NAME = {"weibo": "微博", "zhihu": "知乎", "baidu": "baidu"}
+
+
+def write_txt_snapshots(date_dir: Path):
+    save_titles_to_file(
+        {
+            "weibo": {
+                "AI 新进展": {"ranks": [1], "url": "https://w/1", "mobileUrl": "https://m.w/1", "heat": 1200000},
+                "股市收盘": {"ranks": [2], "url": "", "mobileUrl": ""},
+            },
+            "zhihu": {"如何看待大模型": {"ranks": [1], "url": "https://z/1", "mobileUrl": "", "heat": 0}},
+        },
+        ID_TO_NAME, ["toutiao"], [],
+        file_path=str(date_dir / "txt" / "08时00分.txt"),
+    )
+    save_titles_to_file(
+        {
+            "weibo": {
+                "股市收盘": {"ranks": [1], "url": "", "mobileUrl": ""},
+                "AI 新进展": {"ranks": [2], "url": "https://w/1", "mobileUrl": "https://m.w/1", "heat": 900},
+            },
+            "zhihu": {"如何看待大模型": {"ranks": [1], "url": "https://z/1", "mobileUrl": ""}},
+            "baidu": {"百度 新闻": {"ranks": [1], "url": "", "mobileUrl": ""}},
+        },
+        ID_TO_NAME, [], ["zhihu"],
+        file_path=str(date_dir / "txt" / "08时30分.txt"),
+    )
+
+
+def test_round_trip_and_shared_dictionary():
+    print("=== 测试1: txt 与二进制快照互相转换 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        date_dir = Path(tmp) / "2026年02月20日"
+        write_txt_snapshots(date_dir)
+        first, second = convert_txt_day(date_dir)
+
+        # 第一个快照写入 11 个字符串，第二个快照只新增百度的平台ID和标题
+        dictionary = open_dictionary(date_dir)
+        assert len(dictionary) == 13, len(dictionary)
+
+        for snap_file in (first, second):
+            txt_file = date_dir / "txt" / f"{snap_file.stem}.txt"
+            assert read_snapshot(snap_file).read() == parse_snapshot_file(txt_file)
+        assert read_snapshot(first).failed_ids == ["toutiao"]
+
+        restored = convert_snap_day(date_dir, Path(tmp) / "restored")
+        for txt_file in restored:
+            original = date_dir / "txt" / txt_file.name
+            assert txt_file.read_bytes() == original.read_bytes(), txt_file.name
+        print("✅ 转换结果与 txt 快照逐字节一致，字典只追加新字符串")
+
+
+def test_lazy_decoding():
+    print("\n=== 测试2: 按来源延迟解码 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        date_dir = Path(tmp) / "2026年02月20日"
+        write_txt_snapshots(date_dir)
+        _, snap_file = convert_txt_day(date_dir)
+
+        reader = read_snapshot(snap_file)
+        assert reader.source_ids == ["weibo", "zhihu", "baidu"]
+        assert reader.unchanged_ids == ["zhihu"]
+        assert not reader._decoded
+
+        assert list(reader.titles("baidu")) == ["百度 新闻"]
+        assert list(reader._decoded) == ["baidu"]
+        ranks = [rank for _, rank, _, _, _ in reader.iter_entries("weibo")]
+        assert ranks == [1, 2]
+        print("✅ 只解码访问到的来源")
+
+
+def test_delta_snapshots():
+    print("\n=== 测试3: 增量快照 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        date_dir = Path(tmp) / "2026年02月20日"
+        write_txt_snapshots(date_dir)
+        save_titles_to_file(
+            {"weibo": {"股市收盘": {"ranks": [3], "url": "", "mobileUrl": ""}, "新标题": {"ranks": [1], "url": "", "mobileUrl": ""}}},
+            ID_TO_NAME, ["zhihu"], [],
+            file_path=str(date_dir / "txt" / "09时00分.txt"),
+        )
+        snap_files = convert_txt_day(date_dir, base_interval=2)
+        assert [is_delta(f) for f in snap_files] == [False, True, False]
+
+        for name in list_snapshots(date_dir):
+            txt_file = date_dir / "txt" / f"{name}.txt"
+            assert load_snapshot(date_dir, name) == parse_snapshot_file(txt_file), name
+        assert rank_movements(date_dir, "08时30分") == {"weibo": {"股市收盘": (2, 1), "AI 新进展": (1, 2)}}
+        assert rank_movements(date_dir, "09时00分") == {"weibo": {"股市收盘": (1, 3)}}
+
+        restored = convert_snap_day(date_dir, Path(tmp) / "restored")
+        for txt_file in restored:
+            assert txt_file.read_bytes() == (date_dir / "txt" / txt_file.name).read_bytes()
+
+        # 改写非最新的快照（或多个进程乱序写入时插入快照）：后一个增量改写为完整快照，内容不变
+        write_snapshot(
+            date_dir, "08时00分", {"baidu": {"改写的标题": {"ranks": [1]}}}, ID_TO_NAME, base_interval=2
+        )
+        assert not is_delta(snapshot_dir(date_dir) / "08时30分.snap")
+        assert load_snapshot(date_dir, "08时30分") == parse_snapshot_file(date_dir / "txt" / "08时30分.txt")
+        print("✅ 任意时刻均可重建，排名变化直接从增量读取")
+
+
+def test_binary_backend_matches_txt():
+    print("\n=== 测试4: binary 后端与 txt 后端结果一致 ===")
+    original_cwd = os.getcwd()
+    original_storage = dict(main.CONFIG["STORAGE"])
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            use_backend("txt")
+            write_snapshots()
+            expected = [analyze(), analyze(["weibo", "baidu"])]
+
+            for txt_file in Path("output").glob("*/txt/*.txt"):
+                txt_file.unlink()
+            use_backend("binary", write_txt=False)
+            main.CONFIG["STORAGE"]["BASE_INTERVAL"] = 2
+            write_snapshots()
+            assert not list(Path("output").glob("*/txt/*.txt"))
+            snap_files = sorted(snapshot_dir(Path("output") / format_date_folder()).glob("*.snap"))
+            assert [is_delta(f) for f in snap_files] == [False, True, False]
+            actual = [analyze(), analyze(["weibo", "baidu"])]
+        finally:
+            main.CONFIG["STORAGE"].update(original_storage)
+            os.chdir(original_cwd)
+
+    assert actual == expected
+    print("✅ 当日汇总、新增标题和首次抓取判断均与 txt 后端一致")
+
+
+if __name__ == "__main__":
+    test_round_trip_and_shared_dictionary()
+    test_lazy_decoding()
+    test_delta_snapshots()
+    test_binary_backend_matches_txt()
+    print("\n✅ 所有测试通过！")
@@ -0,0 +1,110 @@
+# coding=utf-8
+"""
+测试快照清单：读取当日快照时只使用清单，一次运行最多列出一次快照目录；
+清单缺失或损坏时重建，重建结果与写入时记录的一致；全局索引按日期记录各快照
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+import main
+from main import (
+    MANIFEST_FILE,
+    OUTPUT_INDEX_FILE,
+    detect_latest_new_titles,
+    format_date_folder,
+    is_first_crawl_today,
+    list_output_days,
+    load_manifest,
+    read_all_today_titles,
+)
+from test_title_store import storage_tempdir, write_snapshots
+
+
+def run_readers():
+    main._daily_aggregate_cache.clear()
+    return read_all_today_titles(), detect_latest_new_titles(), is_first_crawl_today()
+
+
+def count_listings():
+    listed = []
+    iterdir = Path.iterdir
+
+    def counting_iterdir(self):
+        listed.append(self.name)
+        return iterdir(self)
+
+    Path.iterdir = counting_iterdir
+    return listed, iterdir
+
+
+def new_process():
+    main._manifest_cache.clear()
+    main._daily_aggregate_cache.clear()
+
+
+def test_readers_use_manifest():
+    print("=== 测试1: 读取快照只使用清单 ===")
+    with storage_tempdir():
+        write_snapshots()
+        date_folder = format_date_folder()
+        manifest = load_manifest(date_folder)
+        assert sorted(manifest["snapshots"]) == ["08时00分", "08时30分", "09时00分"]
+        assert manifest["snapshots"]["09时00分"]["sources"] == ["weibo", "baidu"]
+        assert manifest["snapshots"]["09时00分"]["titles"] == {"weibo": 2, "baidu": 2}
+
+        new_process()
+        listed, iterdir = count_listings()
+        try:
+            expected = run_readers()
+        finally:
+            Path.iterdir = iterdir
+        assert listed == [], listed
+
+        # 清单缺失：只列出一次目录并重建，重建结果与写入时一致
+        manifest_path = Path("output") / date_folder / MANIFEST_FILE
+        manifest_path.unlink()
+        new_process()
+        listed, iterdir = count_listings()
+        try:
+            assert run_readers() == expected
+            run_readers()
+        finally:
+            Path.iterdir = iterdir
+        assert listed == ["txt"], listed
+        assert json.loads(manifest_path.read_text(encoding="utf-8")) == manifest
+
+        # 清单损坏
+        manifest_path.write_text("{broken", encoding="utf-8")
+        new_process()
+        assert run_readers() == expected
+        assert load_manifest(date_folder) == manifest
+        print("✅ 读取只使用清单，清单缺失或损坏时重建一次")
+
+
+def test_output_index():
+    print("\n=== 测试2: 全局索引 ===")
+    with storage_tempdir():
+        write_snapshots()
+        date_folder = format_date_folder()
+        days = list_output_days()
+        assert days == [(main.get_beijing_time().strftime("%Y-%m-%d"), date_folder)]
+
+        index = json.loads((Path("output") / OUTPUT_INDEX_FILE).read_text(encoding="utf-8"))
+        snapshots = index["days"][date_folder]["snapshots"]
+        manifest = load_manifest(date_folder)
+        assert list(snapshots) == ["08时00分", "08时30分", "09时00分"]
+        assert snapshots["08时30分"] == {
+            "titles": 4, "hash": manifest["snapshots"]["08时30分"]["hash"],
+        }
+        print("✅ 全局索引按日期记录快照时间、标题数和内容哈希")
+
+
+if __name__ == "__main__":
+    test_readers_use_manifest()
+    test_output_index()
+    print("\n✅ 所有测试通过！")
@@ -0,0 +1,238 @@
+# coding=utf-8
+"""
+测试快照队列：发布、背压丢弃、消费端只处理最新快照、异常退出后恢复、分析失败后重试，
+抓取进程发布的消息内容，以及丢弃或跳过积压快照时补齐新增标题
+"""
+
+import json
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+import main
+from main import (
+    DataFetcher,
+    NewsAnalyzer,
+    detect_latest_new_titles,
+    detect_new_titles_since,
+    parse_file_titles,
+)
+from newsnow_replay import RecordingStore
+from snapshot_queue import SnapshotQueue
+from test_title_store import storage_tempdir, write_snapshots
+
+
+def test_backpressure_and_recovery():
+    print("=== 测试1: 背压与恢复 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = SnapshotQueue(Path(tmp) / "spool", max_pending=3)
+        for index in range(5):
+            queue.publish({"index": index})
+        metrics = queue.metrics()
+        assert metrics["pending"] == 3
+        assert metrics["published"] == 5 and metrics["dropped"] == 2
+
+        # 消费端只处理最新的一条，其余积压消息被跳过
+        claimed_path, message = queue.claim_latest()
+        assert message["index"] == 4
+        assert queue.metrics()["pending"] == 0
+        assert queue.metrics()["skipped"] == 2
+
+        # 未确认的消息在消费进程重启后恢复
+        assert queue.recover() == 1
+        claimed_path, message = queue.claim_latest()
+        assert message["index"] == 4
+        queue.ack(claimed_path, message, processing_time=0.5)
+        assert queue.claim_latest() is None
+
+        metrics = queue.metrics()
+        assert metrics["consumed"] == 1 and metrics["processing_time"] == 0.5
+        assert metrics["end_to_end_lag"] >= 0
+        print(queue.format_metrics())
+        print("✅ 积压超限丢弃最旧消息，未确认消息可恢复")
+
+
+def test_crawl_only_then_consume():
+    print("\n=== 测试2: 抓取进程发布，分析进程消费 ===")
+    original_cwd = os.getcwd()
+    original_platforms = main.CONFIG["PLATFORMS"]
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            store = RecordingStore(Path(tmp) / "recordings")
+            for source_id in ["weibo", "zhihu"]:
+                store.save(
+                    source_id,
+                    json.dumps(
+                        {"status": "success", "items": [{"title": f"{source_id} 标题{n}"} for n in range(3)]},
+                        ensure_ascii=False,
+                    ).encode("utf-8"),
+                )
+            main.CONFIG["PLATFORMS"] = [
+                {"id": "weibo", "name": "微博"},
+                {"id": "zhihu", "name": "知乎"},
+                {"id": "toutiao", "name": "今日头条"},
+            ]
+            queue = SnapshotQueue(Path(tmp) / "spool")
+
+            crawler = NewsAnalyzer()
+            crawler.data_fetcher = DataFetcher(replay_store=store, retry_budget=0)
+            crawler.run_crawl_only(queue)
+
+            analyzed = []
+            consumer = NewsAnalyzer()
+            consumer._analyze_snapshot_message = lambda strategy, message: analyzed.append(message)
+            consumer.run_consumer(queue, once=True)
+        finally:
+            main.CONFIG["PLATFORMS"] = original_platforms
+            os.chdir(original_cwd)
+
+        assert len(analyzed) == 1
+        message = analyzed[0]
+        assert sorted(message["results"]) == ["weibo", "zhihu"]
+        assert message["failed_ids"] == ["toutiao"]
+        assert message["id_to_name"]["zhihu"] == "知乎"
+        assert queue.metrics()["consumed"] == 1
+        print("✅ 消息包含完整抓取结果，分析进程已消费")
+
+
+def test_consumer_reuses_message_results():
+    print("\n=== 测试3: 分析进程不重复抓取 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        snapshot = Path(tmp) / "12时00分.txt"
+        results = {"weibo": {"标题": {"ranks": [1], "url": "", "mobileUrl": ""}}}
+        main.save_titles_to_file(results, {"weibo": "微博"}, ["zhihu"], file_path=str(snapshot))
+        fetcher = DataFetcher(retry_budget=0)
+        fetcher.restore_run_snapshot(results, {"weibo": "微博"}, ["zhihu"], [])
+        cached, _, failed_ids = fetcher.crawl_websites(["weibo", "zhihu"], request_interval=1)
+        assert fetcher.fetched_ids == []
+        assert cached == parse_file_titles(snapshot)[0]
+        assert failed_ids == ["zhihu"]
+        print("✅ 消息中的结果填充运行缓存，生成 API 数据时不再发起请求")
+
+
+def test_superseded_snapshots_and_retry():
+    print("\n=== 测试4: 记录被跳过的快照，失败消息重试 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        queue = SnapshotQueue(Path(tmp) / "spool", max_attempts=2)
+        for time_name in ["08时00分", "08时30分", "09时00分"]:
+            queue.publish({"snapshot_file": f"output/day/txt/{time_name}.txt"})
+
+        claimed_path, message = queue.claim_latest()
+        assert message["snapshot_file"].endswith("09时00分.txt")
+        assert message["superseded_snapshots"] == [
+            "output/day/txt/08时00分.txt", "output/day/txt/08时30分.txt"
+        ]
+
+        # 第一次失败放回 pending，被更新的消息取代时其快照一并记录
+        assert queue.fail(claimed_path, message, "渲染失败")
+        queue.publish({"snapshot_file": "output/day/txt/09时30分.txt"})
+        claimed_path, message = queue.claim_latest()
+        assert message["superseded_snapshots"] == [
+            "output/day/txt/08时00分.txt", "output/day/txt/08时30分.txt", "output/day/txt/09时00分.txt"
+        ]
+
+        # 达到 max_attempts 后移入 failed
+        assert queue.fail(claimed_path, message, "渲染失败")
+        claimed_path, message = queue.claim_latest()
+        assert message["attempts"] == 1
+        assert not queue.fail(claimed_path, message, "推送失败")
+        assert queue.claim_latest() is None
+        failed = list((Path(tmp) / "spool" / "failed").glob("*.json"))
+        assert len(failed) == 1
+        assert json.loads(failed[0].read_text(encoding="utf-8"))["last_error"] == "推送失败"
+        metrics = queue.metrics()
+        assert metrics["retried"] == 2 and metrics["failed"] == 1 and metrics.get("consumed", 0) == 0
+        print("✅ 被取代的快照随最新消息传递，失败消息重试后移入 failed")
+
+
+def test_new_titles_since_skipped_snapshots():
+    print("\n=== 测试5: 跳过积压快照时的新增标题 ===")
+    original_cwd = os.getcwd()
+    original_storage = dict(main.CONFIG["STORAGE"])
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            main.CONFIG["STORAGE"].update(BACKEND="txt")
+            main._manifest_cache.clear()
+            main._daily_aggregate_cache.clear()
+            write_snapshots()
+            latest_only = detect_latest_new_titles()
+            since_skipped = detect_new_titles_since("08时30分", "09时00分")
+        finally:
+            main.CONFIG["STORAGE"].update(original_storage)
+            main._manifest_cache.clear()
+            main._daily_aggregate_cache.clear()
+            os.chdir(original_cwd)
+
+    # 百度 新闻 首次出现在被跳过的 08时30分 快照，只检测最新快照时会漏掉
+    assert "百度 新闻" not in latest_only["baidu"]
+    assert sorted(since_skipped["baidu"]) == ["百度 另一条", "百度 新闻"]
+    assert since_skipped["baidu"]["百度 新闻"]["url"] == "https://b/1"
+    assert since_skipped["weibo"] == latest_only["weibo"]
+    assert "zhihu" not in since_skipped
+    print("✅ 跳过期间首次出现的标题全部计入新增")
+
+
+def test_dropped_snapshots_keep_new_titles():
+    print("\n=== 测试6: 背压丢弃的快照中的新增标题 ===")
+    original_api_files = main.generate_static_api_files
+    original_compact = main.compact_output
+    try:
+        main.generate_static_api_files = lambda *args, **kwargs: None
+        main.compact_output = lambda *args, **kwargs: None
+        with storage_tempdir(BACKEND="txt"):
+            txt_dir = Path("output") / main.format_date_folder() / "txt"
+            snapshots = [
+                ("07时00分", ["旧标题"]),
+                ("08时00分", ["旧标题", "只在第一份出现的标题"]),
+                ("08时30分", ["旧标题"]),
+                ("09时00分", ["旧标题", "最新标题"]),
+            ]
+            queue = SnapshotQueue(Path("spool"), max_pending=1)
+            for index, (time_name, titles) in enumerate(snapshots):
+                results = {"weibo": {title: {"ranks": [1], "url": "", "mobileUrl": ""} for title in titles}}
+                path = main.save_titles_to_file(
+                    results, {"weibo": "微博"}, [], file_path=str(txt_dir / f"{time_name}.txt")
+                )
+                # 07时00分 的快照已在此前分析过，只发布之后的三份
+                if index:
+                    queue.publish(
+                        {
+                            "snapshot_file": path,
+                            "results": results,
+                            "id_to_name": {"weibo": "微博"},
+                            "failed_ids": [],
+                            "timed_out_ids": [],
+                            "unchanged_ids": [],
+                        }
+                    )
+            assert queue.metrics()["dropped"] == 2
+
+            claimed_path, message = queue.claim_latest()
+            assert [Path(path).stem for path in message["superseded_snapshots"]] == ["08时00分", "08时30分"]
+
+            analyzer = NewsAnalyzer()
+            reports = []
+            analyzer._execute_mode_strategy = lambda *args, **kwargs: reports.append(kwargs)
+            analyzer._analyze_snapshot_message(analyzer._get_mode_strategy(), message)
+    finally:
+        main.generate_static_api_files = original_api_files
+        main.compact_output = original_compact
+
+    assert sorted(reports[0]["new_titles"]["weibo"]) == ["只在第一份出现的标题", "最新标题"]
+    print("✅ 背压丢弃的消息不影响新增标题的推送")
+
+
+if __name__ == "__main__":
+    test_backpressure_and_recovery()
+    test_crawl_only_then_consume()
+    test_consumer_reuses_message_results()
+    test_superseded_snapshots_and_retry()
+    test_new_titles_since_skipped_snapshots()
+    test_dropped_snapshots_keep_new_titles()
+    print("\n✅ 所有测试通过！")
@@ -0,0 +1,140 @@
+# coding=utf-8
+"""
+测试来源熔断与重试预算：熔断状态在 closed / open / half_open 之间的转换、同一次运行内失败只计一次、
+熔断中的来源与请求失败分开报告，以及重试预算用完后不再重试
+"""
+
+import json
+import sys
+import tempfile
+import threading
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from main import (
+    DataFetcher,
+    SourceAdapter,
+    SourceHealthTracker,
+    TitleRecord,
+    prepare_report_data,
+    split_content_into_batches,
+)
+from newsnow_replay import RecordingStore
+
+
+def test_circuit_state_transitions():
+    print("=== 测试1: 熔断状态转换 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        state_file = Path(tmp) / "source_health.json"
+        tracker = SourceHealthTracker(failure_threshold=2, cooldown=60, state_file=state_file)
+        assert tracker.get_state("weibo", 0) == "closed"
+
+        tracker.record_failure("weibo", 0)
+        assert tracker.get_state("weibo", 0) == "closed"
+        # 同一次运行内再次失败不累计
+        tracker.record_failure("weibo", 5)
+        assert tracker.records["weibo"]["consecutive_failures"] == 1
+        assert tracker.records["weibo"]["last_failure"] == 5
+
+        tracker.start_run()
+        tracker.record_failure("weibo", 10)
+        assert tracker.records["weibo"]["consecutive_failures"] == 2
+        assert tracker.get_state("weibo", 30) == "open"
+        assert tracker.get_state("weibo", 70) == "half_open"
+
+        # 持久化后跨运行保持状态
+        tracker.save()
+        reloaded = SourceHealthTracker(failure_threshold=2, cooldown=60, state_file=state_file)
+        assert reloaded.get_state("weibo", 30) == "open"
+
+        # 探测失败重新熔断，探测成功关闭熔断
+        reloaded.record_failure("weibo", 70)
+        assert reloaded.get_state("weibo", 100) == "open"
+        assert reloaded.records["weibo"]["open_until"] == 130
+        reloaded.record_success("weibo", 130)
+        assert reloaded.get_state("weibo", 130) == "closed"
+        assert reloaded.records["weibo"]["consecutive_failures"] == 0
+    print("✅ 连续失败达到阈值后熔断，冷却结束后探测，成功即恢复")
+
+
+def test_open_circuit_is_reported_separately():
+    print("\n=== 测试2: 熔断中的来源不计入请求失败 ===")
+    with tempfile.TemporaryDirectory() as tmp:
+        store = RecordingStore(Path(tmp) / "recordings")
+        store.save(
+            "weibo",
+            json.dumps({"status": "success", "items": [{"title": "微博标题"}]}, ensure_ascii=False).encode("utf-8"),
+        )
+        tracker = SourceHealthTracker(
+            failure_threshold=1, cooldown=3600, state_file=Path(tmp) / "source_health.json"
+        )
+        fetcher = DataFetcher(replay_store=store, health_tracker=tracker, retry_budget=0)
+
+        _, _, failed_ids = fetcher.crawl_websites(["weibo", "zhihu"], request_interval=1)
+        assert failed_ids == ["zhihu"] and fetcher.circuit_open_ids == []
+        # 生成 API 数据时再次抓取同一批来源，不重复计入失败
+        fetcher.crawl_websites(["zhihu", "baidu"], request_interval=1)
+        assert tracker.records["zhihu"]["consecutive_failures"] == 1
+        assert tracker.records["baidu"]["consecutive_failures"] == 1
+
+        # 下一次运行：熔断中的来源不发起请求，单独记录
+        fetcher.reset_run_cache()
+        results, id_to_name, failed_ids = fetcher.crawl_websites(
+            ["weibo", "zhihu", "baidu"], request_interval=1
+        )
+        assert list(results) == ["weibo"]
+        assert failed_ids == []
+        assert fetcher.circuit_open_ids == ["zhihu", "baidu"]
+        assert fetcher.fetched_ids == ["weibo"]
+        assert "zhihu" in id_to_name
+        assert fetcher.run_snapshot()[2] == []
+        # 同一次运行再次请求时仍视为熔断而非失败
+        _, _, failed_ids = fetcher.crawl_websites(["zhihu"], request_interval=1)
+        assert failed_ids == [] and fetcher.circuit_open_ids == ["zhihu", "baidu"]
+
+    report_data = prepare_report_data([], ["toutiao"], circuit_open_ids=["zhihu", "baidu"])
+    assert report_data["failed_ids"] == ["toutiao"]
+    assert report_data["circuit_open_ids"] == ["zhihu", "baidu"]
+    batches = split_content_into_batches(report_data, "telegram")
+    assert "⛔ 熔断中暂停请求的平台" in "".join(batches)
+    print("✅ 熔断中的来源在报告中单独列出")
+
+
+class FailingAdapter(SourceAdapter):
+    def __init__(self):
+        self.calls = []
+        self.lock = threading.Lock()
+
+    def fetch(self, fetcher, id_value):
+        with self.lock:
+            self.calls.append(id_value)
+        if id_value == "ok":
+            return "success", "hash", [TitleRecord("标题", 1)]
+        raise ConnectionError("模拟请求失败")
+
+
+def test_retry_budget_exhaustion():
+    print("\n=== 测试3: 重试预算 ===")
+    ids = ["a", "b", "c", "ok"]
+    adapter = FailingAdapter()
+    fetcher = DataFetcher(
+        adapters={id_value: adapter for id_value in ids}, max_concurrency=4, retry_budget=2
+    )
+    results, _, failed_ids = fetcher.crawl_websites(
+        ids, request_interval=1, max_retries=3, min_retry_wait=0.01, max_retry_wait=0.02
+    )
+    assert list(results) == ["ok"]
+    assert failed_ids == ["a", "b", "c"]
+    # 3 个失败来源首次请求各 1 次，整次抓取共享的预算只够再重试 2 次
+    failed_calls = [id_value for id_value in adapter.calls if id_value != "ok"]
+    assert len(failed_calls) == 3 + 2, adapter.calls
+    print(f"✅ 预算用完后不再重试（请求顺序 {adapter.calls}）")
+
+
+if __name__ == "__main__":
+    test_circuit_state_transitions()
+    test_open_circuit_is_reported_separately()
+    test_retry_budget_exhaustion()
+    print("\n✅ 所有测试通过！")
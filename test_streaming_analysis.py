@@ -0,0 +1,87 @@
+# coding=utf-8
+"""
+测试流式分析阶段：逐个来源到达时计算的新增标题和词组匹配，
+应与抓取结束后重新解析快照的结果完全一致
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+from main import (
+    StreamingAnalysisStage,
+    count_word_frequency,
+    detect_latest_new_titles,
+    format_date_folder,
+    save_titles_to_file,
+)
+
+WORD_GROUPS = [
+    {"required": [], "normal": ["AI", "大模型"], "group_key": "AI 大模型"},
+    {"required": ["股市"], "normal": [], "group_key": "股市"},
+]
+FILTER_WORDS = ["广告"]
+
+
+def make_titles(*titles):
+    return {
+        title: {"ranks": [index], "url": f"https://example.com/{index}", "mobileUrl": ""}
+        for index, title in enumerate(titles, 1)
+    }
+
+
+def test_streaming_matches_batch_analysis():
+    print("=== 测试: 流式分析与批量分析结果一致 ===")
+    original_cwd = os.getcwd()
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            txt_dir = Path("output") / format_date_folder() / "txt"
+            txt_dir.mkdir(parents=True)
+            (txt_dir / "00时00分.txt").write_text(
+                "weibo | 微博\n1. 旧闻：AI 新进展\n2. 股市收盘\n\n"
+                "zhihu | 知乎\n1. 如何看待大模型\n\n",
+                encoding="utf-8",
+            )
+
+            stage = StreamingAnalysisStage(["weibo", "zhihu"], WORD_GROUPS, FILTER_WORDS)
+            results = {
+                "weibo": make_titles(
+                    "旧闻：AI 新进展", "  股市  大涨 ", "AI 广告", "股市收盘", "股市 大涨"
+                ),
+                "zhihu": make_titles("如何看待大模型", "新的 AI 问题"),
+                "baidu": make_titles("不在监控平台的 AI 标题"),
+            }
+            for source_id, title_data in results.items():
+                stage.add_source(source_id, title_data)
+
+            id_to_name = {"weibo": "微博", "zhihu": "知乎", "baidu": "百度"}
+            save_titles_to_file(results, id_to_name, [])
+
+            expected_new_titles = detect_latest_new_titles(["weibo", "zhihu"])
+            assert stage.new_titles() == expected_new_titles
+            assert sorted(expected_new_titles["weibo"]) == ["AI 广告", "股市 大涨"]
+
+            for mode in ["incremental", "daily"]:
+                expected = count_word_frequency(
+                    results, WORD_GROUPS, FILTER_WORDS, id_to_name,
+                    new_titles=expected_new_titles, mode=mode,
+                )
+                streamed = count_word_frequency(
+                    results, WORD_GROUPS, FILTER_WORDS, id_to_name,
+                    new_titles=stage.new_titles(), mode=mode,
+                    match_cache=stage.match_cache,
+                )
+                assert streamed == expected, mode
+            print("✅ 新增标题与词频统计一致")
+        finally:
+            os.chdir(original_cwd)
+
+
+if __name__ == "__main__":
+    test_streaming_matches_batch_analysis()
+    print("\n✅ 所有测试通过！")
@@ -0,0 +1,153 @@
+# coding=utf-8
+"""
+测试 SQLite 标题存储：迁移已有 txt 快照后，当日汇总、新增标题检测与 txt 后端结果一致；
+关闭 write_txt 时只写入存储
+"""
+
+import contextlib
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+# 添加当前目录到路径
+sys.path.insert(0, str(Path(__file__).parent))
+
+import main
+from main import (
+    detect_latest_new_titles,
+    format_date_folder,
+    is_first_crawl_today,
+    read_all_today_titles,
+    save_titles_to_file,
+)
+from title_store import TitleStore, migrate_txt_snapshots
+
+ID_TO_NAME = {"weibo": "微博", "zhihu": "知乎", "baidu": "百度"}
+
+SNAPSHOTS = [
+    (
+        "08时00分",
+        {
+            "weibo": {"AI 新进展": {"ranks": [1], "url": "", "mobileUrl": "", "heat": 500}, "股市收盘": {"ranks": [2], "url": "https://w/2", "mobileUrl": ""}},
+            "zhihu": {"如何看待大模型": {"ranks": [1], "url": "https://z/1", "mobileUrl": "https://m.z/1"}},
+        },
+        [],
+        ["baidu"],
+    ),
+    (
+        "08时30分",
+        {
+            "weibo": {"股市收盘": {"ranks": [1], "url": "https://w/2", "mobileUrl": ""}, "AI 新进展": {"ranks": [3], "url": "https://w/1", "mobileUrl": "", "heat": 900}},
+            "zhihu": {"如何看待大模型": {"ranks": [1], "url": "https://z/1", "mobileUrl": "https://m.z/1"}},
+            "baidu": {"百度 新闻": {"ranks": [1], "url": "", "mobileUrl": ""}},
+        },
+        ["zhihu"],
+        [],
+    ),
+    (
+        "09时00分",
+        {
+            "weibo": {"  新的   标题 ": {"ranks": [2, 5], "url": "", "mobileUrl": ""}, "股市收盘": {"ranks": [1], "url": "", "mobileUrl": ""}},
+            "baidu": {"百度 新闻": {"ranks": [4], "url": "https://b/1", "mobileUrl": ""}, "百度 另一条": {"ranks": [2], "url": "", "mobileUrl": ""}},
+        },
+        [],
+        ["zhihu"],
+    ),
+]
+
+
+def write_snapshots():
+    txt_dir = Path("output") / format_date_folder() / "txt"
+    for time_name, results, unchanged_ids, failed_ids in SNAPSHOTS:
+        save_titles_to_file(
+            results, ID_TO_NAME, failed_ids, unchanged_ids,
+            file_path=str(txt_dir / f"{time_name}.txt"),
+        )
+
+
+def analyze(platform_ids=None):
+    return (
+        read_all_today_titles(platform_ids),
+        detect_latest_new_titles(platform_ids),
+        is_first_crawl_today(),
+    )
+
+
+def clear_read_caches():
+    main._title_store = None
+    main._manifest_cache.clear()
+    main._daily_aggregate_cache.clear()
+    main.read_stored_section.cache_clear()
+
+
+@contextlib.contextmanager
+def storage_tempdir(**storage):
+    """在临时目录中运行并按参数覆盖 CONFIG["STORAGE"]；退出时恢复工作目录和存储配置，进出时都清空读取缓存"""
+    original_cwd = os.getcwd()
+    original_storage = dict(main.CONFIG["STORAGE"])
+    with tempfile.TemporaryDirectory() as tmp:
+        os.chdir(tmp)
+        try:
+            main.CONFIG["STORAGE"].update(storage)
+            clear_read_caches()
+            yield Path(tmp)
+        finally:
+            main.CONFIG["STORAGE"].clear()
+            main.CONFIG["STORAGE"].update(original_storage)
+            clear_read_caches()
+            os.chdir(original_cwd)
+
+
+def use_backend(backend: str, write_txt: bool = True):
+    main.CONFIG["STORAGE"]["BACKEND"] = backend
+    main.CONFIG["STORAGE"]["WRITE_TXT"] = write_txt
+    main._title_store = None
+
+
+def test_migrated_store_matches_txt():
+    print("=== 测试1: 迁移后与 txt 后端结果一致 ===")
+    with storage_tempdir():
+        use_backend("txt")
+        write_snapshots()
+        expected = [analyze(), analyze(["weibo", "baidu"])]
+
+        count = migrate_txt_snapshots(TitleStore(main.CONFIG["STORAGE"]["SQLITE_PATH"]), Path("output"))
+        assert count == len(SNAPSHOTS)
+        use_backend("sqlite")
+        actual = [analyze(), analyze(["weibo", "baidu"])]
+
+    for (expected_day, expected_new, expected_first), (day, new, first) in zip(expected, actual):
+        assert day == expected_day
+        assert [list(r) for r in day[0].values()] == [list(r) for r in expected_day[0].values()]
+        assert new == expected_new
+        assert first == expected_first
+    assert expected[0][1] == {
+        "weibo": {"新的 标题": {"ranks": [2], "url": "", "mobileUrl": ""}},
+        "baidu": {"百度 另一条": {"ranks": [2], "url": "", "mobileUrl": ""}},
+    }
+    print("✅ 当日汇总、新增标题和首次抓取判断均与 txt 后端一致")
+
+
+def test_sqlite_only_writes():
+    print("\n=== 测试2: 只写入 SQLite ===")
+    with storage_tempdir():
+        use_backend("txt")
+        write_snapshots()
+        expected = analyze()
+
+        for txt_file in Path("output").glob("*/txt/*.txt"):
+            txt_file.unlink()
+        use_backend("sqlite", write_txt=False)
+        write_snapshots()
+        assert not list(Path("output").glob("*/txt/*.txt"))
+        actual = analyze()
+
+    assert actual == expected
+    print("✅ 关闭 write_txt 后不再生成 txt 快照，分析结果不变")
+
+
+if __name__ == "__main__":
+    test_migrated_store_matches_txt()
+    test_sqlite_only_writes()
+    print("\n✅ 所有测试通过！")
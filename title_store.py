@@ -0,0 +1,383 @@
+# coding=utf-8
+"""
+SQLite 标题存储
+以索引表代替 output/<日期>/txt/HH时MM分.txt 快照：分析时按日期查询，不再逐个解析当日全部文件。
+
+表结构：
+  sources           (source_id, name)                         平台及最新名称
+  snapshots         (id, date, time_name, created_at)         一次抓取快照，date 为日期目录名，time_name 为 HH时MM分
+  snapshot_sources  (snapshot_id, source_id, status, position) 快照包含的平台：ok / unchanged / failed，position 为写入顺序
+  titles            (id, source_id, title)                    标题（每个平台内唯一）
+  appearances       (snapshot_id, title_id, rank, url, mobile_url, heat)  标题在某次快照中的出现
+
+用法（在项目根目录执行）:
+  python title_store.py migrate [--output output] [--db output/titles.db]   导入已有 txt 快照
+"""
+
+import argparse
+import sqlite3
+import time
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Set, Tuple, Union
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sources (
+    source_id TEXT PRIMARY KEY,
+    name TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    date TEXT NOT NULL,
+    time_name TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    UNIQUE (date, time_name)
+);
+CREATE TABLE IF NOT EXISTS snapshot_sources (
+    snapshot_id INTEGER NOT NULL,
+    source_id TEXT NOT NULL,
+    status TEXT NOT NULL,
+    position INTEGER NOT NULL,
+    PRIMARY KEY (snapshot_id, source_id)
+);
+CREATE TABLE IF NOT EXISTS titles (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    source_id TEXT NOT NULL,
+    title TEXT NOT NULL,
+    UNIQUE (source_id, title)
+);
+CREATE TABLE IF NOT EXISTS appearances (
+    snapshot_id INTEGER NOT NULL,
+    title_id INTEGER NOT NULL,
+    rank INTEGER NOT NULL,
+    url TEXT NOT NULL DEFAULT '',
+    mobile_url TEXT NOT NULL DEFAULT '',
+    heat INTEGER,
+    PRIMARY KEY (snapshot_id, title_id)
+);
+CREATE INDEX IF NOT EXISTS appearances_by_title ON appearances (title_id, snapshot_id);
+"""
+
+# 按快照时间、平台写入顺序、排名读取当日出现记录
+DAY_ROWS_SQL = """
+SELECT s.time_name, t.source_id, t.title, a.rank, a.url, a.mobile_url, a.heat, ss.status
+FROM snapshots s
+JOIN snapshot_sources ss ON ss.snapshot_id = s.id
+JOIN appearances a ON a.snapshot_id = s.id
+JOIN titles t ON t.id = a.title_id AND t.source_id = ss.source_id
+WHERE s.date = ? AND s.time_name > ? AND s.time_name <= ?{source_filter}
+ORDER BY s.time_name, ss.position, a.rank, a.rowid
+"""
+
+
+def _title_info(rank: int, url: str, mobile_url: str, heat: Optional[int]) -> Dict:
+    info = {"ranks": [rank], "url": url, "mobileUrl": mobile_url}
+    if heat is not None:
+        info["heat"] = heat
+    return info
+
+
+class TitleStore:
+    """标题存储；每次操作单独连接，可跨线程、跨进程使用"""
+
+    def __init__(self, db_path: Union[str, Path]):
+        self.db_path = Path(db_path)
+        self.db_path.parent.mkdir(parents=True, exist_ok=True)
+        conn = sqlite3.connect(str(self.db_path), timeout=30)
+        try:
+            conn.executescript(SCHEMA)
+        finally:
+            conn.close()
+
+    @contextmanager
+    def _connect(self, write: bool = False) -> Iterator[sqlite3.Connection]:
+        conn = sqlite3.connect(str(self.db_path), timeout=30, isolation_level=None)
+        try:
+            if write:
+                conn.execute("BEGIN IMMEDIATE")
+                try:
+                    yield conn
+                except Exception:
+                    conn.execute("ROLLBACK")
+                    raise
+                conn.execute("COMMIT")
+            else:
+                yield conn
+        finally:
+            conn.close()
+
+    @staticmethod
+    def _source_filter(source_ids: Optional[List[str]], column: str) -> Tuple[str, List[str]]:
+        if source_ids is None:
+            return "", []
+        placeholders = ",".join("?" * len(source_ids)) or "NULL"
+        return f" AND {column} IN ({placeholders})", list(source_ids)
+
+    def save_snapshot(
+            self,
+            date: str,
+            time_name: str,
+            results: Dict,
+            id_to_name: Dict,
+            failed_ids: Optional[List] = None,
+            unchanged_ids: Optional[List] = None,
+    ) -> None:
+        """
+        写入一次快照；同一日期、同一时间的快照被整体替换（与同一分钟覆盖 txt 文件一致）
+
+        results 为 {id: {title: {ranks, url, mobileUrl[, heat]}}}，每个标题只记录首个排名
+        """
+        unchanged = set(unchanged_ids or [])
+        with self._connect(write=True) as conn:
+            row = conn.execute(
+                "SELECT id FROM snapshots WHERE date = ? AND time_name = ?", (date, time_name)
+            ).fetchone()
+            if row:
+                snapshot_id = row[0]
+                conn.execute("DELETE FROM appearances WHERE snapshot_id = ?", (snapshot_id,))
+                conn.execute("DELETE FROM snapshot_sources WHERE snapshot_id = ?", (snapshot_id,))
+                conn.execute(
+                    "UPDATE snapshots SET created_at = ? WHERE id = ?", (time.time(), snapshot_id)
+                )
+            else:
+                snapshot_id = conn.execute(
+                    "INSERT INTO snapshots (date, time_name, created_at) VALUES (?, ?, ?)",
+                    (date, time_name, time.time()),
+                ).lastrowid
+
+            position = 0
+            for source_id, title_data in results.items():
+                conn.execute(
+                    "INSERT INTO sources (source_id, name) VALUES (?, ?) "
+                    "ON CONFLICT (source_id) DO UPDATE SET name = excluded.name",
+                    (source_id, id_to_name.get(source_id) or source_id),
+                )
+                conn.execute(
+                    "INSERT INTO snapshot_sources (snapshot_id, source_id, status, position) "
+                    "VALUES (?, ?, ?, ?)",
+                    (snapshot_id, source_id, "unchanged" if source_id in unchanged else "ok", position),
+                )
+                position += 1
+                for title, info in title_data.items():
+                    conn.execute(
+                        "INSERT OR IGNORE INTO titles (source_id, title) VALUES (?, ?)",
+                        (source_id, title),
+                    )
+                    title_id = conn.execute(
+                        "SELECT id FROM titles WHERE source_id = ? AND title = ?",
+                        (source_id, title),
+                    ).fetchone()[0]
+                    ranks = info.get("ranks") or [1]
+                    conn.execute(
+                        "INSERT OR REPLACE INTO appearances "
+                        "(snapshot_id, title_id, rank, url, mobile_url, heat) VALUES (?, ?, ?, ?, ?, ?)",
+                        (
+                            snapshot_id,
+                            title_id,
+                            ranks[0],
+                            info.get("url", ""),
+                            info.get("mobileUrl", ""),
+                            info.get("heat"),
+                        ),
+                    )
+
+            for source_id in failed_ids or []:
+                if source_id in results:
+                    continue
+                conn.execute(
+                    "INSERT OR IGNORE INTO snapshot_sources (snapshot_id, source_id, status, position) "
+                    "VALUES (?, ?, 'failed', ?)",
+                    (snapshot_id, source_id, position),
+                )
+                position += 1
+
+    def dates(self) -> List[str]:
+        """返回有快照的日期目录名"""
+        with self._connect() as conn:
+            return [row[0] for row in conn.execute("SELECT DISTINCT date FROM snapshots ORDER BY date")]
+
+    def snapshot_times(self, date: str) -> List[str]:
+        """返回指定日期的快照时间（HH时MM分），按时间排序"""
+        with self._connect() as conn:
+            return [
+                row[0]
+                for row in conn.execute(
+                    "SELECT time_name FROM snapshots WHERE date = ? ORDER BY time_name", (date,)
+                )
+            ]
+
+    def snapshot_versions(self, date: str) -> List[Tuple[str, str]]:
+        """返回指定日期的 (快照时间, 版本)，快照被重写后版本随之变化"""
+        with self._connect() as conn:
+            return [
+                (time_name, repr(created_at))
+                for time_name, created_at in conn.execute(
+                    "SELECT time_name, created_at FROM snapshots WHERE date = ? ORDER BY time_name",
+                    (date,),
+                )
+            ]
+
+    def iter_day(
+            self,
+            date: str,
+            source_ids: Optional[List[str]] = None,
+            after: Optional[str] = None,
+            until: Optional[str] = None,
+    ) -> Iterator[Tuple[str, Dict, Dict, List]]:
+        """
+        按时间顺序逐个返回当日快照 (time_name, titles_by_id, id_to_name, unchanged_ids)，
+        内容与解析对应 txt 快照的结果一致；source_ids 用于按平台过滤，
+        after / until 限定快照时间范围（不含 after，含 until）
+        """
+        source_filter, params = self._source_filter(source_ids, "t.source_id")
+        with self._connect() as conn:
+            names = dict(conn.execute("SELECT source_id, name FROM sources"))
+            rows = conn.execute(
+                DAY_ROWS_SQL.format(source_filter=source_filter),
+                [date, after or "", until or "\uffff"] + params,
+            )
+
+            current_time = None
+            titles_by_id: Dict[str, Dict] = {}
+            unchanged_ids: List[str] = []
+            for time_name, source_id, title, rank, url, mobile_url, heat, status in rows:
+                if time_name != current_time:
+                    if current_time is not None:
+                        yield current_time, titles_by_id, {i: names.get(i, i) for i in titles_by_id}, unchanged_ids
+                    current_time = time_name
+                    titles_by_id = {}
+                    unchanged_ids = []
+                if source_id not in titles_by_id:
+                    titles_by_id[source_id] = {}
+                    if status == "unchanged":
+                        unchanged_ids.append(source_id)
+                titles_by_id[source_id][title] = _title_info(rank, url, mobile_url, heat)
+            if current_time is not None:
+                yield current_time, titles_by_id, {i: names.get(i, i) for i in titles_by_id}, unchanged_ids
+
+    def load_snapshot(self, date: str, time_name: str) -> Tuple[Dict, Dict, List]:
+        """读取单个快照，返回 (titles_by_id, id_to_name, unchanged_ids)"""
+        with self._connect() as conn:
+            row = conn.execute(
+                "SELECT id FROM snapshots WHERE date = ? AND time_name = ?", (date, time_name)
+            ).fetchone()
+            if not row:
+                return {}, {}, []
+            rows = conn.execute(
+                """
+                SELECT t.source_id, t.title, a.rank, a.url, a.mobile_url, a.heat, ss.status, src.name
+                FROM appearances a
+                JOIN titles t ON t.id = a.title_id
+                JOIN snapshot_sources ss ON ss.snapshot_id = a.snapshot_id AND ss.source_id = t.source_id
+                JOIN sources src ON src.source_id = t.source_id
+                WHERE a.snapshot_id = ?
+                ORDER BY ss.position, a.rank, a.rowid
+                """,
+                (row[0],),
+            ).fetchall()
+
+        titles_by_id = {}
+        id_to_name = {}
+        unchanged_ids = []
+        for source_id, title, rank, url, mobile_url, heat, status, name in rows:
+            if source_id not in titles_by_id:
+                titles_by_id[source_id] = {}
+                id_to_name[source_id] = name
+                if status == "unchanged":
+                    unchanged_ids.append(source_id)
+            titles_by_id[source_id][title] = _title_info(rank, url, mobile_url, heat)
+        return titles_by_id, id_to_name, unchanged_ids
+
+    def latest_new_titles(self, date: str, source_ids: Optional[List[str]] = None) -> Dict:
+        """
+        当日最新快照中此前从未出现过的标题 {id: {title: info}}，
+        与 detect_latest_new_titles 一致：当日不足两次快照时返回空
+        """
+        source_filter, params = self._source_filter(source_ids, "t.source_id")
+        with self._connect() as conn:
+            latest = conn.execute(
+                "SELECT id, time_name FROM snapshots WHERE date = ? ORDER BY time_name DESC LIMIT 2",
+                (date,),
+            ).fetchall()
+            if len(latest) < 2:
+                return {}
+            snapshot_id, time_name = latest[0]
+            rows = conn.execute(
+                f"""
+                SELECT t.source_id, t.title, a.rank, a.url, a.mobile_url, a.heat
+                FROM appearances a
+                JOIN titles t ON t.id = a.title_id
+                JOIN snapshot_sources ss ON ss.snapshot_id = a.snapshot_id AND ss.source_id = t.source_id
+                WHERE a.snapshot_id = ?{source_filter}
+                  AND NOT EXISTS (
+                    SELECT 1 FROM appearances b JOIN snapshots s ON s.id = b.snapshot_id
+                    WHERE b.title_id = a.title_id AND s.date = ? AND s.time_name < ?
+                  )
+                ORDER BY ss.position, a.rank, a.rowid
+                """,
+                [snapshot_id] + params + [date, time_name],
+            ).fetchall()
+
+        new_titles: Dict[str, Dict] = {}
+        for source_id, title, rank, url, mobile_url, heat in rows:
+            new_titles.setdefault(source_id, {})[title] = _title_info(rank, url, mobile_url, heat)
+        return new_titles
+
+    def seen_titles(self, date: str, source_ids: Optional[List[str]] = None) -> Dict[str, Set[str]]:
+        """当日已出现过的标题集合 {id: {title}}"""
+        source_filter, params = self._source_filter(source_ids, "t.source_id")
+        with self._connect() as conn:
+            rows = conn.execute(
+                f"""
+                SELECT DISTINCT t.source_id, t.title
+                FROM appearances a
+                JOIN snapshots s ON s.id = a.snapshot_id
+                JOIN titles t ON t.id = a.title_id
+                WHERE s.date = ?{source_filter}
+                """,
+                [date] + params,
+            )
+            seen: Dict[str, Set[str]] = {}
+            for source_id, title in rows:
+                seen.setdefault(source_id, set()).add(title)
+        return seen
+
+
+def migrate_txt_snapshots(store: TitleStore, output_dir: Path) -> int:
+    """把 output/<日期>/txt/*.txt 导入标题存储，返回导入的快照数；重复执行时覆盖同名快照"""
+    from main import parse_snapshot_file
+
+    count = 0
+    for txt_file in sorted(output_dir.glob("*/txt/*.txt")):
+        titles_by_id, id_to_name, unchanged_ids = parse_snapshot_file(txt_file)
+        store.save_snapshot(
+            txt_file.parent.parent.name,
+            txt_file.stem,
+            titles_by_id,
+            id_to_name,
+            unchanged_ids=unchanged_ids,
+        )
+        count += 1
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SQLite 标题存储")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    migrate_parser = subparsers.add_parser("migrate", help="导入已有 txt 快照")
+    migrate_parser.add_argument("--output", default="output", help="输出目录")
+    migrate_parser.add_argument("--db", default="output/titles.db", help="标题存储路径")
+    args = parser.parse_args()
+
+    if args.command == "migrate":
+        store = TitleStore(args.db)
+        start = time.perf_counter()
+        count = migrate_txt_snapshots(store, Path(args.output))
+        print(
+            f"已导入 {count} 个快照（{len(store.dates())} 天）到 {store.db_path}，"
+            f"耗时 {time.perf_counter() - start:.2f} 秒"
+        )
+
+
+if __name__ == "__main__":
+    main()